@@ -1,2541 +1,3482 @@
-# app.py
-
-import os
-import json
-import random
-import time
-from datetime import datetime, timedelta
-import subprocess
-import sys
-import secrets
-
-# Get the base directory where app.py is located (for finding .git, VERSION, etc.)
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-from collections import defaultdict
-from project_manager import ProjectManager, Project
-from migrate_to_projects import migrate
-import threading
-
-def install_and_import(package):
-    try:
-        __import__(package)
-    except ImportError:
-        subprocess.check_call([sys.executable, "-m", "pip", "install", package])
-        __import__(package)
-
-# List of required packages
-required_packages = ['flask', 'openai']
-
-# Check and install required packages
-for package in required_packages:
-    install_and_import(package)
-
-# Install flask-session separately (package name differs from import name)
-try:
-    import flask_session
-except ImportError:
-    subprocess.check_call([sys.executable, "-m", "pip", "install", "flask-session"])
-
-from flask import Flask, render_template, request, redirect, url_for, session, flash, jsonify
-from flask_session import Session
-from werkzeug.utils import secure_filename
-import openai
-from document_processor import DocumentProcessor
-
-# Create Flask app and set secret key
-app = Flask(__name__)
-
-# Configure server-side session to avoid cookie size limits
-app.config['SESSION_TYPE'] = 'filesystem'
-app.config['SESSION_FILE_DIR'] = './.flask_session/'
-app.config['SESSION_PERMANENT'] = False
-app.config['SESSION_USE_SIGNER'] = True
-
-# Generate a persistent secret key if it doesn't exist
-SECRET_KEY_FILE = 'secret_key.txt'
-
-def get_or_create_secret_key():
-    try:
-        if os.path.exists(SECRET_KEY_FILE):
-            with open(SECRET_KEY_FILE, 'r') as f:
-                return f.read().strip()
-        else:
-            # Generate a new secret key
-            secret_key = secrets.token_hex(32)
-            with open(SECRET_KEY_FILE, 'w') as f:
-                f.write(secret_key)
-            return secret_key
-    except Exception as e:
-        print(f"Error handling secret key: {e}")
-        # Fallback to a new random key (will change on restart)
-        return secrets.token_hex(32)
-
-app.secret_key = get_or_create_secret_key()
-
-# Initialize server-side session
-Session(app)
-
-# Set up OpenAI API key
-with open('openaikey.txt', 'r') as file:
-    api_key = file.read().strip()
-
-# Create OpenAI client
-client = openai.OpenAI(api_key=api_key)
-
-# Run migration if needed (converts old single-project structure to multi-project)
-print("\nChecking if migration is needed...")
-migrate()
-
-# Initialize Project Manager
-print("Initializing Project Manager...")
-project_manager = ProjectManager()
-print(f"[OK] Found {len(project_manager.projects)} project(s)\n")
-
-# Global progress tracking for async project creation and file extraction
-creation_progress = {}
-extraction_progress = {}
-
-# Load settings for configurable parameters
-def get_app_settings():
-    """Get application settings with defaults"""
-    try:
-        if os.path.exists('settings.json'):
-            with open('settings.json', 'r') as f:
-                return json.load(f)
-    except:
-        pass
-    return {
-        "default_cards_per_topic": 25,
-        "default_time_per_card": 10,
-        "default_total_exam_time": 60
-    }
-
-# Load settings on startup
-_settings = get_app_settings()
-
-# Configurable parameters (loaded from settings)
-CARDS_PER_TRANSCRIPT = _settings.get('default_cards_per_topic', 25)  # Default number of cards per transcript
-TIME_PER_CARD = _settings.get('default_time_per_card', 10)  # Default time per card in seconds
-TOTAL_EXAM_TIME = _settings.get('default_total_exam_time', 60)  # Default total exam time in minutes
-
-# Helper functions for project management
-def get_current_project() -> Project:
-    """Get the current project from session, or return default project"""
-    project_id = session.get('current_project_id')
-    
-    if project_id and project_id in project_manager.projects:
-        return project_manager.projects[project_id]
-    
-    # No project in session or project not found - use first available or create default
-    if project_manager.projects:
-        # Use first available project
-        first_project_id = list(project_manager.projects.keys())[0]
-        session['current_project_id'] = first_project_id
-        return project_manager.projects[first_project_id]
-    else:
-        # No projects exist - create a default one
-        default_project = project_manager.create_project("My Flash Cards")
-        session['current_project_id'] = default_project.id
-        return default_project
-
-def set_current_project(project_id: str):
-    """Set the current project in session"""
-    if project_id in project_manager.projects:
-        session['current_project_id'] = project_id
-        return True
-    return False
-
-def save_flashcards(flashcards, filepath='flashcards.json'):
-    """Save flashcards to a JSON file"""
-    try:
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(flashcards, f, indent=2)
-    except Exception as e:
-        print(f"Error saving flashcards: {e}")
-
-def load_saved_flashcards(filepath='flashcards.json'):
-    """Load flashcards from a JSON file if it exists"""
-    try:
-        if os.path.exists(filepath):
-            with open(filepath, 'r', encoding='utf-8') as f:
-                flashcards = json.load(f)
-                # Add answer_type to existing flashcards if missing
-                for card in flashcards:
-                    if 'answer_type' not in card:
-                        card['answer_type'] = get_answer_type(card['answer'])
-                return flashcards
-    except Exception as e:
-        print(f"Error loading saved flashcards: {e}")
-    return None
-
-def get_answer_type(correct_answer):
-    """Determine the type of answer expected"""
-    answer_lower = correct_answer.strip().lower()
-    if answer_lower in ['true', 'false']:
-        return 'true_false'
-    elif answer_lower in ['yes', 'no']:
-        return 'yes_no'
-    elif len(correct_answer.split()) == 1 and correct_answer.isalpha() and len(correct_answer) == 1:
-        return 'multiple_choice'
-    elif ',' in correct_answer and all(len(part.strip()) == 1 and part.strip().isalpha() for part in correct_answer.split(',')):
-        return 'multiple_answer'
-    else:
-        # Default to multiple_choice for any other single word answers
-        return 'multiple_choice'
-
-def validate_flashcard(card):
-    required_keys = ['question', 'answer', 'topic', 'filename']
-    return all(key in card for key in required_keys)
-
-# Load transcripts and generate flashcards
-def load_transcripts(folder_path):
-    """Load flashcards from saved file or generate new ones from transcripts"""
-    # Try to load saved flashcards first
-    saved_flashcards = load_saved_flashcards()
-    if saved_flashcards:
-        print("Loaded flashcards from saved file")
-        return saved_flashcards
-
-    # If no saved flashcards, generate new ones
-    print("\nGenerating new flashcards from transcripts...")
-    flashcards = []
-    try:
-        # First, try to read the Topic.txt file
-        topic_file = os.path.join(folder_path, 'Topic.txt')
-        if os.path.exists(topic_file):
-            with open(topic_file, 'r', encoding='utf-8') as f:
-                main_topic = f.read().strip()
-            print(f"Found main topic: {main_topic}\n")
-        else:
-            main_topic = None
-            print("Warning: Topic.txt not found in transcripts folder\n")
-
-        transcript_files = [f for f in os.listdir(folder_path) 
-                          if f.endswith('.txt') and f != 'Topic.txt']
-        total_files = len(transcript_files)
-        print(f"Found {total_files} transcript files to process\n")
-        
-        for index, filename in enumerate(transcript_files, 1):
-            print(f"Processing transcript {index}/{total_files}: {filename}")
-            filepath = os.path.join(folder_path, filename)
-            with open(filepath, 'r', encoding='utf-8') as f:
-                transcript = f.read()
-            cards = generate_flashcards(transcript, filename, main_topic)
-            flashcards.extend(cards)
-            print(f"Generated {len(cards)} flashcards from {filename}\n")
-        
-        # Save the generated flashcards
-        if flashcards:
-            print(f"Saving {len(flashcards)} total flashcards to file...")
-            save_flashcards(flashcards)
-            print("Flashcards saved successfully!")
-        else:
-            print("No flashcards were generated!")
-            
-    except Exception as e:
-        print(f"Error loading transcripts: {e}")
-    return flashcards
-
-def generate_flashcards(transcript, filename, main_topic=None):
-    print(f"  Generating flashcards for {filename}...")
-    
-    # Get topic from filename (everything before the first dot)
-    topic = filename.split('.')[0]
-    
-    # Include main topic in the prompt if available
-    topic_context = f"Main topic: {main_topic}\n" if main_topic else ""
-    
-    prompt = f"""
-    {topic_context}Generate exactly {CARDS_PER_TRANSCRIPT} flashcards from the following transcript.
-    The response must be a valid JSON array containing flashcard objects.
-    Each flashcard object must have these exact keys: 'question', 'answer', 'explanation', and optionally 'options'.
-    Format the response as a JSON array without any additional text or explanation.
-
-    CRITICAL RULES FOR QUESTION TYPES:
-    
-    1. TRUE/FALSE questions: Use ONLY for statements that can be evaluated as factually true or false.
-       - Answer MUST be exactly "True" or "False" (capitalized)
-       - Question should be a statement, not a question
-       - MUST include "explanation" field with 1-2 sentences explaining WHY the answer is True or False
-       - Example: {{"question": "The Product Owner is responsible for maximizing product value.", "answer": "True", "explanation": "The Product Owner is accountable for maximizing the value of the product resulting from the work of the Scrum Team."}}
-       
-    2. YES/NO questions: Use ONLY for questions asking about permissions, recommendations, or subjective matters.
-       - Answer MUST be exactly "Yes" or "No" (capitalized)
-       - Question should end with a question mark
-       - MUST include "explanation" field with 1-2 sentences explaining WHY
-       - Example: {{"question": "Should the team estimate in story points?", "answer": "Yes", "explanation": "Story points allow teams to estimate relative complexity without committing to specific time estimates, which is more accurate for complex work."}}
-       
-    3. MULTIPLE CHOICE: Use for questions with one correct answer from several options.
-       - Answer MUST be a single letter: "A", "B", "C", or "D"
-       - MUST include "options" array with 4 choices formatted as "A) text", "B) text", etc.
-       - MUST include "explanation" field with 1-2 sentences explaining WHY the correct answer is right
-       - Example: {{"question": "What is the primary role of a Product Owner?", "answer": "A", "options": ["A) Maximize product value", "B) Write code", "C) Manage the team", "D) Create documentation"], "explanation": "The Product Owner's primary responsibility is to maximize the value of the product by managing the Product Backlog and ensuring the team works on the most valuable items."}}
-       
-    4. MULTIPLE ANSWER: Use for questions where multiple options can be correct.
-       - Answer MUST be comma-separated letters like "A,C" or "B,C,D" (no spaces)
-       - MUST include "options" array with choices formatted as "A) text", "B) text", etc.
-       - MUST include "explanation" field explaining WHY these specific answers are correct
-       - Question should indicate multiple answers needed: "(Select all that apply)" or "Which of the following..."
-       - Example: {{"question": "Which of the following are Scrum values? (Select all that apply)", "answer": "A,C,D", "options": ["A) Courage", "B) Speed", "C) Focus", "D) Respect"], "explanation": "The five Scrum values are Commitment, Focus, Openness, Respect, and Courage. Speed is not a Scrum value."}}
-
-    DO NOT mix question types! If the question asks "Is...", use True/False. If it asks "Should..." or "Can...", use Yes/No.
-    Ensure answers match the question type exactly.
-    ALWAYS include an "explanation" field that helps learners understand the concept, not just the answer.
-
-    Transcript:
-    {transcript}
-    """
-    try:
-        print("  Sending request to OpenAI API...")
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {
-                    "role": "system", 
-                    "content": "You are a helpful assistant that generates exam-style flashcards. "
-                              "STRICT RULES: "
-                              "1) True/False questions MUST have answers of exactly 'True' or 'False' (capitalized) and be statements. "
-                              "2) Yes/No questions MUST have answers of exactly 'Yes' or 'No' (capitalized) and be questions about permissions or recommendations. "
-                              "3) Multiple Choice MUST have single letter answers (A, B, C, or D) with an options array. "
-                              "4) Multiple Answer MUST have comma-separated letters (e.g., 'A,C') with an options array. "
-                              "NEVER mix up question types with answer types. "
-                              "Focus on key concepts and ignore anecdotes, jokes, or stories."
-                },
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=4000,
-            n=1,
-            temperature=0.4,
-        )
-        print("  Received response from OpenAI API")
-        
-        flashcards_json = response.choices[0].message.content.strip()
-        print("  Raw response:")
-        print(flashcards_json)
-        
-        # Remove markdown code blocks if present
-        if flashcards_json.startswith('```'):
-            # Find the first newline after ```json or ```
-            first_newline = flashcards_json.find('\n')
-            # Find the last ``` marker
-            last_marker = flashcards_json.rfind('```')
-            if first_newline != -1 and last_marker != -1:
-                flashcards_json = flashcards_json[first_newline+1:last_marker].strip()
-                print("  Removed markdown code blocks from response")
-        
-        try:
-            flashcards = json.loads(flashcards_json)
-            print(f"  Successfully parsed {len(flashcards)} flashcards")
-            
-            for card in flashcards:
-                card['topic'] = topic  # Set topic from filename
-                card['filename'] = filename
-                card['correct_count'] = 0
-                card['attempts'] = 0
-                card['answer_type'] = get_answer_type(card['answer'])  # Add answer type
-            return flashcards
-            
-        except json.JSONDecodeError as e:
-            print(f"  JSON parsing error: {e}")
-            print("  Response was not valid JSON")
-            return []
-            
-    except Exception as e:
-        print(f"  Error generating flashcards: {e}")
-        return []
-
-def generate_project_name_from_text(text, is_multi_document=False, document_count=1):
-    """Use AI to generate a concise project name from document text"""
-    # Take a good sample from the text (first 4000 characters for better context)
-    sample_text = text[:4000]
-    
-    multi_doc_context = f"\n\nNote: This content is from {document_count} different documents. Generate a name that encompasses the overall theme." if is_multi_document and document_count > 1 else ""
-    
-    prompt = f"""
-    Based on the following document content, generate a short, concise project name (3-6 words max).
-    The name should capture the main topic, subject matter, or course title.
-    If this appears to be a certification course or structured learning material, include that in the name.
-    Respond with ONLY the project name, nothing else.{multi_doc_context}
-    
-    Document content:
-    {sample_text}
-    """
-    
-    try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",  # Use mini for simple tasks
-            messages=[
-                {"role": "system", "content": "You generate concise, descriptive project names for educational content and courses."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=50,
-            temperature=0.5,
-        )
-        
-        project_name = response.choices[0].message.content.strip()
-        # Remove quotes if present
-        project_name = project_name.strip('"\'')
-        print(f"Generated project name: {project_name}")
-        return project_name
-    
-    except Exception as e:
-        print(f"Error generating project name: {e}")
-        return "New Project"
-
-def suggest_optimal_flashcard_count(text, topic_name=""):
-    """Use AI to analyze content and suggest optimal flashcard count for a single topic/document"""
-    # Analyze the text to determine appropriate flashcard count
-    text_length = len(text)
-    word_count = len(text.split())
-    
-    # Take a good sample for AI analysis
-    sample_text = text[:3000]
-    
-    topic_context = f" about '{topic_name}'" if topic_name else ""
-    
-    prompt = f"""
-    Analyze this educational content{topic_context} and determine the optimal number of flashcards to generate.
-    
-    Content length: {word_count} words
-    
-    Consider:
-    - Content complexity and depth
-    - Number of distinct concepts covered
-    - Appropriate coverage without redundancy
-    - Effective learning (not too few, not too many)
-    
-    Respond with ONLY a JSON object in this exact format:
-    {{"optimal_count": 15, "reasoning": "Brief 1-sentence explanation"}}
-    
-    Suggest between 5 and 50 flashcards.
-    
-    Content sample:
-    {sample_text}
-    """
-    
-    try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "You are an expert at analyzing educational content and determining optimal learning material quantities."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=100,
-            temperature=0.3,
-        )
-        
-        result_json = response.choices[0].message.content.strip()
-        
-        # Remove markdown code blocks if present
-        if result_json.startswith('```'):
-            first_newline = result_json.find('\n')
-            last_marker = result_json.rfind('```')
-            if first_newline != -1 and last_marker != -1:
-                result_json = result_json[first_newline+1:last_marker].strip()
-        
-        result = json.loads(result_json)
-        optimal_count = result.get('optimal_count', 25)
-        reasoning = result.get('reasoning', 'Based on content analysis')
-        
-        # Clamp to reasonable range
-        optimal_count = max(5, min(50, optimal_count))
-        
-        print(f"AI suggests {optimal_count} flashcards for '{topic_name}': {reasoning}")
-        return optimal_count, reasoning
-    
-    except Exception as e:
-        print(f"Error getting optimal flashcard count: {e}")
-        # Fallback: estimate based on text length
-        if word_count < 500:
-            return 10, "Short content"
-        elif word_count < 1500:
-            return 20, "Medium length content"
-        else:
-            return 25, "Substantial content"
-
-def extract_topics_from_text(text):
-    """Use AI to extract topics and determine flashcard count per topic"""
-    # Take a larger sample for better analysis
-    sample_text = text[:8000]
-    word_count = len(text.split())
-    
-    prompt = f"""
-    Analyze this educational content and identify the optimal number of distinct learning topics.
-    
-    Content length: {word_count} words
-    
-    Your task:
-    1. Understand the overall subject matter and learning objectives
-    2. Identify natural topic divisions that aid learning and retention
-    3. Determine how many topics makes most sense pedagogically (no min/max constraints)
-    4. For each topic, suggest an appropriate number of flashcards based on complexity
-    
-    Guidelines:
-    - Create as many or as few topics as needed for effective learning
-    - Topics should represent meaningful knowledge domains
-    - Each topic should be substantial enough to warrant separate study
-    - Don't force a specific number - let the content guide you
-    - Flashcard counts should match topic complexity (5-50 per topic)
-    
-    Return your response as a JSON array of objects with this exact structure:
-    [{{"name": "Topic Name", "flashcard_count": 15}}]
-    
-    Respond with ONLY the JSON array, no additional text.
-    
-    Content:
-    {sample_text}
-    """
-    
-    try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "You are an expert at analyzing educational content and extracting key topics."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=500,
-            temperature=0.3,
-        )
-        
-        topics_json = response.choices[0].message.content.strip()
-        
-        # Remove markdown code blocks if present
-        if topics_json.startswith('```'):
-            first_newline = topics_json.find('\n')
-            last_marker = topics_json.rfind('```')
-            if first_newline != -1 and last_marker != -1:
-                topics_json = topics_json[first_newline+1:last_marker].strip()
-        
-        topics = json.loads(topics_json)
-        print(f"Extracted {len(topics)} topics")
-        return topics
-    
-    except Exception as e:
-        print(f"Error extracting topics: {e}")
-        return []
-
-def generate_flashcards_from_text(text, topic_name, num_cards):
-    """Generate flashcards for a specific topic from document text"""
-    prompt = f"""
-    Generate EXACTLY {num_cards} flashcards (no more, no less) about "{topic_name}" from the following content.
-    
-    IMPORTANT: The JSON array MUST contain precisely {num_cards} flashcard objects.
-    
-    The response must be a valid JSON array containing flashcard objects.
-    Each flashcard object must have these exact keys: 'question', 'answer', 'explanation', and optionally 'options'.
-    Format the response as a JSON array without any additional text or explanation.
-
-    CRITICAL RULES FOR QUESTION TYPES:
-    
-    1. TRUE/FALSE questions: Use ONLY for statements that can be evaluated as factually true or false.
-       - Answer MUST be exactly "True" or "False" (capitalized)
-       - Question should be a statement, not a question
-       - MUST include "explanation" field with 1-2 sentences explaining WHY
-       
-    2. YES/NO questions: Use ONLY for questions asking about permissions, recommendations, or subjective matters.
-       - Answer MUST be exactly "Yes" or "No" (capitalized)
-       - Question should end with a question mark
-       - MUST include "explanation" field with 1-2 sentences explaining WHY
-       
-    3. MULTIPLE CHOICE: Use for questions with one correct answer from several options.
-       - Answer MUST be a single letter: "A", "B", "C", or "D"
-       - MUST include "options" array with 4 choices formatted as "A) text", "B) text", etc.
-       - MUST include "explanation" field with 1-2 sentences explaining WHY the correct answer is right
-       
-    4. MULTIPLE ANSWER: Use for questions where multiple options can be correct.
-       - Answer MUST be comma-separated letters like "A,C" or "B,C,D" (no spaces)
-       - MUST include "options" array with choices formatted as "A) text", "B) text", etc.
-       - MUST include "explanation" field explaining WHY these specific answers are correct
-       - Question should indicate multiple answers needed
-
-    ALWAYS include an "explanation" field that helps learners understand the concept, not just the answer.
-
-    Document content:
-    {text[:4000]}
-    """
-    
-    try:
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You generate high-quality flashcards from educational content. "
-                              "Follow the question type rules strictly. "
-                              "Always include clear explanations to help learners understand the concepts."
-                },
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=3000,
-            temperature=0.4,
-        )
-        
-        flashcards_json = response.choices[0].message.content.strip()
-        
-        # Remove markdown code blocks if present
-        if flashcards_json.startswith('```'):
-            first_newline = flashcards_json.find('\n')
-            last_marker = flashcards_json.rfind('```')
-            if first_newline != -1 and last_marker != -1:
-                flashcards_json = flashcards_json[first_newline+1:last_marker].strip()
-        
-        flashcards = json.loads(flashcards_json)
-        
-        # Add metadata to each card
-        for card in flashcards:
-            card['topic'] = topic_name
-            card['correct_count'] = 0
-            card['attempts'] = 0
-            card['answer_type'] = get_answer_type(card['answer'])
-        
-        print(f"Generated {len(flashcards)} flashcards for topic '{topic_name}'")
-        return flashcards
-    
-    except Exception as e:
-        print(f"Error generating flashcards for topic '{topic_name}': {e}")
-        return []
-
-# Project-aware helper functions for mastery
-def get_card_hash(question):
-    """Generate a unique hash for a flashcard question"""
-    import hashlib
-    return hashlib.md5(question.encode('utf-8')).hexdigest()
-
-def mark_card_mastered(card):
-    """Mark a card as mastered in current project"""
-    project = get_current_project()
-    card_hash = get_card_hash(card['question'])
-    project.mastery[card_hash] = {
-        'question': card['question'],
-        'topic': card['topic'],
-        'filename': card.get('filename', 'Unknown'),
-        'mastered_date': datetime.now().isoformat()
-    }
-    project.save_mastery()
-
-def is_card_mastered(card):
-    """Check if a card is mastered in current project"""
-    project = get_current_project()
-    card_hash = get_card_hash(card['question'])
-    return card_hash in project.mastery
-
-def reset_topic_mastery(topic):
-    """Reset all mastered cards for a specific topic in current project"""
-    project = get_current_project()
-    project.mastery = {
-        k: v for k, v in project.mastery.items() 
-        if v['topic'] != topic
-    }
-    project.save_mastery()
-
-def get_mastery_stats():
-    """Get mastery statistics by topic for current project"""
-    project = get_current_project()
-    stats = defaultdict(lambda: {'mastered': 0, 'total': 0})
-    
-    # Count total cards per topic
-    for card in project.flashcards:
-        topic = card['topic']
-        stats[topic]['total'] += 1
-        if is_card_mastered(card):
-            stats[topic]['mastered'] += 1
-    
-    return dict(stats)
-
-# Project-aware helper functions for card exclusion
-def exclude_card(card):
-    """Mark a card as excluded in current project"""
-    project = get_current_project()
-    project.load_excluded()
-    card_hash = get_card_hash(card['question'])
-    project.excluded[card_hash] = {
-        'question': card['question'],
-        'answer': card.get('answer', ''),
-        'explanation': card.get('explanation', ''),
-        'topic': card.get('topic', 'Unknown'),
-        'excluded_date': datetime.now().isoformat()
-    }
-    project.save_excluded()
-
-def include_card(card_hash):
-    """Remove exclusion for a card in current project (by hash)"""
-    project = get_current_project()
-    project.load_excluded()
-    if card_hash in project.excluded:
-        del project.excluded[card_hash]
-        project.save_excluded()
-        return True
-    return False
-
-def is_card_excluded(card):
-    """Check if a card is excluded in current project"""
-    project = get_current_project()
-    card_hash = get_card_hash(card['question'])
-    return card_hash in project.excluded
-
-def get_excluded_cards():
-    """Get all excluded cards for current project, grouped by topic"""
-    project = get_current_project()
-    project.load_excluded()
-    
-    excluded_by_topic = defaultdict(list)
-    for card_hash, card_data in project.excluded.items():
-        topic = card_data.get('topic', 'Unknown')
-        excluded_by_topic[topic].append({
-            'hash': card_hash,
-            **card_data
-        })
-    
-    return dict(excluded_by_topic)
-
-def get_excluded_count():
-    """Get count of excluded cards for current project"""
-    project = get_current_project()
-    project.load_excluded()
-    return len(project.excluded)
-
-# Routes
-
-@app.route('/')
-def index():
-    # Auto-save any active unsaved session before going home
-    if 'mode' in session and not session.get('results_saved', False):
-        mode = session['mode']
-        score = session.get('score', 0)
-        total = session.get('current_card_index', 0)
-        
-        # Only save if user has answered at least one card
-        if total > 0:
-            timestamp = datetime.now()
-            percentage = calculate_percentage(score, total)
-            
-            # Save to project history
-            project = get_current_project()
-            project.load_history()
-            if mode == 'exam':
-                project.history['exam_history'][timestamp] = {
-                    'score': score,
-                    'total': total,
-                    'percentage': percentage,
-                    'topics': session.get('topics', [])
-                }
-            else:
-                cards_mastered = session.get('cards_mastered_this_session', 0)
-                project.history['study_history'][timestamp] = {
-                    'score': score,
-                    'total': total,
-                    'percentage': percentage,
-                    'topics': session.get('topics', []),
-                    'cards_mastered': cards_mastered
-                }
-            project.save_history()
-            session['results_saved'] = True
-            flash(f'Session progress saved: {score}/{total} ({percentage:.1f}%)', 'info')
-    
-    return render_template('index.html')
-
-@app.route('/test')
-def test():
-    print("TEST ROUTE CALLED")
-    import sys
-    sys.stdout.flush()
-    # Also try logging
-    import logging
-    logging.basicConfig(level=logging.DEBUG)
-    logging.info("TEST ROUTE CALLED VIA LOGGING")
-    # Also write to file
-    with open('debug.log', 'a') as f:
-        f.write("TEST ROUTE CALLED\n")
-    return "Test route working!"
-
-@app.route('/creation-progress/<progress_id>')
-def get_creation_progress(progress_id):
-    """Get progress of project creation"""
-    if progress_id in creation_progress:
-        return jsonify(creation_progress[progress_id])
-    return jsonify({'status': 'not_found'}), 404
-
-@app.route('/extraction-progress/<progress_id>')
-def get_extraction_progress(progress_id):
-    """Get progress of file extraction"""
-    if progress_id in extraction_progress:
-        return jsonify(extraction_progress[progress_id])
-    return jsonify({'status': 'not_found'}), 404
-
-@app.route('/store-extraction-results', methods=['POST'])
-def store_extraction_results():
-    """Store extraction results in session (called by frontend after background processing completes)"""
-    try:
-        data = request.get_json()
-        session['pending_project'] = {
-            'documents_data': data['documents_data'],
-            'combined_text': data['combined_text'],
-            'document_count': data['document_count'],
-            'suggested_name': data.get('suggested_name', 'New Project'),
-            'ai_topics': data.get('ai_topics', []),
-            'timestamp': datetime.now().isoformat()
-        }
-        return jsonify({'success': True})
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
-
-@app.route('/update-creation-success', methods=['POST'])
-def update_creation_success():
-    """Update session with final flashcard counts after background generation completes"""
-    try:
-        data = request.get_json()
-        session['creation_success'] = {
-            'project_name': data['project_name'],
-            'flashcard_count': data['flashcard_count'],
-            'topic_count': data['topic_count'],
-            'progress_id': data['progress_id']
-        }
-        return jsonify({'success': True})
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
-
-@app.route('/suggest-topic-name', methods=['POST'])
-def suggest_topic_name():
-    """Analyze pasted content and suggest a topic name"""
-    try:
-        data = request.get_json()
-        content = data.get('content', '').strip()
-        
-        if not content or len(content) < 50:
-            return jsonify({
-                'success': False,
-                'error': 'Content too short for analysis'
-            }), 400
-        
-        # Take first 2000 characters for analysis
-        sample = content[:2000]
-        word_count = len(content.split())
-        
-        prompt = f"""
-        Analyze this educational content and suggest a concise, descriptive topic name (3-8 words max).
-        
-        The name should:
-        - Capture the main subject or lesson focus
-        - Be clear and specific
-        - Work as a study topic label
-        - Sound like a lesson or chapter title
-        
-        Content length: {word_count} words
-        
-        Respond with ONLY the topic name, nothing else.
-        
-        Content:
-        {sample}
-        """
-        
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "You generate clear, concise topic names for educational content."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=30,
-            temperature=0.5,
-        )
-        
-        suggested_name = response.choices[0].message.content.strip()
-        suggested_name = suggested_name.strip('"\'')
-        
-        return jsonify({
-            'success': True,
-            'suggested_name': suggested_name
-        })
-        
-    except Exception as e:
-        print(f"Error suggesting topic name: {e}")
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
-
-@app.route('/start', methods=['GET', 'POST'])
-def start():
-    # Check if we just created a project and show success message
-    if 'creation_success' in session:
-        success_data = session.pop('creation_success')
-        flash(f'Project "{success_data["project_name"]}" created with {success_data["flashcard_count"]} flashcards across {success_data["topic_count"]} topics!', 'success')
-    
-    if request.method == 'POST':
-        print(f"\n===== START ROUTE POST REQUEST =====")
-        
-        # Handle project selection if changed
-        if 'project_id' in request.form:
-            new_project_id = request.form.get('project_id')
-            if new_project_id != session.get('current_project_id'):
-                set_current_project(new_project_id)
-                print(f"Switched to project: {new_project_id}")
-        
-        if not request.form.getlist('topics'):
-            flash('Please select at least one topic', 'error')
-            return redirect(url_for('start'))
-        selected_topics = request.form.getlist('topics')
-        
-        print(f"Form data: {dict(request.form)}")
-        print(f"Topics selected: {selected_topics}")
-        print(f"Raw topics list: {list(selected_topics)}")
-        
-        # Reset specific session keys to ensure clean start
-        keys_to_reset = ['mode', 'user_answers', 'exam_questions', 'completed_cards', 'current_card_index', 'score', 'start_time', 'topics', 'total_attempts', 'exam_start_time', 'exam_duration_seconds', 'question_start_time', 'question_duration_seconds', 'flashcards', 'total_cards', 'time_per_card', 'total_exam_time', 'results_saved']
-        for key in keys_to_reset:
-            if key in session:
-                del session[key]
-        
-        # Initialize session
-        session['mode'] = request.form.get('mode', 'study')
-        
-        # Initialize all session variables
-        session['user_answers'] = []
-        session['exam_questions'] = []
-        session['completed_cards'] = []
-        
-        # Get time values with proper error handling and defaults
-        try:
-            session['time_per_card'] = int(request.form.get('time_per_card') or TIME_PER_CARD)
-            session['total_exam_time'] = int(request.form.get('total_exam_time') or TOTAL_EXAM_TIME)
-        except ValueError:
-            session['time_per_card'] = TIME_PER_CARD
-            session['total_exam_time'] = TOTAL_EXAM_TIME
-            
-        session['current_card_index'] = 0
-        session['score'] = 0
-        session['start_time'] = datetime.now().isoformat()
-        session['topics'] = selected_topics
-        session['completed_cards'] = []
-        session['total_attempts'] = 0
-        
-        # Debug: Print session state
-        print(f"New flashcard session started - mode: {session['mode']}, current_card_index: {session['current_card_index']}")
-        print(f"Session keys after setup: {list(session.keys())}")
-        
-        # Test session persistence by setting a test value
-        session['test_value'] = 'test_persistence'
-        print(f"Test value set: {session.get('test_value')}")
-        
-        # Initialize exam timer
-        if session['mode'] == 'exam':
-            session['exam_start_time'] = datetime.now().isoformat()
-            session['exam_duration_seconds'] = session['total_exam_time'] * 60  # Convert minutes to seconds
-            session['question_start_time'] = datetime.now().isoformat()
-            session['question_duration_seconds'] = session['time_per_card']  # Time per question in seconds
-        
-        # Get current project and load its flashcards
-        project = get_current_project()
-        project.load_flashcards()
-        project.load_mastery()
-        project.load_excluded()
-        
-        # Filter flashcards by selected topics if any are selected
-        print(f"Selected topics: {selected_topics}")
-        print(f"Total flashcards available: {len(project.flashcards)}")
-        
-        if 'all' in selected_topics:
-            session['flashcards'] = project.flashcards.copy()  # Use all flashcards
-            print(f"Using all flashcards: {len(session['flashcards'])}")
-        else:
-            session['flashcards'] = [card for card in project.flashcards if card['topic'] in selected_topics]
-            print(f"Filtered flashcards: {len(session['flashcards'])}")
-        
-        # Filter out excluded cards (applies to both study and exam modes)
-        original_count = len(session['flashcards'])
-        session['flashcards'] = [card for card in session['flashcards'] if not is_card_excluded(card)]
-        excluded_count = original_count - len(session['flashcards'])
-        if excluded_count > 0:
-            print(f"Filtered out {excluded_count} excluded cards")
-            flash(f"{excluded_count} card(s) excluded from session", 'info')
-        
-        # In study mode, also filter out already mastered cards
-        if session['mode'] == 'study':
-            original_count = len(session['flashcards'])
-            session['flashcards'] = [card for card in session['flashcards'] if not is_card_mastered(card)]
-            mastered_count = original_count - len(session['flashcards'])
-            if mastered_count > 0:
-                print(f"Filtered out {mastered_count} already mastered cards")
-                flash(f"{mastered_count} card(s) already mastered in selected topics", 'info')
-            
-        session['total_cards'] = len(session['flashcards'])
-        print(f"Total cards set to: {session['total_cards']}")
-        
-        # Debug: Show first few topics from flashcards
-        if project.flashcards:
-            sample_topics = list(set(card['topic'] for card in project.flashcards[:10]))
-            print(f"Sample topics from flashcards: {sample_topics}")
-            
-        if not session['flashcards']:  # If no flashcards match the selected topics
-            print("ERROR: No flashcards found - redirecting back to start")
-            print(f"Selected topics were: {selected_topics}")
-            print(f"Total flashcards in project: {len(project.flashcards)}")
-            return render_template('start.html', 
-                                topics=sorted(set(card['topic'] for card in project.flashcards)),
-                                mastery_stats=get_mastery_stats(),
-                                error="No flashcards found for selected topics")
-            
-        random.shuffle(session['flashcards'])
-        
-        if session['mode'] == 'exam':
-            try:
-                min_questions = int(request.form.get('min_questions') or 5)
-                max_questions = int(request.form.get('max_questions') or 10)
-            except ValueError:
-                min_questions = 5
-                max_questions = 10
-                
-            num_questions = random.randint(min_questions, max_questions)
-            session['exam_questions'] = session['flashcards'][:num_questions]
-        
-        return redirect(url_for('flashcard'))
-    else:
-        # Get current project and load its data
-        project = get_current_project()
-        project.load_flashcards()
-        project.load_mastery()
-        
-        # Get all projects with their stats for the selector
-        available_projects = []
-        for proj_id, proj in project_manager.projects.items():
-            proj.load_flashcards()
-            proj.load_mastery()
-            available_projects.append({
-                'id': proj.id,
-                'name': proj.name,
-                'stats': proj.get_stats()
-            })
-        available_projects = sorted(available_projects, key=lambda x: x['name'])
-        
-        # Get unique topics from current project flashcards with mastery stats
-        topics = sorted(set(card['topic'] for card in project.flashcards)) if project.flashcards else []
-        mastery_stats = get_mastery_stats()
-        
-        return render_template('start.html', 
-                             topics=topics,
-                             mastery_stats=mastery_stats,
-                             current_project=project,
-                             available_projects=available_projects,
-                             time_per_card=TIME_PER_CARD,
-                             total_exam_time=TOTAL_EXAM_TIME)
-
-@app.route('/flashcard', methods=['GET', 'POST'])
-def flashcard():
-    # Check if session is properly initialized
-    mode = session.get('mode', 'study')
-    current_card_index = session.get('current_card_index', 0)
-    
-    print(f"Flashcard route - mode: {mode}, current_card_index: {current_card_index}")
-    print(f"Session keys in flashcard route: {list(session.keys())}")
-    print(f"Test value in flashcard route: {session.get('test_value', 'NOT_FOUND')}")
-    
-    if mode == 'exam':
-        exam_questions = session.get('exam_questions', [])
-        print(f"Exam questions: {len(exam_questions)}")
-        if 'exam_questions' not in session or not exam_questions:
-            print("No exam questions - redirecting to start")
-            return redirect(url_for('start'))
-    else:
-        flashcards = session.get('flashcards', [])
-        print(f"Study flashcards: {len(flashcards)}")
-        if 'flashcards' not in session or not flashcards:
-            print("No flashcards - redirecting to start")
-            return redirect(url_for('start'))
-
-    # Get the current card first
-    if mode == 'exam':
-        exam_questions = session.get('exam_questions', [])
-        print(f"Checking exam: current_card_index={current_card_index}, exam_questions_length={len(exam_questions)}")
-        if current_card_index >= len(exam_questions):
-            print(f"Redirecting to results - current_card_index ({current_card_index}) >= exam_questions length ({len(exam_questions)})")
-            return redirect(url_for('results'))
-        card = exam_questions[current_card_index]
-    else:
-        flashcards = session.get('flashcards', [])
-        print(f"Checking study: current_card_index={current_card_index}, flashcards_length={len(flashcards)}")
-        if current_card_index >= len(flashcards):
-            print(f"Redirecting to results - current_card_index ({current_card_index}) >= flashcards length ({len(flashcards)})")
-            return redirect(url_for('results'))
-        card = flashcards[current_card_index]
-
-    # Check for timer expiry in exam mode
-    if mode == 'exam':
-        exam_start_time = datetime.fromisoformat(session.get('exam_start_time', datetime.now().isoformat()))
-        elapsed_seconds = (datetime.now() - exam_start_time).total_seconds()
-        if elapsed_seconds >= session.get('exam_duration_seconds', 0):
-            return redirect(url_for('results'))
-        
-        # Check for per-question timer expiry
-        question_start_time = datetime.fromisoformat(session.get('question_start_time', datetime.now().isoformat()))
-        question_elapsed = (datetime.now() - question_start_time).total_seconds()
-        if question_elapsed >= session.get('question_duration_seconds', 0):
-            # Check if there's a user answer from the form (timeout but answer provided)
-            user_answer = ''
-            if request.method == 'POST':
-                if card.get('answer_type') == 'multiple_answer':
-                    user_answer = ','.join(request.form.getlist('answer'))
-                else:
-                    user_answer = request.form.get('answer', '')
-            
-            if user_answer:
-                # Time expired but user provided an answer - evaluate it
-                is_correct = check_answer(card['question'], user_answer, card['answer'])
-                completed_card = {
-                    'question': card['question'],
-                    'user_answer': user_answer,
-                    'correct_answer': card['answer'],
-                    'correct': is_correct,
-                    'feedback': get_feedback(card['question'], user_answer, card['answer'], is_correct) + ' ⏰ (Time expired)',
-                    'answer_type': card.get('answer_type', 'multiple_choice'),
-                    'options': card.get('options', []),
-                    'explanation': card.get('explanation', 'No explanation available.')
-                }
-                
-                # Store in user_answers for results calculation
-                session.setdefault('user_answers', []).append({
-                    'question': card['question'],
-                    'user_answer': user_answer,
-                    'correct_answer': card['answer']
-                })
-            else:
-                # Time expired with no answer
-                completed_card = {
-                    'question': card['question'],
-                    'user_answer': '',  # Empty answer for timeout
-                    'correct_answer': card['answer'],
-                    'correct': False,
-                    'feedback': '⏰ Time expired! No answer submitted.',
-                    'answer_type': card.get('answer_type', 'multiple_choice'),
-                    'options': card.get('options', []),
-                    'explanation': card.get('explanation', 'No explanation available.')
-                }
-                
-                # Store in user_answers for results calculation
-                session.setdefault('user_answers', []).append({
-                    'question': card['question'],
-                    'user_answer': '',  # Empty answer for timeout
-                    'correct_answer': card['answer']
-                })
-            
-            # Add to completed cards for display
-            session.setdefault('completed_cards', []).append(completed_card)
-            session['current_card_index'] += 1
-            session['question_start_time'] = datetime.now().isoformat()  # Reset question timer
-            return redirect(url_for('flashcard'))
-
-    # Handle POST request (answer submission)
-    if request.method == 'POST':
-        # Handle multiple answer submissions (checkboxes)
-        if card.get('answer_type') == 'multiple_answer':
-            user_answer = ','.join(request.form.getlist('answer'))
-        else:
-            user_answer = request.form.get('answer')
-            
-        if not user_answer:
-            # Get completed cards based on mode
-            if mode == 'exam':
-                completed_cards = session.get('completed_cards', [])
-                # Calculate remaining time for exam
-                exam_start_time = datetime.fromisoformat(session.get('exam_start_time', datetime.now().isoformat()))
-                elapsed_seconds = (datetime.now() - exam_start_time).total_seconds()
-                exam_remaining_seconds = max(0, session.get('exam_duration_seconds', 0) - elapsed_seconds)
-                
-                # Calculate remaining time for current question
-                question_start_time = datetime.fromisoformat(session.get('question_start_time', datetime.now().isoformat()))
-                question_elapsed = (datetime.now() - question_start_time).total_seconds()
-                question_remaining_seconds = max(0, session.get('question_duration_seconds', 0) - question_elapsed)
-            else:
-                completed_cards = session.get('completed_cards', [])
-                exam_remaining_seconds = None
-                question_remaining_seconds = None
-                
-            return render_template('flashcard_scroll.html', 
-                                cards=completed_cards,
-                                current_card=card, 
-                                mode=mode, 
-                                time_limit=session.get('time_per_card'),
-                                exam_remaining_seconds=exam_remaining_seconds,
-                                question_remaining_seconds=question_remaining_seconds,
-                                error="Please provide an answer")
-        
-        if mode == 'exam':
-            # Store the completed question with results for display
-            completed_card = {
-                'question': card['question'],
-                'user_answer': user_answer,
-                'correct_answer': card['answer'],
-                'correct': check_answer(card['question'], user_answer, card['answer']),
-                'feedback': get_feedback(card['question'], user_answer, card['answer'], check_answer(card['question'], user_answer, card['answer'])),
-                'answer_type': card.get('answer_type', 'multiple_choice'),
-                'options': card.get('options', []),
-                'explanation': card.get('explanation', 'No explanation available.')
-            }
-            
-            # Add to completed cards for display
-            session.setdefault('completed_cards', []).append(completed_card)
-            
-            # Also store in user_answers for results calculation
-            session.setdefault('user_answers', []).append({
-                'question': card['question'],
-                'user_answer': user_answer,
-                'correct_answer': card['answer']
-            })
-            session['current_card_index'] += 1
-            session['question_start_time'] = datetime.now().isoformat()  # Reset question timer for next question
-        else:
-            correct = check_answer(card['question'], user_answer, card['answer'])
-            
-            # Track streak for this specific card
-            card_hash = get_card_hash(card['question'])
-            current_streak = session.get(f'streak_{card_hash}', 0)
-
-            if correct:
-                session['score'] += 1
-                current_streak += 1
-                session[f'streak_{card_hash}'] = current_streak
-            else:
-                current_streak = 0
-                session[f'streak_{card_hash}'] = 0
-            
-            # Generate feedback with streak information
-            base_feedback = get_feedback(card['question'], user_answer, card['answer'], correct)
-            mastered = False
-            
-            if correct and current_streak < 3:
-                feedback = f"{base_feedback} 🔥 Streak: {current_streak}/3"
-            elif correct and current_streak >= 3:
-                feedback = f"{base_feedback} 🎉 CARD MASTERED! You answered correctly 3 times in a row!"
-                mastered = True
-                # Mark the card as permanently mastered
-                mark_card_mastered(card)
-            else:
-                feedback = f"{base_feedback} 🔄 Streak reset to 0/3"
-
-            # Store the completed card with results
-            completed_card = {
-                'question': card['question'],
-                'user_answer': user_answer,
-                'correct_answer': card['answer'],
-                'correct': correct,
-                'feedback': feedback,
-                'answer_type': card.get('answer_type', 'multiple_choice'),
-                'options': card.get('options', []),
-                'streak': current_streak,
-                'mastered': mastered,
-                'explanation': card.get('explanation', 'No explanation available.')
-            }
-            
-            # Add to completed cards list
-            session.setdefault('completed_cards', []).append(completed_card)
-            
-            # Track how many cards have been mastered in this session
-            if mastered:
-                session['cards_mastered_this_session'] = session.get('cards_mastered_this_session', 0) + 1
-            
-            # Check if this is the last card
-            is_last_card = (current_card_index + 1 >= len(session['flashcards']))
-            
-            if current_streak >= 3:
-                # Remove card from session after mastering
-                session['flashcards'].pop(current_card_index)
-            else:
-                session['current_card_index'] += 1
-
-            # Track attempts for each card
-            card['attempts'] = card.get('attempts', 0) + 1
-            session['total_attempts'] = session.get('total_attempts', 0) + 1
-            
-            # If this is the last card, show results
-            if is_last_card:
-                return redirect(url_for('results'))
-                
-        return redirect(url_for('flashcard', new_card='true'))
-
-    # Get all completed cards and current card for scrolling interface
-    if mode == 'exam':
-        # Exam mode now shows completed cards below current question
-        completed_cards = session.get('completed_cards', [])
-        # Calculate remaining time for exam
-        exam_start_time = datetime.fromisoformat(session.get('exam_start_time', datetime.now().isoformat()))
-        elapsed_seconds = (datetime.now() - exam_start_time).total_seconds()
-        exam_remaining_seconds = max(0, session.get('exam_duration_seconds', 0) - elapsed_seconds)
-        
-        # Calculate remaining time for current question
-        question_start_time = datetime.fromisoformat(session.get('question_start_time', datetime.now().isoformat()))
-        question_elapsed = (datetime.now() - question_start_time).total_seconds()
-        question_remaining_seconds = max(0, session.get('question_duration_seconds', 0) - question_elapsed)
-    else:
-        completed_cards = session.get('completed_cards', [])
-        exam_remaining_seconds = None
-        question_remaining_seconds = None
-    
-    # Calculate mastery progress for study mode
-    cards_mastered_session = session.get('cards_mastered_this_session', 0) if mode == 'study' else 0
-    cards_remaining = len(session.get('flashcards', [])) if mode == 'study' else 0
-    
-    return render_template('flashcard_scroll.html', 
-                         cards=completed_cards,
-                         current_card=card, 
-                         mode=mode, 
-                         time_limit=session.get('time_per_card'),
-                         exam_remaining_seconds=exam_remaining_seconds,
-                         question_remaining_seconds=question_remaining_seconds,
-                         cards_mastered_session=cards_mastered_session,
-                         cards_remaining=cards_remaining)
-
-# Modify the results route
-@app.route('/results')
-def results():
-    if 'mode' not in session:
-        return redirect(url_for('index'))
-    
-    mode = session.get('mode', 'study')
-    timestamp = datetime.now()
-    
-    # Check if results have already been saved for this session to prevent duplicates
-    if session.get('results_saved', False):
-        # Results already saved, just display them
-        if mode == 'exam':
-            completed_cards = session.get('completed_cards', [])
-            score = 0
-            results = []
-            
-            for card in completed_cards:
-                is_correct = card.get('correct', False)
-                results.append({
-                    'question': card['question'],
-                    'user_answer': card['user_answer'],
-                    'correct_answer': card['correct_answer'],
-                    'is_correct': is_correct,
-                    'explanation': card.get('explanation', 'No explanation available.')
-                })
-                if is_correct:
-                    score += 1
-                    
-            total_questions = len(completed_cards)
-            percentage = calculate_percentage(score, total_questions)
-            
-            return render_template('results.html',
-                                 mode=mode,
-                                 total_questions=total_questions,
-                                 score=score,
-                                 percentage=percentage,
-                                 results=results)
-        else:
-            total_questions = session.get('current_card_index', 0)
-            score = session.get('score', 0)
-            percentage = calculate_percentage(score, total_questions)
-            
-            return render_template('results.html',
-                                 mode=mode,
-                                 total_questions=total_questions,
-                                 score=score,
-                                 percentage=percentage)
-    
-    # Save results for the first time
-    session['results_saved'] = True
-    
-    if mode == 'exam':
-        completed_cards = session.get('completed_cards', [])
-        score = 0
-        results = []
-        
-        for card in completed_cards:
-            is_correct = card.get('correct', False)
-            results.append({
-                'question': card['question'],
-                'user_answer': card['user_answer'],
-                'correct_answer': card['correct_answer'],
-                'is_correct': is_correct,
-                'explanation': card.get('explanation', 'No explanation available.')
-            })
-            if is_correct:
-                score += 1
-                
-        total_questions = len(completed_cards)
-        percentage = calculate_percentage(score, total_questions)
-        
-        # Save to project history
-        project = get_current_project()
-        project.load_history()  # Load existing history before adding new entry
-        project.history['exam_history'][timestamp] = {
-            'score': score,
-            'total': total_questions,
-            'percentage': percentage,
-            'topics': session.get('topics', [])
-        }
-        project.save_history()
-        
-        return render_template('results.html',
-                             mode=mode,
-                             total_questions=total_questions,
-                             score=score,
-                             percentage=percentage,
-                             results=results)
-    else:
-        total_questions = session.get('current_card_index', 0)
-        score = session.get('score', 0)
-        percentage = calculate_percentage(score, total_questions)
-        cards_mastered = session.get('cards_mastered_this_session', 0)
-        
-        # Save to project history
-        project = get_current_project()
-        project.load_history()  # Load existing history before adding new entry
-        project.history['study_history'][timestamp] = {
-            'score': score,
-            'total': total_questions,
-            'percentage': percentage,
-            'topics': session.get('topics', []),
-            'cards_mastered': cards_mastered
-        }
-        project.save_history()
-        
-        return render_template('results.html',
-                             mode=mode,
-                             total_questions=total_questions,
-                             score=score,
-                             percentage=percentage,
-                             cards_mastered=cards_mastered)
-
-@app.route('/stats')
-def stats():
-    # Auto-save any active unsaved session before showing stats
-    if 'mode' in session and not session.get('results_saved', False):
-        mode = session['mode']
-        score = session.get('score', 0)
-        total = session.get('current_card_index', 0)
-        
-        # Only save if user has answered at least one card
-        if total > 0:
-            timestamp = datetime.now()
-            percentage = calculate_percentage(score, total)
-            
-            # Save to project history
-            project = get_current_project()
-            project.load_history()  # Load existing history before adding new entry
-            if mode == 'exam':
-                project.history['exam_history'][timestamp] = {
-                    'score': score,
-                    'total': total,
-                    'percentage': percentage,
-                    'topics': session.get('topics', [])
-                }
-            else:
-                cards_mastered = session.get('cards_mastered_this_session', 0)
-                project.history['study_history'][timestamp] = {
-                    'score': score,
-                    'total': total,
-                    'percentage': percentage,
-                    'topics': session.get('topics', []),
-                    'cards_mastered': cards_mastered
-                }
-            project.save_history()
-            session['results_saved'] = True  # Mark as saved
-            flash(f'Session progress saved: {score}/{total} ({percentage:.1f}%)', 'info')
-    
-    project = get_current_project()
-    project.load_history()
-    return render_template('stats.html',
-                         current_project=project,
-                         exam_history=project.history.get('exam_history', {}),
-                         study_history=project.history.get('study_history', {}),
-                         all_time_scores=project.history.get('all_time_scores', {}))
-
-@app.route('/mastery')
-def mastery():
-    """Show mastery progress for all topics"""
-    # Auto-save any active unsaved session before showing mastery
-    if 'mode' in session and not session.get('results_saved', False):
-        mode = session['mode']
-        score = session.get('score', 0)
-        total = session.get('current_card_index', 0)
-        
-        # Only save if user has answered at least one card
-        if total > 0:
-            timestamp = datetime.now()
-            percentage = calculate_percentage(score, total)
-            
-            # Save to project history
-            project = get_current_project()
-            project.load_history()
-            if mode == 'exam':
-                project.history['exam_history'][timestamp] = {
-                    'score': score,
-                    'total': total,
-                    'percentage': percentage,
-                    'topics': session.get('topics', [])
-                }
-            else:
-                cards_mastered = session.get('cards_mastered_this_session', 0)
-                project.history['study_history'][timestamp] = {
-                    'score': score,
-                    'total': total,
-                    'percentage': percentage,
-                    'topics': session.get('topics', []),
-                    'cards_mastered': cards_mastered
-                }
-            project.save_history()
-            session['results_saved'] = True
-            flash(f'Session progress saved: {score}/{total} ({percentage:.1f}%)', 'info')
-    
-    project = get_current_project()
-    mastery_stats = get_mastery_stats()
-    return render_template('mastery.html',
-                         current_project=project,
-                         mastery_stats=mastery_stats)
-
-@app.route('/reset_mastery/<topic>', methods=['POST'])
-def reset_mastery(topic):
-    """Reset mastered cards for a specific topic"""
-    reset_topic_mastery(topic)
-    flash(f'Mastery progress reset for "{topic}"', 'success')
-    return redirect(url_for('mastery'))
-
-@app.route('/excluded-cards')
-def excluded_cards():
-    """Show excluded cards management page"""
-    project = get_current_project()
-    excluded_by_topic = get_excluded_cards()
-    total_excluded = get_excluded_count()
-    return render_template('excluded_cards.html',
-                         current_project=project,
-                         excluded_by_topic=excluded_by_topic,
-                         total_excluded=total_excluded)
-
-@app.route('/exclude-card', methods=['POST'])
-def exclude_card_route():
-    """Exclude a card from future sessions"""
-    question = request.form.get('question')
-    if not question:
-        return jsonify({'success': False, 'error': 'No question provided'}), 400
-    
-    project = get_current_project()
-    project.load_flashcards()
-    
-    # Find the card by question
-    card = None
-    for c in project.flashcards:
-        if c['question'] == question:
-            card = c
-            break
-    
-    if not card:
-        return jsonify({'success': False, 'error': 'Card not found'}), 404
-    
-    exclude_card(card)
-    return jsonify({'success': True, 'message': 'Card excluded successfully'})
-
-@app.route('/include-card', methods=['POST'])
-def include_card_route():
-    """Include a previously excluded card back into sessions"""
-    card_hash = request.form.get('card_hash')
-    if not card_hash:
-        return jsonify({'success': False, 'error': 'No card hash provided'}), 400
-    
-    if include_card(card_hash):
-        flash('Card has been included back into sessions', 'success')
-        return redirect(url_for('excluded_cards'))
-    else:
-        flash('Card not found in excluded list', 'error')
-        return redirect(url_for('excluded_cards'))
-
-@app.route('/manage-projects')
-def manage_projects():
-    """Show project management page"""
-    # Auto-save any active unsaved session before showing projects
-    if 'mode' in session and not session.get('results_saved', False):
-        mode = session['mode']
-        score = session.get('score', 0)
-        total = session.get('current_card_index', 0)
-        
-        # Only save if user has answered at least one card
-        if total > 0:
-            timestamp = datetime.now()
-            percentage = calculate_percentage(score, total)
-            
-            # Save to project history
-            project = get_current_project()
-            project.load_history()
-            if mode == 'exam':
-                project.history['exam_history'][timestamp] = {
-                    'score': score,
-                    'total': total,
-                    'percentage': percentage,
-                    'topics': session.get('topics', [])
-                }
-            else:
-                cards_mastered = session.get('cards_mastered_this_session', 0)
-                project.history['study_history'][timestamp] = {
-                    'score': score,
-                    'total': total,
-                    'percentage': percentage,
-                    'topics': session.get('topics', []),
-                    'cards_mastered': cards_mastered
-                }
-            project.save_history()
-            session['results_saved'] = True
-            flash(f'Session progress saved: {score}/{total} ({percentage:.1f}%)', 'info')
-    
-    projects = []
-    for proj_id, proj in project_manager.projects.items():
-        proj.load_flashcards()
-        proj.load_mastery()
-        proj.load_history()
-        projects.append({
-            'id': proj.id,
-            'name': proj.name,
-            'stats': proj.get_stats()
-        })
-    projects = sorted(projects, key=lambda x: x['name'])
-    
-    current_project_id = session.get('current_project_id')
-    
-    return render_template('manage_projects.html',
-                         projects=projects,
-                         current_project_id=current_project_id)
-
-@app.route('/switch-project/<project_id>', methods=['POST'])
-def switch_project(project_id):
-    """Switch to a different project"""
-    if not set_current_project(project_id):
-        flash('Project not found', 'error')
-    return redirect(url_for('start'))
-
-@app.route('/delete-project/<project_id>', methods=['POST'])
-def delete_project(project_id):
-    """Delete a project"""
-    # Don't allow deleting the current project if it's the only one
-    if len(project_manager.projects) == 1:
-        flash('Cannot delete the only project', 'error')
-        return redirect(url_for('manage_projects'))
-    
-    # If deleting current project, switch to another one first
-    if project_id == session.get('current_project_id'):
-        # Find another project to switch to
-        for pid in project_manager.projects.keys():
-            if pid != project_id:
-                set_current_project(pid)
-                break
-    
-    # Delete the project
-    project_name = project_manager.projects[project_id].name if project_id in project_manager.projects else "Unknown"
-    if project_manager.delete_project(project_id):
-        flash(f'Project "{project_name}" deleted successfully', 'success')
-    else:
-        flash(f'Failed to delete project', 'error')
-    
-    return redirect(url_for('manage_projects'))
-
-def _process_documents_background(progress_id, uploaded_files, initial_errors):
-    """Background thread function to process uploaded documents"""
-    processor = DocumentProcessor()
-    errors = list(initial_errors)  # Copy initial errors
-    
-    try:
-        total_files = len(uploaded_files)
-        
-        # Extract text from documents with progress tracking
-        results = {}
-        processing_errors = {}
-        
-        for idx, file_info in enumerate(uploaded_files):
-            filepath = file_info['path']
-            original_name = file_info['original']
-            safe_name = os.path.basename(filepath)
-            
-            # Calculate progress (extraction phase = 0-10%)
-            progress_percentage = 10 * (idx + 1) / total_files
-            
-            # Update progress BEFORE processing
-            extraction_progress[progress_id].update({
-                'status': 'extracting',
-                'current_file': idx + 1,
-                'total_files': total_files,
-                'current_filename': original_name,
-                'current_status': f'Extracting text from document...',
-                'progress_percentage': progress_percentage
-            })
-            
-            print(f"Processing file {idx+1}/{total_files}: {original_name}")
-            
-            try:
-                # Extract text from this file
-                text = processor.extract_text(filepath)
-                if text:
-                    results[safe_name] = text
-                    print(f"  ✓ Extracted {len(text)} characters from {original_name}")
-                    extraction_progress[progress_id]['files_completed'].append(original_name)
-                    extraction_progress[progress_id]['current_status'] = f'Successfully extracted {len(text)} characters'
-                else:
-                    processing_errors[safe_name] = "No text could be extracted"
-                    extraction_progress[progress_id]['current_status'] = f'Warning: No text extracted'
-            except Exception as e:
-                processing_errors[safe_name] = str(e)
-                print(f"  ✗ Error processing {original_name}: {e}")
-                extraction_progress[progress_id]['current_status'] = f'Error: {str(e)}'
-        
-        if processing_errors:
-            errors.extend([f"{k}: {v}" for k, v in processing_errors.items()])
-        
-        if not results:
-            extraction_progress[progress_id].update({
-                'status': 'error',
-                'error': 'Failed to extract text from any document',
-                'errors': errors
-            })
-            return
-        
-        # Update status for AI processing phase
-        extraction_progress[progress_id].update({
-            'status': 'ai_processing',
-            'current_status': 'Getting AI suggestions for flashcard counts...',
-            'ai_file_index': 0,
-            'ai_total_files': len(results)
-        })
-        
-        # Store per-file extracted text (NOT combined)
-        documents_data = []
-        ai_file_index = 0
-        successful_files = len(results)
-        
-        for file_info in uploaded_files:
-            original_filename = file_info['original']
-            filepath = file_info['path']
-            safe_filename = os.path.basename(filepath)
-            
-            # Get extracted text for this file
-            text = results.get(safe_filename, '')
-            if not text:
-                continue
-            
-            # Use ORIGINAL filename as topic name, just remove the file extension
-            topic_name = os.path.splitext(original_filename)[0]  # Remove extension only
-            # Keep everything else: spaces, numbers, "Lesson XX", etc.
-            
-            # Calculate progress (AI flashcard count phase = 10-85%)
-            ai_file_index += 1
-            progress_percentage = 10 + (75 * ai_file_index / successful_files)
-            
-            # Get AI suggestion for optimal flashcard count for this document
-            try:
-                extraction_progress[progress_id].update({
-                    'current_status': f'AI analyzing "{topic_name}"...',
-                    'progress_percentage': progress_percentage,
-                    'ai_file_index': ai_file_index
-                })
-                ai_count, ai_reasoning = suggest_optimal_flashcard_count(text, topic_name)
-            except Exception as e:
-                print(f"Error getting AI count suggestion for {topic_name}: {e}")
-                ai_count = 25  # Fallback
-                ai_reasoning = "Default count"
-            
-            documents_data.append({
-                'original_filename': original_filename,
-                'display_filename': original_filename,
-                'filepath': filepath,
-                'text': text,
-                'suggested_topic': topic_name,
-                'text_length': len(text),
-                'ai_suggested_count': ai_count,
-                'ai_reasoning': ai_reasoning
-            })
-        
-        # Combine all text for project name generation
-        combined_text = '\n\n'.join([doc['text'] for doc in documents_data])
-        
-        # Generate project name suggestion (85-92% progress)
-        extraction_progress[progress_id].update({
-            'status': 'generating_project_name',
-            'current_status': 'Generating project name suggestion...',
-            'progress_percentage': 85
-        })
-        
-        try:
-            suggested_name = generate_project_name_from_text(
-                combined_text,
-                is_multi_document=True,
-                document_count=len(results)
-            )
-        except Exception as e:
-            print(f"Error generating project name: {e}")
-            suggested_name = "New Project"
-        
-        # Extract AI topics (92-100% progress)
-        extraction_progress[progress_id].update({
-            'current_status': 'Extracting topic suggestions...',
-            'progress_percentage': 92
-        })
-        
-        try:
-            ai_topics = extract_topics_from_text(combined_text)
-        except Exception as e:
-            print(f"Error extracting AI topics: {e}")
-            ai_topics = []
-        
-        # Mark extraction as complete
-        extraction_progress[progress_id].update({
-            'status': 'complete',
-            'current_file': len(uploaded_files),
-            'current_filename': '',
-            'current_status': f'Successfully processed {len(results)} document(s)',
-            'progress_percentage': 100,
-            'documents_data': documents_data,
-            'combined_text': combined_text,
-            'document_count': len(results),
-            'processed_files': [doc['original_filename'] for doc in documents_data],
-            'suggested_name': suggested_name,
-            'ai_topics': ai_topics,
-            'errors': errors if errors else None
-        })
-        
-        print(f"✅ Background extraction complete: {len(results)} document(s) processed")
-        
-    except Exception as e:
-        print(f"❌ Error in background extraction: {e}")
-        import traceback
-        traceback.print_exc()
-        extraction_progress[progress_id].update({
-            'status': 'error',
-            'error': str(e)
-        })
-
-@app.route('/upload-documents', methods=['GET', 'POST'])
-def upload_documents():
-    """Handle document uploads for creating a new project"""
-    if request.method == 'POST':
-        # Check if files were uploaded OR content was pasted
-        has_files = 'documents' in request.files and request.files.getlist('documents')
-        has_pasted = 'pasted_content' in request.form
-        
-        if not has_files and not has_pasted:
-            return jsonify({'success': False, 'error': 'No files uploaded or content pasted'}), 400
-        
-        files = request.files.getlist('documents') if has_files else []
-        
-        # Filter out empty files
-        files = [f for f in files if f.filename != '']
-        
-        if not files and not has_pasted:
-            return jsonify({'success': False, 'error': 'No valid files or content provided'}), 400
-        
-        # Initialize document processor
-        processor = DocumentProcessor()
-        
-        # Create temporary directory for uploads
-        temp_dir = os.path.join(os.getcwd(), 'temp_uploads')
-        os.makedirs(temp_dir, exist_ok=True)
-        
-        uploaded_files = []
-        errors = []
-        pasted_file_counter = 1
-        
-        # Create progress tracker for extraction
-        progress_id = secrets.token_hex(8)
-        extraction_progress[progress_id] = {
-            'status': 'starting',
-            'current_file': 0,
-            'total_files': 0,
-            'current_filename': '',
-            'current_status': 'Initializing...',
-            'progress_percentage': 0,
-            'files_completed': []
-        }
-        
-        try:
-            # Handle pasted content first
-            if has_pasted:
-                try:
-                    pasted_data = json.loads(request.form.get('pasted_content'))
-                    temp_dir = os.path.join(os.getcwd(), 'temp_uploads')
-                    os.makedirs(temp_dir, exist_ok=True)
-                    
-                    for pasted_item in pasted_data:
-                        # Create a text file from pasted content
-                        filename = secure_filename(pasted_item['name'])
-                        filepath = os.path.join(temp_dir, filename)
-                        
-                        with open(filepath, 'w', encoding='utf-8') as f:
-                            f.write(pasted_item['content'])
-                        
-                        uploaded_files.append({
-                            'original': pasted_item['name'],
-                            'path': filepath
-                        })
-                        print(f"Created file from pasted content: {pasted_item['name']}")
-                        
-                except Exception as e:
-                    errors.append(f"Error processing pasted content: {str(e)}")
-            
-            # Save uploaded files temporarily
-            for file in files:
-                if file.filename == '':
-                    continue
-                
-                original_filename = file.filename
-                safe_filename = secure_filename(file.filename)
-                
-                # Check if file type is supported
-                if not processor.is_supported_file(safe_filename):
-                    errors.append(f"{original_filename}: Unsupported file type")
-                    continue
-                
-                filepath = os.path.join(temp_dir, safe_filename)
-                file.save(filepath)
-                uploaded_files.append({'original': original_filename, 'path': filepath})
-            
-            if not uploaded_files:
-                return jsonify({
-                    'success': False, 
-                    'error': 'No valid files uploaded',
-                    'errors': errors
-                }), 400
-            
-            # Update extraction progress with total count
-            extraction_progress[progress_id]['total_files'] = len(uploaded_files)
-            extraction_progress[progress_id]['status'] = 'extracting'
-            
-            # Start background thread for processing
-            thread = threading.Thread(
-                target=_process_documents_background,
-                args=(progress_id, uploaded_files, errors),
-                daemon=True
-            )
-            thread.start()
-            
-            # Return immediately with progress ID
-            return jsonify({
-                'success': True,
-                'message': f'Processing {len(uploaded_files)} document(s)...',
-                'extraction_progress_id': progress_id,
-                'document_count': len(uploaded_files)
-            })
-        
-        except Exception as e:
-            # Clean up temp files on error
-            for file_info in uploaded_files:
-                try:
-                    filepath = file_info['path']
-                    if os.path.exists(filepath):
-                        os.remove(filepath)
-                except:
-                    pass
-            
-            return jsonify({
-                'success': False,
-                'error': f'Upload failed: {str(e)}'
-            }), 500
-    
-    # GET request - show upload page
-    return render_template('upload_documents.html')
-
-def _generate_flashcards_background(progress_id, project_id, topics_to_generate, project_name):
-    """Background thread function to generate flashcards"""
-    import shutil
-    from flask import session as flask_session
-    try:
-        # Get the project
-        new_project = project_manager.get_project(project_id)
-        if not new_project:
-            creation_progress[progress_id]['status'] = 'error'
-            creation_progress[progress_id]['error'] = 'Project not found'
-            return
-        
-        # Generate flashcards with progress tracking
-        total_flashcards_generated = 0
-        for idx, topic_info in enumerate(topics_to_generate):
-            # Update progress - preparing to generate
-            creation_progress[progress_id].update({
-                'status': 'generating',
-                'current_topic': idx + 1,
-                'current_topic_name': topic_info['name'],
-                'current_status': f"Preparing to generate flashcards..."
-            })
-            
-            print(f"[{idx+1}/{len(topics_to_generate)}] Generating {topic_info['count']} flashcards for: {topic_info['name']}")
-            
-            # Update progress - calling API
-            creation_progress[progress_id]['current_status'] = f"Calling OpenAI API (this may take 10-30 seconds)..."
-            
-            # Generate flashcards
-            topic_flashcards = generate_flashcards_from_text(
-                topic_info['text'],
-                topic_info['name'],
-                topic_info['count']
-            )
-            
-            # Update progress - processing response
-            creation_progress[progress_id]['current_status'] = f"Processing API response..."
-            
-            # Add to project
-            new_project.flashcards.extend(topic_flashcards)
-            total_flashcards_generated += len(topic_flashcards)
-            
-            # Update progress - completed this topic
-            creation_progress[progress_id].update({
-                'flashcards_generated': total_flashcards_generated,
-                'current_status': f"Completed! Generated {len(topic_flashcards)} cards for this topic."
-            })
-        
-        num_topics = len(topics_to_generate)
-        
-        # Mark progress as complete
-        creation_progress[progress_id]['status'] = 'complete'
-        creation_progress[progress_id]['flashcards_generated'] = total_flashcards_generated
-        creation_progress[progress_id]['project_name'] = project_name
-        creation_progress[progress_id]['topic_count'] = num_topics
-        
-        # Save the project
-        new_project.save_flashcards()
-        
-        # Clean up temp directory
-        temp_dir = os.path.join(os.getcwd(), 'temp_uploads')
-        if os.path.exists(temp_dir):
-            try:
-                shutil.rmtree(temp_dir)
-                os.makedirs(temp_dir, exist_ok=True)
-            except:
-                pass
-        
-        print(f"✅ Background generation complete: {total_flashcards_generated} flashcards in {num_topics} topics")
-        
-    except Exception as e:
-        print(f"❌ Error in background generation: {e}")
-        import traceback
-        traceback.print_exc()
-        creation_progress[progress_id]['status'] = 'error'
-        creation_progress[progress_id]['error'] = str(e)
-
-@app.route('/create-project-from-documents', methods=['GET', 'POST'])
-def create_project_from_documents():
-    """Create a new project from uploaded documents using AI"""
-    # Check if there's pending project data
-    if 'pending_project' not in session:
-        flash('No pending project found. Please upload documents first.', 'error')
-        return redirect(url_for('upload_documents'))
-    
-    pending = session['pending_project']
-    
-    if request.method == 'POST':
-        try:
-            # Get custom project name
-            project_name = request.form.get('project_name', '').strip()
-            
-            if not project_name:
-                flash('Project name is required', 'error')
-                return redirect(url_for('create_project_from_documents'))
-            
-            # Check for duplicate names and append number if needed
-            original_name = project_name
-            existing_names = [p.name for p in project_manager.projects.values()]
-            counter = 1
-            while project_name in existing_names:
-                counter += 1
-                project_name = f"{original_name} ({counter})"
-            
-            # Get topic configuration strategy
-            topic_strategy = request.form.get('topic_strategy', 'one-per-file')
-            
-            # Create the new project
-            new_project = project_manager.create_project(project_name)
-            
-            # Move uploaded documents to project's documents folder
-            import shutil
-            for doc_data in pending['documents_data']:
-                temp_filepath = doc_data['filepath']
-                if temp_filepath and os.path.exists(temp_filepath):
-                    filename = os.path.basename(temp_filepath)
-                    dest_path = os.path.join(new_project.documents_folder, filename)
-                    shutil.move(temp_filepath, dest_path)
-            
-            # Prepare topics list for generation
-            topics_to_generate = []
-            
-            if topic_strategy == 'one-per-file':
-                for i, doc_data in enumerate(pending['documents_data']):
-                    topic_name = request.form.get(f'topic_name_{i}', doc_data['suggested_topic']).strip()
-                    num_cards = int(request.form.get(f'card_count_{i}', doc_data.get('ai_suggested_count', 25)))
-                    topics_to_generate.append({
-                        'name': topic_name,
-                        'text': doc_data['text'],
-                        'count': num_cards
-                    })
-            else:
-                num_topics_input = int(request.form.get('num_topics', 0))
-                for i in range(num_topics_input):
-                    topic_name = request.form.get(f'ai_topic_name_{i}', '').strip()
-                    num_cards = int(request.form.get(f'ai_card_count_{i}', 10))
-                    if topic_name:
-                        topics_to_generate.append({
-                            'name': topic_name,
-                            'text': pending['combined_text'],
-                            'count': num_cards
-                        })
-            
-            # Generate progress ID
-            progress_id = secrets.token_hex(8)
-            creation_progress[progress_id] = {
-                'status': 'starting',
-                'current_topic': 0,
-                'total_topics': len(topics_to_generate),
-                'current_topic_name': '',
-                'flashcards_generated': 0,
-                'project_id': new_project.id
-            }
-            
-            # Start background thread for generation
-            thread = threading.Thread(
-                target=_generate_flashcards_background,
-                args=(progress_id, new_project.id, topics_to_generate, project_name),
-                daemon=True
-            )
-            thread.start()
-            
-            # Clear pending project from session
-            session.pop('pending_project', None)
-            
-            # Set as current project
-            set_current_project(new_project.id)
-            
-            # Note: creation_success will be set by the frontend after generation completes
-            # This ensures the flash message shows the correct flashcard count
-            
-            # Return immediately with progress ID - generation happens in background
-            return jsonify({
-                'success': True,
-                'redirect_url': url_for('start'),
-                'progress_id': progress_id,
-                'message': f'Project "{project_name}" is being created...'
-            })
-        
-        except Exception as e:
-            error_msg = str(e)
-            print(f"Error in create_project_from_documents: {e}")
-            import traceback
-            traceback.print_exc()
-            return jsonify({
-                'success': False,
-                'error': f'Error creating project: {error_msg}'
-            }), 500
-    
-    # GET request - show project setup page with configuration options
-    # Use pre-generated suggestions from background processing (if available)
-    suggested_name = pending.get('suggested_name')
-    ai_topics = pending.get('ai_topics', [])
-    
-    # Fallback: generate if not available (shouldn't happen with new background processing)
-    if not suggested_name:
-        try:
-            suggested_name = generate_project_name_from_text(
-                pending['combined_text'],
-                is_multi_document=True,
-                document_count=pending['document_count']
-            )
-        except Exception as e:
-            print(f"Error generating project name: {e}")
-            suggested_name = "New Project"
-    
-    if not ai_topics:
-        try:
-            ai_topics = extract_topics_from_text(pending['combined_text'])
-        except Exception as e:
-            print(f"Error extracting AI topics: {e}")
-            ai_topics = []
-    
-    return render_template('create_project.html',
-                         suggested_name=suggested_name,
-                         documents_data=pending['documents_data'],
-                         ai_topics=ai_topics,
-                         document_count=pending['document_count'])
-
-# Update the route decorator to match the name used in templates
-@app.route('/exit', methods=['POST'])
-def exit():  # Changed from exit_session to exit
-    # Only save if we're in a session and results haven't already been saved
-    if 'mode' in session and not session.get('results_saved', False):
-        mode = session['mode']
-        score = session.get('score', 0)
-        total = session.get('current_card_index', 0)
-        timestamp = datetime.now()
-        
-        percentage = calculate_percentage(score, total)
-        
-        # Save to project history
-        project = get_current_project()
-        project.load_history()  # Load existing history before adding new entry
-        if mode == 'exam':
-            project.history['exam_history'][timestamp] = {
-                'score': score,
-                'total': total,
-                'percentage': percentage,
-                'topics': session.get('topics', [])
-            }
-        else:
-            project.history['study_history'][timestamp] = {
-                'score': score,
-                'total': total,
-                'percentage': percentage,
-                'topics': session.get('topics', [])
-            }
-        project.save_history()
-    
-    # Preserve current project selection and any other persistent session data
-    current_project_id = session.get('current_project_id')
-    creation_success = session.get('creation_success')
-    pending_project = session.get('pending_project')
-    
-    # Clear session data
-    session.clear()
-    
-    # Restore persistent data
-    if current_project_id:
-        session['current_project_id'] = current_project_id
-    if creation_success:
-        session['creation_success'] = creation_success
-    if pending_project:
-        session['pending_project'] = pending_project
-    
-    return redirect(url_for('index'))
-
-def get_feedback(question, user_answer, correct_answer, is_correct):
-    """Generate helpful feedback for the user"""
-    if is_correct:
-        return f"✅ Correct! Your answer '{user_answer}' is right."
-    else:
-        return f"❌ Incorrect. Your answer was '{user_answer}', but the correct answer is '{correct_answer}'. Try to understand why this is the correct answer."
-
-def check_answer(question, user_answer, correct_answer):
-    """Enhanced answer checking with better evaluation logic"""
-    if not all(isinstance(x, str) for x in [question, user_answer, correct_answer]):
-        print("Warning: Non-string input in check_answer")
-        return False
-    
-    # Normalize answers for comparison
-    user_clean = user_answer.strip().lower()
-    correct_clean = correct_answer.strip().lower()
-    
-    # Direct exact match (case-insensitive)
-    if user_clean == correct_clean:
-        return True
-    
-    # Handle True/False variations
-    if correct_clean in ['true', 'false']:
-        if user_clean in ['true', 't', 'yes', 'y', '1'] and correct_clean == 'true':
-            return True
-        if user_clean in ['false', 'f', 'no', 'n', '0'] and correct_clean == 'false':
-            return True
-    
-    # Handle Yes/No variations
-    if correct_clean in ['yes', 'no']:
-        if user_clean in ['yes', 'y', 'true', 't', '1'] and correct_clean == 'yes':
-            return True
-        if user_clean in ['no', 'n', 'false', 'f', '0'] and correct_clean == 'no':
-            return True
-    
-    # Handle Multiple Choice (single letter answers)
-    if len(correct_clean) == 1 and correct_clean.isalpha():
-        return user_clean == correct_clean
-    
-    # Handle Multiple Answer (comma-separated letters)
-    if ',' in correct_clean:
-        correct_answers = [ans.strip().lower() for ans in correct_clean.split(',')]
-        user_answers = [ans.strip().lower() for ans in user_clean.split(',')]
-        return set(correct_answers) == set(user_answers)
-    
-    # If we get here, it's likely a multiple choice question that wasn't properly classified
-    # Default to exact match for any remaining cases
-    return user_clean == correct_clean
-
-# Fix percentage calculation to handle zero division
-def calculate_percentage(score, total):
-    try:
-        return (score / total) * 100 if total > 0 else 0
-    except ZeroDivisionError:
-        return 0
-
-# Settings Management
-def load_settings():
-    """Load settings from settings.json"""
-    settings_file = 'settings.json'
-    default_settings = {
-        "openai_api_key_file": "openaikey.txt",
-        "default_cards_per_topic": 25,
-        "default_time_per_card": 10,
-        "default_total_exam_time": 60,
-        "auto_update_enabled": False,
-        "last_update_check": None
-    }
-    
-    try:
-        if os.path.exists(settings_file):
-            with open(settings_file, 'r') as f:
-                return json.load(f)
-        else:
-            # Create default settings file
-            with open(settings_file, 'w') as f:
-                json.dump(default_settings, f, indent=4)
-            return default_settings
-    except Exception as e:
-        print(f"Error loading settings: {e}")
-        return default_settings
-
-def save_settings(settings):
-    """Save settings to settings.json"""
-    try:
-        with open('settings.json', 'w') as f:
-            json.dump(settings, f, indent=4)
-        return True
-    except Exception as e:
-        print(f"Error saving settings: {e}")
-        return False
-
-@app.route('/settings', methods=['GET', 'POST'])
-def settings():
-    """Settings page for API key and configuration"""
-    if request.method == 'POST':
-        try:
-            # Get current settings
-            current_settings = load_settings()
-            
-            # Update OpenAI API key
-            new_key = request.form.get('openai_key', '').strip()
-            if new_key:
-                with open('openaikey.txt', 'w') as f:
-                    f.write(new_key)
-            
-            # Update settings
-            current_settings['default_cards_per_topic'] = int(request.form.get('default_cards_per_topic', 25))
-            current_settings['default_time_per_card'] = int(request.form.get('default_time_per_card', 10))
-            current_settings['default_total_exam_time'] = int(request.form.get('default_total_exam_time', 60))
-            current_settings['auto_update_enabled'] = 'auto_update_enabled' in request.form
-            
-            # Save settings
-            if save_settings(current_settings):
-                flash('Settings saved successfully!', 'success')
-            else:
-                flash('Error saving settings', 'error')
-            
-            return redirect(url_for('settings'))
-        except Exception as e:
-            flash(f'Error updating settings: {str(e)}', 'error')
-            return redirect(url_for('settings'))
-    
-    # GET request - show settings page
-    current_settings = load_settings()
-    
-    # Read current API key (masked)
-    try:
-        with open('openaikey.txt', 'r') as f:
-            current_key = f.read().strip()
-            # Mask the key for display
-            if len(current_key) > 8:
-                current_key = current_key[:8] + '...' + current_key[-4:]
-    except:
-        current_key = ''
-    
-    return render_template('settings.html', 
-                         settings=current_settings,
-                         current_key=current_key)
-
-def get_current_version():
-    """Get the current version tag"""
-    try:
-        # Try to get the current tag
-        result = subprocess.run(['git', 'describe', '--tags', '--exact-match'],
-                              capture_output=True, text=True, timeout=5, cwd=BASE_DIR)
-        if result.returncode == 0:
-            return result.stdout.strip()
-        
-        # If not on a tag, get the latest tag we're based on
-        result = subprocess.run(['git', 'describe', '--tags', '--abbrev=0'],
-                              capture_output=True, text=True, timeout=5, cwd=BASE_DIR)
-        if result.returncode == 0:
-            return result.stdout.strip()
-        
-        return 'unknown'
-    except:
-        return 'unknown'
-
-def get_latest_release_tag():
-    """Get the latest release tag from remote"""
-    try:
-        # Fetch tags
-        subprocess.run(['git', 'fetch', '--tags'], 
-                      capture_output=True, text=True, timeout=30, cwd=BASE_DIR)
-        
-        # Get all tags sorted by version
-        result = subprocess.run(['git', 'tag', '-l', '--sort=-v:refname'],
-                              capture_output=True, text=True, timeout=10, cwd=BASE_DIR)
-        
-        if result.returncode != 0:
-            return None
-        
-        tags = [tag.strip() for tag in result.stdout.split('\n') if tag.strip()]
-        
-        # Return the latest version tag (first in list after sorting)
-        if tags:
-            return tags[0]
-        return None
-    except:
-        return None
-
-def compare_versions(current, latest):
-    """Compare version strings (e.g., v1.0.0 vs v1.1.0)"""
-    def parse_version(v):
-        # Remove 'v' prefix if present
-        v = v.lstrip('v')
-        # Split and convert to integers for comparison
-        parts = v.split('.')
-        return tuple(int(p) for p in parts if p.isdigit())
-    
-    try:
-        current_parts = parse_version(current)
-        latest_parts = parse_version(latest)
-        return latest_parts > current_parts
-    except:
-        # If parsing fails, do string comparison
-        return latest != current
-
-@app.route('/check-updates')
-def check_updates():
-    """Check for production release updates from git repository"""
-    try:
-        # Check if we're in a git repository (use BASE_DIR to handle running from different directories)
-        git_dir = os.path.join(BASE_DIR, '.git')
-        if not os.path.exists(git_dir):
-            return jsonify({
-                'success': False,
-                'error': 'Not a git repository. Please install via git clone for update functionality.'
-            })
-        
-        # Get current version
-        current_version = get_current_version()
-        
-        # Get latest release tag
-        latest_version = get_latest_release_tag()
-        
-        if not latest_version:
-            return jsonify({
-                'success': False,
-                'error': 'No release tags found in repository'
-            })
-        
-        # Update last check time
-        settings = load_settings()
-        settings['last_update_check'] = datetime.now().isoformat()
-        settings['current_version'] = current_version
-        settings['latest_version'] = latest_version
-        save_settings(settings)
-        
-        # Compare versions
-        if compare_versions(current_version, latest_version):
-            return jsonify({
-                'success': True,
-                'update_available': True,
-                'current_version': current_version,
-                'latest_version': latest_version,
-                'message': f'Update available: {current_version} → {latest_version}'
-            })
-        else:
-            return jsonify({
-                'success': True,
-                'update_available': False,
-                'current_version': current_version,
-                'latest_version': latest_version,
-                'message': f'You are up to date! (version {current_version})'
-            })
-            
-    except subprocess.TimeoutExpired:
-        return jsonify({
-            'success': False,
-            'error': 'Update check timed out'
-        })
-    except FileNotFoundError:
-        return jsonify({
-            'success': False,
-            'error': 'Git is not installed. Please install Git for update functionality.'
-        })
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        })
-
-@app.route('/install-update', methods=['POST'])
-def install_update():
-    """Install production release update from git repository"""
-    try:
-        # Check if we're in a git repository (use BASE_DIR to handle running from different directories)
-        git_dir = os.path.join(BASE_DIR, '.git')
-        if not os.path.exists(git_dir):
-            return jsonify({
-                'success': False,
-                'error': 'Not a git repository'
-            })
-        
-        # Get the latest release tag
-        latest_tag = get_latest_release_tag()
-        
-        if not latest_tag:
-            return jsonify({
-                'success': False,
-                'error': 'No release tags found'
-            })
-        
-        # Check for uncommitted changes
-        result = subprocess.run(['git', 'status', '--porcelain'],
-                              capture_output=True, text=True, timeout=10, cwd=BASE_DIR)
-        
-        # Only check files that aren't in .gitignore (user data)
-        uncommitted = [line for line in result.stdout.split('\n') 
-                      if line.strip() and not any(x in line for x in 
-                      ['openaikey.txt', 'settings.json', 'secret_key.txt', 
-                       'projects/', '.venv/', 'temp_uploads/', '.flask_session/'])]
-        
-        if uncommitted:
-            return jsonify({
-                'success': False,
-                'error': 'Uncommitted changes detected. Please stash or commit changes before updating.'
-            })
-        
-        # Fetch latest tags
-        subprocess.run(['git', 'fetch', '--tags'], 
-                      capture_output=True, text=True, timeout=30, cwd=BASE_DIR)
-        
-        # Checkout the latest release tag
-        result = subprocess.run(['git', 'checkout', latest_tag],
-                              capture_output=True, text=True, timeout=60, cwd=BASE_DIR)
-        
-        if result.returncode != 0:
-            return jsonify({
-                'success': False,
-                'error': f'Failed to checkout release: {result.stderr}'
-            })
-        
-        # Update settings with new version
-        settings = load_settings()
-        settings['current_version'] = latest_tag
-        save_settings(settings)
-        
-        return jsonify({
-            'success': True,
-            'message': f'✅ Updated to version {latest_tag}! Please restart the application.',
-            'version': latest_tag
-        })
-        
-    except subprocess.TimeoutExpired:
-        return jsonify({
-            'success': False,
-            'error': 'Update installation timed out'
-        })
-    except FileNotFoundError:
-        return jsonify({
-            'success': False,
-            'error': 'Git is not installed'
-        })
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        })
-
-if __name__ == '__main__':
+# app.py
+
+import os
+import json
+import shutil
+import random
+import time
+from datetime import datetime, timedelta
+import subprocess
+import sys
+import secrets
+
+# Get the base directory where app.py is located (for finding .git, VERSION, etc.)
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from project_manager import ProjectManager, Project, question_hash, new_card_id
+from project_cache import project_cache
+from atomic_writes import durable_writer
+from llm_client import LLMClient, LLMResponseCache, RateLimiter
+from llm_backends import create_client, read_api_key
+from llm_usage import UsageLog, usage_project, in_current_context
+from text_chunker import split_into_chunks, allocate_counts, pack_texts, estimate_tokens, normalize_question
+from json_stream import JsonArrayStream
+from job_queue import JobQueue
+from near_duplicates import NearDuplicateIndex
+from migrate_to_projects import migrate
+import threading
+
+def install_and_import(package):
+    try:
+        __import__(package)
+    except ImportError:
+        subprocess.check_call([sys.executable, "-m", "pip", "install", package])
+        __import__(package)
+
+# List of required packages
+required_packages = ['flask', 'openai']
+
+# Check and install required packages
+for package in required_packages:
+    install_and_import(package)
+
+# Install flask-session separately (package name differs from import name)
+try:
+    import flask_session
+except ImportError:
+    subprocess.check_call([sys.executable, "-m", "pip", "install", "flask-session"])
+
+from flask import Flask, render_template, request, redirect, url_for, session, flash, jsonify
+from flask_session import Session
+from werkzeug.utils import secure_filename
+from document_processor import DocumentProcessor
+from extraction_pool import ExtractionPool
+from extraction_cache import ExtractionCache
+from chunked_uploads import UploadStore, UploadError
+from text_blobs import TextBlobStore, preview as text_preview
+
+# Create Flask app and set secret key
+app = Flask(__name__)
+
+# Configure server-side session to avoid cookie size limits
+app.config['SESSION_TYPE'] = 'filesystem'
+app.config['SESSION_FILE_DIR'] = './.flask_session/'
+app.config['SESSION_PERMANENT'] = False
+app.config['SESSION_USE_SIGNER'] = True
+
+# Generate a persistent secret key if it doesn't exist
+SECRET_KEY_FILE = 'secret_key.txt'
+
+def get_or_create_secret_key():
+    try:
+        if os.path.exists(SECRET_KEY_FILE):
+            with open(SECRET_KEY_FILE, 'r') as f:
+                return f.read().strip()
+        else:
+            # Generate a new secret key
+            secret_key = secrets.token_hex(32)
+            with open(SECRET_KEY_FILE, 'w') as f:
+                f.write(secret_key)
+            return secret_key
+    except Exception as e:
+        print(f"Error handling secret key: {e}")
+        # Fallback to a new random key (will change on restart)
+        return secrets.token_hex(32)
+
+app.secret_key = get_or_create_secret_key()
+
+# Initialize server-side session
+Session(app)
+
+# Load settings for configurable parameters
+def get_app_settings():
+    """Get application settings with defaults"""
+    try:
+        if os.path.exists('settings.json'):
+            with open('settings.json', 'r') as f:
+                return json.load(f)
+    except:
+        pass
+    return {
+        "default_cards_per_topic": 25,
+        "default_time_per_card": 10,
+        "default_total_exam_time": 60,
+        "storage_engine": "json",
+        "project_cache_mb": 256,
+        "write_durability": "batch",
+        "write_batch_ms": 100,
+        "card_format": "json",
+        "generation_workers": 4,
+        "chunk_tokens": 1000,
+        "llm_cache_enabled": True,
+        "llm_cache_ttl_hours": 168,
+        "llm_cache_mb": 100,
+        "llm_rate_limits": {
+            "gpt-4o": {"rpm": 500, "tpm": 30000},
+            "gpt-4o-mini": {"rpm": 500, "tpm": 200000}
+        },
+        "llm_max_concurrency": 8,
+        "llm_max_retries": 5,
+        "job_workers": 2,
+        "dedupe_threshold": 0.5,
+        "topic_pack_tokens": 3000,
+        "extraction_workers": 0,
+        "extraction_timeout_seconds": 120,
+        "extraction_memory_mb": 1024,
+        "extraction_cache_enabled": True,
+        "extraction_cache_mb": 500,
+        "text_blob_max_age_days": 7,
+        "llm_backend": "openai",
+        "llm_base_url": None,
+        "llm_recordings_folder": "llm_recordings",
+        "llm_usage_enabled": True,
+        "llm_usage_max_calls": 100000,
+        "llm_prices": {
+            "gpt-4o": {"input": 2.50, "output": 10.00},
+            "gpt-4o-mini": {"input": 0.15, "output": 0.60}
+        }
+    }
+
+# Load settings on startup
+_settings = get_app_settings()
+
+# Configurable parameters (loaded from settings)
+CARDS_PER_TRANSCRIPT = _settings.get('default_cards_per_topic', 25)  # Default number of cards per transcript
+TIME_PER_CARD = _settings.get('default_time_per_card', 10)  # Default time per card in seconds
+TOTAL_EXAM_TIME = _settings.get('default_total_exam_time', 60)  # Default total exam time in minutes
+STORAGE_ENGINE = _settings.get('storage_engine', 'json')  # Storage engine for new projects ('json', 'journal' or 'sqlite')
+CARD_FORMAT = _settings.get('card_format', 'json')  # Card file for new JSON/journal projects ('json', 'binary' or 'sharded')
+GENERATION_WORKERS = max(1, _settings.get('generation_workers', 4))  # Topics generated in parallel when creating a project
+CHUNK_TOKENS = max(250, _settings.get('chunk_tokens', 1000))  # Document text sent per flashcard request (topic analysis uses twice this)
+CARD_SAVE_INTERVAL = 1.0  # Seconds between saves of a project's cards while they stream in during creation
+MAX_AVOID_QUESTIONS = 60  # Existing questions listed in a prompt asking for replacements of duplicates
+JOB_WORKERS = max(1, _settings.get('job_workers', 2))  # Project creation jobs run at the same time (others wait in the queue)
+DEDUPE_THRESHOLD = _settings.get('dedupe_threshold', 0.5)  # Word overlap (0-1) at which a generated question counts as a duplicate; above 1 turns dedupe off
+PACK_TOKENS = _settings.get('topic_pack_tokens', 3000)  # Text of small topics generated together in one request (0 = one request per topic)
+PACK_MAX_CARDS = 60  # Flashcards asked for in one packed request (the response has to fit max_tokens)
+PACK_TOKENS_PER_CARD = 150  # Response budget per flashcard in a packed request
+EXTRACTION_WORKERS = _settings.get('extraction_workers', 0)  # Processes extracting text from uploaded documents (0 = one per CPU core)
+EXTRACTION_TIMEOUT = _settings.get('extraction_timeout_seconds', 120)  # Time limit for extracting one document (0 = none)
+EXTRACTION_MEMORY_MB = _settings.get('extraction_memory_mb', 1024)  # Memory cap of each extraction process (0 = none; not enforced on Windows)
+UPLOAD_CHUNK_BYTES = 4 * 1024 * 1024  # Chunk size the upload page sends files in (the server accepts up to twice this)
+LLM_BACKEND = _settings.get('llm_backend', 'openai')  # 'openai', 'stub' (llm_stub.py), 'record' or 'replay' (see llm_backends.py)
+
+def create_llm_client():
+    """Chat completions client for the configured backend, with the current API key"""
+    return create_client(LLM_BACKEND, read_api_key(),
+                         _settings.get('llm_base_url'),                             # Server for the stub backend (or an OpenAI-compatible proxy)
+                         _settings.get('llm_recordings_folder', 'llm_recordings'))  # Where record saves and replay reads responses
+
+# OpenAI calls go through llm, which caches responses on disk (see llm_client.py)
+llm_cache = LLMResponseCache(
+    'llm_cache',
+    ttl_seconds=_settings.get('llm_cache_ttl_hours', 168) * 3600,  # How long a cached response is reused
+    max_bytes=_settings.get('llm_cache_mb', 100) * 1024 * 1024,     # Disk space for cached responses
+    enabled=_settings.get('llm_cache_enabled', True)                # Set to false to always call the API
+)
+llm_limiter = RateLimiter(
+    _settings.get('llm_rate_limits', {}),                 # Requests/tokens per minute for each model (match your OpenAI tier)
+    max_concurrency=_settings.get('llm_max_concurrency', 8)  # Upper bound for concurrent API calls per model
+)
+llm_usage = UsageLog(
+    'llm_usage.db',
+    max_rows=_settings.get('llm_usage_max_calls', 100000),  # Most recent calls kept for /admin/llm-usage
+    prices=_settings.get('llm_prices'),                     # USD per million input/output tokens, per model
+    enabled=_settings.get('llm_usage_enabled', True)
+)
+llm = LLMClient(create_llm_client(), llm_cache, llm_limiter,
+                max_retries=_settings.get('llm_max_retries', 5),  # Retries on 429/5xx, with jittered exponential backoff
+                usage=llm_usage)
+project_cache.max_bytes = _settings.get('project_cache_mb', 256) * 1024 * 1024  # Memory budget for parsed project data
+durable_writer.configure(_settings.get('write_durability', 'batch'),  # 'always' (fsync each write), 'batch' or 'none'
+                         _settings.get('write_batch_ms', 100))        # Group-commit window for 'batch'
+
+# Run migration if needed (converts old single-project structure to multi-project)
+print("\nChecking if migration is needed...")
+migrate()
+
+# Initialize Project Manager
+print("Initializing Project Manager...")
+project_manager = ProjectManager(storage_engine=STORAGE_ENGINE, card_format=CARD_FORMAT)
+print(f"[OK] Found {len(project_manager.projects)} project(s) in {project_manager.discovery_seconds * 1000:.0f} ms\n")
+
+# Global progress tracking for async project creation and file extraction
+# (creation_progress is the live view of jobs run by job_queue, which persists them)
+creation_progress = {}
+extraction_progress = {}
+job_queue = JobQueue('jobs.db', workers=JOB_WORKERS)
+extraction_cache = ExtractionCache(
+    'extraction_cache',
+    version=DocumentProcessor.EXTRACTOR_VERSION,
+    max_bytes=_settings.get('extraction_cache_mb', 500) * 1024 * 1024,  # Disk space for texts of uploaded documents
+    enabled=_settings.get('extraction_cache_enabled', True)             # Set to false to parse every upload again
+)
+extraction_pool = ExtractionPool(EXTRACTION_WORKERS, EXTRACTION_TIMEOUT, EXTRACTION_MEMORY_MB, cache=extraction_cache)
+upload_store = UploadStore(os.path.join(os.getcwd(), 'temp_uploads'), os.path.join(os.getcwd(), 'upload_parts'),
+                           max_file_size=DocumentProcessor.MAX_FILE_SIZE, max_chunk_bytes=UPLOAD_CHUNK_BYTES * 2)
+upload_batches = {}  # Extraction progress ID -> extraction state of a chunked upload still receiving files
+text_blobs = TextBlobStore(
+    'text_blobs',
+    max_age_seconds=_settings.get('text_blob_max_age_days', 7) * 24 * 3600  # Extracted text is deleted this long after its last use
+)
+text_blobs.prune()
+
+# Helper functions for project management
+def get_current_project() -> Project:
+    """Get the current project from session, or return default project"""
+    project_id = session.get('current_project_id')
+    
+    if project_id and project_id in project_manager.projects:
+        return project_manager.projects[project_id]
+    
+    # No project in session or project not found - use first available or create default
+    if project_manager.projects:
+        # Use first available project
+        first_project_id = list(project_manager.projects.keys())[0]
+        session['current_project_id'] = first_project_id
+        return project_manager.projects[first_project_id]
+    else:
+        # No projects exist - create a default one
+        default_project = project_manager.create_project("My Flash Cards")
+        session['current_project_id'] = default_project.id
+        return default_project
+
+def set_current_project(project_id: str):
+    """Set the current project in session"""
+    if project_id in project_manager.projects:
+        session['current_project_id'] = project_id
+        return True
+    return False
+
+def save_flashcards(flashcards, filepath='flashcards.json'):
+    """Save flashcards to a JSON file"""
+    try:
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump(flashcards, f, indent=2)
+    except Exception as e:
+        print(f"Error saving flashcards: {e}")
+
+def load_saved_flashcards(filepath='flashcards.json'):
+    """Load flashcards from a JSON file if it exists"""
+    try:
+        if os.path.exists(filepath):
+            with open(filepath, 'r', encoding='utf-8') as f:
+                flashcards = json.load(f)
+                # Add answer_type to existing flashcards if missing
+                for card in flashcards:
+                    if 'answer_type' not in card:
+                        card['answer_type'] = get_answer_type(card['answer'])
+                return flashcards
+    except Exception as e:
+        print(f"Error loading saved flashcards: {e}")
+    return None
+
+def is_json_response(text):
+    """True if an API response is JSON (optionally inside a markdown code block)"""
+    text = text.strip()
+    if text.startswith('```'):
+        first_newline = text.find('\n')
+        last_marker = text.rfind('```')
+        if first_newline != -1 and last_marker != -1:
+            text = text[first_newline+1:last_marker].strip()
+    try:
+        json.loads(text)
+        return True
+    except ValueError:
+        return False
+
+def get_answer_type(correct_answer):
+    """Determine the type of answer expected"""
+    answer_lower = correct_answer.strip().lower()
+    if answer_lower in ['true', 'false']:
+        return 'true_false'
+    elif answer_lower in ['yes', 'no']:
+        return 'yes_no'
+    elif len(correct_answer.split()) == 1 and correct_answer.isalpha() and len(correct_answer) == 1:
+        return 'multiple_choice'
+    elif ',' in correct_answer and all(len(part.strip()) == 1 and part.strip().isalpha() for part in correct_answer.split(',')):
+        return 'multiple_answer'
+    else:
+        # Default to multiple_choice for any other single word answers
+        return 'multiple_choice'
+
+def validate_flashcard(card):
+    required_keys = ['question', 'answer', 'topic', 'filename']
+    return all(key in card for key in required_keys)
+
+# Load transcripts and generate flashcards
+def load_transcripts(folder_path):
+    """Load flashcards from saved file or generate new ones from transcripts"""
+    # Try to load saved flashcards first
+    saved_flashcards = load_saved_flashcards()
+    if saved_flashcards:
+        print("Loaded flashcards from saved file")
+        return saved_flashcards
+
+    # If no saved flashcards, generate new ones
+    print("\nGenerating new flashcards from transcripts...")
+    flashcards = []
+    try:
+        # First, try to read the Topic.txt file
+        topic_file = os.path.join(folder_path, 'Topic.txt')
+        if os.path.exists(topic_file):
+            with open(topic_file, 'r', encoding='utf-8') as f:
+                main_topic = f.read().strip()
+            print(f"Found main topic: {main_topic}\n")
+        else:
+            main_topic = None
+            print("Warning: Topic.txt not found in transcripts folder\n")
+
+        transcript_files = [f for f in os.listdir(folder_path) 
+                          if f.endswith('.txt') and f != 'Topic.txt']
+        total_files = len(transcript_files)
+        print(f"Found {total_files} transcript files to process\n")
+        
+        for index, filename in enumerate(transcript_files, 1):
+            print(f"Processing transcript {index}/{total_files}: {filename}")
+            filepath = os.path.join(folder_path, filename)
+            with open(filepath, 'r', encoding='utf-8') as f:
+                transcript = f.read()
+            cards = generate_flashcards(transcript, filename, main_topic)
+            flashcards.extend(cards)
+            print(f"Generated {len(cards)} flashcards from {filename}\n")
+        
+        # Save the generated flashcards
+        if flashcards:
+            print(f"Saving {len(flashcards)} total flashcards to file...")
+            save_flashcards(flashcards)
+            print("Flashcards saved successfully!")
+        else:
+            print("No flashcards were generated!")
+            
+    except Exception as e:
+        print(f"Error loading transcripts: {e}")
+    return flashcards
+
+def generate_flashcards(transcript, filename, main_topic=None):
+    print(f"  Generating flashcards for {filename}...")
+    
+    # Get topic from filename (everything before the first dot)
+    topic = filename.split('.')[0]
+    
+    # Include main topic in the prompt if available
+    topic_context = f"Main topic: {main_topic}\n" if main_topic else ""
+    
+    prompt = f"""
+    {topic_context}Generate exactly {CARDS_PER_TRANSCRIPT} flashcards from the following transcript.
+    The response must be a valid JSON array containing flashcard objects.
+    Each flashcard object must have these exact keys: 'question', 'answer', 'explanation', and optionally 'options'.
+    Format the response as a JSON array without any additional text or explanation.
+
+    CRITICAL RULES FOR QUESTION TYPES:
+    
+    1. TRUE/FALSE questions: Use ONLY for statements that can be evaluated as factually true or false.
+       - Answer MUST be exactly "True" or "False" (capitalized)
+       - Question should be a statement, not a question
+       - MUST include "explanation" field with 1-2 sentences explaining WHY the answer is True or False
+       - Example: {{"question": "The Product Owner is responsible for maximizing product value.", "answer": "True", "explanation": "The Product Owner is accountable for maximizing the value of the product resulting from the work of the Scrum Team."}}
+       
+    2. YES/NO questions: Use ONLY for questions asking about permissions, recommendations, or subjective matters.
+       - Answer MUST be exactly "Yes" or "No" (capitalized)
+       - Question should end with a question mark
+       - MUST include "explanation" field with 1-2 sentences explaining WHY
+       - Example: {{"question": "Should the team estimate in story points?", "answer": "Yes", "explanation": "Story points allow teams to estimate relative complexity without committing to specific time estimates, which is more accurate for complex work."}}
+       
+    3. MULTIPLE CHOICE: Use for questions with one correct answer from several options.
+       - Answer MUST be a single letter: "A", "B", "C", or "D"
+       - MUST include "options" array with 4 choices formatted as "A) text", "B) text", etc.
+       - MUST include "explanation" field with 1-2 sentences explaining WHY the correct answer is right
+       - Example: {{"question": "What is the primary role of a Product Owner?", "answer": "A", "options": ["A) Maximize product value", "B) Write code", "C) Manage the team", "D) Create documentation"], "explanation": "The Product Owner's primary responsibility is to maximize the value of the product by managing the Product Backlog and ensuring the team works on the most valuable items."}}
+       
+    4. MULTIPLE ANSWER: Use for questions where multiple options can be correct.
+       - Answer MUST be comma-separated letters like "A,C" or "B,C,D" (no spaces)
+       - MUST include "options" array with choices formatted as "A) text", "B) text", etc.
+       - MUST include "explanation" field explaining WHY these specific answers are correct
+       - Question should indicate multiple answers needed: "(Select all that apply)" or "Which of the following..."
+       - Example: {{"question": "Which of the following are Scrum values? (Select all that apply)", "answer": "A,C,D", "options": ["A) Courage", "B) Speed", "C) Focus", "D) Respect"], "explanation": "The five Scrum values are Commitment, Focus, Openness, Respect, and Courage. Speed is not a Scrum value."}}
+
+    DO NOT mix question types! If the question asks "Is...", use True/False. If it asks "Should..." or "Can...", use Yes/No.
+    Ensure answers match the question type exactly.
+    ALWAYS include an "explanation" field that helps learners understand the concept, not just the answer.
+
+    Transcript:
+    {transcript}
+    """
+    try:
+        print("  Sending request to OpenAI API...")
+        response_text = llm.complete(
+            model="gpt-4o",
+            messages=[
+                {
+                    "role": "system", 
+                    "content": "You are a helpful assistant that generates exam-style flashcards. "
+                              "STRICT RULES: "
+                              "1) True/False questions MUST have answers of exactly 'True' or 'False' (capitalized) and be statements. "
+                              "2) Yes/No questions MUST have answers of exactly 'Yes' or 'No' (capitalized) and be questions about permissions or recommendations. "
+                              "3) Multiple Choice MUST have single letter answers (A, B, C, or D) with an options array. "
+                              "4) Multiple Answer MUST have comma-separated letters (e.g., 'A,C') with an options array. "
+                              "NEVER mix up question types with answer types. "
+                              "Focus on key concepts and ignore anecdotes, jokes, or stories."
+                },
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=4000,
+            temperature=0.4,
+            stage='generate',
+            validate=is_json_response,
+        )
+        print("  Received response from OpenAI API")
+        
+        flashcards_json = response_text.strip()
+        print("  Raw response:")
+        print(flashcards_json)
+        
+        # Remove markdown code blocks if present
+        if flashcards_json.startswith('```'):
+            # Find the first newline after ```json or ```
+            first_newline = flashcards_json.find('\n')
+            # Find the last ``` marker
+            last_marker = flashcards_json.rfind('```')
+            if first_newline != -1 and last_marker != -1:
+                flashcards_json = flashcards_json[first_newline+1:last_marker].strip()
+                print("  Removed markdown code blocks from response")
+        
+        try:
+            flashcards = json.loads(flashcards_json)
+            print(f"  Successfully parsed {len(flashcards)} flashcards")
+            
+            for card in flashcards:
+                card['topic'] = topic  # Set topic from filename
+                card['filename'] = filename
+                card['correct_count'] = 0
+                card['attempts'] = 0
+                card['answer_type'] = get_answer_type(card['answer'])  # Add answer type
+                card['id'] = new_card_id()
+            return flashcards
+            
+        except json.JSONDecodeError as e:
+            print(f"  JSON parsing error: {e}")
+            print("  Response was not valid JSON")
+            return []
+            
+    except Exception as e:
+        print(f"  Error generating flashcards: {e}")
+        return []
+
+def generate_project_name_from_text(text, is_multi_document=False, document_count=1):
+    """Use AI to generate a concise project name from document text"""
+    # Take a good sample from the text (first 4000 characters for better context)
+    sample_text = text[:4000]
+    
+    multi_doc_context = f"\n\nNote: This content is from {document_count} different documents. Generate a name that encompasses the overall theme." if is_multi_document and document_count > 1 else ""
+    
+    prompt = f"""
+    Based on the following document content, generate a short, concise project name (3-6 words max).
+    The name should capture the main topic, subject matter, or course title.
+    If this appears to be a certification course or structured learning material, include that in the name.
+    Respond with ONLY the project name, nothing else.{multi_doc_context}
+    
+    Document content:
+    {sample_text}
+    """
+    
+    try:
+        response_text = llm.complete(
+            model="gpt-4o-mini",  # Use mini for simple tasks
+            messages=[
+                {"role": "system", "content": "You generate concise, descriptive project names for educational content and courses."},
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=50,
+            temperature=0.5,
+            stage='name',
+        )
+        
+        project_name = response_text.strip()
+        # Remove quotes if present
+        project_name = project_name.strip('"\'')
+        print(f"Generated project name: {project_name}")
+        return project_name
+    
+    except Exception as e:
+        print(f"Error generating project name: {e}")
+        return "New Project"
+
+def suggest_optimal_flashcard_count(text, topic_name=""):
+    """Use AI to analyze content and suggest optimal flashcard count for a single topic/document"""
+    # Analyze the text to determine appropriate flashcard count
+    text_length = len(text)
+    word_count = len(text.split())
+    
+    # Take a good sample for AI analysis
+    sample_text = text[:3000]
+    
+    topic_context = f" about '{topic_name}'" if topic_name else ""
+    
+    prompt = f"""
+    Analyze this educational content{topic_context} and determine the optimal number of flashcards to generate.
+    
+    Content length: {word_count} words
+    
+    Consider:
+    - Content complexity and depth
+    - Number of distinct concepts covered
+    - Appropriate coverage without redundancy
+    - Effective learning (not too few, not too many)
+    
+    Respond with ONLY a JSON object in this exact format:
+    {{"optimal_count": 15, "reasoning": "Brief 1-sentence explanation"}}
+    
+    Suggest between 5 and 50 flashcards.
+    
+    Content sample:
+    {sample_text}
+    """
+    
+    try:
+        response_text = llm.complete(
+            model="gpt-4o-mini",
+            messages=[
+                {"role": "system", "content": "You are an expert at analyzing educational content and determining optimal learning material quantities."},
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=100,
+            temperature=0.3,
+            stage='count-suggest',
+            validate=is_json_response,
+        )
+        
+        result_json = response_text.strip()
+        
+        # Remove markdown code blocks if present
+        if result_json.startswith('```'):
+            first_newline = result_json.find('\n')
+            last_marker = result_json.rfind('```')
+            if first_newline != -1 and last_marker != -1:
+                result_json = result_json[first_newline+1:last_marker].strip()
+        
+        result = json.loads(result_json)
+        optimal_count = result.get('optimal_count', 25)
+        reasoning = result.get('reasoning', 'Based on content analysis')
+        
+        # Clamp to reasonable range
+        optimal_count = max(5, min(50, optimal_count))
+        
+        print(f"AI suggests {optimal_count} flashcards for '{topic_name}': {reasoning}")
+        return optimal_count, reasoning
+    
+    except Exception as e:
+        print(f"Error getting optimal flashcard count: {e}")
+        # Fallback: estimate based on text length
+        if word_count < 500:
+            return 10, "Short content"
+        elif word_count < 1500:
+            return 20, "Medium length content"
+        else:
+            return 25, "Substantial content"
+
+def extract_topics_from_text(text):
+    """Use AI to extract topics and determine flashcard count per topic"""
+    word_count = len(text.split())
+    chunks = split_into_chunks(text, CHUNK_TOKENS * 2)
+    if len(chunks) <= 1:
+        return extract_topics_from_chunk(text, word_count)
+    
+    # Long document: find the topics in each part in parallel, then merge them
+    with ThreadPoolExecutor(max_workers=min(GENERATION_WORKERS, len(chunks))) as pool:
+        chunk_topics = list(pool.map(in_current_context(lambda chunk: extract_topics_from_chunk(chunk, len(chunk.split()))), chunks))
+    chunk_topics = [topics for topics in chunk_topics if topics]
+    if not chunk_topics:
+        return []
+    print(f"Extracted topics from {len(chunk_topics)} of {len(chunks)} parts of the document")
+    return merge_topics(chunk_topics, word_count)
+
+def extract_topics_from_chunk(sample_text, word_count):
+    """Ask the AI for the topics (and flashcard count per topic) in one piece of content"""
+    prompt = f"""
+    Analyze this educational content and identify the optimal number of distinct learning topics.
+    
+    Content length: {word_count} words
+    
+    Your task:
+    1. Understand the overall subject matter and learning objectives
+    2. Identify natural topic divisions that aid learning and retention
+    3. Determine how many topics makes most sense pedagogically (no min/max constraints)
+    4. For each topic, suggest an appropriate number of flashcards based on complexity
+    
+    Guidelines:
+    - Create as many or as few topics as needed for effective learning
+    - Topics should represent meaningful knowledge domains
+    - Each topic should be substantial enough to warrant separate study
+    - Don't force a specific number - let the content guide you
+    - Flashcard counts should match topic complexity (5-50 per topic)
+    
+    Return your response as a JSON array of objects with this exact structure:
+    [{{"name": "Topic Name", "flashcard_count": 15}}]
+    
+    Respond with ONLY the JSON array, no additional text.
+    
+    Content:
+    {sample_text}
+    """
+    
+    try:
+        response_text = llm.complete(
+            model="gpt-4o-mini",
+            messages=[
+                {"role": "system", "content": "You are an expert at analyzing educational content and extracting key topics."},
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=500,
+            temperature=0.3,
+            stage='topics',
+            validate=is_json_response,
+        )
+        
+        topics_json = response_text.strip()
+        
+        # Remove markdown code blocks if present
+        if topics_json.startswith('```'):
+            first_newline = topics_json.find('\n')
+            last_marker = topics_json.rfind('```')
+            if first_newline != -1 and last_marker != -1:
+                topics_json = topics_json[first_newline+1:last_marker].strip()
+        
+        topics = json.loads(topics_json)
+        print(f"Extracted {len(topics)} topics")
+        return topics
+    
+    except Exception as e:
+        print(f"Error extracting topics: {e}")
+        return []
+
+def merge_topics(chunk_topics, word_count):
+    """Combine the topic lists found in each part of a document into one list"""
+    found = [
+        {"part": i + 1, "name": topic['name'], "flashcard_count": topic.get('flashcard_count', 15)}
+        for i, topics in enumerate(chunk_topics) for topic in topics
+    ]
+    prompt = f"""
+    These topics were identified separately in consecutive parts of one educational document ({word_count} words).
+    
+    {json.dumps(found)}
+    
+    Merge them into the final list of distinct learning topics for the whole document:
+    - Combine topics that cover the same subject, even if they are named differently
+    - Keep topics in the order they first appear in the document
+    - Set each flashcard count to reflect the topic's overall complexity (5-50 per topic)
+    
+    Return your response as a JSON array of objects with this exact structure:
+    [{{"name": "Topic Name", "flashcard_count": 15}}]
+    
+    Respond with ONLY the JSON array, no additional text.
+    """
+    
+    try:
+        response_text = llm.complete(
+            model="gpt-4o-mini",
+            messages=[
+                {"role": "system", "content": "You are an expert at analyzing educational content and extracting key topics."},
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=1000,
+            temperature=0.3,
+            stage='topics',
+            validate=is_json_response,
+        )
+        
+        topics_json = response_text.strip()
+        
+        # Remove markdown code blocks if present
+        if topics_json.startswith('```'):
+            first_newline = topics_json.find('\n')
+            last_marker = topics_json.rfind('```')
+            if first_newline != -1 and last_marker != -1:
+                topics_json = topics_json[first_newline+1:last_marker].strip()
+        
+        topics = json.loads(topics_json)
+        print(f"Merged into {len(topics)} topics")
+        return topics
+    
+    except Exception as e:
+        print(f"Error merging topics, combining by name instead: {e}")
+        merged = {}
+        for topic in found:
+            key = normalize_question(topic['name'])
+            if key in merged:
+                merged[key]['flashcard_count'] = min(50, merged[key]['flashcard_count'] + topic['flashcard_count'])
+            else:
+                merged[key] = {"name": topic['name'], "flashcard_count": topic['flashcard_count']}
+        return list(merged.values())
+
+def generate_flashcards_from_text(text, topic_name, num_cards, on_card=None, avoid=None):
+    """
+    Generate flashcards for a specific topic from document text.
+    
+    on_card(card), if given, is called for each card as soon as it has been
+    generated (from several threads at once for a long document). avoid is
+    a list of existing questions the new cards must not repeat.
+    """
+    chunks = split_into_chunks(text, CHUNK_TOKENS)
+    if len(chunks) <= 1:
+        return generate_flashcards_from_chunk(text, topic_name, num_cards, on_card=on_card, avoid=avoid)
+    
+    # Long document: spread the cards over its parts by size and generate each part in
+    # parallel, dropping near-duplicate questions as cards arrive; the result is in document order
+    parts = [(i, chunk, count) for i, (chunk, count) in enumerate(zip(chunks, allocate_counts(chunks, num_cards))) if count]
+    print(f"Generating {num_cards} flashcards for topic '{topic_name}' from {len(parts)} of {len(chunks)} parts")
+    lock = threading.Lock()
+    seen = NearDuplicateIndex(DEDUPE_THRESHOLD)
+    kept = set()
+    
+    def accept(card):
+        with lock:
+            if len(kept) >= num_cards or seen.add(card['id'], card['question']) is not None:
+                return
+            kept.add(card['id'])
+        if on_card:
+            on_card(card)
+    
+    def generate_part(part):
+        i, chunk, count = part
+        return generate_flashcards_from_chunk(chunk, topic_name, count, part=(i + 1, len(chunks)),
+                                              on_card=accept, avoid=avoid)
+    
+    with ThreadPoolExecutor(max_workers=min(GENERATION_WORKERS, len(parts))) as pool:
+        results = list(pool.map(in_current_context(generate_part), parts))
+    
+    flashcards = [card for part_cards in results for card in part_cards if card['id'] in kept]
+    print(f"Generated {len(flashcards)} flashcards for topic '{topic_name}' "
+          f"({sum(len(r) for r in results) - len(flashcards)} duplicates removed)")
+    return flashcards
+
+# Question type rules shared by the flashcard generation prompts
+FLASHCARD_RULES = """CRITICAL RULES FOR QUESTION TYPES:
+    
+    1. TRUE/FALSE questions: Use ONLY for statements that can be evaluated as factually true or false.
+       - Answer MUST be exactly "True" or "False" (capitalized)
+       - Question should be a statement, not a question
+       - MUST include "explanation" field with 1-2 sentences explaining WHY
+       
+    2. YES/NO questions: Use ONLY for questions asking about permissions, recommendations, or subjective matters.
+       - Answer MUST be exactly "Yes" or "No" (capitalized)
+       - Question should end with a question mark
+       - MUST include "explanation" field with 1-2 sentences explaining WHY
+       
+    3. MULTIPLE CHOICE: Use for questions with one correct answer from several options.
+       - Answer MUST be a single letter: "A", "B", "C", or "D"
+       - MUST include "options" array with 4 choices formatted as "A) text", "B) text", etc.
+       - MUST include "explanation" field with 1-2 sentences explaining WHY the correct answer is right
+       
+    4. MULTIPLE ANSWER: Use for questions where multiple options can be correct.
+       - Answer MUST be comma-separated letters like "A,C" or "B,C,D" (no spaces)
+       - MUST include "options" array with choices formatted as "A) text", "B) text", etc.
+       - MUST include "explanation" field explaining WHY these specific answers are correct
+       - Question should indicate multiple answers needed
+
+    ALWAYS include an "explanation" field that helps learners understand the concept, not just the answer."""
+
+def generate_flashcards_from_chunk(text, topic_name, num_cards, part=None, on_card=None, avoid=None):
+    """
+    Generate flashcards for a topic from one piece of document text (part is
+    (n, total) for a section of a longer document).
+    
+    The response is streamed and each card passed to on_card as soon as its
+    JSON object is complete, so if the output is cut off or the connection
+    drops, the cards finished before that are still returned.
+    """
+    section_note = (f"\n    The content is part {part[0]} of {part[1]} of a longer document. "
+                    f"Base the flashcards on what this part says that relates to \"{topic_name}\".") if part else ""
+    avoid_note = ("\n\n    Do NOT repeat or reword any of these existing questions - cover different facts:\n" +
+                  "\n".join(f"    - {question}" for question in avoid[:MAX_AVOID_QUESTIONS])) if avoid else ""
+    prompt = f"""
+    Generate EXACTLY {num_cards} flashcards (no more, no less) about "{topic_name}" from the following content.{section_note}
+    
+    IMPORTANT: The JSON array MUST contain precisely {num_cards} flashcard objects.
+    
+    The response must be a valid JSON array containing flashcard objects.
+    Each flashcard object must have these exact keys: 'question', 'answer', 'explanation', and optionally 'options'.
+    Format the response as a JSON array without any additional text or explanation.
+
+    {FLASHCARD_RULES}{avoid_note}
+
+    Document content:
+    {text}
+    """
+    
+    flashcards = []
+    parser = JsonArrayStream()
+    try:
+        response = llm.stream(
+            model="gpt-4o",
+            messages=[
+                {
+                    "role": "system",
+                    "content": "You generate high-quality flashcards from educational content. "
+                              "Follow the question type rules strictly. "
+                              "Always include clear explanations to help learners understand the concepts."
+                },
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=3000,
+            temperature=0.4,
+            stage='generate',
+            validate=is_json_response,
+        )
+        
+        for piece in response:
+            for card in parser.feed(piece):
+                if not isinstance(card, dict) or 'question' not in card or 'answer' not in card:
+                    print(f"Skipping malformed flashcard for topic '{topic_name}': {card}")
+                    continue
+                
+                # Add metadata to each card
+                card['topic'] = topic_name
+                card['correct_count'] = 0
+                card['attempts'] = 0
+                card['answer_type'] = get_answer_type(card['answer'])
+                card['id'] = new_card_id()
+                if on_card:
+                    on_card(card)
+                flashcards.append(card)
+        
+        if not parser.done:
+            print(f"Response for topic '{topic_name}' was cut off; kept {len(flashcards)} complete flashcards")
+        elif not part:
+            print(f"Generated {len(flashcards)} flashcards for topic '{topic_name}'")
+    
+    except Exception as e:
+        print(f"Error generating flashcards for topic '{topic_name}': {e}")
+        if flashcards:
+            print(f"Kept {len(flashcards)} flashcards generated before the error")
+    return flashcards
+
+def generate_flashcards_for_topics(topics, on_card=None):
+    """
+    Generate the flashcards of several small topics with one request.
+    
+    topics is a list of {'name', 'text', 'count'}. Each topic is given an ID
+    (T1, T2, ...) and every card in the response names the topic it belongs
+    to, so the cards can be streamed and passed to on_card(position, card)
+    as they arrive, position being the topic's index in topics. Returns
+    (cards per topic, complete), complete being False if the response was
+    cut off, failed or could not be parsed; the caller then generates the
+    topics left short on their own.
+    """
+    ids = {f'T{i + 1}': i for i in range(len(topics))}
+    total_cards = sum(topic['count'] for topic in topics)
+    topic_list = "\n".join(f'    - T{i + 1}: "{topic["name"]}" - EXACTLY {topic["count"]} flashcards'
+                           for i, topic in enumerate(topics))
+    # Topics sharing a text (AI-extracted topics) get it once
+    texts = {}
+    for i, topic in enumerate(topics):
+        texts.setdefault(topic['text'], []).append(f'T{i + 1}')
+    contents = "\n\n".join(f'    Content for {", ".join(topic_ids)}:\n    {text}' for text, topic_ids in texts.items())
+    prompt = f"""
+    Generate flashcards for each of the {len(topics)} topics below, using only that topic's own content.
+    
+{topic_list}
+    
+    IMPORTANT: Return ONE JSON array with all {total_cards} flashcards, precisely the number listed for each topic.
+    
+    The response must be a valid JSON array containing flashcard objects.
+    Each flashcard object must have these exact keys: 'topic', 'question', 'answer', 'explanation', and optionally 'options'.
+    'topic' is the ID of the topic the flashcard belongs to (T1, T2, ...).
+    Format the response as a JSON array without any additional text or explanation.
+
+    {FLASHCARD_RULES}
+
+{contents}
+    """
+    
+    cards_by_topic = [[] for _ in topics]
+    parser = JsonArrayStream()
+    complete = False
+    try:
+        response = llm.stream(
+            model="gpt-4o",
+            messages=[
+                {
+                    "role": "system",
+                    "content": "You generate high-quality flashcards from educational content. "
+                              "Follow the question type rules strictly. "
+                              "Always include clear explanations to help learners understand the concepts."
+                },
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=min(16000, max(3000, PACK_TOKENS_PER_CARD * total_cards)),
+            temperature=0.4,
+            stage='generate',
+            validate=is_json_response,
+        )
+        
+        for piece in response:
+            for card in parser.feed(piece):
+                position = ids.get(str(card.get('topic', '')).strip()) if isinstance(card, dict) else None
+                if position is None or 'question' not in card or 'answer' not in card:
+                    print(f"Skipping malformed flashcard in packed request: {card}")
+                    continue
+                
+                topic_name = topics[position]['name']
+                card['topic'] = topic_name
+                card['correct_count'] = 0
+                card['attempts'] = 0
+                card['answer_type'] = get_answer_type(card['answer'])
+                card['id'] = new_card_id()
+                if on_card:
+                    on_card(position, card)
+                cards_by_topic[position].append(card)
+        
+        complete = parser.done
+        if not complete:
+            print(f"Packed response for {len(topics)} topics was cut off; kept "
+                  f"{sum(len(cards) for cards in cards_by_topic)} complete flashcards")
+    
+    except Exception as e:
+        print(f"Error generating flashcards for {len(topics)} packed topics: {e}")
+    return cards_by_topic, complete
+
+# Project-aware helper functions for mastery
+def get_card_hash(question):
+    """Generate a unique hash for a flashcard question"""
+    return question_hash(question)
+
+def get_card_id(card):
+    """Key for a card's mastery/exclusion records (hashes the question only for cards saved without an ID)"""
+    return card.get('id') or get_card_hash(card['question'])
+
+def mark_card_mastered(card):
+    """Mark a card as mastered in current project"""
+    project = get_current_project()
+    project.update_mastery({get_card_id(card): mastery_record(card)})
+
+def mastery_record(card):
+    """Mastery entry stored for a card"""
+    return {
+        'question': card['question'],
+        'topic': card['topic'],
+        'filename': card.get('filename', 'Unknown'),
+        'mastered_date': datetime.now().isoformat()
+    }
+
+def is_card_mastered(card):
+    """Check if a card is mastered in current project"""
+    project = get_current_project()
+    return get_card_id(card) in project.mastery
+
+def reset_topic_mastery(topic):
+    """Reset all mastered cards for a specific topic in current project"""
+    project = get_current_project()
+    project.remove_mastery([
+        k for k, v in project.mastery.items() 
+        if v['topic'] == topic
+    ])
+
+def get_mastery_stats():
+    """Get mastery statistics by topic for current project"""
+    project = get_current_project()
+    stats = {topic: {'mastered': 0, 'total': total} for topic, total in project.get_topic_counts().items()}
+    
+    # Count mastered cards per topic from the mastery records (no need to read the cards)
+    for record in project.mastery.values():
+        topic_stats = stats.get(record.get('topic'))
+        if topic_stats and topic_stats['mastered'] < topic_stats['total']:
+            topic_stats['mastered'] += 1
+    
+    return stats
+
+# Project-aware helper functions for card exclusion
+def exclude_card(card):
+    """Mark a card as excluded in current project"""
+    project = get_current_project()
+    project.load_excluded()
+    project.update_excluded({get_card_id(card): exclusion_record(card)})
+
+def exclusion_record(card):
+    """Exclusion entry stored for a card"""
+    return {
+        'question': card['question'],
+        'answer': card.get('answer', ''),
+        'explanation': card.get('explanation', ''),
+        'topic': card.get('topic', 'Unknown'),
+        'excluded_date': datetime.now().isoformat()
+    }
+
+def include_card(card_hash):
+    """Remove exclusion for a card in current project (by hash)"""
+    project = get_current_project()
+    project.load_excluded()
+    return project.remove_excluded([card_hash]) > 0
+
+def is_card_excluded(card):
+    """Check if a card is excluded in current project"""
+    project = get_current_project()
+    return get_card_id(card) in project.excluded
+
+def get_excluded_cards():
+    """Get all excluded cards for current project, grouped by topic"""
+    project = get_current_project()
+    project.load_excluded()
+    
+    excluded_by_topic = defaultdict(list)
+    for card_hash, card_data in project.excluded.items():
+        topic = card_data.get('topic', 'Unknown')
+        excluded_by_topic[topic].append({
+            'hash': card_hash,
+            **card_data
+        })
+    
+    return dict(excluded_by_topic)
+
+def get_excluded_count():
+    """Get count of excluded cards for current project"""
+    project = get_current_project()
+    project.load_excluded()
+    return len(project.excluded)
+
+# Routes
+
+@app.route('/')
+def index():
+    # Auto-save any active unsaved session before going home
+    if 'mode' in session and not session.get('results_saved', False):
+        mode = session['mode']
+        score = session.get('score', 0)
+        total = session.get('current_card_index', 0)
+        
+        # Only save if user has answered at least one card
+        if total > 0:
+            timestamp = datetime.now()
+            percentage = calculate_percentage(score, total)
+            
+            # Save to project history
+            project = get_current_project()
+            project.load_history()
+            if mode == 'exam':
+                project.add_history_entry('exam_history', timestamp, {
+                    'score': score,
+                    'total': total,
+                    'percentage': percentage,
+                    'topics': session.get('topics', [])
+                })
+            else:
+                cards_mastered = session.get('cards_mastered_this_session', 0)
+                project.add_history_entry('study_history', timestamp, {
+                    'score': score,
+                    'total': total,
+                    'percentage': percentage,
+                    'topics': session.get('topics', []),
+                    'cards_mastered': cards_mastered
+                })
+            session['results_saved'] = True
+            flash(f'Session progress saved: {score}/{total} ({percentage:.1f}%)', 'info')
+    
+    return render_template('index.html')
+
+@app.route('/test')
+def test():
+    print("TEST ROUTE CALLED")
+    import sys
+    sys.stdout.flush()
+    # Also try logging
+    import logging
+    logging.basicConfig(level=logging.DEBUG)
+    logging.info("TEST ROUTE CALLED VIA LOGGING")
+    # Also write to file
+    with open('debug.log', 'a') as f:
+        f.write("TEST ROUTE CALLED\n")
+    return "Test route working!"
+
+@app.route('/creation-progress/<progress_id>')
+def get_creation_progress(progress_id):
+    """Get progress of project creation (from the job queue if this process has not run the job)"""
+    if progress_id in creation_progress:
+        return jsonify(creation_progress[progress_id])
+    job = job_queue.get(progress_id, with_payload=False)
+    if job:
+        return jsonify(_creation_progress_from_job(job))
+    return jsonify({'status': 'not_found'}), 404
+
+@app.route('/jobs')
+def list_jobs():
+    """Recent background jobs with the state of each topic"""
+    return jsonify({'jobs': job_queue.recent()})
+
+@app.route('/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    """Stop a queued or running job; topics already generated are kept"""
+    if not job_queue.cancel(job_id):
+        return jsonify({'success': False, 'error': 'Job not found or already finished'}), 409
+    if job_queue.get(job_id, with_payload=False)['state'] == 'cancelled':
+        creation_progress.pop(job_id, None)  # Was still queued; serve the final state from the queue
+    elif job_id in creation_progress:
+        creation_progress[job_id]['current_status'] = 'Cancelling...'
+    return jsonify({'success': True})
+
+@app.route('/jobs/<job_id>/retry', methods=['POST'])
+def retry_job(job_id):
+    """Run a failed or cancelled job again, generating only the topics that are not done"""
+    if not job_queue.retry(job_id):
+        return jsonify({'success': False, 'error': 'Job not found, still running, or nothing to retry'}), 409
+    creation_progress.pop(job_id, None)
+    return jsonify({'success': True, 'progress_id': job_id})
+
+@app.route('/extraction-progress/<progress_id>')
+def get_extraction_progress(progress_id):
+    """Get progress of file extraction"""
+    if progress_id in extraction_progress:
+        return jsonify(extraction_progress[progress_id])
+    return jsonify({'status': 'not_found'}), 404
+
+@app.route('/admin/cache-stats')
+def cache_stats():
+    """Hit/miss counters and memory use of the in-memory project data cache"""
+    return jsonify(project_cache.stats())
+
+@app.route('/admin/llm-cache-stats', methods=['GET', 'POST'])
+def llm_cache_stats():
+    """Hit/miss counters and disk use of the OpenAI response cache (POST empties it)"""
+    if request.method == 'POST':
+        llm_cache.clear()
+    return jsonify(llm_cache.stats())
+
+@app.route('/admin/extraction-cache-stats', methods=['GET', 'POST'])
+def extraction_cache_stats():
+    """Hit/miss counters and disk use of the extracted text cache (POST empties it)"""
+    if request.method == 'POST':
+        extraction_cache.clear()
+    return jsonify(extraction_cache.stats())
+
+@app.route('/admin/llm-rate-stats')
+def llm_rate_stats():
+    """Per-model rate limit state: concurrency limit, in-flight calls, queue depth, retries"""
+    return jsonify(llm_limiter.stats())
+
+@app.route('/admin/llm-usage')
+def llm_usage_page():
+    """Latency percentiles, tokens and spend of LLM calls per stage, model and project"""
+    hours = request.args.get('hours', type=float)
+    project = request.args.get('project') or None
+    since = time.time() - hours * 3600 if hours else None
+    summary = llm_usage.summary(project=project, since=since)
+    recent = llm_usage.calls(project=project, since=since, limit=50)
+    for call in recent:
+        call['time'] = datetime.fromtimestamp(call['ts']).strftime('%Y-%m-%d %H:%M:%S')
+    project_names = {}
+    for project_id in summary['projects']:
+        found = project_manager.get_project(project_id)
+        project_names[project_id] = found.name if found else project_id
+    return render_template('llm_usage.html', summary=summary, project_names=project_names,
+                           recent=recent,
+                           hours=hours, project=project, enabled=llm_usage.enabled)
+
+@app.route('/admin/llm-usage.json')
+def llm_usage_export():
+    """The /admin/llm-usage summary as JSON (?hours=, ?project=; ?calls=N adds the N most recent calls)"""
+    hours = request.args.get('hours', type=float)
+    project = request.args.get('project') or None
+    since = time.time() - hours * 3600 if hours else None
+    export = llm_usage.summary(project=project, since=since)
+    calls = request.args.get('calls', type=int)
+    if calls:
+        export['calls'] = llm_usage.calls(project=project, since=since, limit=calls)
+    return jsonify(export)
+
+@app.route('/store-extraction-results', methods=['POST'])
+def store_extraction_results():
+    """
+    Store extraction results in session (called by frontend after background processing completes).
+    The page only sends the extraction ID; the results (with handles to the
+    extracted text, not the text) are copied from the extraction progress.
+    """
+    try:
+        data = request.get_json()
+        extraction_id = data.get('extraction_id')
+        extraction = extraction_progress.get(extraction_id)
+        if not extraction or extraction.get('status') != 'complete':
+            return jsonify({'success': False, 'error': 'Extraction not found or not complete'}), 404
+        session['pending_project'] = {
+            'documents_data': extraction['documents_data'],
+            'document_count': extraction['document_count'],
+            'suggested_name': extraction.get('suggested_name') or 'New Project',
+            'ai_topics': extraction.get('ai_topics') or [],
+            'extraction_id': extraction_id,
+            'timestamp': datetime.now().isoformat()
+        }
+        return jsonify({'success': True})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/update-creation-success', methods=['POST'])
+def update_creation_success():
+    """Update session with final flashcard counts after background generation completes"""
+    try:
+        data = request.get_json()
+        session['creation_success'] = {
+            'project_name': data['project_name'],
+            'flashcard_count': data['flashcard_count'],
+            'topic_count': data['topic_count'],
+            'progress_id': data['progress_id']
+        }
+        return jsonify({'success': True})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/suggest-topic-name', methods=['POST'])
+def suggest_topic_name():
+    """Analyze pasted content and suggest a topic name"""
+    try:
+        data = request.get_json()
+        content = data.get('content', '').strip()
+        
+        if not content or len(content) < 50:
+            return jsonify({
+                'success': False,
+                'error': 'Content too short for analysis'
+            }), 400
+        
+        # Take first 2000 characters for analysis
+        sample = content[:2000]
+        word_count = len(content.split())
+        
+        prompt = f"""
+        Analyze this educational content and suggest a concise, descriptive topic name (3-8 words max).
+        
+        The name should:
+        - Capture the main subject or lesson focus
+        - Be clear and specific
+        - Work as a study topic label
+        - Sound like a lesson or chapter title
+        
+        Content length: {word_count} words
+        
+        Respond with ONLY the topic name, nothing else.
+        
+        Content:
+        {sample}
+        """
+        
+        response_text = llm.complete(
+            model="gpt-4o-mini",
+            messages=[
+                {"role": "system", "content": "You generate clear, concise topic names for educational content."},
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=30,
+            temperature=0.5,
+            stage='name',
+        )
+        
+        suggested_name = response_text.strip()
+        suggested_name = suggested_name.strip('"\'')
+        
+        return jsonify({
+            'success': True,
+            'suggested_name': suggested_name
+        })
+        
+    except Exception as e:
+        print(f"Error suggesting topic name: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/start', methods=['GET', 'POST'])
+def start():
+    # Check if we just created a project and show success message
+    if 'creation_success' in session:
+        success_data = session.pop('creation_success')
+        flash(f'Project "{success_data["project_name"]}" created with {success_data["flashcard_count"]} flashcards across {success_data["topic_count"]} topics!', 'success')
+    
+    if request.method == 'POST':
+        print(f"\n===== START ROUTE POST REQUEST =====")
+        
+        # Handle project selection if changed
+        if 'project_id' in request.form:
+            new_project_id = request.form.get('project_id')
+            if new_project_id != session.get('current_project_id'):
+                set_current_project(new_project_id)
+                print(f"Switched to project: {new_project_id}")
+        
+        if not request.form.getlist('topics'):
+            flash('Please select at least one topic', 'error')
+            return redirect(url_for('start'))
+        selected_topics = request.form.getlist('topics')
+        
+        print(f"Form data: {dict(request.form)}")
+        print(f"Topics selected: {selected_topics}")
+        print(f"Raw topics list: {list(selected_topics)}")
+        
+        # Reset specific session keys to ensure clean start
+        keys_to_reset = ['mode', 'user_answers', 'exam_questions', 'completed_cards', 'current_card_index', 'score', 'start_time', 'topics', 'total_attempts', 'exam_start_time', 'exam_duration_seconds', 'question_start_time', 'question_duration_seconds', 'flashcards', 'total_cards', 'time_per_card', 'total_exam_time', 'results_saved']
+        for key in keys_to_reset:
+            if key in session:
+                del session[key]
+        
+        # Initialize session
+        session['mode'] = request.form.get('mode', 'study')
+        
+        # Initialize all session variables
+        session['user_answers'] = []
+        session['exam_questions'] = []
+        session['completed_cards'] = []
+        
+        # Get time values with proper error handling and defaults
+        try:
+            session['time_per_card'] = int(request.form.get('time_per_card') or TIME_PER_CARD)
+            session['total_exam_time'] = int(request.form.get('total_exam_time') or TOTAL_EXAM_TIME)
+        except ValueError:
+            session['time_per_card'] = TIME_PER_CARD
+            session['total_exam_time'] = TOTAL_EXAM_TIME
+            
+        session['current_card_index'] = 0
+        session['score'] = 0
+        session['start_time'] = datetime.now().isoformat()
+        session['topics'] = selected_topics
+        session['completed_cards'] = []
+        session['total_attempts'] = 0
+        
+        # Debug: Print session state
+        print(f"New flashcard session started - mode: {session['mode']}, current_card_index: {session['current_card_index']}")
+        print(f"Session keys after setup: {list(session.keys())}")
+        
+        # Test session persistence by setting a test value
+        session['test_value'] = 'test_persistence'
+        print(f"Test value set: {session.get('test_value')}")
+        
+        # Initialize exam timer
+        if session['mode'] == 'exam':
+            session['exam_start_time'] = datetime.now().isoformat()
+            session['exam_duration_seconds'] = session['total_exam_time'] * 60  # Convert minutes to seconds
+            session['question_start_time'] = datetime.now().isoformat()
+            session['question_duration_seconds'] = session['time_per_card']  # Time per question in seconds
+        
+        # Get current project (only the selected topics' cards are read)
+        project = get_current_project()
+        project.load_mastery()
+        project.load_excluded()
+        topic_counts = project.get_topic_counts()
+        
+        # Filter flashcards by selected topics if any are selected
+        print(f"Selected topics: {selected_topics}")
+        print(f"Total flashcards available: {sum(topic_counts.values())}")
+        
+        if 'all' in selected_topics:
+            session['flashcards'] = project.flashcards.copy()  # Use all flashcards
+            print(f"Using all flashcards: {len(session['flashcards'])}")
+        else:
+            session['flashcards'] = project.get_topic_flashcards(selected_topics)
+            print(f"Filtered flashcards: {len(session['flashcards'])}")
+        
+        # Filter out excluded cards (applies to both study and exam modes)
+        original_count = len(session['flashcards'])
+        session['flashcards'] = [card for card in session['flashcards'] if not is_card_excluded(card)]
+        excluded_count = original_count - len(session['flashcards'])
+        if excluded_count > 0:
+            print(f"Filtered out {excluded_count} excluded cards")
+            flash(f"{excluded_count} card(s) excluded from session", 'info')
+        
+        # In study mode, also filter out already mastered cards
+        if session['mode'] == 'study':
+            original_count = len(session['flashcards'])
+            session['flashcards'] = [card for card in session['flashcards'] if not is_card_mastered(card)]
+            mastered_count = original_count - len(session['flashcards'])
+            if mastered_count > 0:
+                print(f"Filtered out {mastered_count} already mastered cards")
+                flash(f"{mastered_count} card(s) already mastered in selected topics", 'info')
+            
+        session['total_cards'] = len(session['flashcards'])
+        print(f"Total cards set to: {session['total_cards']}")
+        
+        # Debug: Show first few topics in the project
+        if topic_counts:
+            sample_topics = list(topic_counts)[:10]
+            print(f"Sample topics from flashcards: {sample_topics}")
+            
+        if not session['flashcards']:  # If no flashcards match the selected topics
+            print("ERROR: No flashcards found - redirecting back to start")
+            print(f"Selected topics were: {selected_topics}")
+            print(f"Total flashcards in project: {sum(topic_counts.values())}")
+            return render_template('start.html', 
+                                topics=sorted(topic_counts),
+                                mastery_stats=get_mastery_stats(),
+                                error="No flashcards found for selected topics")
+            
+        random.shuffle(session['flashcards'])
+        
+        if session['mode'] == 'exam':
+            try:
+                min_questions = int(request.form.get('min_questions') or 5)
+                max_questions = int(request.form.get('max_questions') or 10)
+            except ValueError:
+                min_questions = 5
+                max_questions = 10
+                
+            num_questions = random.randint(min_questions, max_questions)
+            session['exam_questions'] = session['flashcards'][:num_questions]
+        
+        return redirect(url_for('flashcard'))
+    else:
+        # Get current project and load its data
+        project = get_current_project()
+        project.load_mastery()
+        
+        # Get all projects with their stats for the selector
+        available_projects = project_manager.list_projects()
+        
+        # Get unique topics from current project (from its topic counts) with mastery stats
+        topics = sorted(project.get_topic_counts())
+        mastery_stats = get_mastery_stats()
+        
+        return render_template('start.html', 
+                             topics=topics,
+                             mastery_stats=mastery_stats,
+                             current_project=project,
+                             available_projects=available_projects,
+                             time_per_card=TIME_PER_CARD,
+                             total_exam_time=TOTAL_EXAM_TIME)
+
+@app.route('/flashcard', methods=['GET', 'POST'])
+def flashcard():
+    # Check if session is properly initialized
+    mode = session.get('mode', 'study')
+    current_card_index = session.get('current_card_index', 0)
+    
+    print(f"Flashcard route - mode: {mode}, current_card_index: {current_card_index}")
+    print(f"Session keys in flashcard route: {list(session.keys())}")
+    print(f"Test value in flashcard route: {session.get('test_value', 'NOT_FOUND')}")
+    
+    if mode == 'exam':
+        exam_questions = session.get('exam_questions', [])
+        print(f"Exam questions: {len(exam_questions)}")
+        if 'exam_questions' not in session or not exam_questions:
+            print("No exam questions - redirecting to start")
+            return redirect(url_for('start'))
+    else:
+        flashcards = session.get('flashcards', [])
+        print(f"Study flashcards: {len(flashcards)}")
+        if 'flashcards' not in session or not flashcards:
+            print("No flashcards - redirecting to start")
+            return redirect(url_for('start'))
+
+    # Get the current card first
+    if mode == 'exam':
+        exam_questions = session.get('exam_questions', [])
+        print(f"Checking exam: current_card_index={current_card_index}, exam_questions_length={len(exam_questions)}")
+        if current_card_index >= len(exam_questions):
+            print(f"Redirecting to results - current_card_index ({current_card_index}) >= exam_questions length ({len(exam_questions)})")
+            return redirect(url_for('results'))
+        card = exam_questions[current_card_index]
+    else:
+        flashcards = session.get('flashcards', [])
+        print(f"Checking study: current_card_index={current_card_index}, flashcards_length={len(flashcards)}")
+        if current_card_index >= len(flashcards):
+            print(f"Redirecting to results - current_card_index ({current_card_index}) >= flashcards length ({len(flashcards)})")
+            return redirect(url_for('results'))
+        card = flashcards[current_card_index]
+
+    # Check for timer expiry in exam mode
+    if mode == 'exam':
+        exam_start_time = datetime.fromisoformat(session.get('exam_start_time', datetime.now().isoformat()))
+        elapsed_seconds = (datetime.now() - exam_start_time).total_seconds()
+        if elapsed_seconds >= session.get('exam_duration_seconds', 0):
+            return redirect(url_for('results'))
+        
+        # Check for per-question timer expiry
+        question_start_time = datetime.fromisoformat(session.get('question_start_time', datetime.now().isoformat()))
+        question_elapsed = (datetime.now() - question_start_time).total_seconds()
+        if question_elapsed >= session.get('question_duration_seconds', 0):
+            # Check if there's a user answer from the form (timeout but answer provided)
+            user_answer = ''
+            if request.method == 'POST':
+                if card.get('answer_type') == 'multiple_answer':
+                    user_answer = ','.join(request.form.getlist('answer'))
+                else:
+                    user_answer = request.form.get('answer', '')
+            
+            if user_answer:
+                # Time expired but user provided an answer - evaluate it
+                is_correct = check_answer(card['question'], user_answer, card['answer'])
+                completed_card = {
+                    'question': card['question'],
+                    'user_answer': user_answer,
+                    'correct_answer': card['answer'],
+                    'correct': is_correct,
+                    'feedback': get_feedback(card['question'], user_answer, card['answer'], is_correct) + ' ⏰ (Time expired)',
+                    'answer_type': card.get('answer_type', 'multiple_choice'),
+                    'options': card.get('options', []),
+                    'explanation': card.get('explanation', 'No explanation available.')
+                }
+                
+                # Store in user_answers for results calculation
+                session.setdefault('user_answers', []).append({
+                    'question': card['question'],
+                    'user_answer': user_answer,
+                    'correct_answer': card['answer']
+                })
+            else:
+                # Time expired with no answer
+                completed_card = {
+                    'question': card['question'],
+                    'user_answer': '',  # Empty answer for timeout
+                    'correct_answer': card['answer'],
+                    'correct': False,
+                    'feedback': '⏰ Time expired! No answer submitted.',
+                    'answer_type': card.get('answer_type', 'multiple_choice'),
+                    'options': card.get('options', []),
+                    'explanation': card.get('explanation', 'No explanation available.')
+                }
+                
+                # Store in user_answers for results calculation
+                session.setdefault('user_answers', []).append({
+                    'question': card['question'],
+                    'user_answer': '',  # Empty answer for timeout
+                    'correct_answer': card['answer']
+                })
+            
+            # Add to completed cards for display
+            session.setdefault('completed_cards', []).append(completed_card)
+            session['current_card_index'] += 1
+            session['question_start_time'] = datetime.now().isoformat()  # Reset question timer
+            return redirect(url_for('flashcard'))
+
+    # Handle POST request (answer submission)
+    if request.method == 'POST':
+        # Handle multiple answer submissions (checkboxes)
+        if card.get('answer_type') == 'multiple_answer':
+            user_answer = ','.join(request.form.getlist('answer'))
+        else:
+            user_answer = request.form.get('answer')
+            
+        if not user_answer:
+            # Get completed cards based on mode
+            if mode == 'exam':
+                completed_cards = session.get('completed_cards', [])
+                # Calculate remaining time for exam
+                exam_start_time = datetime.fromisoformat(session.get('exam_start_time', datetime.now().isoformat()))
+                elapsed_seconds = (datetime.now() - exam_start_time).total_seconds()
+                exam_remaining_seconds = max(0, session.get('exam_duration_seconds', 0) - elapsed_seconds)
+                
+                # Calculate remaining time for current question
+                question_start_time = datetime.fromisoformat(session.get('question_start_time', datetime.now().isoformat()))
+                question_elapsed = (datetime.now() - question_start_time).total_seconds()
+                question_remaining_seconds = max(0, session.get('question_duration_seconds', 0) - question_elapsed)
+            else:
+                completed_cards = session.get('completed_cards', [])
+                exam_remaining_seconds = None
+                question_remaining_seconds = None
+                
+            return render_template('flashcard_scroll.html', 
+                                cards=completed_cards,
+                                current_card=card, 
+                                mode=mode, 
+                                time_limit=session.get('time_per_card'),
+                                exam_remaining_seconds=exam_remaining_seconds,
+                                question_remaining_seconds=question_remaining_seconds,
+                                error="Please provide an answer")
+        
+        if mode == 'exam':
+            # Store the completed question with results for display
+            completed_card = {
+                'question': card['question'],
+                'user_answer': user_answer,
+                'correct_answer': card['answer'],
+                'correct': check_answer(card['question'], user_answer, card['answer']),
+                'feedback': get_feedback(card['question'], user_answer, card['answer'], check_answer(card['question'], user_answer, card['answer'])),
+                'answer_type': card.get('answer_type', 'multiple_choice'),
+                'options': card.get('options', []),
+                'explanation': card.get('explanation', 'No explanation available.')
+            }
+            
+            # Add to completed cards for display
+            session.setdefault('completed_cards', []).append(completed_card)
+            
+            # Also store in user_answers for results calculation
+            session.setdefault('user_answers', []).append({
+                'question': card['question'],
+                'user_answer': user_answer,
+                'correct_answer': card['answer']
+            })
+            session['current_card_index'] += 1
+            session['question_start_time'] = datetime.now().isoformat()  # Reset question timer for next question
+        else:
+            correct = check_answer(card['question'], user_answer, card['answer'])
+            
+            # Track streak for this specific card
+            card_id = get_card_id(card)
+            current_streak = session.get(f'streak_{card_id}', 0)
+
+            if correct:
+                session['score'] += 1
+                current_streak += 1
+                session[f'streak_{card_id}'] = current_streak
+            else:
+                current_streak = 0
+                session[f'streak_{card_id}'] = 0
+            
+            # Generate feedback with streak information
+            base_feedback = get_feedback(card['question'], user_answer, card['answer'], correct)
+            mastered = False
+            
+            if correct and current_streak < 3:
+                feedback = f"{base_feedback} 🔥 Streak: {current_streak}/3"
+            elif correct and current_streak >= 3:
+                feedback = f"{base_feedback} 🎉 CARD MASTERED! You answered correctly 3 times in a row!"
+                mastered = True
+                # Mark the card as permanently mastered
+                mark_card_mastered(card)
+            else:
+                feedback = f"{base_feedback} 🔄 Streak reset to 0/3"
+
+            # Store the completed card with results
+            completed_card = {
+                'question': card['question'],
+                'user_answer': user_answer,
+                'correct_answer': card['answer'],
+                'correct': correct,
+                'feedback': feedback,
+                'answer_type': card.get('answer_type', 'multiple_choice'),
+                'options': card.get('options', []),
+                'streak': current_streak,
+                'mastered': mastered,
+                'explanation': card.get('explanation', 'No explanation available.')
+            }
+            
+            # Add to completed cards list
+            session.setdefault('completed_cards', []).append(completed_card)
+            
+            # Track how many cards have been mastered in this session
+            if mastered:
+                session['cards_mastered_this_session'] = session.get('cards_mastered_this_session', 0) + 1
+            
+            # Check if this is the last card
+            is_last_card = (current_card_index + 1 >= len(session['flashcards']))
+            
+            if current_streak >= 3:
+                # Remove card from session after mastering
+                session['flashcards'].pop(current_card_index)
+            else:
+                session['current_card_index'] += 1
+
+            # Track attempts for each card
+            card['attempts'] = card.get('attempts', 0) + 1
+            session['total_attempts'] = session.get('total_attempts', 0) + 1
+            
+            # If this is the last card, show results
+            if is_last_card:
+                return redirect(url_for('results'))
+                
+        return redirect(url_for('flashcard', new_card='true'))
+
+    # Get all completed cards and current card for scrolling interface
+    if mode == 'exam':
+        # Exam mode now shows completed cards below current question
+        completed_cards = session.get('completed_cards', [])
+        # Calculate remaining time for exam
+        exam_start_time = datetime.fromisoformat(session.get('exam_start_time', datetime.now().isoformat()))
+        elapsed_seconds = (datetime.now() - exam_start_time).total_seconds()
+        exam_remaining_seconds = max(0, session.get('exam_duration_seconds', 0) - elapsed_seconds)
+        
+        # Calculate remaining time for current question
+        question_start_time = datetime.fromisoformat(session.get('question_start_time', datetime.now().isoformat()))
+        question_elapsed = (datetime.now() - question_start_time).total_seconds()
+        question_remaining_seconds = max(0, session.get('question_duration_seconds', 0) - question_elapsed)
+    else:
+        completed_cards = session.get('completed_cards', [])
+        exam_remaining_seconds = None
+        question_remaining_seconds = None
+    
+    # Calculate mastery progress for study mode
+    cards_mastered_session = session.get('cards_mastered_this_session', 0) if mode == 'study' else 0
+    cards_remaining = len(session.get('flashcards', [])) if mode == 'study' else 0
+    
+    return render_template('flashcard_scroll.html', 
+                         cards=completed_cards,
+                         current_card=card, 
+                         mode=mode, 
+                         time_limit=session.get('time_per_card'),
+                         exam_remaining_seconds=exam_remaining_seconds,
+                         question_remaining_seconds=question_remaining_seconds,
+                         cards_mastered_session=cards_mastered_session,
+                         cards_remaining=cards_remaining)
+
+# Modify the results route
+@app.route('/results')
+def results():
+    if 'mode' not in session:
+        return redirect(url_for('index'))
+    
+    mode = session.get('mode', 'study')
+    timestamp = datetime.now()
+    
+    # Check if results have already been saved for this session to prevent duplicates
+    if session.get('results_saved', False):
+        # Results already saved, just display them
+        if mode == 'exam':
+            completed_cards = session.get('completed_cards', [])
+            score = 0
+            results = []
+            
+            for card in completed_cards:
+                is_correct = card.get('correct', False)
+                results.append({
+                    'question': card['question'],
+                    'user_answer': card['user_answer'],
+                    'correct_answer': card['correct_answer'],
+                    'is_correct': is_correct,
+                    'explanation': card.get('explanation', 'No explanation available.')
+                })
+                if is_correct:
+                    score += 1
+                    
+            total_questions = len(completed_cards)
+            percentage = calculate_percentage(score, total_questions)
+            
+            return render_template('results.html',
+                                 mode=mode,
+                                 total_questions=total_questions,
+                                 score=score,
+                                 percentage=percentage,
+                                 results=results)
+        else:
+            total_questions = session.get('current_card_index', 0)
+            score = session.get('score', 0)
+            percentage = calculate_percentage(score, total_questions)
+            
+            return render_template('results.html',
+                                 mode=mode,
+                                 total_questions=total_questions,
+                                 score=score,
+                                 percentage=percentage)
+    
+    # Save results for the first time
+    session['results_saved'] = True
+    
+    if mode == 'exam':
+        completed_cards = session.get('completed_cards', [])
+        score = 0
+        results = []
+        
+        for card in completed_cards:
+            is_correct = card.get('correct', False)
+            results.append({
+                'question': card['question'],
+                'user_answer': card['user_answer'],
+                'correct_answer': card['correct_answer'],
+                'is_correct': is_correct,
+                'explanation': card.get('explanation', 'No explanation available.')
+            })
+            if is_correct:
+                score += 1
+                
+        total_questions = len(completed_cards)
+        percentage = calculate_percentage(score, total_questions)
+        
+        # Save to project history
+        project = get_current_project()
+        project.load_history()  # Load existing history before adding new entry
+        project.add_history_entry('exam_history', timestamp, {
+            'score': score,
+            'total': total_questions,
+            'percentage': percentage,
+            'topics': session.get('topics', [])
+        })
+        
+        return render_template('results.html',
+                             mode=mode,
+                             total_questions=total_questions,
+                             score=score,
+                             percentage=percentage,
+                             results=results)
+    else:
+        total_questions = session.get('current_card_index', 0)
+        score = session.get('score', 0)
+        percentage = calculate_percentage(score, total_questions)
+        cards_mastered = session.get('cards_mastered_this_session', 0)
+        
+        # Save to project history
+        project = get_current_project()
+        project.load_history()  # Load existing history before adding new entry
+        project.add_history_entry('study_history', timestamp, {
+            'score': score,
+            'total': total_questions,
+            'percentage': percentage,
+            'topics': session.get('topics', []),
+            'cards_mastered': cards_mastered
+        })
+        
+        return render_template('results.html',
+                             mode=mode,
+                             total_questions=total_questions,
+                             score=score,
+                             percentage=percentage,
+                             cards_mastered=cards_mastered)
+
+@app.route('/stats')
+def stats():
+    # Auto-save any active unsaved session before showing stats
+    if 'mode' in session and not session.get('results_saved', False):
+        mode = session['mode']
+        score = session.get('score', 0)
+        total = session.get('current_card_index', 0)
+        
+        # Only save if user has answered at least one card
+        if total > 0:
+            timestamp = datetime.now()
+            percentage = calculate_percentage(score, total)
+            
+            # Save to project history
+            project = get_current_project()
+            project.load_history()  # Load existing history before adding new entry
+            if mode == 'exam':
+                project.add_history_entry('exam_history', timestamp, {
+                    'score': score,
+                    'total': total,
+                    'percentage': percentage,
+                    'topics': session.get('topics', [])
+                })
+            else:
+                cards_mastered = session.get('cards_mastered_this_session', 0)
+                project.add_history_entry('study_history', timestamp, {
+                    'score': score,
+                    'total': total,
+                    'percentage': percentage,
+                    'topics': session.get('topics', []),
+                    'cards_mastered': cards_mastered
+                })
+            session['results_saved'] = True  # Mark as saved
+            flash(f'Session progress saved: {score}/{total} ({percentage:.1f}%)', 'info')
+    
+    project = get_current_project()
+    project.load_history()
+    return render_template('stats.html',
+                         current_project=project,
+                         exam_history=project.history.get('exam_history', {}),
+                         study_history=project.history.get('study_history', {}),
+                         all_time_scores=project.history.get('all_time_scores', {}))
+
+@app.route('/mastery')
+def mastery():
+    """Show mastery progress for all topics"""
+    # Auto-save any active unsaved session before showing mastery
+    if 'mode' in session and not session.get('results_saved', False):
+        mode = session['mode']
+        score = session.get('score', 0)
+        total = session.get('current_card_index', 0)
+        
+        # Only save if user has answered at least one card
+        if total > 0:
+            timestamp = datetime.now()
+            percentage = calculate_percentage(score, total)
+            
+            # Save to project history
+            project = get_current_project()
+            project.load_history()
+            if mode == 'exam':
+                project.add_history_entry('exam_history', timestamp, {
+                    'score': score,
+                    'total': total,
+                    'percentage': percentage,
+                    'topics': session.get('topics', [])
+                })
+            else:
+                cards_mastered = session.get('cards_mastered_this_session', 0)
+                project.add_history_entry('study_history', timestamp, {
+                    'score': score,
+                    'total': total,
+                    'percentage': percentage,
+                    'topics': session.get('topics', []),
+                    'cards_mastered': cards_mastered
+                })
+            session['results_saved'] = True
+            flash(f'Session progress saved: {score}/{total} ({percentage:.1f}%)', 'info')
+    
+    project = get_current_project()
+    mastery_stats = get_mastery_stats()
+    return render_template('mastery.html',
+                         current_project=project,
+                         mastery_stats=mastery_stats)
+
+@app.route('/reset_mastery/<topic>', methods=['POST'])
+def reset_mastery(topic):
+    """Reset mastered cards for a specific topic"""
+    reset_topic_mastery(topic)
+    flash(f'Mastery progress reset for "{topic}"', 'success')
+    return redirect(url_for('mastery'))
+
+@app.route('/excluded-cards')
+def excluded_cards():
+    """Show excluded cards management page"""
+    project = get_current_project()
+    excluded_by_topic = get_excluded_cards()
+    total_excluded = get_excluded_count()
+    return render_template('excluded_cards.html',
+                         current_project=project,
+                         excluded_by_topic=excluded_by_topic,
+                         total_excluded=total_excluded)
+
+@app.route('/exclude-card', methods=['POST'])
+def exclude_card_route():
+    """Exclude a card from future sessions"""
+    question = request.form.get('question')
+    if not question and not request.form.get('card_id'):
+        return jsonify({'success': False, 'error': 'No question provided'}), 400
+    
+    project = get_current_project()
+    
+    # Find the card by ID (or by question, through the project's question index)
+    card_id = request.form.get('card_id') or project.find_card_id(question)
+    card = project.get_card(card_id) if card_id else None
+    
+    if not card:
+        return jsonify({'success': False, 'error': 'Card not found'}), 404
+    
+    exclude_card(card)
+    return jsonify({'success': True, 'message': 'Card excluded successfully'})
+
+@app.route('/include-card', methods=['POST'])
+def include_card_route():
+    """Include a previously excluded card back into sessions"""
+    card_hash = request.form.get('card_hash')
+    if not card_hash:
+        return jsonify({'success': False, 'error': 'No card hash provided'}), 400
+    
+    if include_card(card_hash):
+        flash('Card has been included back into sessions', 'success')
+        return redirect(url_for('excluded_cards'))
+    else:
+        flash('Card not found in excluded list', 'error')
+        return redirect(url_for('excluded_cards'))
+
+BULK_CARD_ACTIONS = ('exclude', 'include', 'master', 'reset')
+
+def select_cards(project, card_filter):
+    """Cards matching a bulk-operation filter: topic (name or list), answer_type, mastered, excluded"""
+    topics = card_filter.get('topic')
+    if topics is None:
+        cards = project.flashcards
+    else:
+        cards = project.get_topic_flashcards([topics] if isinstance(topics, str) else topics)
+    
+    selected = []
+    for card in cards:
+        if 'answer_type' in card_filter and card.get('answer_type') != card_filter['answer_type']:
+            continue
+        card_id = get_card_id(card)
+        if 'mastered' in card_filter and (card_id in project.mastery) != bool(card_filter['mastered']):
+            continue
+        if 'excluded' in card_filter and (card_id in project.excluded) != bool(card_filter['excluded']):
+            continue
+        selected.append(card)
+    return selected
+
+@app.route('/api/cards/bulk', methods=['POST'])
+def bulk_cards_route():
+    """
+    Apply one action to many cards in a single load/modify/save cycle.
+    
+    JSON body: {"action": "exclude" | "include" | "master" | "reset",
+                "card_ids": [...]}  or  {"action": ..., "filter": {"topic": ..., "answer_type": ..., "mastered": bool}}
+    """
+    data = request.get_json(silent=True) or {}
+    action = data.get('action')
+    if action not in BULK_CARD_ACTIONS:
+        return jsonify({'success': False, 'error': f"action must be one of {', '.join(BULK_CARD_ACTIONS)}"}), 400
+    if 'card_ids' not in data and 'filter' not in data:
+        return jsonify({'success': False, 'error': 'Provide card_ids or a filter'}), 400
+    
+    project = get_current_project()
+    not_found = 0
+    if 'card_ids' in data:
+        cards = []
+        for card_id in data['card_ids']:
+            card = project.get_card(card_id)
+            if card:
+                cards.append(card)
+            elif action == 'include' and card_id in project.excluded:
+                # Excluded cards may no longer be in the deck; their ID is all include needs
+                cards.append({'id': card_id})
+            else:
+                not_found += 1
+    else:
+        cards = select_cards(project, data['filter'] or {})
+    
+    card_ids = [get_card_id(card) for card in cards]
+    if action == 'exclude':
+        records = {get_card_id(card): exclusion_record(card) for card in cards
+                   if get_card_id(card) not in project.excluded}
+        if records:
+            project.update_excluded(records)
+        changed = len(records)
+    elif action == 'include':
+        changed = project.remove_excluded(card_ids)
+    elif action == 'master':
+        records = {get_card_id(card): mastery_record(card) for card in cards
+                   if get_card_id(card) not in project.mastery}
+        if records:
+            project.update_mastery(records)
+        changed = len(records)
+    else:
+        changed = project.remove_mastery(card_ids)
+    
+    return jsonify({
+        'success': True,
+        'action': action,
+        'matched': len(cards),
+        'changed': changed,
+        'not_found': not_found
+    })
+
+@app.route('/manage-projects')
+def manage_projects():
+    """Show project management page"""
+    # Auto-save any active unsaved session before showing projects
+    if 'mode' in session and not session.get('results_saved', False):
+        mode = session['mode']
+        score = session.get('score', 0)
+        total = session.get('current_card_index', 0)
+        
+        # Only save if user has answered at least one card
+        if total > 0:
+            timestamp = datetime.now()
+            percentage = calculate_percentage(score, total)
+            
+            # Save to project history
+            project = get_current_project()
+            project.load_history()
+            if mode == 'exam':
+                project.add_history_entry('exam_history', timestamp, {
+                    'score': score,
+                    'total': total,
+                    'percentage': percentage,
+                    'topics': session.get('topics', [])
+                })
+            else:
+                cards_mastered = session.get('cards_mastered_this_session', 0)
+                project.add_history_entry('study_history', timestamp, {
+                    'score': score,
+                    'total': total,
+                    'percentage': percentage,
+                    'topics': session.get('topics', []),
+                    'cards_mastered': cards_mastered
+                })
+            session['results_saved'] = True
+            flash(f'Session progress saved: {score}/{total} ({percentage:.1f}%)', 'info')
+    
+    projects = project_manager.list_projects()
+    
+    current_project_id = session.get('current_project_id')
+    
+    return render_template('manage_projects.html',
+                         projects=projects,
+                         current_project_id=current_project_id)
+
+@app.route('/switch-project/<project_id>', methods=['POST'])
+def switch_project(project_id):
+    """Switch to a different project"""
+    if not set_current_project(project_id):
+        flash('Project not found', 'error')
+    return redirect(url_for('start'))
+
+@app.route('/delete-project/<project_id>', methods=['POST'])
+def delete_project(project_id):
+    """Delete a project"""
+    # Don't allow deleting the current project if it's the only one
+    if len(project_manager.projects) == 1:
+        flash('Cannot delete the only project', 'error')
+        return redirect(url_for('manage_projects'))
+    
+    # If deleting current project, switch to another one first
+    if project_id == session.get('current_project_id'):
+        # Find another project to switch to
+        for pid in project_manager.projects.keys():
+            if pid != project_id:
+                set_current_project(pid)
+                break
+    
+    # Delete the project
+    project_name = project_manager.projects.name(project_id) if project_id in project_manager.projects else "Unknown"
+    if project_manager.delete_project(project_id):
+        flash(f'Project "{project_name}" deleted successfully', 'success')
+    else:
+        flash(f'Failed to delete project', 'error')
+    
+    return redirect(url_for('manage_projects'))
+
+def _new_extraction_batch(progress_id, uploaded_files, initial_errors):
+    """State of one upload's extraction, shared by the threads extracting its files"""
+    batch = {
+        'uploaded_files': list(uploaded_files),  # In upload order; chunked uploads get their path when finalized
+        'total_files': len(uploaded_files),
+        'pending': len(uploaded_files),  # Files not extracted (or failed) yet
+        'results': {},  # path -> text
+        'processing_errors': {},
+        'cache_hits': 0,
+        'errors': list(initial_errors),
+        'lock': threading.Lock()
+    }
+    extraction_progress[progress_id].update({
+        'status': 'extracting',
+        'current_file': 0,
+        'total_files': batch['total_files'],
+        'current_filename': '',
+        'current_status': f'Extracting text on {min(extraction_pool.workers, batch["total_files"])} worker(s)...',
+        'progress_percentage': 0,
+        'cache_hits': 0,
+        'cache_hit_rate': 0
+    })
+    return batch
+
+def _record_extracted_file(progress_id, batch, filepath, original_name, text, error, cached=False):
+    """Store one file's text (or error) and report it; files finish in any order (extraction phase = 0-10%)"""
+    safe_name = os.path.basename(filepath) if filepath else secure_filename(original_name)
+    with batch['lock']:
+        if cached:
+            batch['cache_hits'] += 1
+        if error is not None:
+            batch['processing_errors'][safe_name] = error
+            print(f"  ✗ Error processing {original_name}: {error}")
+            status = f'Error: {error}'
+        elif text:
+            batch['results'][filepath] = text
+            print(f"  ✓ Extracted {len(text)} characters from {original_name}{' (cached)' if cached else ''}")
+            extraction_progress[progress_id]['files_completed'].append(original_name)
+            status = (f'Reused {len(text)} characters extracted earlier' if cached
+                      else f'Successfully extracted {len(text)} characters')
+        else:
+            batch['processing_errors'][safe_name] = "No text could be extracted"
+            status = 'Warning: No text extracted'
+        files_done = len(batch['results']) + len(batch['processing_errors'])
+        extraction_progress[progress_id].update({
+            'current_file': files_done,
+            'current_filename': original_name,
+            'current_status': status,
+            'progress_percentage': 10 * files_done / batch['total_files'],
+            'cache_hits': batch['cache_hits'],
+            'cache_hit_rate': 100 * batch['cache_hits'] / files_done  # Share of files not parsed again
+        })
+        batch['pending'] -= 1
+        return batch['pending']
+
+def _extract_files(progress_id, batch, uploaded_files, content_hashes=None):
+    """Extract files on the extraction pool; True if they included the batch's last pending file"""
+    original_names = {file_info['path']: file_info['original'] for file_info in uploaded_files}
+    pending_after = []
+
+    def on_file_extracted(filepath, text, error, cached):
+        pending_after.append(_record_extracted_file(progress_id, batch, filepath, original_names[filepath],
+                                                    text, error, cached))
+
+    print(f"Extracting {len(uploaded_files)} file(s) on up to {extraction_pool.workers} worker(s)")
+    extraction_pool.extract_files(list(original_names), on_done=on_file_extracted, content_hashes=content_hashes)
+    return 0 in pending_after
+
+def _process_documents_background(progress_id, uploaded_files, initial_errors):
+    """Background thread function to process uploaded documents"""
+    try:
+        batch = _new_extraction_batch(progress_id, uploaded_files, initial_errors)
+        _extract_files(progress_id, batch, uploaded_files)
+        _analyze_extracted_documents(progress_id, batch)
+    except Exception as e:
+        print(f"❌ Error in background extraction: {e}")
+        import traceback
+        traceback.print_exc()
+        extraction_progress[progress_id].update({
+            'status': 'error',
+            'error': str(e)
+        })
+
+def _analyze_extracted_documents(progress_id, batch):
+    """AI phase once every file of an upload is extracted: flashcard counts, project name and topics"""
+    uploaded_files = [file_info for file_info in batch['uploaded_files'] if file_info.get('path')]
+    results = batch['results']
+    processing_errors = batch['processing_errors']
+    errors = batch['errors']
+    try:
+        if processing_errors:
+            errors.extend([f"{k}: {v}" for k, v in processing_errors.items()])
+        
+        if not results:
+            extraction_progress[progress_id].update({
+                'status': 'error',
+                'error': 'Failed to extract text from any document',
+                'errors': errors
+            })
+            return
+        
+        # Update status for AI processing phase
+        extraction_progress[progress_id].update({
+            'status': 'ai_processing',
+            'current_status': 'Getting AI suggestions for flashcard counts...',
+            'ai_file_index': 0,
+            'ai_total_files': len(results)
+        })
+        
+        # Store per-file extracted text (NOT combined)
+        documents_data = []
+        ai_file_index = 0
+        successful_files = len(results)
+        
+        for file_info in uploaded_files:
+            original_filename = file_info['original']
+            filepath = file_info['path']
+            
+            # Get extracted text for this file
+            text = results.get(filepath, '')
+            if not text:
+                continue
+            
+            # Use ORIGINAL filename as topic name, just remove the file extension
+            topic_name = os.path.splitext(original_filename)[0]  # Remove extension only
+            # Keep everything else: spaces, numbers, "Lesson XX", etc.
+            
+            # Calculate progress (AI flashcard count phase = 10-85%)
+            ai_file_index += 1
+            progress_percentage = 10 + (75 * ai_file_index / successful_files)
+            
+            # Get AI suggestion for optimal flashcard count for this document
+            try:
+                extraction_progress[progress_id].update({
+                    'current_status': f'AI analyzing "{topic_name}"...',
+                    'progress_percentage': progress_percentage,
+                    'ai_file_index': ai_file_index
+                })
+                ai_count, ai_reasoning = suggest_optimal_flashcard_count(text, topic_name)
+            except Exception as e:
+                print(f"Error getting AI count suggestion for {topic_name}: {e}")
+                ai_count = 25  # Fallback
+                ai_reasoning = "Default count"
+            
+            # The text is stored once on the server; the page, session and job get its handle
+            documents_data.append({
+                'original_filename': original_filename,
+                'display_filename': original_filename,
+                'filepath': filepath,
+                'text_blob': text_blobs.put(text),
+                'text_preview': text_preview(text),
+                'suggested_topic': topic_name,
+                'text_length': len(text),
+                'ai_suggested_count': ai_count,
+                'ai_reasoning': ai_reasoning
+            })
+        
+        # Combine all text for project name generation
+        combined_text = '\n\n'.join(results[doc['filepath']] for doc in documents_data)
+        
+        # Generate project name suggestion (85-92% progress)
+        extraction_progress[progress_id].update({
+            'status': 'generating_project_name',
+            'current_status': 'Generating project name suggestion...',
+            'progress_percentage': 85
+        })
+        
+        try:
+            suggested_name = generate_project_name_from_text(
+                combined_text,
+                is_multi_document=True,
+                document_count=len(results)
+            )
+        except Exception as e:
+            print(f"Error generating project name: {e}")
+            suggested_name = "New Project"
+        
+        # Extract AI topics (92-100% progress)
+        extraction_progress[progress_id].update({
+            'current_status': 'Extracting topic suggestions...',
+            'progress_percentage': 92
+        })
+        
+        try:
+            ai_topics = extract_topics_from_text(combined_text)
+        except Exception as e:
+            print(f"Error extracting AI topics: {e}")
+            ai_topics = []
+        
+        # Mark extraction as complete
+        extraction_progress[progress_id].update({
+            'status': 'complete',
+            'current_file': len(uploaded_files),
+            'current_filename': '',
+            'current_status': f'Successfully processed {len(results)} document(s)',
+            'progress_percentage': 100,
+            'documents_data': documents_data,
+            'document_count': len(results),
+            'processed_files': [doc['original_filename'] for doc in documents_data],
+            'suggested_name': suggested_name,
+            'ai_topics': ai_topics,
+            'extraction_id': progress_id,
+            'errors': errors if errors else None
+        })
+        
+        print(f"✅ Background extraction complete: {len(results)} document(s) processed")
+        
+    except Exception as e:
+        print(f"❌ Error in background extraction: {e}")
+        import traceback
+        traceback.print_exc()
+        extraction_progress[progress_id].update({
+            'status': 'error',
+            'error': str(e)
+        })
+
+def _save_pasted_documents(pasted_data, folder):
+    """Write pasted content ([{"name", "content"}]) to text files; returns their uploaded file entries"""
+    os.makedirs(folder, exist_ok=True)
+    uploaded_files = []
+    for pasted_item in pasted_data:
+        # Create a text file from pasted content
+        filename = secure_filename(pasted_item['name'])
+        filepath = os.path.join(folder, filename)
+        
+        with open(filepath, 'w', encoding='utf-8') as f:
+            f.write(pasted_item['content'])
+        
+        uploaded_files.append({
+            'original': pasted_item['name'],
+            'path': filepath
+        })
+        print(f"Created file from pasted content: {pasted_item['name']}")
+    return uploaded_files
+
+@app.route('/upload-documents', methods=['GET', 'POST'])
+def upload_documents():
+    """Handle document uploads for creating a new project"""
+    if request.method == 'POST':
+        # Check if files were uploaded OR content was pasted
+        has_files = 'documents' in request.files and request.files.getlist('documents')
+        has_pasted = 'pasted_content' in request.form
+        
+        if not has_files and not has_pasted:
+            return jsonify({'success': False, 'error': 'No files uploaded or content pasted'}), 400
+        
+        files = request.files.getlist('documents') if has_files else []
+        
+        # Filter out empty files
+        files = [f for f in files if f.filename != '']
+        
+        if not files and not has_pasted:
+            return jsonify({'success': False, 'error': 'No valid files or content provided'}), 400
+        
+        # Initialize document processor
+        processor = DocumentProcessor()
+        upload_store.prune_folders(text_blobs.max_age_seconds)
+        
+        uploaded_files = []
+        errors = []
+        pasted_file_counter = 1
+        
+        # Create progress tracker for extraction
+        progress_id = secrets.token_hex(8)
+        
+        # Temporary folder of this upload, so files with the same name in other uploads don't clash
+        temp_dir = os.path.join(upload_store.upload_folder, progress_id)
+        os.makedirs(temp_dir, exist_ok=True)
+        extraction_progress[progress_id] = {
+            'status': 'starting',
+            'current_file': 0,
+            'total_files': 0,
+            'current_filename': '',
+            'current_status': 'Initializing...',
+            'progress_percentage': 0,
+            'files_completed': []
+        }
+        
+        try:
+            # Handle pasted content first
+            if has_pasted:
+                try:
+                    pasted_data = json.loads(request.form.get('pasted_content'))
+                    uploaded_files.extend(_save_pasted_documents(pasted_data, temp_dir))
+                except Exception as e:
+                    errors.append(f"Error processing pasted content: {str(e)}")
+            
+            # Save uploaded files temporarily
+            for file in files:
+                if file.filename == '':
+                    continue
+                
+                original_filename = file.filename
+                safe_filename = secure_filename(file.filename)
+                
+                # Check if file type is supported
+                if not processor.is_supported_file(safe_filename):
+                    errors.append(f"{original_filename}: Unsupported file type")
+                    continue
+                
+                filepath = os.path.join(temp_dir, safe_filename)
+                file.save(filepath)
+                uploaded_files.append({'original': original_filename, 'path': filepath})
+            
+            if not uploaded_files:
+                return jsonify({
+                    'success': False, 
+                    'error': 'No valid files uploaded',
+                    'errors': errors
+                }), 400
+            
+            # Update extraction progress with total count
+            extraction_progress[progress_id]['total_files'] = len(uploaded_files)
+            extraction_progress[progress_id]['status'] = 'extracting'
+            
+            # Start background thread for processing; its LLM calls are logged against this
+            # upload until a project is created from it
+            with usage_project(f'upload-{progress_id}'):
+                thread = threading.Thread(
+                    target=in_current_context(_process_documents_background),
+                    args=(progress_id, uploaded_files, errors),
+                    daemon=True
+                )
+            thread.start()
+            
+            # Return immediately with progress ID
+            return jsonify({
+                'success': True,
+                'message': f'Processing {len(uploaded_files)} document(s)...',
+                'extraction_progress_id': progress_id,
+                'document_count': len(uploaded_files)
+            })
+        
+        except Exception as e:
+            # Clean up temp files on error
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            
+            return jsonify({
+                'success': False,
+                'error': f'Upload failed: {str(e)}'
+            }), 500
+    
+    # GET request - show upload page
+    return render_template('upload_documents.html')
+
+def _start_upload_extraction(progress_id, batch, uploaded_files, content_hashes=None):
+    """Extract files of a chunked upload on a background thread (its AI calls are logged against the upload)"""
+    with usage_project(f'upload-{progress_id}'):
+        thread = threading.Thread(
+            target=in_current_context(_extract_upload_files),
+            args=(progress_id, batch, uploaded_files, content_hashes),
+            daemon=True
+        )
+    thread.start()
+
+def _extract_upload_files(progress_id, batch, uploaded_files, content_hashes=None):
+    """Background thread: extract files of a chunked upload; whichever thread finishes the last file runs the AI phase"""
+    try:
+        if _extract_files(progress_id, batch, uploaded_files, content_hashes):
+            _finish_chunked_upload(progress_id, batch)
+    except Exception as e:
+        print(f"❌ Error in background extraction: {e}")
+        import traceback
+        traceback.print_exc()
+        extraction_progress[progress_id].update({
+            'status': 'error',
+            'error': str(e)
+        })
+
+def _finish_chunked_upload(progress_id, batch):
+    upload_batches.pop(progress_id, None)
+    _analyze_extracted_documents(progress_id, batch)
+
+def _chunked_upload_failed(upload, error):
+    """Count a cancelled, expired or corrupt chunked upload as a failed file of its batch"""
+    batch = upload_batches.get(upload.batch_id)
+    if batch is None:
+        return
+    if _record_extracted_file(upload.batch_id, batch, None, upload.name, None, error) == 0:
+        with usage_project(f'upload-{upload.batch_id}'):
+            thread = threading.Thread(target=in_current_context(_finish_chunked_upload),
+                                      args=(upload.batch_id, batch), daemon=True)
+        thread.start()
+
+@app.route('/uploads/init', methods=['POST'])
+def init_chunked_upload():
+    """
+    Start a chunked upload of documents: {"files": [{"name", "size"}], "pasted_content": [{"name", "content"}]}.
+    Returns an upload ID per accepted file; each file is then sent with PUT /uploads/<id>?offset=N
+    (raw bytes, at most chunk_size per request) and POST /uploads/<id>/finalize, which starts
+    its extraction. Progress is reported at /extraction-progress/<extraction_progress_id>.
+    """
+    data = request.get_json(silent=True) or {}
+    files = data.get('files') or []
+    pasted_data = data.get('pasted_content') or []
+    if not files and not pasted_data:
+        return jsonify({'success': False, 'error': 'No files uploaded or content pasted'}), 400
+
+    for stale_upload in upload_store.prune_stale():
+        _chunked_upload_failed(stale_upload, 'Upload timed out')
+    upload_store.prune_folders(text_blobs.max_age_seconds)
+
+    processor = DocumentProcessor()
+    progress_id = secrets.token_hex(8)
+    extraction_progress[progress_id] = {
+        'status': 'starting',
+        'current_file': 0,
+        'total_files': 0,
+        'current_filename': '',
+        'current_status': 'Initializing...',
+        'progress_percentage': 0,
+        'files_completed': []
+    }
+    uploaded_files = []
+    uploads = []
+    errors = []
+
+    for index, item in enumerate(files):
+        name = str(item.get('name') or '')
+        if not processor.is_supported_file(secure_filename(name)):
+            errors.append(f"{name}: Unsupported file type")
+            continue
+        try:
+            upload = upload_store.create(name, int(item.get('size') or 0), batch_id=progress_id)
+        except (UploadError, ValueError) as e:
+            errors.append(str(e))
+            continue
+        uploaded_files.append({'original': name, 'path': None, 'upload_id': upload.id})
+        uploads.append({'upload_id': upload.id, 'name': name, 'index': index})
+
+    pasted_files = []
+    if pasted_data:
+        try:
+            pasted_files = _save_pasted_documents(pasted_data, os.path.join(upload_store.upload_folder, progress_id))
+        except Exception as e:
+            errors.append(f"Error processing pasted content: {str(e)}")
+    uploaded_files = pasted_files + uploaded_files
+
+    if not uploaded_files:
+        extraction_progress.pop(progress_id, None)
+        return jsonify({'success': False, 'error': 'No valid files uploaded', 'errors': errors}), 400
+
+    batch = _new_extraction_batch(progress_id, uploaded_files, errors)
+    upload_batches[progress_id] = batch
+    if pasted_files:
+        _start_upload_extraction(progress_id, batch, pasted_files)
+
+    return jsonify({
+        'success': True,
+        'extraction_progress_id': progress_id,
+        'uploads': uploads,
+        'chunk_size': UPLOAD_CHUNK_BYTES,
+        'document_count': len(uploaded_files),
+        'errors': errors
+    })
+
+@app.route('/uploads/<upload_id>', methods=['GET', 'PUT', 'DELETE'])
+def chunked_upload(upload_id):
+    """Where a chunked upload stands (GET), append a chunk at ?offset=N (PUT) or cancel it (DELETE)"""
+    try:
+        if request.method == 'PUT':
+            offset = request.args.get('offset', type=int)
+            if offset is None:
+                raise UploadError("Missing offset")
+            received = upload_store.append(upload_id, offset, request.stream, request.content_length)
+            return jsonify({'success': True, 'offset': received})
+        if request.method == 'DELETE':
+            _chunked_upload_failed(upload_store.discard(upload_id), 'Upload cancelled')
+            return jsonify({'success': True})
+        return jsonify(dict(upload_store.get(upload_id).status(), success=True))
+    except UploadError as e:
+        return jsonify({'success': False, 'error': str(e), 'offset': e.offset}), e.status
+
+@app.route('/uploads/<upload_id>/finalize', methods=['POST'])
+def finalize_chunked_upload(upload_id):
+    """Finish a chunked upload ({"sha256": optional checksum}) and start extracting its text"""
+    data = request.get_json(silent=True) or {}
+    try:
+        upload = upload_store.get(upload_id)
+        first = upload_store.finalize(upload_id, data.get('sha256'))
+    except UploadError as e:
+        if e.status == 422:
+            _chunked_upload_failed(upload, str(e))
+        return jsonify({'success': False, 'error': str(e), 'offset': e.offset}), e.status
+
+    if first:
+        batch = upload_batches.get(upload.batch_id)
+        if batch is None:
+            return jsonify({'success': False, 'error': 'Upload expired'}), 404
+        with batch['lock']:
+            file_info = next(f for f in batch['uploaded_files'] if f.get('upload_id') == upload.id)
+            file_info['path'] = upload.path
+        _start_upload_extraction(upload.batch_id, batch, [file_info], {upload.path: upload.content_hash})
+    return jsonify({'success': True, 'size': upload.size, 'sha256': upload.content_hash})
+
+def _creation_progress_from_job(job):
+    """Progress payload for a project creation job, rebuilt from its checkpoints in the job queue"""
+    topics = [{'name': t['name'], 'status': t['state'], 'cards': t['cards']} for t in job['topics']]
+    for topic, checkpoint in zip(topics, job['topics']):
+        if checkpoint['error']:
+            topic['error'] = checkpoint['error']
+    project = project_manager.get_project(job['project_id'])
+    finished = [t for t in topics if t['status'] in ('done', 'failed')]
+    return {
+        'status': {'running': 'generating'}.get(job['state'], job['state']),
+        'job_id': job['id'],
+        'current_topic': len(finished),
+        'total_topics': len(topics),
+        'current_topic_name': '',
+        'flashcards_generated': sum(t['cards'] for t in topics),
+        'project_id': job['project_id'],
+        'project_name': project.name if project else '',
+        'topics': topics,
+        'failed_topics': [t['name'] for t in topics if t['status'] == 'failed'],
+        'topic_count': sum(1 for t in topics if t['status'] == 'done'),
+        'error': job['error']
+    }
+
+def _generate_topics(job_id, progress, batch, topics_to_generate, on_card):
+    """
+    Generate the flashcards of one topic, or of several small topics packed into
+    one request (runs in the generation pool), and record each topic's status.
+    
+    Topics a packed request left short (it was cut off, failed or could not be
+    parsed, or it gave a topic no cards) are then generated on their own.
+    """
+    if job_queue.is_cancelled(job_id):
+        for idx in batch:
+            progress['topics'][idx]['status'] = 'cancelled'
+        return
+    for idx in batch:
+        topic_status = progress['topics'][idx]
+        topic_status.update({'status': 'generating', 'cards': 0})
+        topic_status.pop('error', None)
+        job_queue.set_topic(job_id, idx, 'generating')
+    topics = [topics_to_generate[idx] for idx in batch]
+    if len(batch) == 1:
+        print(f"[{batch[0]+1}/{len(progress['topics'])}] Generating {topics[0]['count']} flashcards for: {topics[0]['name']}")
+    else:
+        print(f"[{batch[0]+1}/{len(progress['topics'])}] Generating {sum(t['count'] for t in topics)} flashcards "
+              f"for {len(batch)} small topics in one request: {', '.join(t['name'] for t in topics)}")
+    
+    questions = {idx: [] for idx in batch}
+    duplicates = {idx: [] for idx in batch}
+    
+    def add_card(idx, card):
+        job_queue.check_cancelled(job_id)  # Stops reading the response once the job is cancelled
+        if on_card(idx, card):  # Counts the card in progress['topics'][idx]['cards']
+            questions[idx].append(card['question'])
+        else:
+            duplicates[idx].append(card['question'])
+    
+    try:
+        if len(batch) == 1:
+            generate_flashcards_from_text(
+                topics[0]['text'],
+                topics[0]['name'],
+                topics[0]['count'],
+                on_card=lambda card: add_card(batch[0], card)
+            )
+            complete = True
+        else:
+            _, complete = generate_flashcards_for_topics(
+                topics,
+                on_card=lambda position, card: add_card(batch[position], card)
+            )
+    except Exception as e:
+        for idx in batch:
+            progress['topics'][idx]['error'] = str(e)
+        complete = False
+    
+    for idx, topic_info in zip(batch, topics):
+        topic_status = progress['topics'][idx]
+        if job_queue.is_cancelled(job_id):
+            break
+        try:
+            if len(batch) > 1 and (not complete or not topic_status['cards']) and topic_status['cards'] < topic_info['count']:
+                # Fallback: the packed request didn't deliver this topic, so ask for the rest on its own
+                missing = topic_info['count'] - topic_status['cards']
+                print(f"Generating {missing} flashcards for topic '{topic_info['name']}' on its own")
+            elif duplicates[idx]:
+                # Backfill: ask once more for as many cards as were dropped as near-duplicates of
+                # cards already in the project, listing the questions the new ones must avoid
+                missing = len(duplicates[idx])
+                print(f"Replacing {missing} near-duplicate flashcards in topic '{topic_info['name']}'")
+            else:
+                continue
+            if duplicates[idx]:
+                topic_status['duplicates'] = len(duplicates[idx])
+            topic_status.pop('error', None)
+            generate_flashcards_from_text(
+                topic_info['text'],
+                topic_info['name'],
+                missing,
+                on_card=lambda card, idx=idx: add_card(idx, card),
+                avoid=questions[idx] + duplicates[idx]
+            )
+        except Exception as e:
+            topic_status['error'] = str(e)
+    
+    for idx in batch:
+        topic_status = progress['topics'][idx]
+        if job_queue.is_cancelled(job_id):
+            topic_status['status'] = 'cancelled'
+        elif topic_status['cards']:
+            topic_status['status'] = 'done'
+        else:
+            topic_status['status'] = 'failed'
+            topic_status.setdefault('error', 'No flashcards were generated for this topic')
+
+def _load_text_blobs(handles):
+    """Text of extracted documents from their handles in text_blobs, joined as the combined text is"""
+    texts = []
+    for handle in handles:
+        text = text_blobs.get(handle)
+        if text is None:
+            raise RuntimeError('The extracted text of the documents is no longer available, please upload them again')
+        texts.append(text)
+    return '\n\n'.join(texts)
+
+def _generate_flashcards_background(job):
+    """
+    Job handler for project creation: generate the new project's flashcards.
+    
+    Each finished topic is saved to the project and checkpointed in the job
+    queue, so a job resumed after a restart (or retried) only generates the
+    topics that were not done.
+    """
+    progress_id = job['id']
+    payload = job['payload']
+    progress = creation_progress[progress_id] = _creation_progress_from_job(job)
+    try:
+        # Get the project
+        new_project = project_manager.get_project(job['project_id'])
+        if not new_project:
+            raise RuntimeError('Project not found')
+        project_name = payload['project_name']
+        # Jobs queued before extracted text moved to text_blobs carry the texts themselves
+        texts = payload['texts'] if 'texts' in payload else [_load_text_blobs(handles) for handles in payload['text_blobs']]
+        topics_to_generate = [
+            {'name': t['name'], 'text': texts[t['text']], 'count': t['count']}
+            for t in payload['topics']
+        ]
+        
+        # Keep the cards of topics already done; cards of a topic that was interrupted
+        # part way are dropped, and the topic is generated again
+        done = {t['idx'] for t in job['topics'] if t['state'] == 'done'}
+        topic_index = {t['name']: idx for idx, t in enumerate(topics_to_generate)}
+        unfinished = {t['name'] for idx, t in enumerate(topics_to_generate) if idx not in done}
+        existing = list(new_project.load_flashcards())
+        kept = [card for card in existing if card.get('topic') not in unfinished]
+        new_project.flashcards = kept  # A list, also for projects stored as a (read-only) binary card file
+        if len(kept) != len(existing):
+            new_project.save_flashcards()
+        
+        progress.update({
+            'status': 'generating',
+            'current_status': f"Calling OpenAI API for up to {GENERATION_WORKERS} topics at a time (this may take 10-30 seconds)..."
+        })
+        if done:
+            print(f"Resuming creation of '{project_name}': {len(done)} of {len(topics_to_generate)} topics already done")
+        
+        # Generate topics in parallel. Each card is added to the project as soon as it
+        # arrives (saved at most every CARD_SAVE_INTERVAL seconds, and whenever a topic
+        # finishes); once all topics are done the deck is put back in topic order
+        save_lock = threading.Lock()
+        card_topics = {card['id']: topic_index.get(card.get('topic'), len(topics_to_generate)) for card in kept}
+        last_save = [time.time()]
+        
+        # Cards that nearly duplicate a card already in the project (usually from another
+        # topic generated from the same text) are dropped; _generate_topics backfills them
+        seen = NearDuplicateIndex(DEDUPE_THRESHOLD)
+        for card in kept:
+            seen.add(card['id'], card['question'])
+        
+        def add_card(idx, card):
+            """Add a generated card to the project; False if it was dropped as a near-duplicate"""
+            with save_lock:
+                if seen.add(card['id'], card['question']) is not None:
+                    progress['duplicates_removed'] = progress.get('duplicates_removed', 0) + 1
+                    return False
+                card_topics[card['id']] = idx
+                new_project.add_flashcards([card])
+                progress['topics'][idx]['cards'] += 1  # Chunks of a topic arrive on several threads
+                progress['flashcards_generated'] = len(card_topics)
+                if time.time() - last_save[0] >= CARD_SAVE_INTERVAL:
+                    new_project.save_flashcards()
+                    last_save[0] = time.time()
+                return True
+        
+        # Small topics (each fitting one request) are packed together up to PACK_TOKENS of
+        # text, so a project of many short documents doesn't repeat the prompt for each
+        todo = [idx for idx in range(len(topics_to_generate)) if idx not in done]
+        small = [idx for idx in todo if estimate_tokens(topics_to_generate[idx]['text']) <= CHUNK_TOKENS]
+        batches = [[small[i] for i in group] for group in pack_texts(
+            [topics_to_generate[idx]['text'] for idx in small],
+            [topics_to_generate[idx]['count'] for idx in small],
+            PACK_TOKENS, PACK_MAX_CARDS
+        )]
+        batches += [[idx] for idx in todo if idx not in small]
+        with usage_project(new_project.id), ThreadPoolExecutor(max_workers=min(GENERATION_WORKERS, len(batches) or 1)) as pool:
+            futures = {
+                pool.submit(in_current_context(_generate_topics), progress_id, progress, batch, topics_to_generate, add_card): batch
+                for batch in batches
+            }
+            for future in as_completed(futures):
+                batch = futures[future]
+                future.result()
+                with save_lock:
+                    new_project.save_flashcards()
+                    durable_writer.flush()  # Cards are on disk before the topics are checkpointed
+                    last_save[0] = time.time()
+                for idx in batch:
+                    topic_status = progress['topics'][idx]
+                    job_queue.set_topic(progress_id, idx, topic_status['status'], topic_status['cards'], topic_status.get('error'))
+                
+                # Update progress - one more topic (or batch of topics) finished
+                running = [t['name'] for t in progress['topics'] if t['status'] == 'generating']
+                finished = [progress['topics'][idx] for idx in batch]
+                names = ', '.join(f"\"{t['name']}\"" for t in finished)
+                failed = [t for t in finished if t['status'] == 'failed']
+                failed_names = ', '.join(f"\"{t['name']}\"" for t in failed)
+                progress.update({
+                    'current_topic': sum(1 for t in progress['topics'] if t['status'] in ('done', 'failed')),
+                    'current_topic_name': ', '.join(running) or finished[-1]['name'],
+                    'current_status': (f"Stopped {names}." if any(t['status'] == 'cancelled' for t in finished) else
+                                       f"Failed {failed_names}: {failed[0].get('error')}" if failed else
+                                       f"Completed {names} ({sum(t['cards'] for t in finished)} cards).")
+                })
+        
+        total_flashcards_generated = len(card_topics)
+        new_project.flashcards = sorted(new_project.flashcards, key=lambda card: card_topics.get(card['id'], len(topics_to_generate)))
+        new_project.save_flashcards()
+        durable_writer.flush()
+        progress['flashcards_generated'] = total_flashcards_generated
+        
+        if job_queue.is_cancelled(progress_id):
+            progress['status'] = 'cancelled'
+            print(f"Creation of '{project_name}' cancelled with {total_flashcards_generated} flashcards generated")
+            return 'cancelled'
+        
+        failed_topics = [t['name'] for t in progress['topics'] if t['status'] == 'failed']
+        progress['failed_topics'] = failed_topics
+        if failed_topics and len(failed_topics) == len(topics_to_generate):
+            raise RuntimeError('Flashcard generation failed for every topic')
+        
+        num_topics = len(topics_to_generate) - len(failed_topics)
+        
+        # Mark progress as complete
+        progress['status'] = 'complete'
+        progress['project_name'] = project_name
+        progress['topic_count'] = num_topics
+        
+        print(f"✅ Background generation complete: {total_flashcards_generated} flashcards in {num_topics} topics")
+        return 'complete'
+        
+    except Exception as e:
+        print(f"❌ Error in background generation: {e}")
+        import traceback
+        traceback.print_exc()
+        progress['status'] = 'error'
+        progress['error'] = str(e)
+        raise
+
+@app.route('/create-project-from-documents', methods=['GET', 'POST'])
+def create_project_from_documents():
+    """Create a new project from uploaded documents using AI"""
+    # Check if there's pending project data
+    if 'pending_project' not in session:
+        flash('No pending project found. Please upload documents first.', 'error')
+        return redirect(url_for('upload_documents'))
+    
+    pending = session['pending_project']
+    
+    if request.method == 'POST':
+        try:
+            # Get custom project name
+            project_name = request.form.get('project_name', '').strip()
+            
+            if not project_name:
+                flash('Project name is required', 'error')
+                return redirect(url_for('create_project_from_documents'))
+            
+            # Check for duplicate names and append number if needed
+            original_name = project_name
+            existing_names = project_manager.project_names()
+            counter = 1
+            while project_name in existing_names:
+                counter += 1
+                project_name = f"{original_name} ({counter})"
+            
+            # Get topic configuration strategy
+            topic_strategy = request.form.get('topic_strategy', 'one-per-file')
+            
+            # Check the extracted text is still stored before creating anything
+            if not all(text_blobs.exists(doc_data.get('text_blob')) for doc_data in pending['documents_data']):
+                session.pop('pending_project', None)
+                return jsonify({
+                    'success': False,
+                    'error': 'The extracted text of the documents is no longer available, please upload them again'
+                }), 410
+            
+            # Create the new project
+            new_project = project_manager.create_project(project_name)
+            if pending.get('extraction_id'):
+                # Count the AI calls made while analysing the upload towards the project
+                llm_usage.assign_project(f"upload-{pending['extraction_id']}", new_project.id)
+            
+            # Move uploaded documents to project's documents folder. Each upload has its own
+            # folder (temp_uploads/<upload id>/); the ID keeps files with the same name apart
+            upload_folders = set()
+            for doc_data in pending['documents_data']:
+                temp_filepath = doc_data['filepath']
+                if temp_filepath and os.path.exists(temp_filepath):
+                    filename = os.path.basename(temp_filepath)
+                    upload_folder = os.path.dirname(os.path.abspath(temp_filepath))
+                    if os.path.dirname(upload_folder) == os.path.abspath(upload_store.upload_folder):
+                        filename = f"{os.path.basename(upload_folder)}_{filename}"
+                        upload_folders.add(upload_folder)
+                    dest_path = os.path.join(new_project.documents_folder, filename)
+                    shutil.move(temp_filepath, dest_path)
+            # Remove this upload's folders, with any files that were not used (e.g. failed extraction)
+            for upload_folder in upload_folders:
+                shutil.rmtree(upload_folder, ignore_errors=True)
+            
+            # Prepare topics list for generation
+            topics_to_generate = []
+            
+            if topic_strategy == 'one-per-file':
+                for i, doc_data in enumerate(pending['documents_data']):
+                    topic_name = request.form.get(f'topic_name_{i}', doc_data['suggested_topic']).strip()
+                    num_cards = int(request.form.get(f'card_count_{i}', doc_data.get('ai_suggested_count', 25)))
+                    topics_to_generate.append({
+                        'name': topic_name,
+                        'text_blobs': (doc_data['text_blob'],),
+                        'count': num_cards
+                    })
+            else:
+                combined_blobs = tuple(doc_data['text_blob'] for doc_data in pending['documents_data'])
+                num_topics_input = int(request.form.get('num_topics', 0))
+                for i in range(num_topics_input):
+                    topic_name = request.form.get(f'ai_topic_name_{i}', '').strip()
+                    num_cards = int(request.form.get(f'ai_card_count_{i}', 10))
+                    if topic_name:
+                        topics_to_generate.append({
+                            'name': topic_name,
+                            'text_blobs': combined_blobs,
+                            'count': num_cards
+                        })
+            
+            # Queue the generation job; its ID doubles as the progress ID. The payload
+            # holds text handles (each text is the join of one or more documents), and
+            # texts shared by several topics (the combined text) are listed once
+            progress_id = secrets.token_hex(8)
+            texts = []
+            text_index = {}
+            for topic_info in topics_to_generate:
+                if topic_info['text_blobs'] not in text_index:
+                    text_index[topic_info['text_blobs']] = len(texts)
+                    texts.append(list(topic_info['text_blobs']))
+            creation_progress[progress_id] = {
+                'status': 'starting',
+                'job_id': progress_id,
+                'current_topic': 0,
+                'total_topics': len(topics_to_generate),
+                'current_topic_name': '',
+                'flashcards_generated': 0,
+                'project_id': new_project.id
+            }
+            job_queue.submit(progress_id, 'create_project', new_project.id, {
+                'project_name': project_name,
+                'text_blobs': texts,
+                'topics': [{'name': t['name'], 'count': t['count'], 'text': text_index[t['text_blobs']]} for t in topics_to_generate]
+            }, [t['name'] for t in topics_to_generate])
+            
+            # Clear pending project from session
+            session.pop('pending_project', None)
+            
+            # Set as current project
+            set_current_project(new_project.id)
+            
+            # Note: creation_success will be set by the frontend after generation completes
+            # This ensures the flash message shows the correct flashcard count
+            
+            # Return immediately with progress ID - generation happens in background
+            return jsonify({
+                'success': True,
+                'redirect_url': url_for('start'),
+                'progress_id': progress_id,
+                'message': f'Project "{project_name}" is being created...'
+            })
+        
+        except Exception as e:
+            error_msg = str(e)
+            print(f"Error in create_project_from_documents: {e}")
+            import traceback
+            traceback.print_exc()
+            return jsonify({
+                'success': False,
+                'error': f'Error creating project: {error_msg}'
+            }), 500
+    
+    # GET request - show project setup page with configuration options
+    # Use pre-generated suggestions from background processing (if available)
+    suggested_name = pending.get('suggested_name')
+    ai_topics = pending.get('ai_topics', [])
+    
+    # Fallback: generate if not available (shouldn't happen with new background processing)
+    if not suggested_name or not ai_topics:
+        try:
+            combined_text = _load_text_blobs(doc_data.get('text_blob') for doc_data in pending['documents_data'])
+        except RuntimeError as e:
+            session.pop('pending_project', None)
+            flash(str(e), 'error')
+            return redirect(url_for('upload_documents'))
+    
+    if not suggested_name:
+        try:
+            suggested_name = generate_project_name_from_text(
+                combined_text,
+                is_multi_document=True,
+                document_count=pending['document_count']
+            )
+        except Exception as e:
+            print(f"Error generating project name: {e}")
+            suggested_name = "New Project"
+    
+    if not ai_topics:
+        try:
+            ai_topics = extract_topics_from_text(combined_text)
+        except Exception as e:
+            print(f"Error extracting AI topics: {e}")
+            ai_topics = []
+    
+    return render_template('create_project.html',
+                         suggested_name=suggested_name,
+                         documents_data=pending['documents_data'],
+                         ai_topics=ai_topics,
+                         document_count=pending['document_count'])
+
+# Update the route decorator to match the name used in templates
+@app.route('/exit', methods=['POST'])
+def exit():  # Changed from exit_session to exit
+    # Only save if we're in a session and results haven't already been saved
+    if 'mode' in session and not session.get('results_saved', False):
+        mode = session['mode']
+        score = session.get('score', 0)
+        total = session.get('current_card_index', 0)
+        timestamp = datetime.now()
+        
+        percentage = calculate_percentage(score, total)
+        
+        # Save to project history
+        project = get_current_project()
+        project.load_history()  # Load existing history before adding new entry
+        if mode == 'exam':
+            project.add_history_entry('exam_history', timestamp, {
+                'score': score,
+                'total': total,
+                'percentage': percentage,
+                'topics': session.get('topics', [])
+            })
+        else:
+            project.add_history_entry('study_history', timestamp, {
+                'score': score,
+                'total': total,
+                'percentage': percentage,
+                'topics': session.get('topics', [])
+            })
+    
+    # Preserve current project selection and any other persistent session data
+    current_project_id = session.get('current_project_id')
+    creation_success = session.get('creation_success')
+    pending_project = session.get('pending_project')
+    
+    # Clear session data
+    session.clear()
+    
+    # Restore persistent data
+    if current_project_id:
+        session['current_project_id'] = current_project_id
+    if creation_success:
+        session['creation_success'] = creation_success
+    if pending_project:
+        session['pending_project'] = pending_project
+    
+    return redirect(url_for('index'))
+
+def get_feedback(question, user_answer, correct_answer, is_correct):
+    """Generate helpful feedback for the user"""
+    if is_correct:
+        return f"✅ Correct! Your answer '{user_answer}' is right."
+    else:
+        return f"❌ Incorrect. Your answer was '{user_answer}', but the correct answer is '{correct_answer}'. Try to understand why this is the correct answer."
+
+def check_answer(question, user_answer, correct_answer):
+    """Enhanced answer checking with better evaluation logic"""
+    if not all(isinstance(x, str) for x in [question, user_answer, correct_answer]):
+        print("Warning: Non-string input in check_answer")
+        return False
+    
+    # Normalize answers for comparison
+    user_clean = user_answer.strip().lower()
+    correct_clean = correct_answer.strip().lower()
+    
+    # Direct exact match (case-insensitive)
+    if user_clean == correct_clean:
+        return True
+    
+    # Handle True/False variations
+    if correct_clean in ['true', 'false']:
+        if user_clean in ['true', 't', 'yes', 'y', '1'] and correct_clean == 'true':
+            return True
+        if user_clean in ['false', 'f', 'no', 'n', '0'] and correct_clean == 'false':
+            return True
+    
+    # Handle Yes/No variations
+    if correct_clean in ['yes', 'no']:
+        if user_clean in ['yes', 'y', 'true', 't', '1'] and correct_clean == 'yes':
+            return True
+        if user_clean in ['no', 'n', 'false', 'f', '0'] and correct_clean == 'no':
+            return True
+    
+    # Handle Multiple Choice (single letter answers)
+    if len(correct_clean) == 1 and correct_clean.isalpha():
+        return user_clean == correct_clean
+    
+    # Handle Multiple Answer (comma-separated letters)
+    if ',' in correct_clean:
+        correct_answers = [ans.strip().lower() for ans in correct_clean.split(',')]
+        user_answers = [ans.strip().lower() for ans in user_clean.split(',')]
+        return set(correct_answers) == set(user_answers)
+    
+    # If we get here, it's likely a multiple choice question that wasn't properly classified
+    # Default to exact match for any remaining cases
+    return user_clean == correct_clean
+
+# Fix percentage calculation to handle zero division
+def calculate_percentage(score, total):
+    try:
+        return (score / total) * 100 if total > 0 else 0
+    except ZeroDivisionError:
+        return 0
+
+# Settings Management
+def load_settings():
+    """Load settings from settings.json"""
+    settings_file = 'settings.json'
+    default_settings = {
+        "openai_api_key_file": "openaikey.txt",
+        "default_cards_per_topic": 25,
+        "default_time_per_card": 10,
+        "default_total_exam_time": 60,
+        "auto_update_enabled": False,
+        "last_update_check": None,
+        "storage_engine": "json",
+        "project_cache_mb": 256,
+        "write_durability": "batch",
+        "write_batch_ms": 100,
+        "card_format": "json",
+        "generation_workers": 4,
+        "chunk_tokens": 1000,
+        "llm_cache_enabled": True,
+        "llm_cache_ttl_hours": 168,
+        "llm_cache_mb": 100,
+        "llm_rate_limits": {
+            "gpt-4o": {"rpm": 500, "tpm": 30000},
+            "gpt-4o-mini": {"rpm": 500, "tpm": 200000}
+        },
+        "llm_max_concurrency": 8,
+        "llm_max_retries": 5,
+        "job_workers": 2,
+        "dedupe_threshold": 0.5,
+        "topic_pack_tokens": 3000,
+        "extraction_workers": 0,
+        "extraction_timeout_seconds": 120,
+        "extraction_memory_mb": 1024,
+        "extraction_cache_enabled": True,
+        "extraction_cache_mb": 500,
+        "text_blob_max_age_days": 7,
+        "llm_backend": "openai",
+        "llm_base_url": None,
+        "llm_recordings_folder": "llm_recordings",
+        "llm_usage_enabled": True,
+        "llm_usage_max_calls": 100000,
+        "llm_prices": {
+            "gpt-4o": {"input": 2.50, "output": 10.00},
+            "gpt-4o-mini": {"input": 0.15, "output": 0.60}
+        }
+    }
+    
+    try:
+        if os.path.exists(settings_file):
+            with open(settings_file, 'r') as f:
+                return json.load(f)
+        else:
+            # Create default settings file
+            with open(settings_file, 'w') as f:
+                json.dump(default_settings, f, indent=4)
+            return default_settings
+    except Exception as e:
+        print(f"Error loading settings: {e}")
+        return default_settings
+
+def save_settings(settings):
+    """Save settings to settings.json"""
+    try:
+        with open('settings.json', 'w') as f:
+            json.dump(settings, f, indent=4)
+        return True
+    except Exception as e:
+        print(f"Error saving settings: {e}")
+        return False
+
+@app.route('/settings', methods=['GET', 'POST'])
+def settings():
+    """Settings page for API key and configuration"""
+    if request.method == 'POST':
+        try:
+            # Get current settings
+            current_settings = load_settings()
+            
+            # Update OpenAI API key
+            new_key = request.form.get('openai_key', '').strip()
+            if new_key:
+                with open('openaikey.txt', 'w') as f:
+                    f.write(new_key)
+                llm.client = create_llm_client()
+            
+            # Update settings
+            current_settings['default_cards_per_topic'] = int(request.form.get('default_cards_per_topic', 25))
+            current_settings['default_time_per_card'] = int(request.form.get('default_time_per_card', 10))
+            current_settings['default_total_exam_time'] = int(request.form.get('default_total_exam_time', 60))
+            current_settings['auto_update_enabled'] = 'auto_update_enabled' in request.form
+            
+            # Save settings
+            if save_settings(current_settings):
+                flash('Settings saved successfully!', 'success')
+            else:
+                flash('Error saving settings', 'error')
+            
+            return redirect(url_for('settings'))
+        except Exception as e:
+            flash(f'Error updating settings: {str(e)}', 'error')
+            return redirect(url_for('settings'))
+    
+    # GET request - show settings page
+    current_settings = load_settings()
+    
+    # Read current API key (masked)
+    try:
+        with open('openaikey.txt', 'r') as f:
+            current_key = f.read().strip()
+            # Mask the key for display
+            if len(current_key) > 8:
+                current_key = current_key[:8] + '...' + current_key[-4:]
+    except:
+        current_key = ''
+    
+    return render_template('settings.html', 
+                         settings=current_settings,
+                         current_key=current_key)
+
+def get_current_version():
+    """Get the current version tag"""
+    try:
+        # Try to get the current tag
+        result = subprocess.run(['git', 'describe', '--tags', '--exact-match'],
+                              capture_output=True, text=True, timeout=5, cwd=BASE_DIR)
+        if result.returncode == 0:
+            return result.stdout.strip()
+        
+        # If not on a tag, get the latest tag we're based on
+        result = subprocess.run(['git', 'describe', '--tags', '--abbrev=0'],
+                              capture_output=True, text=True, timeout=5, cwd=BASE_DIR)
+        if result.returncode == 0:
+            return result.stdout.strip()
+        
+        return 'unknown'
+    except:
+        return 'unknown'
+
+def get_latest_release_tag():
+    """Get the latest release tag from remote"""
+    try:
+        # Fetch tags
+        subprocess.run(['git', 'fetch', '--tags'], 
+                      capture_output=True, text=True, timeout=30, cwd=BASE_DIR)
+        
+        # Get all tags sorted by version
+        result = subprocess.run(['git', 'tag', '-l', '--sort=-v:refname'],
+                              capture_output=True, text=True, timeout=10, cwd=BASE_DIR)
+        
+        if result.returncode != 0:
+            return None
+        
+        tags = [tag.strip() for tag in result.stdout.split('\n') if tag.strip()]
+        
+        # Return the latest version tag (first in list after sorting)
+        if tags:
+            return tags[0]
+        return None
+    except:
+        return None
+
+def compare_versions(current, latest):
+    """Compare version strings (e.g., v1.0.0 vs v1.1.0)"""
+    def parse_version(v):
+        # Remove 'v' prefix if present
+        v = v.lstrip('v')
+        # Split and convert to integers for comparison
+        parts = v.split('.')
+        return tuple(int(p) for p in parts if p.isdigit())
+    
+    try:
+        current_parts = parse_version(current)
+        latest_parts = parse_version(latest)
+        return latest_parts > current_parts
+    except:
+        # If parsing fails, do string comparison
+        return latest != current
+
+@app.route('/check-updates')
+def check_updates():
+    """Check for production release updates from git repository"""
+    try:
+        # Check if we're in a git repository (use BASE_DIR to handle running from different directories)
+        git_dir = os.path.join(BASE_DIR, '.git')
+        if not os.path.exists(git_dir):
+            return jsonify({
+                'success': False,
+                'error': 'Not a git repository. Please install via git clone for update functionality.'
+            })
+        
+        # Get current version
+        current_version = get_current_version()
+        
+        # Get latest release tag
+        latest_version = get_latest_release_tag()
+        
+        if not latest_version:
+            return jsonify({
+                'success': False,
+                'error': 'No release tags found in repository'
+            })
+        
+        # Update last check time
+        settings = load_settings()
+        settings['last_update_check'] = datetime.now().isoformat()
+        settings['current_version'] = current_version
+        settings['latest_version'] = latest_version
+        save_settings(settings)
+        
+        # Compare versions
+        if compare_versions(current_version, latest_version):
+            return jsonify({
+                'success': True,
+                'update_available': True,
+                'current_version': current_version,
+                'latest_version': latest_version,
+                'message': f'Update available: {current_version} → {latest_version}'
+            })
+        else:
+            return jsonify({
+                'success': True,
+                'update_available': False,
+                'current_version': current_version,
+                'latest_version': latest_version,
+                'message': f'You are up to date! (version {current_version})'
+            })
+            
+    except subprocess.TimeoutExpired:
+        return jsonify({
+            'success': False,
+            'error': 'Update check timed out'
+        })
+    except FileNotFoundError:
+        return jsonify({
+            'success': False,
+            'error': 'Git is not installed. Please install Git for update functionality.'
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        })
+
+@app.route('/install-update', methods=['POST'])
+def install_update():
+    """Install production release update from git repository"""
+    try:
+        # Check if we're in a git repository (use BASE_DIR to handle running from different directories)
+        git_dir = os.path.join(BASE_DIR, '.git')
+        if not os.path.exists(git_dir):
+            return jsonify({
+                'success': False,
+                'error': 'Not a git repository'
+            })
+        
+        # Get the latest release tag
+        latest_tag = get_latest_release_tag()
+        
+        if not latest_tag:
+            return jsonify({
+                'success': False,
+                'error': 'No release tags found'
+            })
+        
+        # Check for uncommitted changes
+        result = subprocess.run(['git', 'status', '--porcelain'],
+                              capture_output=True, text=True, timeout=10, cwd=BASE_DIR)
+        
+        # Only check files that aren't in .gitignore (user data)
+        uncommitted = [line for line in result.stdout.split('\n') 
+                      if line.strip() and not any(x in line for x in 
+                      ['openaikey.txt', 'settings.json', 'secret_key.txt', 
+                       'projects/', '.venv/', 'temp_uploads/', '.flask_session/', 'llm_cache/', 'jobs.db', 'llm_recordings/', 'llm_usage.db', 'extraction_cache/', 'upload_parts/', 'text_blobs/'])]
+        
+        if uncommitted:
+            return jsonify({
+                'success': False,
+                'error': 'Uncommitted changes detected. Please stash or commit changes before updating.'
+            })
+        
+        # Fetch latest tags
+        subprocess.run(['git', 'fetch', '--tags'], 
+                      capture_output=True, text=True, timeout=30, cwd=BASE_DIR)
+        
+        # Checkout the latest release tag
+        result = subprocess.run(['git', 'checkout', latest_tag],
+                              capture_output=True, text=True, timeout=60, cwd=BASE_DIR)
+        
+        if result.returncode != 0:
+            return jsonify({
+                'success': False,
+                'error': f'Failed to checkout release: {result.stderr}'
+            })
+        
+        # Update settings with new version
+        settings = load_settings()
+        settings['current_version'] = latest_tag
+        save_settings(settings)
+        
+        return jsonify({
+            'success': True,
+            'message': f'✅ Updated to version {latest_tag}! Please restart the application.',
+            'version': latest_tag
+        })
+        
+    except subprocess.TimeoutExpired:
+        return jsonify({
+            'success': False,
+            'error': 'Update installation timed out'
+        })
+    except FileNotFoundError:
+        return jsonify({
+            'success': False,
+            'error': 'Git is not installed'
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        })
+
+# Run project creation jobs, resuming any interrupted by the last shutdown. Under the
+# debug reloader only the child process (WERKZEUG_RUN_MAIN) runs them, not the watcher
+job_queue.register('create_project', _generate_flashcards_background)
+if __name__ != '__main__' or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+    resumed_jobs = job_queue.start()
+    if resumed_jobs:
+        print(f"Resuming {resumed_jobs} unfinished project creation job(s)")
+
+if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
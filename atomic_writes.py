@@ -0,0 +1,244 @@
+"""
+Crash-safe writes for project files.
+
+Every write goes to a temporary file in the same folder which is then moved
+over the target with os.replace, so readers (and a crash) only ever see the
+old file or the new one, never a truncated one. How often data is forced to
+disk is configurable:
+
+    'always' - fsync on every write before it returns
+    'batch'  - writes are queued and a background thread writes and fsyncs
+               them every batch_ms; repeated writes to the same file inside
+               one window become a single write (group commit)
+    'none'   - write immediately, leave flushing to the operating system
+
+Files that can be rebuilt from others (e.g. the project index) are written
+with durable=False: in every mode the write is queued like a batched one,
+so repeated writes coalesce, and it is not fsynced.
+
+A batched write that fails is logged and stays queued to be tried again, and
+the next flush() raises WriteError, so a caller that flushes before relying
+on its data (e.g. before checkpointing a job) finds out.
+"""
+
+import io
+import os
+import json
+import time
+import atexit
+import logging
+import tempfile
+import threading
+from typing import Dict
+
+DURABILITY_MODES = ('always', 'batch', 'none')
+
+logger = logging.getLogger(__name__)
+
+
+class WriteError(OSError):
+    """Queued writes that failed; errors maps each path to its exception"""
+
+    def __init__(self, errors: Dict[str, Exception]):
+        super().__init__('; '.join(f"{path}: {error}" for path, error in errors.items()))
+        self.errors = errors
+
+
+def _fsync_dir(folder: str):
+    """Make a rename durable (not supported on Windows, where it isn't needed)"""
+    if os.name == 'nt':
+        return
+    fd = os.open(folder or '.', os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def atomic_write(path: str, write, fsync: bool = True):
+    """Call write(f) on a binary temporary file next to path, then move it over path"""
+    folder = os.path.dirname(path)
+    fd, temp_path = tempfile.mkstemp(dir=folder or None, prefix=os.path.basename(path) + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write(f)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+    if fsync:
+        _fsync_dir(folder)
+
+
+def _json_writer(data, indent):
+    def write(f):
+        text = io.TextIOWrapper(f, encoding='utf-8')
+        json.dump(data, text, indent=indent)
+        text.flush()
+        text.detach()
+    return write
+
+
+def atomic_write_json(path: str, data, indent: int = 2, fsync: bool = True):
+    """Write data as JSON to path via a temporary file and os.replace"""
+    atomic_write(path, _json_writer(data, indent), fsync)
+
+
+def _snapshot(data):
+    """Shallow copy so later changes by the caller don't race with a queued write"""
+    if isinstance(data, dict):
+        return dict(data)
+    if isinstance(data, list):
+        return list(data)
+    return data
+
+
+class DurableWriter:
+    """Routes file writes and journal appends through the configured durability mode"""
+
+    def __init__(self, mode: str = 'batch', batch_ms: int = 100):
+        self.mode = mode
+        self.batch_ms = batch_ms
+        self._pending: Dict[str, object] = {}  # path -> write(f) for the latest data
+        self._pending_syncs = set()            # appended files waiting for fsync
+        self._lazy = set()                     # queued paths written without fsync (durable=False)
+        self._writing = set()                  # paths a flush is writing right now
+        self._errors: Dict[str, Exception] = {}  # failures not yet reported by flush()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def configure(self, mode: str = None, batch_ms: int = None):
+        if mode is not None:
+            if mode not in DURABILITY_MODES:
+                raise ValueError(f"Unknown write durability mode: {mode}")
+            if self.mode == 'batch' and mode != 'batch':
+                self.flush()
+            self.mode = mode
+        if batch_ms is not None:
+            self.batch_ms = batch_ms
+
+    def write_json(self, path: str, data, indent: int = 2, durable: bool = True):
+        """Atomically replace path with data as JSON (queued in 'batch' mode, or always if not durable)"""
+        self._submit(path, _json_writer(_snapshot(data), indent), durable)
+
+    def write_bytes(self, path: str, data: bytes):
+        """Atomically replace path with raw bytes (queued in 'batch' mode)"""
+        self._submit(path, lambda f: f.write(data))
+
+    def _submit(self, path: str, write, durable: bool = True):
+        if durable and self.mode != 'batch':
+            atomic_write(path, write, fsync=(self.mode == 'always'))
+            return
+        with self._lock:
+            self._pending[path] = write
+            if durable:
+                self._lazy.discard(path)
+            else:
+                self._lazy.add(path)
+            self._start()
+        self._wake.set()
+
+    def synced_append(self, f):
+        """Make data just written to an open append-mode file durable per the current mode"""
+        if self.mode == 'always':
+            f.flush()
+            os.fsync(f.fileno())
+        elif self.mode == 'batch':
+            with self._lock:
+                self._pending_syncs.add(f.name)
+                self._start()
+            self._wake.set()
+
+    def has_pending(self, path: str) -> bool:
+        """True if path has data queued or being written (readers should flush(path) first)"""
+        with self._lock:
+            return path in self._pending or path in self._writing
+
+    def discard(self, folder: str):
+        """Drop queued writes under a folder (e.g. a project being deleted)"""
+        prefix = os.path.join(folder, '')
+        with self._lock:
+            for path in [p for p in self._pending if p.startswith(prefix)]:
+                del self._pending[path]
+                self._lazy.discard(path)
+            self._pending_syncs = {p for p in self._pending_syncs if not p.startswith(prefix)}
+            self._errors = {p: e for p, e in self._errors.items() if not p.startswith(prefix)}
+
+    def flush(self, path: str = None):
+        """
+        Write out queued data now (all of it, or just one path). Raises
+        WriteError for writes that failed, in this flush or a background one
+        since the last flush(); they stay queued and are tried again.
+        """
+        self._flush(path)
+        with self._lock:
+            if path is None:
+                errors, self._errors = self._errors, {}
+            else:
+                errors = {path: self._errors.pop(path)} if path in self._errors else {}
+        if errors:
+            raise WriteError(errors)
+
+    def _flush(self, path: str = None):
+        with self._flush_lock:
+            with self._lock:
+                if path is None:
+                    writes, self._pending = self._pending, {}
+                    syncs, self._pending_syncs = self._pending_syncs, set()
+                else:
+                    writes = {path: self._pending.pop(path)} if path in self._pending else {}
+                    syncs = set()
+                lazy = self._lazy & set(writes)
+                self._lazy -= lazy
+                self._writing = set(writes)
+            failed = {}
+            for target, write in writes.items():
+                try:
+                    atomic_write(target, write, fsync=target not in lazy)
+                except Exception as e:
+                    logger.error("Error writing %s: %s", target, e)
+                    failed[target] = (write, e)
+            failed_syncs = {}
+            for target in syncs:
+                try:
+                    with open(target, 'a', encoding='utf-8') as f:
+                        os.fsync(f.fileno())
+                except Exception as e:
+                    logger.error("Error syncing %s: %s", target, e)
+                    failed_syncs[target] = e
+            with self._lock:
+                self._writing = set()
+                for target, (write, error) in failed.items():
+                    if target not in self._pending:  # Unless newer data was queued meanwhile
+                        self._pending[target] = write
+                        if target in lazy:
+                            self._lazy.add(target)
+                    self._errors[target] = error
+                self._pending_syncs.update(failed_syncs)
+                self._errors.update(failed_syncs)
+
+    def _start(self):
+        # Caller holds self._lock
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='durable-writer', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            # Collect everything written during the batch window into one flush
+            time.sleep(self.batch_ms / 1000)
+            self._wake.clear()
+            self._flush()  # Failures are logged and raised by the next flush()
+
+
+durable_writer = DurableWriter()
+atexit.register(durable_writer._flush)  # Failures at exit are logged
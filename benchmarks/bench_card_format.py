@@ -0,0 +1,108 @@
+"""
+Benchmark: loading flashcards.json vs. the binary flashcards.bin format.
+
+For each deck size, writes the same cards in both formats and loads each one
+in a fresh Python process, reporting load time, memory growth (RSS) after
+loading, and the time to read 100 random cards afterwards. The JSON format
+parses every card up front; the binary format maps the file and decodes cards
+only when they are accessed.
+
+Usage:
+    python benchmarks/bench_card_format.py [sizes...]
+"""
+
+import os
+import sys
+import json
+import random
+import subprocess
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from card_file import CardFile, encode_cards
+
+RANDOM_READS = 100
+
+
+def sample_card(i: int) -> dict:
+    return {
+        'question': f'Sample question number {i} about an important concept in topic {i % 50}?',
+        'answer': random.choice(['True', 'False', 'A', 'B,D']),
+        'explanation': 'A sentence or two explaining why the answer is correct, as generated cards have. ' * 2,
+        'topic': f'Topic {i % 50}',
+        'filename': 'bench.txt',
+        'correct_count': 0,
+        'attempts': 0,
+        'answer_type': 'multiple_choice'
+    }
+
+
+def rss_kb() -> int:
+    """Current resident set size in KB (Linux), falling back to peak RSS elsewhere"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def child(card_format: str, path: str):
+    """Load one file and print 'load_ms rss_kb read_ms' (run in a fresh process)"""
+    import time
+    before = rss_kb()
+    start = time.perf_counter()
+    if card_format == 'json':
+        with open(path, 'r', encoding='utf-8') as f:
+            cards = json.load(f)
+    else:
+        cards = CardFile(path)
+    load_ms = (time.perf_counter() - start) * 1000
+    grown = rss_kb() - before
+
+    start = time.perf_counter()
+    for i in random.sample(range(len(cards)), min(RANDOM_READS, len(cards))):
+        cards[i]['question']
+    read_ms = (time.perf_counter() - start) * 1000
+    print(f"{load_ms} {grown} {read_ms}")
+
+
+def run(card_format: str, path: str):
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--child', card_format, path],
+        capture_output=True, text=True, check=True
+    ).stdout.split()
+    return float(output[0]), int(output[1]), float(output[2])
+
+
+def main():
+    sizes = [int(s) for s in sys.argv[1:]] or [1000, 10000, 100000]
+
+    print(f"{'cards':>8} {'format':>7} {'file MB':>8} {'load ms':>9} {'RSS +MB':>8} {'100 reads ms':>13}")
+    with tempfile.TemporaryDirectory() as folder:
+        for size in sizes:
+            cards = [sample_card(i) for i in range(size)]
+            json_path = os.path.join(folder, 'flashcards.json')
+            bin_path = os.path.join(folder, 'flashcards.bin')
+            with open(json_path, 'w', encoding='utf-8') as f:
+                json.dump(cards, f, indent=2)
+            with open(bin_path, 'wb') as f:
+                f.write(encode_cards(cards))
+
+            for card_format, path in (('json', json_path), ('binary', bin_path)):
+                load_ms, grown_kb, read_ms = run(card_format, path)
+                file_mb = os.path.getsize(path) / 1024 / 1024
+                print(f"{size:>8} {card_format:>7} {file_mb:>8.1f} {load_ms:>9.1f} "
+                      f"{grown_kb / 1024:>8.1f} {read_ms:>13.2f}")
+
+
+if __name__ == '__main__':
+    if len(sys.argv) == 4 and sys.argv[1] == '--child':
+        child(sys.argv[2], sys.argv[3])
+    else:
+        main()
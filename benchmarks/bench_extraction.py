@@ -0,0 +1,129 @@
+"""
+Benchmark: PDF text extraction, pdfplumber on every page vs. the tiered path.
+
+Writes a corpus of text-layer PDFs (10 to 500 pages by default), some pages
+of which hold only a short caption - as scanned or figure pages do - so the
+tiered extractor has pages to send to pdfplumber. Then extracts the corpus
+three ways and reports pages per second:
+
+    pdfplumber  every page with pdfplumber, one file at a time (the old path)
+    tiered      PyPDF2, with pdfplumber only for the poor pages, one process
+    pool        the tiered extractor on ExtractionPool, long PDFs split into
+                page ranges across the worker processes
+
+and checks that every way extracted the same words.
+
+Usage:
+    python benchmarks/bench_extraction.py [--pages 10,50,100,500]
+        [--caption-rate 0.05] [--workers 0] [--skip-pdfplumber]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pdfplumber
+from document_processor import DocumentProcessor
+from extraction_pool import ExtractionPool
+
+WORDS = """cell membrane protein enzyme energy molecule reaction gene chromosome tissue organ
+signal receptor pathway structure function transport diffusion gradient nucleus
+ribosome mitochondria synthesis metabolism oxygen glucose carbon nitrogen water""".split()
+LINES_PER_PAGE = 45
+
+
+def page_lines(rng: random.Random, caption: bool):
+    if caption:
+        return [f'Figure {rng.randint(1, 99)}']
+    return [' '.join(rng.choice(WORDS) for _ in range(rng.randint(8, 12))) for _ in range(LINES_PER_PAGE)]
+
+
+def write_pdf(path: str, pages: int, caption_rate: float, seed: int):
+    """A minimal PDF with a Helvetica text layer on every page"""
+    rng = random.Random(seed)
+    objects = {1: b'<< /Type /Catalog /Pages 2 0 R >>',
+               3: b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>'}
+    kids = []
+    for i in range(pages):
+        page_id, content_id = 4 + 2 * i, 5 + 2 * i
+        kids.append(f'{page_id} 0 R')
+        lines = page_lines(rng, rng.random() < caption_rate)
+        stream = ('BT /F1 10 Tf 50 780 Td 14 TL ' + ' '.join(f"({line}) '" for line in lines) + ' ET').encode()
+        objects[page_id] = (f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] '
+                            f'/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>').encode()
+        objects[content_id] = b'<< /Length %d >>\nstream\n%s\nendstream' % (len(stream), stream)
+    objects[2] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {pages} >>".encode()
+
+    out = bytearray(b'%PDF-1.4\n')
+    offsets = {}
+    for number in sorted(objects):
+        offsets[number] = len(out)
+        out += b'%d 0 obj\n%s\nendobj\n' % (number, objects[number])
+    xref = len(out)
+    out += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    for number in sorted(objects):
+        out += b'%010d 00000 n \n' % offsets[number]
+    out += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref)
+    with open(path, 'wb') as f:
+        f.write(out)
+
+
+def extract_with_pdfplumber(path: str) -> str:
+    """The extractor before the tiered path: pdfplumber on every page"""
+    with pdfplumber.open(path) as pdf:
+        return '\n\n'.join(text for text in (page.extract_text() for page in pdf.pages) if text)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--pages', default='10,50,100,500', help='comma-separated page counts, one PDF each')
+    parser.add_argument('--caption-rate', type=float, default=0.05, help='share of pages holding only a caption')
+    parser.add_argument('--workers', type=int, default=0, help='pool worker processes (0 = one per CPU core)')
+    parser.add_argument('--skip-pdfplumber', action='store_true', help="don't time the (slow) pdfplumber-only path")
+    args = parser.parse_args()
+
+    folder = tempfile.mkdtemp(prefix='bench_extraction_')
+    sizes = [int(size) for size in args.pages.split(',')]
+    paths = []
+    for i, pages in enumerate(sizes):
+        path = os.path.join(folder, f'corpus_{i + 1}_{pages}p.pdf')
+        write_pdf(path, pages, args.caption_rate, seed=i)
+        paths.append(path)
+    total_pages = sum(sizes)
+    print(f"{len(paths)} PDFs, {total_pages} pages ({args.caption_rate:.0%} caption-only) in {folder}\n")
+
+    processor = DocumentProcessor()
+    runs = {}
+
+    if not args.skip_pdfplumber:
+        start = time.perf_counter()
+        runs['pdfplumber'] = ({path: extract_with_pdfplumber(path) for path in paths}, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    runs['tiered'] = ({path: processor.extract_text(path) for path in paths}, time.perf_counter() - start)
+
+    pool = ExtractionPool(workers=args.workers, timeout_seconds=0)
+    pool.extract_files(paths[:1])  # Start the workers outside the timing
+    start = time.perf_counter()
+    texts, errors = pool.extract_files(paths)
+    runs[f'pool ({pool.workers} workers)'] = (texts, time.perf_counter() - start)
+    pool.shutdown()
+    if errors:
+        sys.exit(f"Pool extraction failed: {errors}")
+
+    baseline = None
+    print(f"{'path':>22} {'seconds':>9} {'pages/s':>9} {'speedup':>8}  same words")
+    for name, (texts, seconds) in runs.items():
+        words = [texts[path].split() for path in paths]
+        baseline = baseline or (seconds, words)
+        print(f"{name:>22} {seconds:9.2f} {total_pages / seconds:9.1f} {baseline[0] / seconds:7.1f}x  "
+              f"{'yes' if words == baseline[1] else 'NO'}")
+
+
+if __name__ == '__main__':
+    main()
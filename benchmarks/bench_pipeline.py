@@ -0,0 +1,153 @@
+"""
+Benchmark: the whole upload -> extract -> generate pipeline against the LLM stub.
+
+Starts llm_stub.py in-process, runs the app from a temporary folder with
+"llm_backend": "stub" and the response cache off, and drives the same
+requests the browser makes: paste documents, poll extraction, store the
+results, create the project and poll generation until it finishes. Prints
+the wall time of each stage and the LLM calls made, with latency percentiles
+and (list-price) cost per pipeline stage from the usage log. The stub's answers are
+deterministic, so runs differ only by the latency and failures injected.
+
+Usage:
+    python benchmarks/bench_pipeline.py [--documents 4] [--words 3000]
+        [--strategy one-per-file|ai-topics] [--latency 0.3] [--jitter 0.1]
+        [--tokens-per-second 0] [--rate-limit-rate 0] [--error-rate 0]
+        [--truncate-rate 0] [--pack-tokens N] [--real-limits]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+
+from llm_stub import start_stub_server
+
+WORDS = """cell membrane protein enzyme energy molecule reaction gene chromosome tissue organ
+signal receptor pathway structure function transport diffusion gradient nucleus
+ribosome mitochondria synthesis metabolism oxygen glucose carbon nitrogen water
+pressure temperature balance system process control growth division replication""".split()
+
+
+def make_document(seed: int, words: int) -> str:
+    """Deterministic prose-like text of about `words` words, in paragraphs"""
+    rng = random.Random(seed)
+    paragraphs = []
+    count = 0
+    while count < words:
+        sentences = []
+        for _ in range(rng.randint(3, 6)):
+            sentence = [rng.choice(WORDS) for _ in range(rng.randint(8, 18))]
+            sentences.append(' '.join(sentence).capitalize() + '.')
+            count += len(sentence)
+        paragraphs.append(' '.join(sentences))
+    return '\n\n'.join(paragraphs)
+
+
+def wait_for(client, url: str, done_states=('complete', 'error', 'cancelled'), timeout: float = 600) -> dict:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        progress = client.get(url).get_json()
+        if progress.get('status') in done_states:
+            return progress
+        time.sleep(0.05)
+    raise TimeoutError(f'{url} did not finish within {timeout}s')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--documents', type=int, default=4)
+    parser.add_argument('--words', type=int, default=3000, help='words per document')
+    parser.add_argument('--strategy', choices=('one-per-file', 'ai-topics'), default='one-per-file')
+    parser.add_argument('--latency', type=float, default=0.3)
+    parser.add_argument('--jitter', type=float, default=0.1)
+    parser.add_argument('--tokens-per-second', type=float, default=0)
+    parser.add_argument('--rate-limit-rate', type=float, default=0)
+    parser.add_argument('--error-rate', type=float, default=0)
+    parser.add_argument('--truncate-rate', type=float, default=0)
+    parser.add_argument('--pack-tokens', type=int, help='override "topic_pack_tokens" (0 = one request per topic)')
+    parser.add_argument('--real-limits', action='store_true',
+                        help="keep settings.json's per-model rate limits (lifted by default so only the stub's timing counts)")
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server(
+        latency=args.latency, jitter=args.jitter, tokens_per_second=args.tokens_per_second,
+        rate_limit_rate=args.rate_limit_rate, error_rate=args.error_rate, truncate_rate=args.truncate_rate
+    )
+    folder = tempfile.mkdtemp(prefix='bench_pipeline_')
+    os.chdir(folder)
+    with open(os.path.join(REPO, 'settings.json'), 'r') as f:
+        settings = json.load(f)
+    settings.update({'llm_backend': 'stub', 'llm_base_url': base_url, 'llm_cache_enabled': False,
+                     'auto_update_enabled': False})
+    if args.pack_tokens is not None:
+        settings['topic_pack_tokens'] = args.pack_tokens
+    if not args.real_limits:
+        settings['llm_rate_limits'] = {model: {'rpm': 10 ** 6, 'tpm': 10 ** 9} for model in ('gpt-4o', 'gpt-4o-mini')}
+    with open('settings.json', 'w') as f:
+        json.dump(settings, f, indent=4)
+
+    import app as flashcard_app
+    flashcard_app.app.config['TESTING'] = True
+    client = flashcard_app.app.test_client()
+    timings = []
+
+    def stage(name, start):
+        timings.append((name, time.perf_counter() - start))
+
+    documents = [{'name': f'document_{i + 1}.txt', 'content': make_document(i, args.words)}
+                 for i in range(args.documents)]
+
+    start = time.perf_counter()
+    upload = client.post('/upload-documents', data={'pasted_content': json.dumps(documents)}).get_json()
+    stage('upload', start)
+
+    start = time.perf_counter()
+    extraction = wait_for(client, f"/extraction-progress/{upload['extraction_progress_id']}")
+    stage('extract + analyze', start)
+    if extraction['status'] != 'complete':
+        sys.exit(f"Extraction failed: {extraction.get('error')}")
+
+    start = time.perf_counter()
+    client.post('/store-extraction-results', json={'extraction_id': extraction['extraction_id']})
+    form = {'project_name': 'Pipeline benchmark', 'topic_strategy': args.strategy}
+    if args.strategy == 'ai-topics':
+        form['num_topics'] = len(extraction['ai_topics'])
+        for i, topic in enumerate(extraction['ai_topics']):
+            form[f'ai_topic_name_{i}'] = topic['name']
+            form[f'ai_card_count_{i}'] = topic.get('flashcard_count', 10)
+    created = client.post('/create-project-from-documents', data=form).get_json()
+    stage('store + create', start)
+
+    start = time.perf_counter()
+    generation = wait_for(client, f"/creation-progress/{created['progress_id']}")
+    stage('generate', start)
+
+    server.shutdown()
+    total = sum(seconds for _, seconds in timings)
+    print(f"\n{args.documents} documents x {args.words} words, strategy {args.strategy}, "
+          f"stub latency {args.latency}s\n")
+    for name, seconds in timings:
+        print(f"{name:>20} {seconds:9.2f}s")
+    print(f"{'total':>20} {total:9.2f}s\n")
+    print(f"Generation {generation['status']}: {generation.get('flashcards_generated')} flashcards "
+          f"in {generation.get('topic_count')} topics, {generation.get('duplicates_removed', 0)} duplicates dropped")
+    for model, stats in flashcard_app.llm_limiter.stats().items():
+        print(f"{model}: {stats['calls']} calls, {stats['retries']} retries, "
+              f"{stats['rate_limited']} rate limited, {stats['tokens_used']} tokens")
+
+    print(f"\n{'stage':>20} {'calls':>6} {'retries':>8} {'p50 ms':>8} {'p95 ms':>8} {'tokens':>9} {'cost':>8}")
+    for name, row in flashcard_app.llm_usage.summary()['stages'].items():
+        print(f"{name:>20} {row['api_calls']:>6} {row['retries']:>8} {row['latency_p50_ms'] or 0:>8.0f} "
+              f"{row['latency_p95_ms'] or 0:>8.0f} {row['prompt_tokens'] + row['completion_tokens']:>9} "
+              f"${row['cost_usd']:>7.3f}")
+
+
+if __name__ == '__main__':
+    main()
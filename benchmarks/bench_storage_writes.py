@@ -0,0 +1,65 @@
+"""
+Benchmark: cost of marking one card mastered vs. number of cards already mastered.
+
+Runs Project.update_mastery against every storage engine in a temporary
+folder. With the JSON engine the per-write cost grows with the size of
+mastery.json; with the journal and SQLite engines it should stay flat.
+
+Usage:
+    python benchmarks/bench_storage_writes.py [sizes...]
+"""
+
+import os
+import sys
+import time
+import tempfile
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from project_manager import Project
+from project_storage import STORAGE_ENGINES
+
+WRITES_PER_RUN = 200
+
+
+def mastery_record(i: int) -> dict:
+    return {
+        'question': f'Sample question number {i} about an important concept?',
+        'topic': f'Topic {i % 20}',
+        'filename': 'bench.txt',
+        'mastered_date': datetime.now().isoformat()
+    }
+
+
+def bench(engine: str, already_mastered: int) -> float:
+    """Return the mean time in milliseconds of one update_mastery call"""
+    with tempfile.TemporaryDirectory() as folder:
+        project = Project('bench', 'Bench', folder, engine)
+        project.mastery = {f'seed-{i}': mastery_record(i) for i in range(already_mastered)}
+        project.save_mastery()
+        if engine == 'journal':
+            project.storage.compact()
+
+        start = time.perf_counter()
+        for i in range(WRITES_PER_RUN):
+            project.update_mastery({f'new-{i}': mastery_record(i)})
+        elapsed = time.perf_counter() - start
+
+        project.storage.close()
+    return elapsed / WRITES_PER_RUN * 1000
+
+
+def main():
+    sizes = [int(s) for s in sys.argv[1:]] or [100, 1000, 10000, 50000]
+    engines = list(STORAGE_ENGINES)
+
+    print(f"Mean ms per update_mastery ({WRITES_PER_RUN} writes per run)\n")
+    print(f"{'already mastered':>18}" + ''.join(f"{e:>12}" for e in engines))
+    for size in sizes:
+        row = [bench(engine, size) for engine in engines]
+        print(f"{size:>18}" + ''.join(f"{ms:>12.3f}" for ms in row))
+
+
+if __name__ == '__main__':
+    main()
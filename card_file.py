@@ -0,0 +1,135 @@
+"""
+Compact binary flashcard file (flashcards.bin) read through mmap.
+
+Layout (integers little-endian):
+
+    magic       8 bytes   b'FCARDS01'
+    header_len  uint32
+    header      JSON {"count", "columns", "constants"}, padded to 8 bytes
+    offsets     (count + 1) x uint64, start of each record relative to data
+    data        one record per card
+
+A record is a compact JSON array holding the card's values for the header's
+columns, optionally followed by a dict of keys only some cards have. Keys
+whose value is the same on every card (e.g. correct_count/attempts = 0) are
+stored once in "constants" instead of on every card.
+
+CardFile opens the file and decodes a card only when it is indexed, so a
+deck of any size is "loaded" by mapping the file and reading the header.
+"""
+
+import sys
+import json
+import mmap
+import struct
+from array import array
+from collections.abc import Sequence
+from typing import Dict, Iterable, List
+
+MAGIC = b'FCARDS01'
+_HEADER_LEN = struct.Struct('<I')
+
+
+def _pad8(n: int) -> int:
+    return (n + 7) & ~7
+
+
+def encode_cards(cards: Iterable[Dict]) -> bytes:
+    """Serialize cards to the binary card format"""
+    cards = list(cards)
+
+    # Keys every card has; of those, the ones with one shared value become constants
+    common = list(cards[0]) if cards else []
+    for card in cards[1:]:
+        common = [key for key in common if key in card]
+    constants = {}
+    for key in common:
+        value = cards[0][key]
+        if all(card[key] == value for card in cards[1:]):
+            constants[key] = value
+    columns = [key for key in common if key not in constants]
+    stored_once = set(columns) | set(constants)
+
+    records = []
+    offsets = array('Q', [0])
+    size = 0
+    for card in cards:
+        values = [card[key] for key in columns]
+        extras = {k: v for k, v in card.items() if k not in stored_once}
+        if extras:
+            values.append(extras)
+        record = json.dumps(values, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+        records.append(record)
+        size += len(record)
+        offsets.append(size)
+    if sys.byteorder != 'little':
+        offsets.byteswap()
+
+    header = json.dumps({'count': len(cards), 'columns': columns, 'constants': constants}).encode('utf-8')
+    prefix_len = len(MAGIC) + _HEADER_LEN.size + len(header)
+    padding = b'\0' * (_pad8(prefix_len) - prefix_len)
+    return b''.join([MAGIC, _HEADER_LEN.pack(len(header)), header, padding, offsets.tobytes()] + records)
+
+
+class CardFile(Sequence):
+    """Read-only, lazily decoded sequence of the cards in a flashcards.bin file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[:len(MAGIC)] != MAGIC:
+            self._mm.close()
+            raise ValueError(f"{path} is not a flashcard file")
+        (header_len,) = _HEADER_LEN.unpack_from(self._mm, len(MAGIC))
+        header_start = len(MAGIC) + _HEADER_LEN.size
+        header = json.loads(self._mm[header_start:header_start + header_len])
+        self._count = header['count']
+        self._columns = header['columns']
+        self._constants = header['constants']
+
+        table_start = _pad8(header_start + header_len)
+        self._data_start = table_start + 8 * (self._count + 1)
+        if sys.byteorder == 'little':
+            self._offsets = memoryview(self._mm)[table_start:self._data_start].cast('Q')
+        else:
+            self._offsets = array('Q', self._mm[table_start:self._data_start])
+            self._offsets.byteswap()
+
+    def _decode(self, i: int) -> Dict:
+        start = self._data_start + self._offsets[i]
+        end = self._data_start + self._offsets[i + 1]
+        values = json.loads(self._mm[start:end])
+        card = dict(self._constants)
+        card.update(zip(self._columns, values))
+        if len(values) > len(self._columns):
+            card.update(values[-1])
+        return card
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._decode(i) for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError('card index out of range')
+        return self._decode(index)
+
+    def __iter__(self):
+        for i in range(self._count):
+            yield self._decode(i)
+
+    def copy(self) -> List[Dict]:
+        """Decode every card into a plain list (like list.copy())"""
+        return list(self)
+
+    def close(self):
+        if isinstance(self._offsets, memoryview):
+            self._offsets.release()
+        self._mm.close()
+
+    def __repr__(self) -> str:
+        return f"<CardFile {self.path!r} ({self._count} cards)>"
@@ -0,0 +1,229 @@
+"""
+Resumable, chunked uploads of documents.
+
+A multipart POST to /upload-documents is buffered by Werkzeug and ties up a
+server thread until every file has arrived. With chunked uploads the
+browser declares each file (name and size), sends it in chunks that are
+appended straight to disk, and finalizes it. Each chunk is written in
+small blocks as it is read from the request, the SHA-256 of the file is
+kept up to date as bytes arrive, and the declared size (at most
+max_file_size) is enforced block by block, so an oversized file is refused
+without being stored.
+
+Each chunk names the offset it starts at. A chunk that arrives for the
+wrong offset is refused with the current one, so after a dropped
+connection the client asks GET /uploads/<id> where to continue and resends
+from there. Uploads that see no chunk for stale_seconds are discarded.
+
+Partial files live in upload_parts/ until they are finalized and moved to
+a folder of their own in the upload folder, which every other upload of
+documents (pasted content, multipart posts) also gets. Creating a project
+moves the files out and removes the folder; prune_folders() deletes the
+folders of uploads never made into a project. Upload state is kept in
+memory: a server restart loses unfinished uploads.
+"""
+
+import os
+import time
+import shutil
+import hashlib
+import secrets
+import threading
+from typing import Dict, List, Optional
+
+from werkzeug.utils import secure_filename
+
+READ_BLOCK_BYTES = 64 * 1024
+
+
+class UploadError(Exception):
+    """A refused upload request; status is the HTTP status to answer with"""
+
+    def __init__(self, message: str, status: int = 400, offset: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+        self.offset = offset
+
+
+class Upload:
+    """One file being uploaded in chunks"""
+
+    def __init__(self, upload_id: str, name: str, size: int, part_path: str, batch_id: Optional[str] = None):
+        self.id = upload_id
+        self.name = name
+        self.size = size
+        self.part_path = part_path
+        self.batch_id = batch_id
+        self.received = 0
+        self.sha256 = hashlib.sha256()
+        self.path = None  # Set when finalized
+        self.content_hash = None
+        self.updated = time.time()
+        self.lock = threading.Lock()
+
+    def status(self) -> Dict:
+        return {
+            'upload_id': self.id,
+            'name': self.name,
+            'size': self.size,
+            'offset': self.received,
+            'finalized': self.path is not None
+        }
+
+
+class UploadStore:
+    """Chunked uploads in progress"""
+
+    def __init__(self, upload_folder: str = 'temp_uploads', parts_folder: str = 'upload_parts',
+                 max_file_size: int = 50 * 1024 * 1024, max_chunk_bytes: int = 8 * 1024 * 1024,
+                 stale_seconds: float = 3600):
+        self.upload_folder = upload_folder
+        self.parts_folder = parts_folder
+        self.max_file_size = max_file_size
+        self.max_chunk_bytes = max_chunk_bytes
+        self.stale_seconds = stale_seconds
+        self._uploads = {}
+        self._lock = threading.Lock()
+
+    def create(self, name: str, size: int, batch_id: Optional[str] = None) -> Upload:
+        """Start an upload of a file of `size` bytes"""
+        if size <= 0:
+            raise UploadError(f"{name}: File is empty")
+        if size > self.max_file_size:
+            raise UploadError(f"{name}: File too large (max {self.max_file_size // (1024 * 1024)}MB)", 413)
+        upload_id = secrets.token_hex(8)
+        os.makedirs(self.parts_folder, exist_ok=True)
+        part_path = os.path.join(self.parts_folder, f'{upload_id}.part')
+        open(part_path, 'wb').close()
+        upload = Upload(upload_id, name, size, part_path, batch_id)
+        with self._lock:
+            self._uploads[upload_id] = upload
+        return upload
+
+    def get(self, upload_id: str) -> Upload:
+        with self._lock:
+            upload = self._uploads.get(upload_id)
+        if upload is None:
+            raise UploadError("Unknown or expired upload", 404)
+        return upload
+
+    def append(self, upload_id: str, offset: int, stream, length: Optional[int] = None) -> int:
+        """
+        Append a chunk read from `stream` at `offset`; returns the new offset.
+        Bytes read before the stream breaks are kept, so the returned (or
+        queried) offset is always where the next chunk starts.
+        """
+        upload = self.get(upload_id)
+        if not upload.lock.acquire(blocking=False):
+            raise UploadError("Another chunk of this file is being received", 409, upload.received)
+        try:
+            if upload.path is not None:
+                raise UploadError("Upload already finalized", 409, upload.received)
+            if offset != upload.received:
+                raise UploadError(f"Expected the chunk at offset {upload.received}", 409, upload.received)
+            if length is not None and (length > self.max_chunk_bytes or offset + length > upload.size):
+                raise UploadError("Chunk too large", 413, upload.received)
+
+            chunk_bytes = 0
+            try:
+                with open(upload.part_path, 'ab') as f:
+                    while True:
+                        block = stream.read(READ_BLOCK_BYTES)
+                        if not block:
+                            break
+                        chunk_bytes += len(block)
+                        if chunk_bytes > self.max_chunk_bytes or upload.received + len(block) > upload.size:
+                            raise UploadError("Chunk too large", 413, upload.received)
+                        f.write(block)
+                        upload.sha256.update(block)
+                        upload.received += len(block)
+            finally:
+                upload.updated = time.time()
+            return upload.received
+        finally:
+            upload.lock.release()
+
+    def finalize(self, upload_id: str, sha256: Optional[str] = None) -> bool:
+        """
+        Check a complete upload (against the client's SHA-256, if given) and
+        move it into the upload folder. False if it was already finalized.
+        """
+        upload = self.get(upload_id)
+        with upload.lock:
+            if upload.path is not None:
+                return False
+            if upload.received != upload.size:
+                raise UploadError(f"Received {upload.received} of {upload.size} bytes", 409, upload.received)
+            content_hash = upload.sha256.hexdigest()
+            if sha256 and sha256.lower() != content_hash:
+                self._remove(upload)
+                raise UploadError(f"{upload.name}: Checksum mismatch, upload the file again", 422)
+            # Own folder per upload, so files with the same name don't overwrite each other
+            folder = os.path.join(self.upload_folder, upload.id)
+            os.makedirs(folder, exist_ok=True)
+            path = os.path.join(folder, secure_filename(upload.name) or 'document' + os.path.splitext(upload.name)[1].lower())
+            shutil.move(upload.part_path, path)
+            upload.path = path
+            upload.content_hash = content_hash
+            upload.updated = time.time()
+        return True
+
+    def _remove(self, upload: Upload):
+        with self._lock:
+            self._uploads.pop(upload.id, None)
+        try:
+            os.remove(upload.part_path)
+        except OSError:
+            pass
+
+    def discard(self, upload_id: str) -> Upload:
+        """Cancel an unfinished upload, deleting its partial file"""
+        upload = self.get(upload_id)
+        if not upload.lock.acquire(blocking=False):
+            raise UploadError("A chunk of this file is being received", 409, upload.received)
+        try:
+            if upload.path is not None:
+                raise UploadError("Upload already finalized", 409, upload.received)
+            self._remove(upload)
+        finally:
+            upload.lock.release()
+        return upload
+
+    def prune_folders(self, max_age_seconds: float) -> int:
+        """
+        Delete folders (and loose files) in the upload folder that have not
+        changed for max_age_seconds; returns how many were deleted.
+        """
+        if not max_age_seconds or not os.path.isdir(self.upload_folder):
+            return 0
+        cutoff = time.time() - max_age_seconds
+        removed = 0
+        for entry in os.scandir(self.upload_folder):
+            try:
+                if entry.stat().st_mtime >= cutoff:
+                    continue
+                if entry.is_dir():
+                    shutil.rmtree(entry.path)
+                else:
+                    os.remove(entry.path)
+                removed += 1
+            except OSError:
+                pass
+        return removed
+
+    def prune_stale(self) -> List[Upload]:
+        """
+        Discard unfinished uploads that have had no chunk for stale_seconds
+        (returned) and forget finalized ones as old, whose files were handed
+        over when they were finalized.
+        """
+        cutoff = time.time() - self.stale_seconds
+        with self._lock:
+            old = [upload for upload in self._uploads.values() if upload.updated < cutoff and not upload.lock.locked()]
+            for upload in old:
+                if upload.path is not None:
+                    del self._uploads[upload.id]
+        stale = [upload for upload in old if upload.path is None]
+        for upload in stale:
+            self._remove(upload)
+        return stale
@@ -0,0 +1,116 @@
+"""
+Conversion Script: Switch Projects Between Card File Formats
+
+Rewrites a project's cards as flashcards.bin (compact, memory-mapped, decoded
+on demand - see card_file.py), as per-topic shards under cards/, or back to
+flashcards.json, and records the new format in project.json. Mastery,
+exclusions and history are untouched.
+
+Projects using the SQLite storage engine keep their cards in project.db and
+are skipped. Safe to run multiple times.
+
+Usage:
+    python convert_cards.py binary                 # convert every project to flashcards.bin
+    python convert_cards.py sharded                # one card file per topic under cards/
+    python convert_cards.py json <project-id>...   # convert selected projects back to JSON
+"""
+
+import os
+import sys
+import json
+import shutil
+from project_manager import ProjectManager, Project
+from project_storage import CARD_FORMATS, create_storage
+
+
+def _fingerprint(flashcards) -> list:
+    return sorted(json.dumps(card, sort_keys=True) for card in flashcards)
+
+
+def convert_project(project: Project, card_format: str) -> bool:
+    """Rewrite one project's cards in the given format and update its metadata"""
+    if project.storage_engine == 'sqlite':
+        print(f"[SKIP] {project.name}: SQLite projects store cards in project.db")
+        return True
+    if project.card_format == card_format:
+        print(f"[OK] {project.name}: already using {card_format} cards")
+        return True
+
+    old_storage = project.storage
+    old_path = old_storage._path('flashcards')
+    flashcards = list(project.load_flashcards())
+
+    # Write through the new format and verify before switching over
+    new_storage = create_storage(project.storage_engine, project.folder, card_format)
+    new_storage.save_flashcards(flashcards)
+    converted = new_storage.load_flashcards() or []
+    # Sharded files group cards by topic, so compare regardless of order
+    if len(converted) != len(flashcards) or _fingerprint(converted) != _fingerprint(flashcards):
+        print(f"[ERROR] {project.name}: verification failed, keeping {project.card_format} cards")
+        if hasattr(converted, 'close'):
+            converted.close()
+        _remove_cards(new_storage)
+        return False
+    if hasattr(converted, 'close'):
+        converted.close()
+
+    old_storage.close()
+    project.storage = new_storage
+    project.flashcards = flashcards
+    project.save_flashcards()
+    project.save_metadata()
+
+    if old_storage.card_format == 'sharded':
+        shutil.rmtree(old_storage.cards_folder + '.backup', ignore_errors=True)
+        shutil.move(old_storage.cards_folder, old_storage.cards_folder + '.backup')
+    elif os.path.exists(old_path):
+        shutil.move(old_path, old_path + '.backup')
+
+    print(f"[OK] {project.name}: converted {len(flashcards)} flashcards to {card_format}")
+    return True
+
+
+def _remove_cards(storage):
+    if storage.card_format == 'sharded':
+        shutil.rmtree(storage.cards_folder, ignore_errors=True)
+    else:
+        os.remove(storage._path('flashcards'))
+
+
+def convert(card_format: str, project_ids=None, projects_root: str = 'projects') -> bool:
+    """Convert the given projects (or all projects) to the given card format"""
+
+    print("\n" + "="*60)
+    print(f"CONVERSION: Switching Card Files to {card_format.upper()}")
+    print("="*60 + "\n")
+
+    pm = ProjectManager(projects_root)
+    project_ids = project_ids or list(pm.projects.keys())
+
+    success = True
+    for project_id in project_ids:
+        project = pm.get_project(project_id)
+        if not project:
+            print(f"[ERROR] Project not found: {project_id}")
+            success = False
+            continue
+        try:
+            success = convert_project(project, card_format) and success
+        except Exception as e:
+            print(f"[ERROR] {project.name}: conversion failed: {e}")
+            success = False
+
+    print()
+    if success:
+        print("[SUCCESS] CONVERSION COMPLETED SUCCESSFULLY!")
+        print("Previous card files have been backed up with .backup extension\n")
+    else:
+        print("[ERROR] Some projects could not be converted. Their card files are untouched.\n")
+    return success
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2 or sys.argv[1] not in CARD_FORMATS:
+        print(__doc__)
+        sys.exit(1)
+    convert(sys.argv[1], sys.argv[2:])
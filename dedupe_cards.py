@@ -0,0 +1,137 @@
+"""
+Dedupe Script: Remove Near-Duplicate Flashcards From Existing Projects
+
+Projects created before duplicate detection was added (or with the
+AI-extracted topic strategy, which generates every topic from the same text)
+often ask the same question several times in slightly different words. This
+finds near-duplicates across each project's whole deck with MinHash/LSH (see
+near_duplicates.py) and removes all but one card of each group.
+
+The card kept from a group is the one with the most study progress (mastered,
+then most attempts), otherwise the first in the deck. The mastery and
+exclusion records of removed cards are deleted with them. Removed cards (and
+their records) are appended to removed_duplicates.json in the project folder
+so nothing is lost. Safe to run multiple times.
+
+Usage:
+    python dedupe_cards.py --dry-run               # list duplicates in every project, change nothing
+    python dedupe_cards.py                         # remove duplicates from every project
+    python dedupe_cards.py <project-id>...         # only the given projects
+    python dedupe_cards.py --threshold 0.6 ...     # stricter matching (default 0.5)
+"""
+
+import os
+import sys
+import json
+from datetime import datetime
+from project_manager import ProjectManager, Project
+from near_duplicates import find_near_duplicates
+
+
+def dedupe_project(project: Project, threshold: float, dry_run: bool) -> int:
+    """Remove (or with dry_run, list) one project's near-duplicate cards; returns how many"""
+    flashcards = list(project.load_flashcards())
+    mastery = project.load_mastery()
+
+    # Look at studied cards first so they are the ones kept
+    order = sorted(range(len(flashcards)), key=lambda i: (
+        flashcards[i]['id'] not in mastery,
+        -flashcards[i].get('attempts', 0),
+        i
+    ))
+    duplicates = find_near_duplicates([flashcards[i] for i in order], threshold)
+    if not duplicates:
+        print(f"[OK] {project.name}: no near-duplicates in {len(flashcards)} flashcards")
+        return 0
+
+    removed_positions = {order[position] for position in duplicates}
+    for position, kept in sorted(duplicates.items(), key=lambda item: order[item[0]]):
+        duplicate_card = flashcards[order[position]]
+        kept_card = flashcards[order[kept]]
+        print(f"  - [{duplicate_card.get('topic')}] {duplicate_card['question']}")
+        print(f"    duplicates [{kept_card.get('topic')}] {kept_card['question']}")
+
+    if dry_run:
+        print(f"[DRY RUN] {project.name}: {len(removed_positions)} of {len(flashcards)} flashcards are near-duplicates")
+        return len(removed_positions)
+
+    removed = [card for i, card in enumerate(flashcards) if i in removed_positions]
+    removed_ids = [card['id'] for card in removed]
+    excluded = project.load_excluded()
+    backup_path = os.path.join(project.folder, 'removed_duplicates.json')
+    backup = []
+    if os.path.exists(backup_path):
+        with open(backup_path, 'r', encoding='utf-8') as f:
+            backup = json.load(f)
+    backup.append({
+        'removed_at': datetime.now().isoformat(),
+        'threshold': threshold,
+        'cards': removed,
+        'mastery': {card_id: mastery[card_id] for card_id in removed_ids if card_id in mastery},
+        'excluded': {card_id: excluded[card_id] for card_id in removed_ids if card_id in excluded}
+    })
+    with open(backup_path, 'w', encoding='utf-8') as f:
+        json.dump(backup, f, indent=2)
+
+    project.flashcards = [card for i, card in enumerate(flashcards) if i not in removed_positions]
+    project.save_flashcards()
+    project.remove_mastery(removed_ids)
+    project.remove_excluded(removed_ids)
+    print(f"[OK] {project.name}: removed {len(removed)} near-duplicates, {len(project.flashcards)} flashcards left")
+    return len(removed)
+
+
+def dedupe(project_ids=None, threshold: float = 0.5, dry_run: bool = False, projects_root: str = 'projects') -> bool:
+    """Dedupe the given projects (or all projects)"""
+
+    print("\n" + "="*60)
+    print("DEDUPE: " + ("Listing" if dry_run else "Removing") + " Near-Duplicate Flashcards")
+    print("="*60 + "\n")
+
+    pm = ProjectManager(projects_root)
+    project_ids = project_ids or list(pm.projects.keys())
+
+    success = True
+    total = 0
+    for project_id in project_ids:
+        project = pm.get_project(project_id)
+        if not project:
+            print(f"[ERROR] Project not found: {project_id}")
+            success = False
+            continue
+        try:
+            total += dedupe_project(project, threshold, dry_run)
+        except Exception as e:
+            print(f"[ERROR] {project.name}: dedupe failed: {e}")
+            success = False
+
+    print()
+    if dry_run:
+        print(f"[DRY RUN] {total} near-duplicate flashcards found. Run without --dry-run to remove them.\n")
+    elif success:
+        print(f"[SUCCESS] Removed {total} near-duplicate flashcards")
+        if total:
+            print("Removed cards were saved to removed_duplicates.json in each project folder")
+        print()
+    else:
+        print("[ERROR] Some projects could not be deduped. Their cards are untouched.\n")
+    return success
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    if '-h' in args or '--help' in args:
+        print(__doc__)
+        sys.exit(0)
+    dry_run = '--dry-run' in args
+    args = [arg for arg in args if arg != '--dry-run']
+    threshold = 0.5
+    if '--threshold' in args:
+        i = args.index('--threshold')
+        try:
+            threshold = float(args[i + 1])
+        except (IndexError, ValueError):
+            print(__doc__)
+            sys.exit(1)
+        del args[i:i + 2]
+    sys.exit(0 if dedupe(args, threshold, dry_run) else 1)
@@ -0,0 +1,122 @@
+"""
+Bookkeeping shared by the on-disk caches (llm_client.LLMResponseCache and
+extraction_cache.ExtractionCache).
+
+Entries are files under folder/<first two key characters>/<key><suffix>.
+DiskCache keeps the size of every entry (scanned from disk on first use),
+hit/miss/store/eviction counters, and evicts the least recently used
+entries (by modification time, which a hit refreshes) down to 90% of
+max_bytes whenever a store takes the cache past it. Subclasses decide what
+an entry holds and how it is read and written.
+"""
+
+import os
+import threading
+from typing import Dict
+
+
+class DiskCache:
+    """Files keyed by content hash, with usage counters and a total size bound"""
+
+    suffix = ''
+
+    def __init__(self, folder: str, max_bytes: int, enabled: bool = True):
+        self.folder = folder
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self._sizes = None  # path -> size, scanned from disk on first use
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.folder, key[:2], f'{key}{self.suffix}')
+
+    def _scan(self):
+        # Caller holds self._lock
+        if self._sizes is None:
+            self._sizes = {}
+            if os.path.isdir(self.folder):
+                for root, _, files in os.walk(self.folder):
+                    for name in files:
+                        if name.endswith(self.suffix):
+                            path = os.path.join(root, name)
+                            self._sizes[path] = os.path.getsize(path)
+
+    def _lookup(self, path: str, found: bool) -> bool:
+        """Count a lookup; a hit is marked as recently used. Returns found."""
+        with self._lock:
+            if found:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if found:
+            try:
+                os.utime(path)  # Mark as recently used for eviction
+            except OSError:
+                pass
+        return found
+
+    def _stored(self, path: str, size: int):
+        """Account for an entry just written, evicting others if the cache is over its bound"""
+        with self._lock:
+            self._scan()
+            self._sizes[path] = size
+            self.stores += 1
+            if sum(self._sizes.values()) > self.max_bytes:
+                self._evict()
+
+    def _remove(self, path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        with self._lock:
+            if self._sizes is not None:
+                self._sizes.pop(path, None)
+
+    def _evict(self):
+        # Caller holds self._lock; drop least recently used entries down to 90% of the bound
+        def last_used(path):
+            try:
+                return os.path.getmtime(path)
+            except OSError:
+                return 0
+        total = sum(self._sizes.values())
+        for path in sorted(self._sizes, key=last_used):
+            if total <= self.max_bytes * 0.9:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= self._sizes.pop(path)
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._scan()
+            for path in list(self._sizes):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            self._sizes = {}
+
+    def stats(self) -> Dict:
+        with self._lock:
+            self._scan()
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': (self.hits / lookups * 100) if lookups else 0,
+                'stores': self.stores,
+                'evictions': self.evictions,
+                'entries': len(self._sizes),
+                'bytes': sum(self._sizes.values()),
+                'max_bytes': self.max_bytes
+            }
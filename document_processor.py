@@ -4,6 +4,7 @@ Supports PDF, Word documents (.docx), and plain text files.
 """
 
 import os
+import re
 from typing import Dict, List, Optional
 import PyPDF2
 import pdfplumber
@@ -16,6 +17,15 @@ class DocumentProcessor:
     
     SUPPORTED_EXTENSIONS = {'.pdf', '.docx', '.txt'}
     MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB
+    EXTRACTOR_VERSION = 2  # Bump when extracted text changes, so cached texts aren't reused
+    
+    # A PDF page's PyPDF2 text is re-extracted with pdfplumber when it has fewer
+    # visible characters than this, more than this share of unreadable
+    # characters, or words this long on average (spaces were lost)
+    MIN_PAGE_CHARS = 20
+    MAX_GARBLED_RATIO = 0.05
+    MAX_AVERAGE_WORD_LENGTH = 20
+    GARBLED_CHARS = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f\ufffd\ue000-\uf8ff]')
     
     def __init__(self):
         self.magic = magic.Magic(mime=True)
@@ -49,30 +59,65 @@ class DocumentProcessor:
         
         return True, None
     
-    def extract_text_from_pdf(self, file_path: str) -> str:
-        """Extract text from PDF using pdfplumber (better layout support)"""
-        text = []
-        
+    def is_poor_page_text(self, text: str) -> bool:
+        """True if text extracted from a PDF page looks empty or garbled"""
+        visible = ''.join(text.split())
+        if len(visible) < self.MIN_PAGE_CHARS:
+            return True
+        if len(self.GARBLED_CHARS.findall(visible)) > self.MAX_GARBLED_RATIO * len(visible):
+            return True
+        return len(visible) / len(text.split()) > self.MAX_AVERAGE_WORD_LENGTH
+    
+    def pdf_page_count(self, file_path: str) -> int:
+        """Number of pages in a PDF"""
+        with open(file_path, 'rb') as file:
+            return len(PyPDF2.PdfReader(file).pages)
+    
+    def extract_text_from_pdf(self, file_path: str, first_page: int = 0, last_page: Optional[int] = None) -> str:
+        """
+        Extract text from PDF pages [first_page, last_page) (all by default).
+        PyPDF2 reads the text layer quickly; only pages where its text looks
+        poor are parsed again with pdfplumber (slower, better layout support).
+        """
+        pages = {}
         try:
-            with pdfplumber.open(file_path) as pdf:
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text.append(page_text)
+            with open(file_path, 'rb') as file:
+                pdf_reader = PyPDF2.PdfReader(file)
+                last_page = len(pdf_reader.pages) if last_page is None else min(last_page, len(pdf_reader.pages))
+                for number in range(first_page, last_page):
+                    try:
+                        pages[number] = pdf_reader.pages[number].extract_text() or ''
+                    except Exception as e:
+                        print(f"PyPDF2 failed on page {number + 1}, trying pdfplumber: {e}")
+                        pages[number] = ''
         except Exception as e:
-            # Fallback to PyPDF2 if pdfplumber fails
-            print(f"pdfplumber failed, trying PyPDF2: {e}")
+            # PyPDF2 couldn't read the file at all; pdfplumber reads every page
+            print(f"PyPDF2 failed, trying pdfplumber: {e}")
+            pages = None
+        
+        if pages is None:
+            retry = None
+        else:
+            retry = [number for number, page_text in pages.items() if self.is_poor_page_text(page_text)]
+        if retry is None or retry:
             try:
-                with open(file_path, 'rb') as file:
-                    pdf_reader = PyPDF2.PdfReader(file)
-                    for page in pdf_reader.pages:
-                        page_text = page.extract_text()
-                        if page_text:
-                            text.append(page_text)
-            except Exception as e2:
-                raise Exception(f"Failed to extract PDF text: {e2}")
+                # pdfplumber numbers pages from 1
+                wanted = None if retry is None else [number + 1 for number in retry]
+                with pdfplumber.open(file_path, pages=wanted) as pdf:
+                    pages = pages or {}
+                    for page in pdf.pages:
+                        number = page.page_number - 1
+                        if number < first_page or (last_page is not None and number >= last_page):
+                            continue
+                        page_text = page.extract_text() or ''
+                        if page_text.strip() or number not in pages:
+                            pages[number] = page_text
+            except Exception as e:
+                if retry is None:
+                    raise Exception(f"Failed to extract PDF text: {e}")
+                print(f"pdfplumber failed, keeping PyPDF2 text: {e}")
         
-        return '\n\n'.join(text)
+        return '\n\n'.join(pages[number] for number in sorted(pages) if pages[number])
     
     def extract_text_from_docx(self, file_path: str) -> str:
         """Extract text from Word document"""
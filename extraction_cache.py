@@ -0,0 +1,75 @@
+"""
+On-disk cache of text extracted from uploaded documents.
+
+Users often upload the same course PDFs again for a new project. Entries are
+content-addressed by the SHA-256 of the file's bytes together with its
+extension and DocumentProcessor.EXTRACTOR_VERSION, so a re-upload (under any
+name) skips parsing, and changing the extractor invalidates old entries
+without clearing anything. Texts are stored under extraction_cache/ as
+plain UTF-8 files, and the least recently used ones are evicted once the
+cache passes max_bytes (see disk_cache.py). Uploads are looked up in the
+cache by ExtractionPool(cache=...), before a file is handed to a worker.
+"""
+
+import os
+import hashlib
+from typing import Dict, Optional
+
+from atomic_writes import atomic_write
+from disk_cache import DiskCache
+
+HASH_BLOCK_BYTES = 1024 * 1024
+
+
+def file_sha256(file_path: str) -> str:
+    """Hex SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_BYTES), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ExtractionCache(DiskCache):
+    """Extracted texts keyed by file content, with a total size bound"""
+
+    suffix = '.txt'
+
+    def __init__(self, folder: str = 'extraction_cache', version: int = 1,
+                 max_bytes: int = 500 * 1024 * 1024, enabled: bool = True):
+        super().__init__(folder, max_bytes, enabled)
+        self.version = version
+
+    def key(self, file_path: str, content_hash: Optional[str] = None) -> str:
+        """Cache key of a file (pass content_hash if the file's SHA-256 is already known)"""
+        ext = os.path.splitext(file_path)[1].lower()
+        content_hash = content_hash or file_sha256(file_path)
+        return hashlib.sha256(f'{self.version}:{ext}:{content_hash}'.encode('ascii')).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Cached text for a key, or None on a miss"""
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                text = f.read()
+        except (OSError, ValueError):
+            text = None
+        return text if self._lookup(path, text is not None) else None
+
+    def put(self, key: str, text: str):
+        if not self.enabled:
+            return
+        path = self._path(key)
+        data = text.encode('utf-8')
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            atomic_write(path, lambda f: f.write(data), fsync=False)
+        except OSError as e:
+            print(f"Error caching extracted text: {e}")
+            return
+        self._stored(path, len(data))
+
+    def stats(self) -> Dict:
+        return dict(super().stats(), version=self.version)
@@ -0,0 +1,326 @@
+"""
+Document text extraction on a pool of worker processes.
+
+pdfplumber parsing is CPU-bound Python, so extracting a 30-PDF upload on one
+thread used one core, and a single malformed PDF could hang the whole batch.
+ExtractionPool runs DocumentProcessor.extract_text in worker processes (one
+per CPU core by default), shared by every upload, and reports each file as
+it finishes.
+
+Every file gets a time limit and every worker a memory cap:
+- Inside the worker, an interval timer stops an extraction that runs past
+  timeout_seconds, and an address space limit turns runaway allocations
+  into a MemoryError (POSIX only - Windows has neither).
+- Outside, a file still running KILL_GRACE_SECONDS after its time limit
+  (stuck in C code, or on Windows) gets the pool's workers killed. The pool
+  is replaced and the other files that were running on it start again.
+- A worker that dies (killed by the OS for memory, or a parser crash)
+  breaks the pool; the files that were running are retried once on a new one.
+
+Large PDFs are split into page ranges extracted on different workers (each
+range has the full time limit), so one long PDF also uses every core. Plain
+text files are read on the calling thread: handing them to a worker costs
+more than reading them. Other files are looked up in an ExtractionCache
+first (see extraction_cache.py) and only parsed if they aren't in it.
+"""
+
+import os
+import sys
+import time
+import signal
+import threading
+import multiprocessing
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, CancelledError, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, List, Optional, Tuple
+
+from document_processor import DocumentProcessor
+
+KILL_GRACE_SECONDS = 10  # Time a worker gets to stop a file itself before it is killed
+INLINE_EXTENSIONS = {'.txt'}
+MIN_PAGES_PER_TASK = 50  # PDFs are only split into ranges at least this long
+MAX_WINDOWS_WORKERS = 61  # ProcessPoolExecutor limit on Windows
+
+
+class ExtractionTimeout(BaseException):
+    """
+    Raised in a worker by its timer. A BaseException, so that the PDF
+    extractor's fallback to PyPDF2 (which catches Exception) doesn't run
+    on borrowed time.
+    """
+
+
+# Worker process state, set up by _init_worker
+_processor = None
+_memory_mb = 0
+
+
+def _init_worker(memory_mb: int):
+    global _processor, _memory_mb
+    # Ctrl+C stops the server, which shuts the workers down
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _processor = DocumentProcessor()
+    _memory_mb = memory_mb
+    if memory_mb:
+        try:
+            import resource
+            soft, hard = resource.getrlimit(resource.RLIMIT_AS)
+            limit = memory_mb * 1024 * 1024
+            if hard != resource.RLIM_INFINITY:
+                limit = min(limit, hard)
+            resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+        except (ImportError, ValueError, OSError):
+            pass  # Not available on this platform
+
+
+def _on_timer(signum, frame):
+    raise ExtractionTimeout()
+
+
+def _extract_in_worker(file_path: str, timeout_seconds: float, pages: Optional[Tuple[int, int]] = None) -> str:
+    timer = bool(timeout_seconds) and hasattr(signal, 'setitimer')
+    if timer:
+        signal.signal(signal.SIGALRM, _on_timer)
+        signal.setitimer(signal.ITIMER_REAL, timeout_seconds)
+    try:
+        if pages is not None:
+            return _processor.extract_text_from_pdf(file_path, *pages)
+        return _processor.extract_text(file_path)
+    except ExtractionTimeout:
+        raise TimeoutError(f"Extraction took longer than {timeout_seconds:g}s")
+    except MemoryError:
+        raise MemoryError(f"Extraction needed more than {_memory_mb}MB of memory")
+    finally:
+        if timer:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+_spawn_lock = threading.Lock()
+
+
+@contextmanager
+def _main_module_hidden():
+    """
+    Keep spawned workers from re-importing the server's main script (app.py
+    would run its whole startup in every worker). Workers only need
+    extraction_pool and document_processor, which they import by name.
+    """
+    main = sys.modules['__main__']
+    with _spawn_lock:
+        saved = {name: main.__dict__[name] for name in ('__file__', '__spec__') if name in main.__dict__}
+        main.__dict__.pop('__file__', None)
+        if '__spec__' in saved:
+            main.__spec__ = None
+        try:
+            yield
+        finally:
+            main.__dict__.update(saved)
+
+
+class ExtractionPool:
+    """Extracts text from documents on worker processes shared by all uploads"""
+
+    def __init__(self, workers: int = 0, timeout_seconds: float = 120, memory_mb: int = 1024, cache=None):
+        workers = workers or os.cpu_count() or 1
+        if sys.platform == 'win32':
+            workers = min(workers, MAX_WINDOWS_WORKERS)
+        self.workers = workers
+        self.timeout_seconds = timeout_seconds
+        self.memory_mb = memory_mb
+        self.processor = DocumentProcessor()
+        self.cache = cache
+        # A file is submitted only when a worker is free, so it starts running
+        # right away and its time limit can be counted from submission
+        self._slots = threading.BoundedSemaphore(workers)
+        self._lock = threading.Lock()
+        self._pool = None
+        self._generation = 0
+        self._killed = set()  # Generations killed over another upload's file
+
+    def _submit(self, file_path: str, pages: Optional[Tuple[int, int]] = None):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn'),  # fork copies the server's threads and locks
+                    initializer=_init_worker,
+                    initargs=(self.memory_mb,)
+                )
+            pool, generation = self._pool, self._generation
+        # Workers are started on demand by submit()
+        with _main_module_hidden():
+            future = pool.submit(_extract_in_worker, file_path, self.timeout_seconds, pages)
+        return future, generation
+
+    def _discard_pool(self, generation: int, kill: bool = False):
+        """Replace the pool (if it is still the given generation), killing its workers if asked"""
+        with self._lock:
+            if self._generation != generation or self._pool is None:
+                return
+            pool = self._pool
+            self._pool = None
+            self._generation += 1
+            if kill:
+                self._killed.add(generation)
+        processes = list((getattr(pool, '_processes', None) or {}).values())  # No public API for this
+        if kill:
+            for process in processes:
+                try:
+                    process.kill()
+                except Exception:
+                    pass
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def _cache_key(self, file_path: str, content_hash: Optional[str] = None) -> Optional[str]:
+        """Key of a file in the extraction cache, or None if it can't be cached"""
+        if self.cache is None or not self.cache.enabled:
+            return None
+        is_valid, _ = self.processor.validate_file(file_path)
+        if not is_valid:
+            return None
+        try:
+            return self.cache.key(file_path, content_hash)
+        except OSError:
+            return None
+
+    def _page_ranges(self, file_path: str) -> List[Optional[Tuple[int, int]]]:
+        """Page ranges to extract a PDF in, one per worker for a long PDF ([None] = the whole file)"""
+        if os.path.splitext(file_path)[1].lower() != '.pdf' or self.workers < 2:
+            return [None]
+        is_valid, _ = self.processor.validate_file(file_path)
+        if not is_valid:
+            return [None]  # The worker reports the problem
+        try:
+            page_count = self.processor.pdf_page_count(file_path)
+        except Exception:
+            return [None]
+        parts = min(self.workers, page_count // MIN_PAGES_PER_TASK)
+        if parts < 2:
+            return [None]
+        bounds = [page_count * i // parts for i in range(parts + 1)]
+        return [(bounds[i], bounds[i + 1]) for i in range(parts)]
+
+    def shutdown(self):
+        with self._lock:
+            generation = self._generation
+        self._discard_pool(generation, kill=True)
+
+    def extract_files(self, file_paths: List[str],
+                      on_done: Optional[Callable[[str, Optional[str], Optional[str], bool], None]] = None,
+                      content_hashes: Optional[Dict[str, str]] = None) -> Tuple[Dict[str, str], Dict[str, str]]:
+        """
+        Extract text from files in parallel.
+        Returns ({path: text}, {path: error}); on_done(path, text, error, cached)
+        is called on this thread as each file finishes. content_hashes has the
+        SHA-256 of files whose hash is already known (saves reading them twice).
+        """
+        results = {}
+        errors = {}
+        parts = {}  # path -> {page range: text} for files still being extracted
+        cache_keys = {}
+
+        def finish(path, text=None, error=None, cached=False):
+            if error is None:
+                results[path] = text
+                if text and path in cache_keys:
+                    self.cache.put(cache_keys[path], text)
+            else:
+                errors[path] = error
+            parts.pop(path, None)
+            if on_done:
+                on_done(path, text, error, cached)
+
+        def part_done(task, text=None, error=None):
+            path, pages = task
+            if path not in parts:
+                return  # Another range of this file already failed
+            if error is not None:
+                finish(path, error=error)
+                return
+            parts[path][pages] = text
+            if all(part is not None for part in parts[path].values()):
+                ranges = sorted(parts[path], key=lambda pages: pages and pages[0])
+                finish(path, '\n\n'.join(parts[path][pages] for pages in ranges if parts[path][pages]))
+
+        inline = [p for p in file_paths if os.path.splitext(p)[1].lower() in INLINE_EXTENSIONS]
+        queued = deque()  # (path, page range) tasks
+        for path in file_paths:
+            if path not in inline:
+                key = self._cache_key(path, (content_hashes or {}).get(path))
+                text = self.cache.get(key) if key else None
+                if text is not None:
+                    finish(path, text, cached=True)
+                    continue
+                if key:
+                    cache_keys[path] = key
+                ranges = self._page_ranges(path)
+                parts[path] = dict.fromkeys(ranges)
+                queued.extend((path, pages) for pages in ranges)
+        running = {}  # future -> (task, started, generation)
+        crashes = {}
+
+        def start_queued(block: bool):
+            while queued and self._slots.acquire(blocking=block):
+                task = queued.popleft()
+                if task[0] not in parts:
+                    self._slots.release()
+                    continue
+                try:
+                    future, generation = self._submit(*task)
+                except Exception as e:
+                    self._slots.release()
+                    part_done(task, error=f"Could not start extraction: {e}")
+                    continue
+                running[future] = (task, time.monotonic(), generation)
+                block = False
+
+        start_queued(block=False)
+        for path in inline:
+            try:
+                finish(path, self.processor.extract_text(path))
+            except Exception as e:
+                finish(path, error=str(e))
+
+        while queued or running:
+            # Wait for a worker only when none of this call's files are running
+            start_queued(block=not running)
+            if not running:
+                continue
+
+            timeout = None
+            if self.timeout_seconds:
+                oldest = min(started for _, started, _ in running.values())
+                timeout = max(0.0, oldest + self.timeout_seconds + KILL_GRACE_SECONDS - time.monotonic())
+            done, _ = wait(list(running), timeout=timeout, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                task, started, generation = running.pop(future)
+                self._slots.release()
+                try:
+                    part_done(task, future.result())
+                except (BrokenProcessPool, CancelledError):
+                    self._discard_pool(generation)
+                    if generation in self._killed:
+                        queued.append(task)  # Killed over a file that hung; not this one's fault
+                    elif crashes.get(task, 0) < 1:
+                        crashes[task] = crashes.get(task, 0) + 1
+                        queued.append(task)
+                    else:
+                        part_done(task, error="The extraction worker crashed (out of memory or a broken file)")
+                except Exception as e:
+                    part_done(task, error=str(e))
+
+            if self.timeout_seconds:
+                now = time.monotonic()
+                for future, (task, started, generation) in list(running.items()):
+                    if now - started > self.timeout_seconds + KILL_GRACE_SECONDS:
+                        # The worker didn't stop itself: kill the pool, the other files start again
+                        print(f"Extraction of {os.path.basename(task[0])} is stuck, restarting the extraction workers")
+                        del running[future]
+                        self._slots.release()
+                        self._discard_pool(generation, kill=True)
+                        part_done(task, error=f"Extraction took longer than {self.timeout_seconds:g}s")
+
+        return results, errors
@@ -0,0 +1,224 @@
+"""
+Durable queue for background jobs (project creation).
+
+Jobs used to run on daemon threads with their state in a module-level dict,
+so restarting the server mid-generation lost the job and left the project
+with some or none of its cards. JobQueue keeps every job and the state of
+each of its topics in jobs.db (SQLite). A handler checkpoints topics as it
+finishes them; on startup, jobs that were queued or running are resumed and
+skip the topics already done. Jobs can be cancelled while they run and
+retried after they fail or are cancelled.
+
+Job states:   queued -> running -> complete | error | cancelled
+Topic states: pending -> generating -> done | failed | cancelled
+"""
+
+import json
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+FINISHED_STATES = ('complete', 'error', 'cancelled')
+DONE_TOPIC_STATES = ('done',)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    project_id TEXT,
+    state TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    error TEXT,
+    created REAL NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS job_topics (
+    job_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    state TEXT NOT NULL,
+    cards INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    PRIMARY KEY (job_id, idx)
+);
+"""
+
+
+class JobCancelled(Exception):
+    """Raised inside a running job once it has been cancelled"""
+
+
+class JobQueue:
+    """SQLite-backed job queue with per-topic checkpoints, run by a few daemon worker threads"""
+
+    def __init__(self, path: str = 'jobs.db', workers: int = 2):
+        self.path = path
+        self.workers = max(1, workers)
+        self._handlers = {}
+        self._queue = queue.Queue()
+        self._cancelled = set()
+        self._lock = threading.Lock()
+        self._threads = []
+        with self._connect() as db:
+            db.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        """A connection for one transaction (committed on success, always closed)"""
+        db = sqlite3.connect(self.path, timeout=30)
+        try:
+            db.row_factory = sqlite3.Row
+            db.execute('PRAGMA journal_mode=WAL')
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def register(self, kind: str, handler: Callable[[Dict], Optional[str]]):
+        """
+        Set the function that runs jobs of this kind. handler(job) returns the
+        final state ('complete' if it returns None) and may raise to fail the job.
+        """
+        self._handlers[kind] = handler
+
+    def start(self):
+        """Start the worker threads and resume jobs interrupted by the last shutdown"""
+        if not self._threads:
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f'job-worker-{i}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+        return self.resume()
+
+    def resume(self) -> int:
+        """Re-queue jobs left queued or running; returns how many were resumed"""
+        with self._connect() as db:
+            rows = db.execute(
+                "SELECT id FROM jobs WHERE state IN ('queued', 'running') ORDER BY created"
+            ).fetchall()
+            db.execute("UPDATE jobs SET state = 'queued' WHERE state = 'running'")
+        for row in rows:
+            self._queue.put(row['id'])
+        return len(rows)
+
+    # ---- Submitting and inspecting jobs ----
+
+    def submit(self, job_id: str, kind: str, project_id: Optional[str], payload: Dict, topics: List[str]) -> str:
+        now = time.time()
+        with self._connect() as db:
+            db.execute(
+                "INSERT INTO jobs (id, kind, project_id, state, payload, created, updated) VALUES (?, ?, ?, 'queued', ?, ?, ?)",
+                (job_id, kind, project_id, json.dumps(payload), now, now)
+            )
+            db.executemany(
+                "INSERT INTO job_topics (job_id, idx, name, state) VALUES (?, ?, ?, 'pending')",
+                [(job_id, idx, name) for idx, name in enumerate(topics)]
+            )
+        self._queue.put(job_id)
+        return job_id
+
+    def get(self, job_id: str, with_payload: bool = True) -> Optional[Dict]:
+        """The job as a dict, with its topics in order, or None"""
+        with self._connect() as db:
+            row = db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return None
+            topics = db.execute(
+                "SELECT idx, name, state, cards, error FROM job_topics WHERE job_id = ? ORDER BY idx", (job_id,)
+            ).fetchall()
+        job = dict(row)
+        job['payload'] = json.loads(job['payload']) if with_payload else None
+        job['topics'] = [dict(topic) for topic in topics]
+        return job
+
+    def recent(self, limit: int = 50) -> List[Dict]:
+        """Most recent jobs first, without payloads"""
+        with self._connect() as db:
+            ids = [row['id'] for row in db.execute(
+                "SELECT id FROM jobs ORDER BY created DESC LIMIT ?", (limit,)
+            )]
+        return [self.get(job_id, with_payload=False) for job_id in ids]
+
+    # ---- Checkpoints, called by handlers ----
+
+    def set_state(self, job_id: str, state: str, error: Optional[str] = None):
+        with self._connect() as db:
+            db.execute("UPDATE jobs SET state = ?, error = ?, updated = ? WHERE id = ?",
+                       (state, error, time.time(), job_id))
+
+    def set_topic(self, job_id: str, idx: int, state: str, cards: int = 0, error: Optional[str] = None):
+        with self._connect() as db:
+            db.execute("UPDATE job_topics SET state = ?, cards = ?, error = ? WHERE job_id = ? AND idx = ?",
+                       (state, cards, error, job_id, idx))
+            db.execute("UPDATE jobs SET updated = ? WHERE id = ?", (time.time(), job_id))
+
+    def is_cancelled(self, job_id: str) -> bool:
+        with self._lock:
+            return job_id in self._cancelled
+
+    def check_cancelled(self, job_id: str):
+        """Raise JobCancelled if the job has been cancelled"""
+        if self.is_cancelled(job_id):
+            raise JobCancelled(f'Job {job_id} was cancelled')
+
+    # ---- Cancel and retry ----
+
+    def cancel(self, job_id: str) -> bool:
+        """Stop a queued or running job; finished topics are kept. False if it already finished"""
+        job = self.get(job_id, with_payload=False)
+        if job is None or job['state'] in FINISHED_STATES:
+            return False
+        with self._lock:
+            self._cancelled.add(job_id)
+        with self._connect() as db:
+            db.execute("UPDATE job_topics SET state = 'cancelled' WHERE job_id = ? AND state = 'pending'", (job_id,))
+        if job['state'] == 'queued':
+            self.set_state(job_id, 'cancelled')
+        return True
+
+    def retry(self, job_id: str) -> bool:
+        """Queue a failed or cancelled job again (or a complete one with failed topics); done topics are skipped"""
+        job = self.get(job_id, with_payload=False)
+        if job is None or job['state'] not in FINISHED_STATES:
+            return False
+        if job['state'] == 'complete' and all(t['state'] in DONE_TOPIC_STATES for t in job['topics']):
+            return False
+        with self._connect() as db:
+            db.execute("UPDATE job_topics SET state = 'pending', error = NULL WHERE job_id = ? AND state != 'done'", (job_id,))
+            db.execute("UPDATE jobs SET state = 'queued', error = NULL, updated = ? WHERE id = ?", (time.time(), job_id))
+        with self._lock:
+            self._cancelled.discard(job_id)
+        self._queue.put(job_id)
+        return True
+
+    # ---- Workers ----
+
+    def _work(self):
+        while True:
+            self._run(self._queue.get())
+
+    def _run(self, job_id: str):
+        job = self.get(job_id)
+        if job is None or job['state'] != 'queued':
+            return  # Cancelled while queued, or already picked up
+        handler = self._handlers.get(job['kind'])
+        if handler is None:
+            self.set_state(job_id, 'error', f"No handler for {job['kind']} jobs")
+            return
+        self.set_state(job_id, 'running')
+        try:
+            state = handler(job) or 'complete'
+            error = None
+        except JobCancelled:
+            state, error = 'cancelled', None
+        except Exception as e:
+            print(f"Error running job {job_id}: {e}")
+            state, error = 'error', str(e)
+        if self.is_cancelled(job_id) and state != 'error':
+            state = 'cancelled'
+        self.set_state(job_id, state, error)
+        with self._lock:
+            self._cancelled.discard(job_id)
@@ -0,0 +1,69 @@
+"""
+Incremental parser for a JSON array arriving in pieces.
+
+Flashcards are generated as one JSON array of objects. Streaming the response
+and feeding each piece to JsonArrayStream yields every card as soon as its
+closing brace arrives, so cards can be saved and counted while the model is
+still writing, and a response cut off at max_tokens still gives back every
+card that was completed before the cut.
+"""
+
+import json
+from typing import Any, List
+
+
+class JsonArrayStream:
+    """
+    Pulls the elements of the first top-level JSON array out of text fed in
+    arbitrary pieces. Anything before the opening '[' (such as a markdown
+    code fence) is skipped, and so is anything after the closing ']'.
+    Object and array elements are returned once complete; an element that
+    is not valid JSON is dropped rather than stopping the rest.
+    """
+
+    def __init__(self):
+        self.started = False
+        self.done = False
+        self._depth = 0          # Nesting depth inside the current element
+        self._in_string = False
+        self._escape = False
+        self._element = []       # Characters of the element being read
+
+    def feed(self, text: str) -> List[Any]:
+        """Consume the next piece of text; return the elements it completed"""
+        completed = []
+        for ch in text:
+            if self.done:
+                break
+            if not self.started:
+                if ch == '[':
+                    self.started = True
+                continue
+
+            if self._depth:
+                self._element.append(ch)
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == '\\':
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch in '{[':
+                if not self._depth:
+                    self._element = [ch]
+                self._depth += 1
+            elif ch in '}]':
+                if not self._depth:
+                    self.done = True  # End of the array itself
+                    continue
+                self._depth -= 1
+                if not self._depth:
+                    try:
+                        completed.append(json.loads(''.join(self._element)))
+                    except ValueError:
+                        pass
+                    self._element = []
+        return completed
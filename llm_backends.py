@@ -0,0 +1,184 @@
+"""
+Interchangeable chat completions backends for LLMClient.
+
+LLMClient only needs an object with chat.completions.create(...) that
+behaves like the OpenAI client. create_client() builds one for the backend
+chosen in settings.json ("llm_backend"):
+
+    openai  - the real API, with the key from openaikey.txt
+    stub    - llm_stub.py (or any OpenAI-compatible server) at "llm_base_url"
+    record  - the real API, saving every response under llm_recordings/
+    replay  - answers only from llm_recordings/, never touching the network
+
+Record a run once with a real key, then replay it to profile or debug the
+upload -> extract -> generate pipeline with the exact same responses every
+time. Recordings are keyed like the response cache (model, messages,
+temperature and max_tokens), whether or not the request was streamed.
+"""
+
+import os
+import json
+from types import SimpleNamespace
+from typing import Dict, Iterator, Optional
+
+from atomic_writes import atomic_write_json
+from llm_client import cache_key
+
+LLM_BACKENDS = ('openai', 'stub', 'record', 'replay')
+DEFAULT_STUB_URL = 'http://127.0.0.1:8765/v1'
+
+
+def read_api_key(path: str = 'openaikey.txt') -> str:
+    """The saved OpenAI API key, or '' if there is none yet"""
+    try:
+        with open(path, 'r') as f:
+            return f.read().strip()
+    except OSError:
+        return ''
+
+
+def _wrap(create) -> SimpleNamespace:
+    """An object with the client.chat.completions.create shape"""
+    return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+
+def _missing_key_client() -> SimpleNamespace:
+    def create(**kwargs):
+        raise RuntimeError("No OpenAI API key set - add one on the Settings page")
+    return _wrap(create)
+
+
+def create_client(backend: str = 'openai', api_key: str = '', base_url: Optional[str] = None,
+                  recordings_folder: str = 'llm_recordings'):
+    """The chat completions client for a backend (see module docstring)"""
+    if backend not in LLM_BACKENDS:
+        print(f"Unknown llm_backend '{backend}', using openai")
+        backend = 'openai'
+    if backend == 'replay':
+        return ReplayClient(recordings_folder)
+
+    import openai
+    if backend == 'stub':
+        # Retries are handled by LLMClient, which also rate limits them
+        return openai.OpenAI(api_key=api_key or 'stub', base_url=base_url or DEFAULT_STUB_URL, max_retries=0)
+    if not api_key:
+        return _missing_key_client()
+    client = openai.OpenAI(api_key=api_key, base_url=base_url, max_retries=0)
+    if backend == 'record':
+        return RecordingClient(client, recordings_folder)
+    return client
+
+
+class RecordingNotFound(Exception):
+    """A replayed request that was never recorded"""
+
+
+def _recording_path(folder: str, key: str) -> str:
+    return os.path.join(folder, key[:2], f'{key}.json')
+
+
+def _request_key(kwargs: Dict) -> str:
+    return cache_key(kwargs.get('model'), kwargs.get('messages', []),
+                     kwargs.get('temperature'), kwargs.get('max_tokens'))
+
+
+def _usage_dict(usage) -> Optional[Dict]:
+    if usage is None:
+        return None
+    return {name: getattr(usage, name, None) for name in ('prompt_tokens', 'completion_tokens', 'total_tokens')}
+
+
+class RecordingClient:
+    """Passes requests to a real client and saves each complete response to disk"""
+
+    def __init__(self, inner, folder: str = 'llm_recordings'):
+        self.inner = inner
+        self.folder = folder
+        self.recorded = 0
+        self.chat = _wrap(self.create).chat
+
+    def _save(self, kwargs: Dict, content: str, finish_reason: Optional[str], usage: Optional[Dict]):
+        try:
+            path = _recording_path(self.folder, _request_key(kwargs))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            atomic_write_json(path, {
+                'model': kwargs.get('model'),
+                'messages': kwargs.get('messages'),
+                'temperature': kwargs.get('temperature'),
+                'max_tokens': kwargs.get('max_tokens'),
+                'content': content,
+                'finish_reason': finish_reason,
+                'usage': usage
+            }, fsync=False)
+            self.recorded += 1
+        except Exception as e:
+            print(f"Error saving LLM recording: {e}")
+
+    def create(self, **kwargs):
+        response = self.inner.chat.completions.create(**kwargs)
+        if kwargs.get('stream'):
+            return self._record_stream(kwargs, response)
+        choice = response.choices[0]
+        self._save(kwargs, choice.message.content or '', getattr(choice, 'finish_reason', None),
+                   _usage_dict(getattr(response, 'usage', None)))
+        return response
+
+    def _record_stream(self, kwargs: Dict, stream) -> Iterator:
+        # Saved only once the stream has been read to the end
+        pieces = []
+        finish_reason = None
+        usage = None
+        try:
+            for chunk in stream:
+                if getattr(chunk, 'usage', None) is not None:
+                    usage = _usage_dict(chunk.usage)
+                if chunk.choices:
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        pieces.append(delta)
+                    finish_reason = chunk.choices[0].finish_reason or finish_reason
+                yield chunk
+        finally:
+            stream.close()  # Also when closed before the end
+        self._save(kwargs, ''.join(pieces), finish_reason, usage)
+
+
+class ReplayClient:
+    """Answers requests from recordings made by RecordingClient"""
+
+    # Characters per streamed piece when replaying a streamed request
+    PIECE_CHARS = 64
+
+    def __init__(self, folder: str = 'llm_recordings'):
+        self.folder = folder
+        self.replayed = 0
+        self.chat = _wrap(self.create).chat
+
+    def create(self, **kwargs):
+        path = _recording_path(self.folder, _request_key(kwargs))
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                recording = json.load(f)
+        except (OSError, ValueError):
+            raise RecordingNotFound(f"No recorded response for this {kwargs.get('model')} request in {self.folder}/")
+        self.replayed += 1
+
+        content = recording.get('content') or ''
+        finish_reason = recording.get('finish_reason') or 'stop'
+        usage = SimpleNamespace(**recording['usage']) if recording.get('usage') else None
+        if not kwargs.get('stream'):
+            message = SimpleNamespace(role='assistant', content=content)
+            return SimpleNamespace(choices=[SimpleNamespace(index=0, message=message, finish_reason=finish_reason)],
+                                   usage=usage, model=recording.get('model'))
+        return self._replay_stream(content, finish_reason, usage)
+
+    def _replay_stream(self, content: str, finish_reason: str, usage) -> Iterator:
+        def chunk(text, finish=None):
+            delta = SimpleNamespace(content=text)
+            return SimpleNamespace(choices=[SimpleNamespace(index=0, delta=delta, finish_reason=finish)], usage=None)
+
+        for i in range(0, len(content), self.PIECE_CHARS):
+            yield chunk(content[i:i + self.PIECE_CHARS])
+        yield chunk(None, finish_reason)
+        if usage is not None:
+            yield SimpleNamespace(choices=[], usage=usage)
@@ -0,0 +1,431 @@
+"""
+Wrapper around the OpenAI chat completions API used by every generation step.
+
+Responses are cached on disk under llm_cache/, content-addressed by a hash of
+(model, messages, temperature, max_tokens), so re-uploading the same document
+or retrying a failed project replays earlier answers instead of spending
+tokens again. Entries expire after ttl_seconds, and the least recently used
+entries are evicted once the cache passes max_bytes (see disk_cache.py).
+
+Requests that reach the API pass through a RateLimiter, which keeps separate
+requests-per-minute and tokens-per-minute buckets for each model and an
+adaptive (AIMD) concurrency limit that halves when the API answers 429 and
+grows back by one slot per round of successful calls. Rate limit, server and
+connection errors are retried with jittered exponential backoff.
+
+stream() returns a response piece by piece as the model writes it; the
+complete text is cached the same way as complete()'s.
+
+Every call, cache hits included, is reported to an optional usage log (see
+llm_usage.py) with the pipeline stage given by the caller, its tokens,
+latency, retries and outcome.
+"""
+
+import os
+import json
+import time
+import random
+import hashlib
+import threading
+from typing import Callable, Dict, Iterator, List, Optional
+
+from atomic_writes import atomic_write_json
+from disk_cache import DiskCache
+
+
+def cache_key(model: str, messages: List[Dict], temperature: Optional[float], max_tokens: Optional[int]) -> str:
+    """Content address of a request"""
+    request = json.dumps({
+        'model': model,
+        'messages': messages,
+        'temperature': temperature,
+        'max_tokens': max_tokens
+    }, sort_keys=True)
+    return hashlib.sha256(request.encode('utf-8')).hexdigest()
+
+
+class LLMResponseCache(DiskCache):
+    """On-disk cache of response texts with TTL and a total size bound"""
+
+    suffix = '.json'
+
+    def __init__(self, folder: str = 'llm_cache', ttl_seconds: float = 7 * 24 * 3600,
+                 max_bytes: int = 100 * 1024 * 1024, enabled: bool = True):
+        super().__init__(folder, max_bytes, enabled)
+        self.ttl_seconds = ttl_seconds
+
+    def get(self, key: str) -> Optional[str]:
+        """Cached response text for a key, or None on a miss or expired entry"""
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            entry = None
+        if entry is not None and time.time() - entry['created'] > self.ttl_seconds:
+            self._remove(path)
+            entry = None
+        if not self._lookup(path, entry is not None):
+            return None
+        return entry['content']
+
+    def put(self, key: str, model: str, content: str):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        atomic_write_json(path, {'created': time.time(), 'model': model, 'content': content},
+                          indent=None, fsync=False)
+        self._stored(path, os.path.getsize(path))
+
+    def stats(self) -> Dict:
+        return dict(super().stats(), ttl_seconds=self.ttl_seconds)
+
+
+class TokenBucket:
+    """Budget of `per_minute` units, refilled continuously"""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` units are available (0 if they are now)"""
+        self._refill(now)
+        amount = min(amount, self.capacity)  # A request larger than the bucket waits for a full bucket
+        return 0.0 if self.tokens >= amount else (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float):
+        # May go negative when a call used more tokens than estimated; later calls wait it off
+        self.tokens -= amount
+
+
+class ModelLimiter:
+    """Request/token buckets and adaptive concurrency for one model (not thread-safe on its own; see RateLimiter)"""
+
+    def __init__(self, model: str, rpm: float, tpm: float, max_concurrency: int):
+        self.model = model
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.max_concurrency = max_concurrency
+        self.concurrency = float(max_concurrency)
+        self.in_flight = 0
+        self.waiting = 0
+        self.max_waiting = 0
+        self.calls = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.failures = 0
+        self.tokens_used = 0
+        self.wait_seconds = 0.0
+
+    def stats(self) -> Dict:
+        return {
+            'rpm': self.requests.capacity,
+            'tpm': self.tokens.capacity,
+            'concurrency_limit': int(self.concurrency),
+            'in_flight': self.in_flight,
+            'queue_depth': self.waiting,
+            'max_queue_depth': self.max_waiting,
+            'calls': self.calls,
+            'retries': self.retries,
+            'rate_limited': self.rate_limited,
+            'failures': self.failures,
+            'tokens_used': self.tokens_used,
+            'avg_wait_ms': (self.wait_seconds / self.calls * 1000) if self.calls else 0
+        }
+
+
+class RateLimiter:
+    """Per-model rate limits shared by every thread that calls the API"""
+
+    def __init__(self, limits: Optional[Dict[str, Dict]] = None, max_concurrency: int = 8):
+        # limits maps model name -> {'rpm': ..., 'tpm': ...}; 'default' covers unlisted models
+        self.limits = limits or {}
+        self.max_concurrency = max(1, max_concurrency)
+        self._models = {}
+        self._condition = threading.Condition()
+
+    def _model(self, model: str) -> ModelLimiter:
+        # Caller holds self._condition
+        if model not in self._models:
+            limit = self.limits.get(model) or self.limits.get('default') or {}
+            self._models[model] = ModelLimiter(model, limit.get('rpm', 500), limit.get('tpm', 30000), self.max_concurrency)
+        return self._models[model]
+
+    def acquire(self, model: str, tokens: int):
+        """Block until a request of about `tokens` tokens may be sent to `model`"""
+        started = time.monotonic()
+        with self._condition:
+            limiter = self._model(model)
+            limiter.waiting += 1
+            limiter.max_waiting = max(limiter.max_waiting, limiter.waiting)
+            while True:
+                now = time.monotonic()
+                if limiter.in_flight < int(limiter.concurrency):
+                    wait = max(limiter.requests.wait_time(1, now), limiter.tokens.wait_time(tokens, now))
+                    if wait <= 0:
+                        break
+                else:
+                    wait = None  # Woken by release()
+                self._condition.wait(wait)
+            limiter.requests.consume(1)
+            limiter.tokens.consume(tokens)
+            limiter.waiting -= 1
+            limiter.in_flight += 1
+            limiter.calls += 1
+            limiter.wait_seconds += time.monotonic() - started
+
+    def release(self, model: str, estimated_tokens: int, used_tokens: Optional[int], outcome: str,
+                retry: bool = False):
+        """
+        Return a slot taken by acquire(). outcome is 'ok', 'rate_limited' or
+        'error'; retry says whether the caller will send the request again.
+        """
+        with self._condition:
+            limiter = self._model(model)
+            limiter.in_flight -= 1
+            if used_tokens is not None:
+                limiter.tokens.consume(used_tokens - estimated_tokens)
+                limiter.tokens_used += used_tokens
+            if outcome == 'ok':
+                # Additive increase: about one extra slot per full round of successful calls
+                limiter.concurrency = min(limiter.max_concurrency, limiter.concurrency + 1 / limiter.concurrency)
+            elif outcome == 'rate_limited':
+                # Multiplicative decrease
+                limiter.concurrency = max(1.0, limiter.concurrency / 2)
+                limiter.rate_limited += 1
+            if retry:
+                limiter.retries += 1
+            elif outcome != 'ok':
+                limiter.failures += 1
+            self._condition.notify_all()
+
+    def stats(self) -> Dict:
+        with self._condition:
+            return {model: limiter.stats() for model, limiter in self._models.items()}
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    return getattr(error, 'status_code', None) or getattr(getattr(error, 'response', None), 'status_code', None)
+
+
+def _is_retryable(error: Exception) -> bool:
+    """429s, 5xx responses, timeouts and dropped connections are worth retrying"""
+    status = _status_code(error)
+    if status is not None:
+        return status == 429 or status >= 500
+    name = type(error).__name__
+    return 'Timeout' in name or 'Connection' in name
+
+
+def _outcome(error: Exception) -> str:
+    return 'rate_limited' if _status_code(error) == 429 else 'error'
+
+
+def _retry_after(error: Exception) -> float:
+    """Seconds the server asked us to wait, if it sent a Retry-After header"""
+    headers = getattr(getattr(error, 'response', None), 'headers', None) or {}
+    try:
+        return float(headers.get('retry-after', 0))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def estimate_tokens(messages: List[Dict], max_tokens: Optional[int]) -> int:
+    """Prompt tokens (about four characters each) plus the completion budget"""
+    prompt_chars = sum(len(message.get('content') or '') for message in messages)
+    return prompt_chars // 4 + (max_tokens or 1000)
+
+
+class LLMClient:
+    """Chat completions through one place, with response caching, rate limiting and retries"""
+
+    def __init__(self, client, cache: LLMResponseCache, limiter: Optional[RateLimiter] = None,
+                 max_retries: int = 5, backoff_base: float = 1.0, backoff_max: float = 60.0, usage=None):
+        self.client = client
+        self.cache = cache
+        self.limiter = limiter or RateLimiter()
+        self.usage = usage  # llm_usage.UsageLog, or None to skip telemetry
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        # Full jitter, but never sooner than the server's Retry-After
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        return max(delay, _retry_after(error))
+
+    def _record(self, model: str, stage: str, messages: List[Dict], content: str, usage, outcome: str,
+                call: Dict, error: Optional[Exception] = None, cached: bool = False):
+        """Report one call to the usage log; tokens are estimated when the API sent no usage"""
+        if self.usage is None:
+            return
+        prompt_tokens = getattr(usage, 'prompt_tokens', None)
+        completion_tokens = getattr(usage, 'completion_tokens', None)
+        estimated = prompt_tokens is None or completion_tokens is None
+        if estimated:
+            # A request that failed before any output is not billed
+            prompt_tokens = sum(len(m.get('content') or '') for m in messages) // 4 if content or cached else 0
+            completion_tokens = len(content) // 4
+        self.usage.record(
+            model, stage, outcome, prompt_tokens, completion_tokens, estimated=estimated, cached=cached,
+            latency_ms=call.get('latency_ms'), first_token_ms=call.get('first_token_ms'),
+            total_ms=(time.perf_counter() - call['started']) * 1000, retries=call.get('retries', 0),
+            error=f'{error.__class__.__name__}: {error}' if error is not None else None
+        )
+
+    def _attempts(self, model: str, estimated: int, call: Dict) -> Iterator[int]:
+        """
+        Yield attempt numbers, each once a rate limiter slot for it has been
+        acquired. The caller gives the slot back with limiter.release() when
+        the attempt succeeds, or with _failed() when it raises.
+        """
+        attempt = 0
+        while True:
+            self.limiter.acquire(model, estimated)
+            call['attempt_started'] = time.perf_counter()
+            yield attempt
+            attempt += 1
+            call['retries'] = attempt
+
+    def _failed(self, model: str, estimated: int, attempt: int, error: Exception, retryable: bool = True) -> bool:
+        """
+        Release the slot of a failed attempt. Returns True, after backing
+        off, if the request should be sent again (429/5xx/connection errors,
+        up to max_retries); False if the error should be raised.
+        """
+        retry = retryable and _is_retryable(error) and attempt < self.max_retries
+        self.limiter.release(model, estimated, None, _outcome(error), retry)
+        if retry:
+            delay = self._backoff(attempt, error)
+            print(f"OpenAI {model} request failed ({error.__class__.__name__}), retrying in {delay:.1f}s")
+            time.sleep(delay)
+        return retry
+
+    def _create(self, model: str, call: Dict, **kwargs):
+        """One API call under the rate limiter, retried on 429/5xx/connection errors"""
+        estimated = estimate_tokens(kwargs['messages'], kwargs.get('max_tokens'))
+        for attempt in self._attempts(model, estimated, call):
+            try:
+                response = self.client.chat.completions.create(model=model, **kwargs)
+            except Exception as e:
+                if self._failed(model, estimated, attempt, e):
+                    continue
+                raise
+            call['latency_ms'] = (time.perf_counter() - call['attempt_started']) * 1000
+            usage = getattr(response, 'usage', None)
+            self.limiter.release(model, estimated, getattr(usage, 'total_tokens', None), 'ok')
+            return response
+
+    def complete(self, model: str, messages: List[Dict], max_tokens: Optional[int] = None,
+                 temperature: Optional[float] = None, use_cache: bool = True,
+                 validate: Optional[Callable[[str], bool]] = None, stage: str = 'other') -> str:
+        """
+        Return the response text for a chat completion request.
+
+        validate(text), if given, decides whether a response is good enough
+        to cache (e.g. that it parses as JSON), so a malformed answer is
+        requested again next time instead of being replayed. stage labels
+        the call in the usage log.
+        """
+        call = {'started': time.perf_counter()}
+        use_cache = use_cache and self.cache.enabled
+        key = cache_key(model, messages, temperature, max_tokens)
+        if use_cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                self._record(model, stage, messages, cached, None, 'ok', call, cached=True)
+                return cached
+
+        kwargs = {'messages': messages}
+        if max_tokens is not None:
+            kwargs['max_tokens'] = max_tokens
+        if temperature is not None:
+            kwargs['temperature'] = temperature
+        try:
+            response = self._create(model, call, **kwargs)
+        except Exception as e:
+            self._record(model, stage, messages, '', None, _outcome(e), call, e)
+            raise
+        choice = response.choices[0]
+        content = choice.message.content or ''
+        outcome = 'truncated' if getattr(choice, 'finish_reason', None) == 'length' else 'ok'
+        self._record(model, stage, messages, content, getattr(response, 'usage', None), outcome, call)
+
+        if use_cache and (validate is None or validate(content)):
+            self.cache.put(key, model, content)
+        return content
+
+    def stream(self, model: str, messages: List[Dict], max_tokens: Optional[int] = None,
+               temperature: Optional[float] = None, use_cache: bool = True,
+               validate: Optional[Callable[[str], bool]] = None, stage: str = 'other') -> Iterator[str]:
+        """
+        Yield the response text for a chat completion request in pieces as
+        it is generated (a cached response comes back as a single piece).
+
+        A failed request is only retried if it failed before producing any
+        text; once pieces have been yielded the error is raised to the
+        caller, which keeps whatever it has already received.
+        """
+        call = {'started': time.perf_counter()}
+        use_cache = use_cache and self.cache.enabled
+        key = cache_key(model, messages, temperature, max_tokens)
+        if use_cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                self._record(model, stage, messages, cached, None, 'ok', call, cached=True)
+                yield cached
+                return
+
+        kwargs = {'messages': messages, 'stream': True, 'stream_options': {'include_usage': True}}
+        if max_tokens is not None:
+            kwargs['max_tokens'] = max_tokens
+        if temperature is not None:
+            kwargs['temperature'] = temperature
+        estimated = estimate_tokens(messages, max_tokens)
+        pieces = []
+        usage = None
+        finish_reason = None
+        for attempt in self._attempts(model, estimated, call):
+            try:
+                response = self.client.chat.completions.create(model=model, **kwargs)
+                try:
+                    for chunk in response:
+                        if getattr(chunk, 'usage', None) is not None:
+                            usage = chunk.usage
+                        if chunk.choices:
+                            finish_reason = chunk.choices[0].finish_reason or finish_reason
+                        delta = chunk.choices[0].delta.content if chunk.choices else None
+                        if delta:
+                            if not pieces:
+                                call['first_token_ms'] = (time.perf_counter() - call['attempt_started']) * 1000
+                            pieces.append(delta)
+                            yield delta
+                finally:
+                    # Also when the caller stops reading, so the connection isn't left open
+                    response.close()
+            except GeneratorExit:
+                # Caller stopped reading; the request still counts against the limits
+                self.limiter.release(model, estimated, None, 'ok')
+                call['latency_ms'] = (time.perf_counter() - call['attempt_started']) * 1000
+                self._record(model, stage, messages, ''.join(pieces), None, 'abandoned', call)
+                raise
+            except Exception as e:
+                # Only retried if no text was yielded yet
+                if self._failed(model, estimated, attempt, e, retryable=not pieces):
+                    continue
+                self._record(model, stage, messages, ''.join(pieces), None, _outcome(e), call, e)
+                raise
+            self.limiter.release(model, estimated, getattr(usage, 'total_tokens', None), 'ok')
+            call['latency_ms'] = (time.perf_counter() - call['attempt_started']) * 1000
+            break
+
+        content = ''.join(pieces)
+        self._record(model, stage, messages, content, usage, 'truncated' if finish_reason == 'length' else 'ok', call)
+        if use_cache and (validate is None or validate(content)):
+            self.cache.put(key, model, content)
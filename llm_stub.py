@@ -0,0 +1,271 @@
+"""
+Local stand-in for the OpenAI chat completions API.
+
+Answers POST /v1/chat/completions (plain and streamed) with made-up but
+well-formed responses for every kind of request the app makes - flashcard
+arrays built from sentences of the supplied content (for one topic or for
+several packed into one request), topic lists, flashcard count suggestions
+and short names - so project creation can be run, load tested and profiled
+without an API key or network access. Responses are
+deterministic for a given request; latency, streaming speed and failures
+(429s, 500s and responses cut off part way) can be injected.
+
+Usage:
+    python llm_stub.py [--port 8765] [--latency 0.5] [--jitter 0.2]
+                       [--tokens-per-second 0] [--rate-limit-rate 0]
+                       [--error-rate 0] [--truncate-rate 0] [--seed 0]
+
+Then set "llm_backend": "stub" in settings.json ("llm_base_url" defaults to
+http://127.0.0.1:8765/v1).
+"""
+
+import re
+import sys
+import json
+import time
+import random
+import hashlib
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_PORT = 8765
+CHARS_PER_TOKEN = 4
+
+
+def _content_section(prompt: str) -> str:
+    """The document text at the end of a prompt (after its last 'Content:'-style label)"""
+    labels = list(re.finditer(r'(Document content|Content|Transcript):\s*\n', prompt))
+    return prompt[labels[-1].end():] if labels else prompt
+
+
+def _sentences(text: str) -> List[str]:
+    sentences = [s.strip() for s in re.split(r'(?<=[.!?])\s+|\n+', text) if len(s.split()) >= 4]
+    return sentences or ['The document describes its subject in some detail.']
+
+
+def _flashcards(prompt: str, count: int, rng: random.Random, topic: Optional[str] = None,
+                content: Optional[str] = None) -> List[Dict]:
+    if topic is None:
+        topic = re.search(r'about "([^"]+)"', prompt)
+        topic = topic.group(1) if topic else 'the material'
+    sentences = _sentences(_content_section(prompt) if content is None else content)
+    rng.shuffle(sentences)
+    cards = []
+    for i in range(count):
+        fact = ' '.join(sentences[i % len(sentences)].split()[:25]).rstrip('.!?')
+        kind = i % 3
+        if kind == 0:
+            cards.append({
+                'question': f'{fact}.',
+                'answer': rng.choice(['True', 'False']),
+                'explanation': f'This statement comes from the material on {topic}.'
+            })
+        elif kind == 1:
+            cards.append({
+                'question': f'Which of the following does the material on {topic} say about {" ".join(fact.split()[:6]).lower()}?',
+                'answer': 'A',
+                'options': [f'A) {fact}', 'B) None of the above', 'C) The opposite', 'D) It is not covered'],
+                'explanation': f'The material states: {fact}.'
+            })
+        else:
+            cards.append({
+                'question': f'Should a learner of {topic} remember that {fact[:1].lower()}{fact[1:]}?',
+                'answer': 'Yes',
+                'explanation': 'It is one of the key points of this part of the material.'
+            })
+    return cards
+
+
+def _packed_flashcards(prompt: str, rng: random.Random) -> List[Dict]:
+    """Cards for a request covering several topics, each card naming its topic ID"""
+    sections = re.split(r'\n\s*Content for ((?:T\d+(?:, )?)+):\s*\n', prompt)
+    contents = {}
+    for topic_ids, text in zip(sections[1::2], sections[2::2]):
+        for topic_id in topic_ids.split(', '):
+            contents[topic_id] = text
+    cards = []
+    for topic_id, name, count in re.findall(r'- (T\d+): "([^"]*)" - EXACTLY (\d+) flashcards', prompt):
+        for card in _flashcards(prompt, int(count), rng, name, contents.get(topic_id, '')):
+            cards.append(dict(card, topic=topic_id))
+    return cards
+
+
+def _topics(prompt: str, rng: random.Random) -> List[Dict]:
+    found = [name for name in re.findall(r'"name": "([^"]+)"', prompt) if name != 'Topic Name']
+    if 'Merge them' in prompt and found:
+        # Merging topics found in several parts: keep each distinct name once
+        names = list(dict.fromkeys(found))
+    else:
+        words = re.findall(r'[A-Za-z]{5,}', _content_section(prompt))
+        common = sorted(set(words), key=lambda w: (-words.count(w), w))[:rng.randint(2, 5)] or ['General']
+        names = [f'{word.capitalize()} Concepts' for word in common]
+    return [{'name': name, 'flashcard_count': rng.randint(5, 20)} for name in names]
+
+
+def fake_completion(messages: List[Dict], rng: Optional[random.Random] = None) -> str:
+    """A plausible response text for any of the app's prompts"""
+    prompt = '\n'.join(message.get('content') or '' for message in messages)
+    if rng is None:
+        rng = random.Random(hashlib.sha256(prompt.encode('utf-8')).hexdigest())
+
+    if re.search(r'- T\d+: "[^"]*" - EXACTLY \d+ flashcards', prompt):
+        return json.dumps(_packed_flashcards(prompt, rng), indent=2)
+    count = re.search(r'Generate EXACTLY (\d+) flashcards', prompt, re.IGNORECASE)
+    if count:
+        return json.dumps(_flashcards(prompt, int(count.group(1)), rng), indent=2)
+    if 'optimal_count' in prompt:
+        return json.dumps({'optimal_count': rng.randint(8, 30), 'reasoning': 'Based on the amount of distinct content'})
+    if 'flashcard_count' in prompt:
+        return json.dumps(_topics(prompt, rng))
+    words = re.findall(r'[A-Za-z]{4,}', _content_section(prompt))[:4] or ['Study', 'Notes']
+    return ' '.join(word.capitalize() for word in words)
+
+
+class StubConfig:
+    """Latency and failure injection settings for the stub server"""
+
+    def __init__(self, latency: float = 0.5, jitter: float = 0.2, tokens_per_second: float = 0,
+                 rate_limit_rate: float = 0, error_rate: float = 0, truncate_rate: float = 0, seed: int = 0):
+        self.latency = latency                      # Seconds before the first byte of a response
+        self.jitter = jitter                        # +/- random variation of the latency
+        self.tokens_per_second = tokens_per_second  # Streaming speed (0 = as fast as possible)
+        self.rate_limit_rate = rate_limit_rate      # Fraction of requests answered with 429
+        self.error_rate = error_rate                # Fraction answered with 500
+        self.truncate_rate = truncate_rate          # Fraction cut off half way (finish_reason 'length')
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+
+    def draw(self) -> Tuple[float, float]:
+        """(failure draw, latency) for the next request"""
+        with self.lock:
+            self.requests += 1
+            return self.rng.random(), max(0.0, self.latency + self.rng.uniform(-self.jitter, self.jitter))
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    config = StubConfig()
+
+    def log_message(self, format, *args):
+        pass  # Keep benchmark output clean
+
+    def _send_json(self, status: int, body: Dict, headers: Optional[Dict] = None):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path.rstrip('/').endswith('/models'):
+            self._send_json(200, {'object': 'list', 'data': [
+                {'id': model, 'object': 'model', 'owned_by': 'stub'} for model in ('gpt-4o', 'gpt-4o-mini')
+            ]})
+        else:
+            self._send_json(404, {'error': {'message': 'Not found', 'type': 'invalid_request_error'}})
+
+    def do_POST(self):
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            self._send_json(404, {'error': {'message': 'Not found', 'type': 'invalid_request_error'}})
+            return
+        length = int(self.headers.get('Content-Length', 0))
+        request = json.loads(self.rfile.read(length) or b'{}')
+        config = self.config
+        draw, latency = config.draw()
+        time.sleep(latency)
+
+        if draw < config.rate_limit_rate:
+            self._send_json(429, {'error': {'message': 'Rate limit reached (injected by stub)', 'type': 'rate_limit_exceeded'}},
+                            {'Retry-After': '1'})
+            return
+        if draw < config.rate_limit_rate + config.error_rate:
+            self._send_json(500, {'error': {'message': 'Server error (injected by stub)', 'type': 'server_error'}})
+            return
+
+        messages = request.get('messages', [])
+        content = fake_completion(messages)
+        finish_reason = 'stop'
+        max_chars = (request.get('max_tokens') or 4096) * CHARS_PER_TOKEN
+        if draw < config.rate_limit_rate + config.error_rate + config.truncate_rate:
+            max_chars = min(max_chars, len(content) // 2)
+        if len(content) > max_chars:
+            content, finish_reason = content[:max_chars], 'length'
+
+        prompt_tokens = sum(len(m.get('content') or '') for m in messages) // CHARS_PER_TOKEN
+        completion_tokens = len(content) // CHARS_PER_TOKEN
+        usage = {'prompt_tokens': prompt_tokens, 'completion_tokens': completion_tokens,
+                 'total_tokens': prompt_tokens + completion_tokens}
+        base = {'id': f'chatcmpl-stub{config.requests}', 'created': int(time.time()), 'model': request.get('model', 'stub')}
+
+        if not request.get('stream'):
+            self._send_json(200, dict(base, object='chat.completion', usage=usage, choices=[{
+                'index': 0, 'message': {'role': 'assistant', 'content': content}, 'finish_reason': finish_reason
+            }]))
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        self.close_connection = True
+
+        def event(choices, **extra):
+            chunk = dict(base, object='chat.completion.chunk', choices=choices, **extra)
+            self.wfile.write(f'data: {json.dumps(chunk)}\n\n'.encode('utf-8'))
+            self.wfile.flush()
+
+        piece_tokens = 4
+        for i in range(0, len(content), piece_tokens * CHARS_PER_TOKEN):
+            if config.tokens_per_second:
+                time.sleep(piece_tokens / config.tokens_per_second)
+            event([{'index': 0, 'delta': {'content': content[i:i + piece_tokens * CHARS_PER_TOKEN]}, 'finish_reason': None}])
+        event([{'index': 0, 'delta': {}, 'finish_reason': finish_reason}])
+        if (request.get('stream_options') or {}).get('include_usage'):
+            event([], usage=usage)
+        self.wfile.write(b'data: [DONE]\n\n')
+        self.wfile.flush()
+
+
+def start_stub_server(host: str = '127.0.0.1', port: int = 0, **config) -> Tuple[ThreadingHTTPServer, str]:
+    """Run a stub server on a background thread; returns (server, base_url). port=0 picks a free port"""
+    handler = type('ConfiguredStubHandler', (StubHandler,), {'config': StubConfig(**config)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://{host}:{server.server_address[1]}/v1'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local stub of the OpenAI chat completions API')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--latency', type=float, default=0.5, help='seconds before each response starts')
+    parser.add_argument('--jitter', type=float, default=0.2, help='random +/- variation of the latency')
+    parser.add_argument('--tokens-per-second', type=float, default=0, help='streaming speed (0 = unlimited)')
+    parser.add_argument('--rate-limit-rate', type=float, default=0, help='fraction of requests answered with 429')
+    parser.add_argument('--error-rate', type=float, default=0, help='fraction of requests answered with 500')
+    parser.add_argument('--truncate-rate', type=float, default=0, help='fraction of responses cut off half way')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server(
+        args.host, args.port, latency=args.latency, jitter=args.jitter,
+        tokens_per_second=args.tokens_per_second, rate_limit_rate=args.rate_limit_rate,
+        error_rate=args.error_rate, truncate_rate=args.truncate_rate, seed=args.seed
+    )
+    print(f"Stub chat completions API listening on {base_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+        sys.exit(0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,226 @@
+"""
+Telemetry for LLM calls: latency, tokens and cost per project and stage.
+
+LLMClient records every call it makes - model, prompt and completion tokens
+(from response.usage, or estimated from the text when the API sent none),
+latency, retries and outcome - into a UsageLog, a rolling SQLite table
+(llm_usage.db) that keeps the most recent max_rows calls. Cache hits are
+logged too, so the hit rate per stage shows up, but they don't count
+towards latency percentiles or spend.
+
+Each call is tagged with the pipeline stage passed by its call site
+(count-suggest, name, topics, generate) and with the project it was made
+for. The project is set once with `usage_project(project_id)` around a
+unit of work and picked up by every call inside it, including calls on
+worker threads started through `in_current_context(fn)`. Calls made while
+analysing an upload, before its project exists, are tagged with the upload
+and moved to the project with assign_project() once it is created.
+"""
+
+import time
+import sqlite3
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+# USD per million tokens (input, output); override with "llm_prices" in settings.json
+DEFAULT_PRICES = {
+    'gpt-4o': {'input': 2.50, 'output': 10.00},
+    'gpt-4o-mini': {'input': 0.15, 'output': 0.60},
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_calls (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts REAL NOT NULL,
+    model TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    project TEXT,
+    outcome TEXT NOT NULL,
+    cached INTEGER NOT NULL DEFAULT 0,
+    prompt_tokens INTEGER NOT NULL DEFAULT 0,
+    completion_tokens INTEGER NOT NULL DEFAULT 0,
+    estimated INTEGER NOT NULL DEFAULT 0,
+    cost REAL NOT NULL DEFAULT 0,
+    latency_ms REAL,
+    first_token_ms REAL,
+    total_ms REAL,
+    retries INTEGER NOT NULL DEFAULT 0,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS llm_calls_project ON llm_calls (project);
+CREATE INDEX IF NOT EXISTS llm_calls_ts ON llm_calls (ts);
+"""
+
+_project = contextvars.ContextVar('llm_usage_project', default=None)
+
+
+@contextmanager
+def usage_project(project_id: Optional[str]):
+    """Tag the LLM calls made inside this block (on this thread) with a project"""
+    token = _project.set(project_id)
+    try:
+        yield
+    finally:
+        _project.reset(token)
+
+
+def current_project() -> Optional[str]:
+    return _project.get()
+
+
+def in_current_context(fn):
+    """
+    Wrap fn so that it runs with the caller's project tag when a thread pool
+    calls it (executor threads don't inherit context variables).
+    """
+    context = contextvars.copy_context()
+
+    def run(*args, **kwargs):
+        return context.copy().run(fn, *args, **kwargs)
+    return run
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile (q in 0-100) of a list of numbers, None if empty"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * q // 100))  # ceil(n * q / 100)
+    return ordered[int(rank) - 1]
+
+
+class UsageLog:
+    """Rolling SQLite log of LLM calls with per-stage and per-project summaries"""
+
+    def __init__(self, path: str = 'llm_usage.db', max_rows: int = 100000,
+                 prices: Optional[Dict[str, Dict]] = None, enabled: bool = True):
+        self.path = path
+        self.max_rows = max_rows
+        self.prices = dict(DEFAULT_PRICES, **(prices or {}))
+        self.enabled = enabled
+        self._inserts = 0
+        self._lock = threading.Lock()
+        if enabled:
+            with self._connect() as db:
+                db.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        """A connection for one transaction (committed on success, always closed)"""
+        db = sqlite3.connect(self.path, timeout=30)
+        try:
+            db.row_factory = sqlite3.Row
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('PRAGMA synchronous=NORMAL')  # Losing the last few records in a crash is fine
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def cost(self, model: str, prompt_tokens: int, completion_tokens: int) -> float:
+        """Price in USD of a call; models without a price cost 0"""
+        price = self.prices.get(model)
+        if price is None:
+            # Dated snapshots (gpt-4o-2024-08-06) are priced like their base model
+            matches = [name for name in self.prices if model.startswith(name)]
+            price = self.prices[max(matches, key=len)] if matches else {}
+        return (prompt_tokens * price.get('input', 0) + completion_tokens * price.get('output', 0)) / 1e6
+
+    def record(self, model: str, stage: str, outcome: str, prompt_tokens: int = 0, completion_tokens: int = 0,
+               estimated: bool = False, cached: bool = False, latency_ms: Optional[float] = None,
+               first_token_ms: Optional[float] = None, total_ms: Optional[float] = None,
+               retries: int = 0, error: Optional[str] = None, project: Optional[str] = None):
+        """Log one call. Never raises: telemetry must not break generation"""
+        if not self.enabled:
+            return
+        if project is None:
+            project = current_project()
+        cost = 0.0 if cached else self.cost(model, prompt_tokens, completion_tokens)
+        try:
+            with self._connect() as db:
+                db.execute(
+                    "INSERT INTO llm_calls (ts, model, stage, project, outcome, cached, prompt_tokens, completion_tokens, "
+                    "estimated, cost, latency_ms, first_token_ms, total_ms, retries, error) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (time.time(), model, stage, project, outcome, int(cached), prompt_tokens, completion_tokens,
+                     int(estimated), cost, latency_ms, first_token_ms, total_ms, retries, error and error[:500])
+                )
+                with self._lock:
+                    self._inserts += 1
+                    prune = self._inserts % 1000 == 0
+                if prune:
+                    db.execute("DELETE FROM llm_calls WHERE id <= (SELECT MAX(id) FROM llm_calls) - ?", (self.max_rows,))
+        except Exception as e:
+            print(f"Error recording LLM usage: {e}")
+
+    def assign_project(self, old: str, new: str):
+        """Move calls tagged with a temporary ID (an upload) to the project created from it"""
+        if not self.enabled:
+            return
+        with self._connect() as db:
+            db.execute("UPDATE llm_calls SET project = ? WHERE project = ?", (new, old))
+
+    def calls(self, project: Optional[str] = None, stage: Optional[str] = None,
+              since: Optional[float] = None, limit: Optional[int] = None) -> List[Dict]:
+        """Logged calls, newest first, optionally filtered"""
+        if not self.enabled:
+            return []
+        query = "SELECT * FROM llm_calls WHERE 1 = 1"
+        args = []
+        if project is not None:
+            query += " AND project = ?"
+            args.append(project)
+        if stage is not None:
+            query += " AND stage = ?"
+            args.append(stage)
+        if since is not None:
+            query += " AND ts >= ?"
+            args.append(since)
+        query += " ORDER BY id DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            args.append(limit)
+        with self._connect() as db:
+            return [dict(row) for row in db.execute(query, args)]
+
+    def clear(self):
+        if self.enabled:
+            with self._connect() as db:
+                db.execute("DELETE FROM llm_calls")
+
+    @staticmethod
+    def _summarize(calls: List[Dict]) -> Dict:
+        api_calls = [c for c in calls if not c['cached']]
+        latencies = [c['latency_ms'] for c in api_calls if c['latency_ms'] is not None and c['outcome'] != 'error']
+        first_tokens = [c['first_token_ms'] for c in api_calls if c['first_token_ms'] is not None]
+        totals = [c['total_ms'] for c in api_calls if c['total_ms'] is not None]
+        return {
+            'calls': len(calls),
+            'api_calls': len(api_calls),
+            'cache_hits': len(calls) - len(api_calls),
+            'errors': sum(1 for c in calls if c['outcome'] in ('error', 'rate_limited')),
+            'truncated': sum(1 for c in calls if c['outcome'] == 'truncated'),
+            'retries': sum(c['retries'] for c in calls),
+            'prompt_tokens': sum(c['prompt_tokens'] for c in api_calls),
+            'completion_tokens': sum(c['completion_tokens'] for c in api_calls),
+            'estimated_calls': sum(1 for c in api_calls if c['estimated']),
+            'cost_usd': round(sum(c['cost'] for c in api_calls), 6),
+            'latency_p50_ms': percentile(latencies, 50),
+            'latency_p95_ms': percentile(latencies, 95),
+            'first_token_p50_ms': percentile(first_tokens, 50),
+            'total_p95_ms': percentile(totals, 95),
+        }
+
+    def summary(self, project: Optional[str] = None, since: Optional[float] = None) -> Dict:
+        """Totals and latency percentiles overall, per stage, per model and per project"""
+        calls = self.calls(project=project, since=since)
+        groups = {'stages': 'stage', 'models': 'model', 'projects': 'project'}
+        result = {'total': self._summarize(calls)}
+        for name, field in groups.items():
+            grouped = {}
+            for call in calls:
+                grouped.setdefault(call[field] or '(none)', []).append(call)
+            result[name] = {key: self._summarize(group) for key, group in sorted(grouped.items())}
+        return result
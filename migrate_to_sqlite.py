@@ -0,0 +1,114 @@
+"""
+Migration Script: Convert JSON Project Storage to SQLite
+
+This script moves each project's flashcards.json, mastery.json, excluded.json
+and history.json (plus any pending journal entries, and cards kept in a binary
+file or per-topic shards) into a single project.db and switches the project
+to the SQLite storage engine.
+
+Safe to run multiple times - projects already using SQLite are skipped.
+
+Usage:
+    python migrate_to_sqlite.py                 # migrate every project
+    python migrate_to_sqlite.py <project-id>... # migrate selected projects
+"""
+
+import os
+import sys
+import json
+import shutil
+from atomic_writes import atomic_write_json
+from project_manager import ProjectManager, Project
+
+
+def migrate_project(project: Project) -> bool:
+    """Copy one project's JSON files into SQLite and update its metadata"""
+    if project.storage_engine == 'sqlite':
+        print(f"[OK] {project.name}: already using SQLite")
+        return True
+
+    # Read everything through the JSON engine
+    project.load_flashcards()
+    project.load_mastery()
+    project.load_excluded()
+    project.load_history()
+
+    # Write everything through the SQLite engine
+    sqlite_project = Project(project.id, project.name, project.folder, 'sqlite')
+    sqlite_project.flashcards = project.flashcards
+    sqlite_project.mastery = project.mastery
+    sqlite_project.excluded = project.excluded
+    sqlite_project.history = project.history
+    sqlite_project.storage.save_flashcards(sqlite_project.flashcards)
+    sqlite_project.storage.save_mastery(sqlite_project.mastery)
+    sqlite_project.storage.save_excluded(sqlite_project.excluded)
+    sqlite_project.storage.save_history(sqlite_project._serialize_history())
+
+    # Verify before switching over
+    counts = (
+        len(sqlite_project.load_flashcards()),
+        len(sqlite_project.load_mastery()),
+        len(sqlite_project.load_excluded()),
+    )
+    expected = (len(project.flashcards), len(project.mastery), len(project.excluded))
+    if counts != expected:
+        print(f"[ERROR] {project.name}: verification failed (expected {expected}, got {counts})")
+        sqlite_project.storage.close()
+        os.remove(sqlite_project.storage.db_path)
+        return False
+    sqlite_project.storage.close()
+
+    # Switch the project to SQLite, preserving the rest of its metadata
+    with open(project.project_meta_path, 'r', encoding='utf-8') as f:
+        metadata = json.load(f)
+    metadata['storage_engine'] = 'sqlite'
+    atomic_write_json(project.project_meta_path, metadata)
+
+    # Back up the JSON files (and the journal, binary card file or card shards, if the project used them)
+    project.storage.close()
+    for path in (project.flashcards_path, os.path.join(project.folder, 'flashcards.bin'),
+                 os.path.join(project.folder, 'cards'),
+                 project.mastery_path, project.excluded_path, project.history_path,
+                 os.path.join(project.folder, 'journal.log')):
+        if os.path.exists(path):
+            shutil.move(path, path + '.backup')
+
+    print(f"[OK] {project.name}: migrated {expected[0]} flashcards, "
+          f"{expected[1]} mastered and {expected[2]} excluded cards")
+    return True
+
+
+def migrate(project_ids=None, projects_root: str = 'projects') -> bool:
+    """Migrate the given projects (or all projects) to SQLite storage"""
+
+    print("\n" + "="*60)
+    print("MIGRATION: Converting Project Storage to SQLite")
+    print("="*60 + "\n")
+
+    pm = ProjectManager(projects_root)
+    project_ids = project_ids or list(pm.projects.keys())
+
+    success = True
+    for project_id in project_ids:
+        project = pm.get_project(project_id)
+        if not project:
+            print(f"[ERROR] Project not found: {project_id}")
+            success = False
+            continue
+        try:
+            success = migrate_project(project) and success
+        except Exception as e:
+            print(f"[ERROR] {project.name}: migration failed: {e}")
+            success = False
+
+    print()
+    if success:
+        print("[SUCCESS] MIGRATION COMPLETED SUCCESSFULLY!")
+        print("Original JSON files (and the cards/ folder of sharded projects) have been backed up with .backup extension\n")
+    else:
+        print("[ERROR] Some projects could not be migrated. Their JSON files are untouched.\n")
+    return success
+
+
+if __name__ == '__main__':
+    migrate(sys.argv[1:])
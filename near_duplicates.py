@@ -0,0 +1,144 @@
+"""
+Near-duplicate detection for flashcard questions (MinHash with LSH banding).
+
+When every AI-extracted topic is generated from the same combined text, the
+model tends to ask the same questions under several topics, worded slightly
+differently. Comparing every pair of cards is quadratic, so each question is
+reduced to a MinHash signature over its content words and word pairs, and the
+signature is split into bands: only questions that share a whole band are
+compared, and a pair counts as a duplicate when the Jaccard similarity of
+those sets reaches the threshold. A question that is negated and one that
+isn't ("X is not Y" / "X is Y", often a true/false pair) are never
+duplicates, however much wording they share.
+
+NearDuplicateIndex is incremental, so cards can be checked as they arrive
+during generation; find_near_duplicates() runs it over a finished deck.
+"""
+
+import re
+import struct
+import hashlib
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+from text_chunker import normalize_question
+
+# Words that carry no meaning of their own in a question
+STOP_WORDS = frozenset("""
+    a an the of in on at to for from by with about into as and or but
+    is are was were be been being do does did has have had can could should would will may might must
+    what which who whom whose when where why how this that these those it its
+    there their they them he she his her we our you your i
+    true false yes following statement best most
+""".split())
+
+# Words that turn a statement around (kept as content words, see is_negated)
+NEGATION_WORDS = frozenset('not no never none nor neither cannot'.split())
+_CONTRACTED_NOT = re.compile(r"n['\u2019]t\b", re.IGNORECASE)
+
+
+def shingles(question: str) -> frozenset:
+    """
+    The content words of a question and each pair of adjacent content words,
+    after normalizing, dropping stop words and folding plural endings. Single
+    words let rewordings ("the primary function of mitochondria" / "the main
+    function of the mitochondria") overlap; pairs keep questions that only
+    share a frame ("the function of mitochondria" / "the function of
+    ribosomes") apart.
+    """
+    words = []
+    for word in normalize_question(_CONTRACTED_NOT.sub(' not', question)).split():
+        if word in STOP_WORDS:
+            continue
+        if len(word) > 4 and word.endswith('ies'):
+            word = word[:-3] + 'y'
+        elif len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+            word = word[:-1]
+        words.append(word)
+    return frozenset(words) | frozenset(f'{a} {b}' for a, b in zip(words, words[1:]))
+
+
+def is_negated(shingle_set: frozenset) -> bool:
+    return not NEGATION_WORDS.isdisjoint(shingle_set)
+
+
+def jaccard(a: frozenset, b: frozenset) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class NearDuplicateIndex:
+    """
+    Questions seen so far, bucketed by LSH band. With the defaults (32 bands
+    of 3 rows) a pair at 0.5 Jaccard similarity is compared 99% of the time
+    and one at 0.1 only 3% of the time.
+    """
+
+    def __init__(self, threshold: float = 0.5, bands: int = 32, rows: int = 3):
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = rows
+        self._row_format = f'<{bands * rows}I'
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], List[Hashable]] = {}
+        self._shingles: Dict[Hashable, frozenset] = {}
+
+    def __len__(self):
+        return len(self._shingles)
+
+    def _signature(self, shingle_set: frozenset) -> List[int]:
+        # One extendable-output hash per shingle gives it a value under each of the
+        # bands * rows hash functions; the signature is the minimum of each
+        size = 4 * self.bands * self.rows
+        rows = [struct.unpack(self._row_format, hashlib.shake_128(s.encode('utf-8')).digest(size))
+                for s in shingle_set] or [(0,) * (self.bands * self.rows)]
+        return list(map(min, zip(*rows)))
+
+    def _bands(self, signature: List[int]):
+        for band in range(self.bands):
+            yield band, tuple(signature[band * self.rows:(band + 1) * self.rows])
+
+    def find(self, question: str) -> Optional[Hashable]:
+        """Key of an indexed question that this one nearly duplicates, or None"""
+        return self._find(shingles(question))[0]
+
+    def _find(self, shingle_set: frozenset):
+        bands = list(self._bands(self._signature(shingle_set)))
+        negated = is_negated(shingle_set)
+        checked = set()
+        for band in bands:
+            for key in self._buckets.get(band, ()):
+                if key not in checked:
+                    checked.add(key)
+                    other = self._shingles[key]
+                    if is_negated(other) == negated and jaccard(shingle_set, other) >= self.threshold:
+                        return key, bands
+        return None, bands
+
+    def add(self, key: Hashable, question: str) -> Optional[Hashable]:
+        """
+        Index a question unless it nearly duplicates one already indexed.
+        Returns the key of that earlier question (and does not index this
+        one), or None if the question was added.
+        """
+        shingle_set = shingles(question)
+        duplicate_of, bands = self._find(shingle_set)
+        if duplicate_of is not None:
+            return duplicate_of
+        self._shingles[key] = shingle_set
+        for band in bands:
+            self._buckets.setdefault(band, []).append(key)
+        return None
+
+
+def find_near_duplicates(cards: Sequence[Dict], threshold: float = 0.5) -> Dict[int, int]:
+    """
+    Map the position of each card that nearly duplicates an earlier card to
+    the position of the card it duplicates (the first of each group is kept).
+    """
+    index = NearDuplicateIndex(threshold)
+    duplicates = {}
+    for position, card in enumerate(cards):
+        duplicate_of = index.add(position, card['question'])
+        if duplicate_of is not None:
+            duplicates[position] = duplicate_of
+    return duplicates
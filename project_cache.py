@@ -0,0 +1,90 @@
+"""
+Shared bookkeeping for project data held in memory.
+
+Each Project keeps its parsed collections (flashcards, mastery, excluded,
+history) together with the storage version they were read at, and only
+re-parses when that version changes on disk. This module tracks how much
+parsed data all projects are holding, counts cache hits and misses, and
+asks the least recently used projects to release collections once the
+total passes max_bytes. Released collections are re-read transparently the
+next time they are accessed.
+
+Sizes are estimated from the on-disk size of each collection.
+"""
+
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Dict
+
+
+class ProjectCache:
+    """LRU accounting of parsed project collections across all projects"""
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # (id(project), collection) -> (project ref, collection, size)
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def record_hit(self, project, collection: str):
+        """Note that a project served a collection from memory"""
+        with self._lock:
+            self.hits += 1
+            key = (id(project), collection)
+            if key in self._entries:
+                self._entries.move_to_end(key)
+
+    def admit(self, project, collection: str, size: int, miss: bool = True):
+        """Track a freshly read or written collection and evict others if over budget"""
+        with self._lock:
+            if miss:
+                self.misses += 1
+            key = (id(project), collection)
+            old = self._entries.pop(key, None)
+            if old:
+                self._total_bytes -= old[2]
+            self._entries[key] = (weakref.ref(project), collection, size)
+            self._total_bytes += size
+            self._evict(keep=key)
+
+    def forget(self, project, collection: str = None):
+        """Stop tracking a project's collections (e.g. when the project is deleted)"""
+        with self._lock:
+            for key in list(self._entries):
+                if key[0] == id(project) and (collection is None or key[1] == collection):
+                    self._total_bytes -= self._entries.pop(key)[2]
+
+    def _evict(self, keep):
+        # Walk from least recently used; projects busy in another thread are skipped
+        for key in list(self._entries):
+            if self._total_bytes <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            ref, collection, size = self._entries[key]
+            project = ref()
+            if project is not None and not project._release(collection):
+                continue
+            del self._entries[key]
+            self._total_bytes -= size
+            self.evictions += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': (self.hits / lookups * 100) if lookups else 0,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self._total_bytes,
+                'max_bytes': self.max_bytes
+            }
+
+
+project_cache = ProjectCache()
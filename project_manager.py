@@ -7,31 +7,104 @@ mastery tracking, and statistics.
 
 import os
 import json
+import time
 import hashlib
+import threading
+import uuid
+from collections.abc import MutableMapping
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, List, Optional
 
+from atomic_writes import durable_writer
+from project_storage import create_storage
+from project_cache import project_cache
+
+
+COLLECTIONS = ('flashcards', 'mastery', 'excluded', 'history')
+
+
+def question_hash(question: str) -> str:
+    """MD5 of a card's question (the original card key, still used as the ID of older cards)"""
+    return hashlib.md5(question.encode('utf-8')).hexdigest()
+
+
+def new_card_id() -> str:
+    """ID for a newly generated card; stays with the card even if its question is edited"""
+    return uuid.uuid4().hex
+
+
+def _empty_collection(collection: str):
+    if collection == 'flashcards':
+        return []
+    if collection == 'history':
+        return {'exam_history': {}, 'study_history': {}, 'all_time_scores': {}}
+    return {}
+
+
+def _collection_property(collection: str):
+    """Data attribute that is loaded on first access, and re-loaded after the cache releases it"""
+    def getter(self):
+        with self._lock:
+            if self._data[collection] is None:
+                getattr(self, f'load_{collection}')()
+            if self._data[collection] is None:
+                self._data[collection] = _empty_collection(collection)
+            return self._data[collection]
+    
+    def setter(self, value):
+        with self._lock:
+            self._data[collection] = value
+            self._versions[collection] = None  # No longer matches what is stored
+    
+    return property(getter, setter)
+
 
 class Project:
     """Represents a single flashcard project"""
     
-    def __init__(self, project_id: str, name: str, folder_path: str):
+    flashcards = _collection_property('flashcards')
+    mastery = _collection_property('mastery')
+    excluded = _collection_property('excluded')
+    history = _collection_property('history')
+    
+    def __init__(self, project_id: str, name: str, folder_path: str, storage_engine: str = 'json',
+                 create_folders: bool = True, card_format: str = 'json'):
         self.id = project_id
         self.name = name
         self.folder = folder_path
-        self.flashcards = []
-        self.mastery = {}
-        self.excluded = {}
-        self.history = {'exam_history': {}, 'study_history': {}, 'all_time_scores': {}}
+        self.storage = create_storage(storage_engine, folder_path, card_format)
+        
+        # Parsed collections and the storage version they were read at (see project_cache)
+        self._lock = threading.RLock()
+        self._data = dict.fromkeys(COLLECTIONS)
+        self._versions = dict.fromkeys(COLLECTIONS)
+        
+        # Card lookups (id -> position, question hash -> id), built once per loaded deck
+        self._card_index = None
+        self._card_index_source = None
+        self._unsaved_card_ids = False
+        
+        # Called as on_change(project, collection) after every successful save
+        self.on_change = None
         
-        # Ensure project folder structure exists
-        self._ensure_folder_structure()
+        # Ensure project folder structure exists (skipped for projects found on disk)
+        if create_folders:
+            self._ensure_folder_structure()
     
     def _ensure_folder_structure(self):
         """Create project folder structure if it doesn't exist"""
         os.makedirs(self.folder, exist_ok=True)
         os.makedirs(os.path.join(self.folder, 'documents'), exist_ok=True)
     
+    @property
+    def storage_engine(self) -> str:
+        return self.storage.name
+    
+    @property
+    def card_format(self) -> str:
+        return self.storage.card_format
+    
     @property
     def flashcards_path(self) -> str:
         return os.path.join(self.folder, 'flashcards.json')
@@ -56,137 +129,344 @@ class Project:
     def documents_folder(self) -> str:
         return os.path.join(self.folder, 'documents')
     
+    def _load_cached(self, collection: str, read):
+        """Return the collection, calling read() only if storage changed since it was last read"""
+        with self._lock:
+            version = self.storage.version(collection)
+            if (version is not None and version == self._versions[collection]
+                    and self._data[collection] is not None):
+                project_cache.record_hit(self, collection)
+                return self._data[collection]
+            data = read()
+            if data is not None:
+                self._data[collection] = data
+                self._versions[collection] = version
+                project_cache.admit(self, collection, self.storage.size_hint(collection))
+            return data
+    
+    def _mark_saved(self, collection: str, data):
+        """Record that data is now what storage holds for the collection"""
+        self._data[collection] = data
+        self._versions[collection] = self.storage.version(collection)
+        if collection == 'flashcards':
+            self._card_index_source = None  # The deck may have been changed in place
+        project_cache.admit(self, collection, self.storage.size_hint(collection), miss=False)
+        if self.on_change:
+            self.on_change(self, collection)
+    
+    def _release(self, collection: str) -> bool:
+        """Drop a collection from memory (called by the project cache). Returns False if busy."""
+        if not self._lock.acquire(blocking=False):
+            return False
+        try:
+            # Never drop changes that haven't been saved yet
+            if self._versions[collection] is not None:
+                self._data[collection] = None
+                self._versions[collection] = None
+            return True
+        finally:
+            self._lock.release()
+    
+    def _read_flashcards(self) -> Optional[List[Dict]]:
+        return self._complete_cards(self.storage.load_flashcards())
+    
+    def _complete_cards(self, flashcards):
+        """Fill in fields older cards are missing: answer_type and a stable id"""
+        if flashcards and not isinstance(flashcards, list) and 'id' not in flashcards[0]:
+            # Binary card files written before IDs existed; decode once so IDs can be saved
+            flashcards = list(flashcards)
+        if isinstance(flashcards, list):
+            for card in flashcards:
+                if 'answer_type' not in card:
+                    card['answer_type'] = self._get_answer_type(card.get('answer', ''))
+                if 'id' not in card:
+                    # The question hash is what mastery and exclusion records are already keyed by
+                    card['id'] = question_hash(card['question'])
+                    self._unsaved_card_ids = True
+        return flashcards
+    
+    def _card_indexes(self):
+        """(id -> position, question hash -> id) for the current deck"""
+        with self._lock:
+            flashcards = self.flashcards
+            if self._card_index_source is not flashcards:
+                by_id, by_question = {}, {}
+                for position, card in enumerate(flashcards):
+                    card_id = card.get('id') or question_hash(card['question'])
+                    by_id.setdefault(card_id, position)
+                    by_question.setdefault(question_hash(card['question']), card_id)
+                self._card_index = (by_id, by_question)
+                self._card_index_source = flashcards
+            return self._card_index
+    
+    def get_card(self, card_id: str) -> Optional[Dict]:
+        """Look up a card by its ID"""
+        with self._lock:
+            by_id, _ = self._card_indexes()
+            position = by_id.get(card_id)
+            return self.flashcards[position] if position is not None else None
+    
+    def find_card_id(self, question: str) -> Optional[str]:
+        """ID of the card with the given question text"""
+        _, by_question = self._card_indexes()
+        return by_question.get(question_hash(question))
+    
+    def _loaded_flashcards(self) -> Optional[List[Dict]]:
+        """Flashcards already parsed in memory and still current, or None"""
+        flashcards = self._data['flashcards']
+        if isinstance(flashcards, list) and self._versions['flashcards'] in (None, self.storage.version('flashcards')):
+            return flashcards
+        return None
+    
+    def get_topic_counts(self) -> Dict[str, int]:
+        """Number of cards per topic, without reading the cards when storage keeps counts"""
+        with self._lock:
+            flashcards = self._loaded_flashcards()
+            counts = self.storage.load_topic_counts() if flashcards is None else None
+            if counts is None:
+                counts = {}
+                for card in (flashcards if flashcards is not None else self.flashcards):
+                    counts[card['topic']] = counts.get(card['topic'], 0) + 1
+            return counts
+    
+    def get_topic_flashcards(self, topics) -> List[Dict]:
+        """Cards belonging to the given topics, reading only those topics when storage allows"""
+        with self._lock:
+            flashcards = self._loaded_flashcards()
+            if flashcards is None:
+                selected = self.storage.load_flashcards_for_topics(topics)
+                if selected is not None:
+                    return self._complete_cards(selected)
+                flashcards = self.flashcards
+            topics = set(topics)
+            return [card for card in flashcards if card['topic'] in topics]
+    
     def load_flashcards(self) -> List[Dict]:
-        """Load flashcards from project folder"""
+        """Load flashcards from project storage"""
         try:
-            if os.path.exists(self.flashcards_path):
-                with open(self.flashcards_path, 'r', encoding='utf-8') as f:
-                    self.flashcards = json.load(f)
-                    # Add answer_type to existing flashcards if missing
-                    for card in self.flashcards:
-                        if 'answer_type' not in card:
-                            card['answer_type'] = self._get_answer_type(card.get('answer', ''))
-                return self.flashcards
+            with self._lock:
+                flashcards = self._load_cached('flashcards', self._read_flashcards)
+                if self._unsaved_card_ids:
+                    # Persist the IDs given to older cards so they never need hashing again
+                    self._unsaved_card_ids = False
+                    self.save_flashcards()
+            if flashcards is not None:
+                return flashcards
         except Exception as e:
             print(f"Error loading flashcards for project {self.name}: {e}")
         return []
     
     def save_flashcards(self):
-        """Save flashcards to project folder"""
-        try:
-            with open(self.flashcards_path, 'w', encoding='utf-8') as f:
-                json.dump(self.flashcards, f, indent=2)
-        except Exception as e:
-            print(f"Error saving flashcards for project {self.name}: {e}")
+        """Save flashcards to project storage"""
+        with self._lock:
+            try:
+                flashcards = self._complete_cards(self.flashcards)
+                self._unsaved_card_ids = False
+                self.storage.save_flashcards(flashcards)
+                self._mark_saved('flashcards', flashcards)
+            except Exception as e:
+                print(f"Error saving flashcards for project {self.name}: {e}")
+    
+    def add_flashcards(self, cards: List[Dict]):
+        """
+        Append cards to the deck in memory (save_flashcards() persists them).
+        The deck is marked unsaved, so the project cache keeps it loaded, and a
+        binary card file (read-only) is decoded into a list first.
+        """
+        with self._lock:
+            flashcards = self.flashcards
+            if not isinstance(flashcards, list):
+                flashcards = list(flashcards)
+            flashcards.extend(cards)
+            self.flashcards = flashcards
+            self._card_index_source = None
     
     def load_mastery(self) -> Dict:
-        """Load mastery data from project folder"""
+        """Load mastery data from project storage"""
         try:
-            if os.path.exists(self.mastery_path):
-                with open(self.mastery_path, 'r', encoding='utf-8') as f:
-                    self.mastery = json.load(f)
-                return self.mastery
+            mastery = self._load_cached('mastery', self.storage.load_mastery)
+            if mastery is not None:
+                return mastery
         except Exception as e:
             print(f"Error loading mastery for project {self.name}: {e}")
         return {}
     
     def save_mastery(self):
-        """Save mastery data to project folder"""
-        try:
-            with open(self.mastery_path, 'w', encoding='utf-8') as f:
-                json.dump(self.mastery, f, indent=2)
-        except Exception as e:
-            print(f"Error saving mastery for project {self.name}: {e}")
+        """Save all mastery data to project storage"""
+        with self._lock:
+            try:
+                mastery = self.mastery
+                self.storage.save_mastery(mastery)
+                self._mark_saved('mastery', mastery)
+            except Exception as e:
+                print(f"Error saving mastery for project {self.name}: {e}")
+    
+    def update_mastery(self, records: Dict[str, Dict]):
+        """Add or replace mastery records (card_hash -> record) and persist only those rows"""
+        with self._lock:
+            mastery = self.mastery
+            mastery.update(records)
+            try:
+                self.storage.put_mastery(mastery, list(records))
+                self._mark_saved('mastery', mastery)
+            except Exception as e:
+                print(f"Error saving mastery for project {self.name}: {e}")
+    
+    def remove_mastery(self, card_hashes: List[str]) -> int:
+        """Remove mastery records and persist only those rows. Returns number removed."""
+        with self._lock:
+            mastery = self.mastery
+            removed = [h for h in card_hashes if mastery.pop(h, None) is not None]
+            if removed:
+                try:
+                    self.storage.delete_mastery(mastery, removed)
+                    self._mark_saved('mastery', mastery)
+                except Exception as e:
+                    print(f"Error saving mastery for project {self.name}: {e}")
+            return len(removed)
     
     def load_excluded(self) -> Dict:
-        """Load excluded cards data from project folder"""
+        """Load excluded cards data from project storage"""
         try:
-            if os.path.exists(self.excluded_path):
-                with open(self.excluded_path, 'r', encoding='utf-8') as f:
-                    self.excluded = json.load(f)
-                return self.excluded
+            excluded = self._load_cached('excluded', self.storage.load_excluded)
+            if excluded is not None:
+                return excluded
         except Exception as e:
             print(f"Error loading excluded cards for project {self.name}: {e}")
         return {}
     
     def save_excluded(self):
-        """Save excluded cards data to project folder"""
-        try:
-            with open(self.excluded_path, 'w', encoding='utf-8') as f:
-                json.dump(self.excluded, f, indent=2)
-        except Exception as e:
-            print(f"Error saving excluded cards for project {self.name}: {e}")
+        """Save all excluded cards data to project storage"""
+        with self._lock:
+            try:
+                excluded = self.excluded
+                self.storage.save_excluded(excluded)
+                self._mark_saved('excluded', excluded)
+            except Exception as e:
+                print(f"Error saving excluded cards for project {self.name}: {e}")
+    
+    def update_excluded(self, records: Dict[str, Dict]):
+        """Add or replace exclusion records (card_hash -> record) and persist only those rows"""
+        with self._lock:
+            excluded = self.excluded
+            excluded.update(records)
+            try:
+                self.storage.put_excluded(excluded, list(records))
+                self._mark_saved('excluded', excluded)
+            except Exception as e:
+                print(f"Error saving excluded cards for project {self.name}: {e}")
+    
+    def remove_excluded(self, card_hashes: List[str]) -> int:
+        """Remove exclusion records and persist only those rows. Returns number removed."""
+        with self._lock:
+            excluded = self.excluded
+            removed = [h for h in card_hashes if excluded.pop(h, None) is not None]
+            if removed:
+                try:
+                    self.storage.delete_excluded(excluded, removed)
+                    self._mark_saved('excluded', excluded)
+                except Exception as e:
+                    print(f"Error saving excluded cards for project {self.name}: {e}")
+            return len(removed)
+    
+    def _read_history(self) -> Optional[Dict]:
+        history = self.storage.load_history()
+        if history is None:
+            return None
+        # Convert string dates back to datetime objects
+        return {
+            'exam_history': {
+                datetime.fromisoformat(k): v 
+                for k, v in history.get('exam_history', {}).items()
+            },
+            'study_history': {
+                datetime.fromisoformat(k): v 
+                for k, v in history.get('study_history', {}).items()
+            },
+            'all_time_scores': history.get('all_time_scores', {})
+        }
     
     def load_history(self) -> Dict:
-        """Load history from project folder"""
+        """Load history from project storage"""
         try:
-            if os.path.exists(self.history_path):
-                with open(self.history_path, 'r', encoding='utf-8') as f:
-                    history = json.load(f)
-                    # Convert string dates back to datetime objects
-                    from datetime import datetime
-                    self.history = {
-                        'exam_history': {
-                            datetime.fromisoformat(k): v 
-                            for k, v in history.get('exam_history', {}).items()
-                        },
-                        'study_history': {
-                            datetime.fromisoformat(k): v 
-                            for k, v in history.get('study_history', {}).items()
-                        },
-                        'all_time_scores': history.get('all_time_scores', {})
-                    }
-                return self.history
+            history = self._load_cached('history', self._read_history)
+            if history is not None:
+                return history
         except Exception as e:
             print(f"Error loading history for project {self.name}: {e}")
         return {'exam_history': {}, 'study_history': {}, 'all_time_scores': {}}
     
+    def _serialize_history(self, history: Dict = None) -> Dict:
+        """Convert datetime keys to ISO format strings"""
+        history = self.history if history is None else history
+        return {
+            'exam_history': {
+                k.isoformat() if isinstance(k, datetime) else k: v 
+                for k, v in history.get('exam_history', {}).items()
+            },
+            'study_history': {
+                k.isoformat() if isinstance(k, datetime) else k: v 
+                for k, v in history.get('study_history', {}).items()
+            },
+            'all_time_scores': history.get('all_time_scores', {})
+        }
+    
     def save_history(self):
-        """Save history to project folder"""
-        try:
-            # Convert datetime objects to ISO format strings
-            history_to_save = {
-                'exam_history': {
-                    k.isoformat() if isinstance(k, datetime) else k: v 
-                    for k, v in self.history.get('exam_history', {}).items()
-                },
-                'study_history': {
-                    k.isoformat() if isinstance(k, datetime) else k: v 
-                    for k, v in self.history.get('study_history', {}).items()
-                },
-                'all_time_scores': self.history.get('all_time_scores', {})
-            }
-            with open(self.history_path, 'w', encoding='utf-8') as f:
-                json.dump(history_to_save, f, indent=2)
-        except Exception as e:
-            print(f"Error saving history for project {self.name}: {e}")
+        """Save history to project storage"""
+        with self._lock:
+            try:
+                history = self.history
+                self.storage.save_history(self._serialize_history(history))
+                self._mark_saved('history', history)
+            except Exception as e:
+                print(f"Error saving history for project {self.name}: {e}")
+    
+    def add_history_entry(self, kind: str, timestamp: datetime, entry: Dict):
+        """Record one study or exam session ('study_history'/'exam_history') and persist only that entry"""
+        with self._lock:
+            history = self.history
+            history.setdefault(kind, {})[timestamp] = entry
+            try:
+                self.storage.append_history(kind, timestamp.isoformat(), entry,
+                                            lambda: self._serialize_history(history))
+                self._mark_saved('history', history)
+            except Exception as e:
+                print(f"Error saving history for project {self.name}: {e}")
     
     def save_metadata(self):
         """Save project metadata"""
         metadata = {
             'id': self.id,
             'name': self.name,
+            'storage_engine': self.storage_engine,
+            'card_format': self.card_format,
             'created_at': datetime.now().isoformat(),
             'last_accessed': datetime.now().isoformat()
         }
         try:
-            with open(self.project_meta_path, 'w', encoding='utf-8') as f:
-                json.dump(metadata, f, indent=2)
+            durable_writer.write_json(self.project_meta_path, metadata)
         except Exception as e:
             print(f"Error saving metadata for project {self.name}: {e}")
     
-    def get_stats(self) -> Dict:
-        """Get project statistics"""
-        topics = sorted(set(card['topic'] for card in self.flashcards)) if self.flashcards else []
-        stats = {
-            'total_flashcards': len(self.flashcards),
-            'mastered_count': len(self.mastery),
-            'excluded_count': len(self.excluded),
-            'mastery_percentage': (len(self.mastery) / len(self.flashcards) * 100) if self.flashcards else 0,
-            'total_topics': len(topics),
-            'total_sessions': len(self.history.get('study_history', {})) + len(self.history.get('exam_history', {})),
-            'topics': topics
-        }
+    def get_stats(self, collections=COLLECTIONS) -> Dict:
+        """Get project statistics (only the parts derived from the given collections)"""
+        stats = {}
+        if 'flashcards' in collections:
+            topic_counts = self.get_topic_counts()
+            stats.update({
+                'total_flashcards': sum(topic_counts.values()),
+                'total_topics': len(topic_counts),
+                'topics': sorted(topic_counts)
+            })
+        if 'mastery' in collections:
+            stats['mastered_count'] = len(self.mastery)
+        if 'excluded' in collections:
+            stats['excluded_count'] = len(self.excluded)
+        if 'history' in collections:
+            stats['total_sessions'] = len(self.history.get('study_history', {})) + len(self.history.get('exam_history', {}))
+        if 'flashcards' in collections and 'mastery' in collections:
+            total = stats['total_flashcards']
+            stats['mastery_percentage'] = (len(self.mastery) / total * 100) if total else 0
         return stats
     
     def _get_answer_type(self, correct_answer: str) -> str:
@@ -204,44 +484,216 @@ class Project:
             return 'multiple_choice'
 
 
+class LazyProjects(MutableMapping):
+    """
+    Project registry that only builds a Project the first time it is accessed.
+
+    Discovered projects are registered with their metadata; membership tests,
+    len() and iterating over IDs never materialize them.
+    """
+    
+    def __init__(self, factory):
+        self._factory = factory  # factory(metadata, folder_path) -> Project
+        self._entries: Dict[str, object] = {}  # project_id -> Project or (metadata, folder_path)
+        self._lock = threading.Lock()
+    
+    def add_discovered(self, metadata: Dict, folder_path: str):
+        self._entries[metadata['id']] = (metadata, folder_path)
+    
+    def name(self, project_id: str) -> str:
+        """Project name without materializing the project"""
+        entry = self._entries[project_id]
+        return entry.name if isinstance(entry, Project) else entry[0]['name']
+    
+    def folder(self, project_id: str) -> str:
+        """Project folder without materializing the project"""
+        entry = self._entries[project_id]
+        return entry.folder if isinstance(entry, Project) else entry[1]
+    
+    def is_loaded(self, project_id: str) -> bool:
+        return isinstance(self._entries.get(project_id), Project)
+    
+    def __getitem__(self, project_id: str) -> Project:
+        entry = self._entries[project_id]
+        if isinstance(entry, Project):
+            return entry
+        with self._lock:
+            entry = self._entries[project_id]
+            if not isinstance(entry, Project):
+                entry = self._factory(*entry)
+                self._entries[project_id] = entry
+            return entry
+    
+    def __setitem__(self, project_id: str, project: Project):
+        self._entries[project_id] = project
+    
+    def __delitem__(self, project_id: str):
+        del self._entries[project_id]
+    
+    def __contains__(self, project_id) -> bool:
+        return project_id in self._entries
+    
+    def __iter__(self):
+        return iter(list(self._entries))
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class ProjectIndex:
+    """
+    Summary stats for every project, kept in projects_index.json.
+
+    Entries are updated from a project's on_change hook whenever its cards,
+    mastery, exclusions or history are saved, so listing projects never has
+    to open any project's data files.
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: Dict[str, Dict] = {}
+        self.saved_at = None  # mtime of the index file when loaded
+        self._lock = threading.Lock()
+        self._load()
+    
+    def _load(self):
+        try:
+            if os.path.exists(self.path):
+                self.saved_at = os.path.getmtime(self.path)
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f).get('projects', {})
+        except Exception as e:
+            print(f"Error loading project index: {e}")
+            self.entries = {}
+    
+    def _save(self):
+        # Caller holds self._lock; entries are replaced rather than mutated so a
+        # queued write of this snapshot never sees them change. The index can be
+        # rebuilt from the projects, so it is queued (a burst of study answers
+        # becomes one write) and never fsynced, whatever the durability mode
+        try:
+            durable_writer.write_json(self.path, {'projects': dict(self.entries)}, durable=False)
+        except Exception as e:
+            print(f"Error saving project index: {e}")
+    
+    def update(self, project: 'Project', collections=COLLECTIONS):
+        """Refresh the stats derived from the given collections of a project"""
+        stats = project.get_stats(collections)
+        with self._lock:
+            entry = dict(self.entries.get(project.id, {}))
+            entry['name'] = project.name
+            entry.update(stats)
+            # Percentage depends on both cards and mastery, so recompute from the stored counts
+            total = entry.get('total_flashcards', 0)
+            entry['mastery_percentage'] = (entry.get('mastered_count', 0) / total * 100) if total else 0
+            self.entries[project.id] = entry
+            self._save()
+    
+    def remove(self, project_id: str):
+        with self._lock:
+            if self.entries.pop(project_id, None) is not None:
+                self._save()
+    
+    def prune(self, project_ids):
+        """Drop entries for projects that no longer exist"""
+        with self._lock:
+            stale = [pid for pid in self.entries if pid not in project_ids]
+            for pid in stale:
+                del self.entries[pid]
+            if stale:
+                self._save()
+    
+    def get(self, project_id: str) -> Optional[Dict]:
+        return self.entries.get(project_id)
+    
+    def is_stale(self, folder: str) -> bool:
+        """Whether a project's files changed after the index was last written (e.g. a crash lost the queued write)"""
+        if self.saved_at is None:
+            return True
+        try:
+            with os.scandir(folder) as entries:
+                return any(entry.stat().st_mtime > self.saved_at for entry in entries)
+        except OSError:
+            return False
+
+
 class ProjectManager:
     """Manages all flashcard projects"""
     
-    def __init__(self, projects_root: str = 'projects'):
+    def __init__(self, projects_root: str = 'projects', storage_engine: str = 'json', card_format: str = 'json'):
         self.projects_root = projects_root
-        self.projects: Dict[str, Project] = {}
+        self.storage_engine = storage_engine  # Engine used for newly created projects
+        self.card_format = card_format        # Card file format for newly created JSON/journal projects
+        self.projects = LazyProjects(self._materialize_project)
         self._ensure_projects_folder()
+        self.index = ProjectIndex(os.path.join(projects_root, 'projects_index.json'))
+        start = time.perf_counter()
         self._load_all_projects()
+        self._sync_index()
+        self.discovery_seconds = time.perf_counter() - start
     
     def _ensure_projects_folder(self):
         """Create projects root folder if it doesn't exist"""
         os.makedirs(self.projects_root, exist_ok=True)
     
+    def _read_metadata(self, folder_path: str) -> Optional[Dict]:
+        """Read one project's project.json (None if the folder isn't a project)"""
+        meta_path = os.path.join(folder_path, 'project.json')
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Error loading project from {folder_path}: {e}")
+            return None
+    
     def _load_all_projects(self):
-        """Load all existing projects from the projects folder"""
+        """Discover existing projects; metadata is read in parallel and projects are built lazily"""
         try:
             if not os.path.exists(self.projects_root):
                 return
             
-            for folder_name in os.listdir(self.projects_root):
-                folder_path = os.path.join(self.projects_root, folder_name)
-                if os.path.isdir(folder_path):
-                    meta_path = os.path.join(folder_path, 'project.json')
-                    if os.path.exists(meta_path):
-                        try:
-                            with open(meta_path, 'r', encoding='utf-8') as f:
-                                metadata = json.load(f)
-                                project = Project(
-                                    metadata['id'],
-                                    metadata['name'],
-                                    folder_path
-                                )
-                                self.projects[project.id] = project
-                        except Exception as e:
-                            print(f"Error loading project from {folder_path}: {e}")
+            with os.scandir(self.projects_root) as entries:
+                folders = [entry.path for entry in entries if entry.is_dir()]
+            if not folders:
+                return
+            
+            # Metadata reads are I/O bound, so threads help on slow or network volumes
+            with ThreadPoolExecutor(max_workers=min(32, len(folders))) as pool:
+                for folder_path, metadata in zip(folders, pool.map(self._read_metadata, folders)):
+                    if metadata:
+                        self.projects.add_discovered(metadata, folder_path)
         except Exception as e:
             print(f"Error loading projects: {e}")
     
+    def _materialize_project(self, metadata: Dict, folder_path: str) -> Project:
+        project = Project(
+            metadata['id'],
+            metadata['name'],
+            folder_path,
+            metadata.get('storage_engine', 'json'),
+            create_folders=False,
+            card_format=metadata.get('card_format', 'json')
+        )
+        project.on_change = self._on_project_change
+        return project
+    
+    def _add_project(self, project: Project):
+        """Register a project and keep its index entry current"""
+        project.on_change = self._on_project_change
+        self.projects[project.id] = project
+    
+    def _on_project_change(self, project: Project, collection: str):
+        self.index.update(project, (collection,))
+    
+    def _sync_index(self):
+        """Index projects missing from projects_index.json or changed since it was written, and drop deleted ones"""
+        self.index.prune(self.projects)
+        for project_id in self.projects:
+            if self.index.get(project_id) is None or self.index.is_stale(self.projects.folder(project_id)):
+                self.index.update(self.projects[project_id])
+    
     def create_project(self, name: str) -> Project:
         """Create a new project"""
         # Generate unique project ID
@@ -251,11 +703,13 @@ class ProjectManager:
         folder_path = os.path.join(self.projects_root, project_id)
         
         # Create project
-        project = Project(project_id, name, folder_path)
+        project = Project(project_id, name, folder_path, self.storage_engine,
+                          card_format=self.card_format)
         project.save_metadata()
         
         # Add to projects dict
-        self.projects[project_id] = project
+        self._add_project(project)
+        self.index.update(project)
         
         return project
     
@@ -263,17 +717,22 @@ class ProjectManager:
         """Get a project by ID"""
         return self.projects.get(project_id)
     
+    def project_names(self) -> List[str]:
+        """Names of all projects, without loading them"""
+        return [self.projects.name(project_id) for project_id in self.projects]
+    
     def list_projects(self) -> List[Dict]:
-        """List all projects with their metadata"""
+        """List all projects with their summary stats (read from the index, not project files)"""
         project_list = []
-        for project in self.projects.values():
-            stats = project.get_stats()
+        for project_id in self.projects:
+            stats = self.index.get(project_id) or {}
             project_list.append({
-                'id': project.id,
-                'name': project.name,
-                'total_flashcards': stats['total_flashcards'],
-                'mastery_percentage': stats['mastery_percentage'],
-                'total_sessions': stats['total_study_sessions'] + stats['total_exam_sessions']
+                'id': project_id,
+                'name': stats.get('name', project_id),
+                'total_flashcards': stats.get('total_flashcards', 0),
+                'mastery_percentage': stats.get('mastery_percentage', 0),
+                'total_sessions': stats.get('total_sessions', 0),
+                'stats': stats
             })
         return sorted(project_list, key=lambda x: x['name'])
     
@@ -285,12 +744,18 @@ class ProjectManager:
             return False
         
         try:
-            project = self.projects[project_id]
+            if self.projects.is_loaded(project_id):
+                project = self.projects[project_id]
+                project.storage.close()
+                project_cache.forget(project)
+            folder = self.projects.folder(project_id)
+            durable_writer.discard(folder)
             # Remove project folder
-            if os.path.exists(project.folder):
-                shutil.rmtree(project.folder)
+            if os.path.exists(folder):
+                shutil.rmtree(folder)
             # Remove from projects dict
             del self.projects[project_id]
+            self.index.remove(project_id)
             return True
         except Exception as e:
             print(f"Error deleting project {project_id}: {e}")
@@ -0,0 +1,693 @@
+"""
+Storage engines for project data.
+
+Each Project delegates its persistence to one of these engines. The JSON
+engine keeps the original one-file-per-collection layout; the journal engine
+keeps the same files but appends mastery, exclusion and history changes to a
+log; the SQLite engine keeps everything in a single project.db so that those
+changes are written as single-row upserts instead of full rewrites.
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+import atexit
+import sqlite3
+import threading
+import weakref
+from typing import Dict, Iterable, List, Optional
+from atomic_writes import atomic_write, atomic_write_json, durable_writer
+from card_file import CardFile, encode_cards
+
+
+def _stat_token(path: str) -> Optional[tuple]:
+    """Identify a file's current contents by (mtime, size, inode), or None if it doesn't exist"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+CARD_FORMATS = ('json', 'binary', 'sharded')
+
+
+def _shard_name(topic: str, data: bytes) -> str:
+    """File name for a topic's shard: readable slug plus a hash of its contents"""
+    slug = re.sub(r'[^a-z0-9]+', '-', topic.lower()).strip('-')[:40] or 'topic'
+    return f"{slug}-{hashlib.md5(data).hexdigest()[:12]}.json"
+
+
+class JsonStorage:
+    """
+    Original layout: flashcards.json, mastery.json, excluded.json, history.json
+
+    With card_format='binary' the cards are kept in flashcards.bin instead
+    (see card_file.py) and loaded as a lazily decoded CardFile.
+
+    With card_format='sharded' the cards are split into one file per topic
+    under cards/, listed in cards/manifest.json together with each topic's
+    card count, so topic lists and counts read only the manifest and a
+    session over a few topics reads only their shards.
+    """
+
+    name = 'json'
+
+    def __init__(self, folder: str, card_format: str = 'json'):
+        if card_format not in CARD_FORMATS:
+            raise ValueError(f"Unknown card format: {card_format}")
+        self.folder = folder
+        self.card_format = card_format
+
+    @property
+    def flashcards_path(self) -> str:
+        return os.path.join(self.folder, 'flashcards.json')
+
+    @property
+    def cards_bin_path(self) -> str:
+        return os.path.join(self.folder, 'flashcards.bin')
+
+    @property
+    def cards_folder(self) -> str:
+        return os.path.join(self.folder, 'cards')
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.cards_folder, 'manifest.json')
+
+    @property
+    def mastery_path(self) -> str:
+        return os.path.join(self.folder, 'mastery.json')
+
+    @property
+    def excluded_path(self) -> str:
+        return os.path.join(self.folder, 'excluded.json')
+
+    @property
+    def history_path(self) -> str:
+        return os.path.join(self.folder, 'history.json')
+
+    def _path(self, collection: str) -> str:
+        cards_path = {
+            'json': self.flashcards_path,
+            'binary': self.cards_bin_path,
+            'sharded': self.manifest_path,
+        }[self.card_format]
+        return {
+            'flashcards': cards_path,
+            'mastery': self.mastery_path,
+            'excluded': self.excluded_path,
+            'history': self.history_path,
+        }[collection]
+
+    def version(self, collection: str) -> Optional[tuple]:
+        """Token that changes whenever the stored collection changes (None if nothing is stored)"""
+        return _stat_token(self._path(collection))
+
+    def size_hint(self, collection: str) -> int:
+        """Approximate size in bytes of the stored collection"""
+        if collection == 'flashcards' and self.card_format == 'sharded':
+            manifest = self._read(self.manifest_path) or {}
+            return sum(shard['bytes'] for shard in manifest.get('topics', {}).values())
+        token = _stat_token(self._path(collection))
+        return token[1] if token else 0
+
+    def _read(self, path: str):
+        """Return parsed JSON from path, or None if the file does not exist"""
+        if durable_writer.has_pending(path):
+            durable_writer.flush(path)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _write(self, path: str, data):
+        durable_writer.write_json(path, data)
+
+    def close(self):
+        pass
+
+    def load_flashcards(self) -> Optional[List[Dict]]:
+        if self.card_format == 'binary':
+            path = self.cards_bin_path
+            if durable_writer.has_pending(path):
+                durable_writer.flush(path)
+            return CardFile(path) if os.path.exists(path) else None
+        if self.card_format == 'sharded':
+            manifest = self._read(self.manifest_path)
+            if manifest is None:
+                return None
+            return self._read_shards(manifest, list(manifest['topics']))
+        return self._read(self.flashcards_path)
+
+    def save_flashcards(self, flashcards: List[Dict]):
+        if self.card_format == 'binary':
+            durable_writer.write_bytes(self.cards_bin_path, encode_cards(flashcards))
+        elif self.card_format == 'sharded':
+            self._write_shards(flashcards)
+        else:
+            self._write(self.flashcards_path, flashcards)
+
+    def load_topic_counts(self) -> Optional[Dict[str, int]]:
+        """Cards per topic without reading the cards, or None if this layout can't tell"""
+        if self.card_format != 'sharded':
+            return None
+        manifest = self._read(self.manifest_path)
+        if manifest is None:
+            return {}
+        return {topic: shard['count'] for topic, shard in manifest['topics'].items()}
+
+    def load_flashcards_for_topics(self, topics: Iterable[str]) -> Optional[List[Dict]]:
+        """Cards of the given topics only, or None if this layout has to read every card"""
+        if self.card_format != 'sharded':
+            return None
+        manifest = self._read(self.manifest_path)
+        if manifest is None:
+            return []
+        return self._read_shards(manifest, [t for t in manifest['topics'] if t in set(topics)])
+
+    def _read_shards(self, manifest: Dict, topics: List[str]) -> List[Dict]:
+        flashcards = []
+        for topic in topics:
+            flashcards.extend(self._read(os.path.join(self.cards_folder, manifest['topics'][topic]['file'])))
+        return flashcards
+
+    def _write_shards(self, flashcards: List[Dict]):
+        # Shard files are named by content, so unchanged topics keep their file
+        # and aren't rewritten. New shards are written before the manifest that
+        # points at them; old ones are removed only after it has been replaced.
+        # These writes bypass write batching so the removal can't overtake them.
+        os.makedirs(self.cards_folder, exist_ok=True)
+        fsync = durable_writer.mode != 'none'
+        by_topic = {}
+        for card in flashcards:
+            by_topic.setdefault(card['topic'], []).append(card)
+
+        topics = {}
+        for topic, cards in by_topic.items():
+            data = json.dumps(cards, indent=2).encode('utf-8')
+            name = _shard_name(topic, data)
+            path = os.path.join(self.cards_folder, name)
+            if not os.path.exists(path):
+                atomic_write(path, lambda f: f.write(data), fsync)
+            topics[topic] = {'file': name, 'count': len(cards), 'bytes': len(data)}
+        atomic_write_json(self.manifest_path, {'topics': topics}, fsync=fsync)
+
+        keep = {shard['file'] for shard in topics.values()} | {'manifest.json'}
+        for name in os.listdir(self.cards_folder):
+            if name not in keep and name.endswith('.json'):
+                os.remove(os.path.join(self.cards_folder, name))
+
+    def load_mastery(self) -> Optional[Dict]:
+        return self._read(self.mastery_path)
+
+    def save_mastery(self, mastery: Dict):
+        self._write(self.mastery_path, mastery)
+
+    def put_mastery(self, mastery: Dict, card_hashes: Iterable[str]):
+        """Persist changed mastery rows (the JSON layout can only rewrite the whole file)"""
+        self.save_mastery(mastery)
+
+    def delete_mastery(self, mastery: Dict, card_hashes: Iterable[str]):
+        self.save_mastery(mastery)
+
+    def load_excluded(self) -> Optional[Dict]:
+        return self._read(self.excluded_path)
+
+    def save_excluded(self, excluded: Dict):
+        self._write(self.excluded_path, excluded)
+
+    def put_excluded(self, excluded: Dict, card_hashes: Iterable[str]):
+        self.save_excluded(excluded)
+
+    def delete_excluded(self, excluded: Dict, card_hashes: Iterable[str]):
+        self.save_excluded(excluded)
+
+    def load_history(self) -> Optional[Dict]:
+        """Return history with ISO-string timestamp keys"""
+        return self._read(self.history_path)
+
+    def save_history(self, history: Dict):
+        self._write(self.history_path, history)
+
+    def append_history(self, kind: str, timestamp: str, entry: Dict, serialize_history):
+        """Persist a single new history entry; serialize_history() returns the full history"""
+        self.save_history(serialize_history())
+
+
+class SqliteStorage:
+    """Single project.db per project with one table per collection"""
+
+    name = 'sqlite'
+    card_format = 'rows'  # Cards are always table rows
+
+    # PRAGMA synchronous for each write durability mode; in WAL mode NORMAL
+    # syncs at checkpoints, which is SQLite's own form of group commit
+    SYNCHRONOUS = {'always': 'FULL', 'batch': 'NORMAL', 'none': 'OFF'}
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS cards (
+            position INTEGER PRIMARY KEY,
+            topic TEXT,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_cards_topic ON cards(topic);
+        CREATE TABLE IF NOT EXISTS mastery (
+            card_hash TEXT PRIMARY KEY,
+            data TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS exclusions (
+            card_hash TEXT PRIMARY KEY,
+            data TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS history (
+            kind TEXT NOT NULL,
+            timestamp TEXT NOT NULL,
+            data TEXT NOT NULL,
+            PRIMARY KEY (kind, timestamp)
+        );
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        );
+    """
+
+    def __init__(self, folder: str, card_format: str = None):
+        self.folder = folder
+        self._conn = None
+        self._lock = threading.Lock()
+
+    @property
+    def db_path(self) -> str:
+        return os.path.join(self.folder, 'project.db')
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(f'PRAGMA synchronous={self.SYNCHRONOUS[durable_writer.mode]}')
+            conn.executescript(self.SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _bump_version(self, conn: sqlite3.Connection, collection: str):
+        """Increment the collection's change counter (call inside the write transaction)"""
+        conn.execute(
+            "INSERT INTO meta (key, value) VALUES (?, '1') "
+            "ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1",
+            (f'version:{collection}',)
+        )
+
+    def version(self, collection: str) -> Optional[tuple]:
+        if not os.path.exists(self.db_path):
+            return None
+        with self._lock:
+            row = self._connect().execute(
+                'SELECT value FROM meta WHERE key = ?', (f'version:{collection}',)
+            ).fetchone()
+        return (row[0] if row else '0',)
+
+    def size_hint(self, collection: str) -> int:
+        if not os.path.exists(self.db_path):
+            return 0
+        table = {'flashcards': 'cards', 'mastery': 'mastery',
+                 'excluded': 'exclusions', 'history': 'history'}[collection]
+        with self._lock:
+            row = self._connect().execute(f'SELECT SUM(LENGTH(data)) FROM {table}').fetchone()
+        return row[0] or 0
+
+    def _load_table(self, table: str) -> Dict:
+        with self._lock:
+            rows = self._connect().execute(
+                f'SELECT card_hash, data FROM {table} ORDER BY rowid'
+            ).fetchall()
+        return {card_hash: json.loads(data) for card_hash, data in rows}
+
+    def _replace_table(self, table: str, collection: str, records: Dict):
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                self._bump_version(conn, collection)
+                conn.execute(f'DELETE FROM {table}')
+                conn.executemany(
+                    f'INSERT INTO {table} (card_hash, data) VALUES (?, ?)',
+                    [(k, json.dumps(v)) for k, v in records.items()]
+                )
+
+    def _upsert_rows(self, table: str, collection: str, records: Dict, card_hashes: Iterable[str]):
+        rows = [(k, json.dumps(records[k])) for k in card_hashes if k in records]
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                self._bump_version(conn, collection)
+                conn.executemany(
+                    f'INSERT INTO {table} (card_hash, data) VALUES (?, ?) '
+                    f'ON CONFLICT(card_hash) DO UPDATE SET data = excluded.data',
+                    rows
+                )
+
+    def _delete_rows(self, table: str, collection: str, card_hashes: Iterable[str]):
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                self._bump_version(conn, collection)
+                conn.executemany(
+                    f'DELETE FROM {table} WHERE card_hash = ?',
+                    [(k,) for k in card_hashes]
+                )
+
+    def load_flashcards(self) -> Optional[List[Dict]]:
+        if not os.path.exists(self.db_path):
+            return None
+        with self._lock:
+            rows = self._connect().execute('SELECT data FROM cards ORDER BY position').fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    def load_topic_counts(self) -> Optional[Dict[str, int]]:
+        if not os.path.exists(self.db_path):
+            return {}
+        with self._lock:
+            rows = self._connect().execute(
+                'SELECT topic, COUNT(*) FROM cards GROUP BY topic ORDER BY MIN(position)'
+            ).fetchall()
+        return dict(rows)
+
+    def load_flashcards_for_topics(self, topics: Iterable[str]) -> Optional[List[Dict]]:
+        if not os.path.exists(self.db_path):
+            return []
+        topics = list(topics)
+        with self._lock:
+            rows = self._connect().execute(
+                f'SELECT data FROM cards WHERE topic IN ({",".join("?" * len(topics))}) ORDER BY position',
+                topics
+            ).fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    def save_flashcards(self, flashcards: List[Dict]):
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                self._bump_version(conn, 'flashcards')
+                conn.execute('DELETE FROM cards')
+                conn.executemany(
+                    'INSERT INTO cards (position, topic, data) VALUES (?, ?, ?)',
+                    [(i, card.get('topic'), json.dumps(card)) for i, card in enumerate(flashcards)]
+                )
+
+    def load_mastery(self) -> Optional[Dict]:
+        if not os.path.exists(self.db_path):
+            return None
+        return self._load_table('mastery')
+
+    def save_mastery(self, mastery: Dict):
+        self._replace_table('mastery', 'mastery', mastery)
+
+    def put_mastery(self, mastery: Dict, card_hashes: Iterable[str]):
+        self._upsert_rows('mastery', 'mastery', mastery, card_hashes)
+
+    def delete_mastery(self, mastery: Dict, card_hashes: Iterable[str]):
+        self._delete_rows('mastery', 'mastery', card_hashes)
+
+    def load_excluded(self) -> Optional[Dict]:
+        if not os.path.exists(self.db_path):
+            return None
+        return self._load_table('exclusions')
+
+    def save_excluded(self, excluded: Dict):
+        self._replace_table('exclusions', 'excluded', excluded)
+
+    def put_excluded(self, excluded: Dict, card_hashes: Iterable[str]):
+        self._upsert_rows('exclusions', 'excluded', excluded, card_hashes)
+
+    def delete_excluded(self, excluded: Dict, card_hashes: Iterable[str]):
+        self._delete_rows('exclusions', 'excluded', card_hashes)
+
+    def load_history(self) -> Optional[Dict]:
+        if not os.path.exists(self.db_path):
+            return None
+        with self._lock:
+            conn = self._connect()
+            rows = conn.execute('SELECT kind, timestamp, data FROM history ORDER BY rowid').fetchall()
+            scores = conn.execute("SELECT value FROM meta WHERE key = 'all_time_scores'").fetchone()
+        history = {'exam_history': {}, 'study_history': {}, 'all_time_scores': {}}
+        for kind, timestamp, data in rows:
+            history.setdefault(kind, {})[timestamp] = json.loads(data)
+        if scores:
+            history['all_time_scores'] = json.loads(scores[0])
+        return history
+
+    def save_history(self, history: Dict):
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                self._bump_version(conn, 'history')
+                conn.execute('DELETE FROM history')
+                for kind in ('exam_history', 'study_history'):
+                    conn.executemany(
+                        'INSERT INTO history (kind, timestamp, data) VALUES (?, ?, ?)',
+                        [(kind, ts, json.dumps(entry)) for ts, entry in history.get(kind, {}).items()]
+                    )
+                conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('all_time_scores', ?)",
+                    (json.dumps(history.get('all_time_scores', {})),)
+                )
+
+    def append_history(self, kind: str, timestamp: str, entry: Dict, serialize_history):
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                self._bump_version(conn, 'history')
+                conn.execute(
+                    'INSERT OR REPLACE INTO history (kind, timestamp, data) VALUES (?, ?, ?)',
+                    (kind, timestamp, json.dumps(entry))
+                )
+
+
+class JournalStorage(JsonStorage):
+    """
+    JSON snapshots plus an append-only journal.log.
+
+    Mastery, exclusion and history changes are appended as one JSON line each,
+    so a write costs the same no matter how many cards are already mastered.
+    Loads replay the journal on top of the snapshot files, and a background
+    compactor folds the journal back into the snapshots once it grows past
+    COMPACT_MAX_BYTES or its oldest entry is older than COMPACT_MAX_AGE seconds.
+    """
+
+    name = 'journal'
+
+    COMPACT_MAX_BYTES = 1024 * 1024
+    COMPACT_MAX_AGE = 300
+
+    def __init__(self, folder: str, card_format: str = 'json'):
+        super().__init__(folder, card_format)
+        self._lock = threading.RLock()
+        self._first_entry_time = None
+        if os.path.exists(self.journal_path) and os.path.getsize(self.journal_path) > 0:
+            self._first_entry_time = os.path.getmtime(self.journal_path)
+        _compactor.register(self)
+
+    @property
+    def journal_path(self) -> str:
+        return os.path.join(self.folder, 'journal.log')
+
+    def version(self, collection: str) -> Optional[tuple]:
+        snapshot = super().version(collection)
+        if collection == 'flashcards':
+            return snapshot
+        journal = _stat_token(self.journal_path)
+        if snapshot is None and journal is None:
+            return None
+        return (snapshot, journal)
+
+    def size_hint(self, collection: str) -> int:
+        size = super().size_hint(collection)
+        if collection != 'flashcards':
+            journal = _stat_token(self.journal_path)
+            size += journal[1] if journal else 0
+        return size
+
+    def _append(self, entries: List[Dict]):
+        lines = ''.join(json.dumps(entry) + '\n' for entry in entries)
+        with self._lock:
+            with open(self.journal_path, 'a', encoding='utf-8') as f:
+                f.write(lines)
+                durable_writer.synced_append(f)
+                size = f.tell()
+            if self._first_entry_time is None:
+                self._first_entry_time = time.time()
+        if size >= self.COMPACT_MAX_BYTES:
+            _compactor.wake()
+
+    def _read_journal(self) -> List[Dict]:
+        if not os.path.exists(self.journal_path):
+            return []
+        entries = []
+        with open(self.journal_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # Torn final line from a crash mid-append; everything before it is intact
+                    break
+        return entries
+
+    @staticmethod
+    def _replay(entries: List[Dict], collection: str, snapshot: Dict) -> Dict:
+        """Apply journal entries for one collection, in order, on top of a snapshot"""
+        for entry in entries:
+            if entry['coll'] != collection:
+                continue
+            if entry['op'] == 'replace':
+                snapshot = entry['value']
+                continue
+            target = snapshot.setdefault(entry['kind'], {}) if 'kind' in entry else snapshot
+            if entry['op'] == 'put':
+                target[entry['key']] = entry['value']
+            elif entry['op'] == 'delete':
+                target.pop(entry['key'], None)
+        return snapshot
+
+    def _load(self, collection: str) -> Optional[Dict]:
+        with self._lock:
+            snapshot = self._read(self._path(collection))
+            entries = [e for e in self._read_journal() if e['coll'] == collection]
+        if snapshot is None and not entries:
+            return None
+        return self._replay(entries, collection, snapshot or {})
+
+    def load_mastery(self) -> Optional[Dict]:
+        return self._load('mastery')
+
+    def save_mastery(self, mastery: Dict):
+        self._append([{'op': 'replace', 'coll': 'mastery', 'value': mastery}])
+
+    def put_mastery(self, mastery: Dict, card_hashes: Iterable[str]):
+        self._append([{'op': 'put', 'coll': 'mastery', 'key': k, 'value': mastery[k]}
+                      for k in card_hashes if k in mastery])
+
+    def delete_mastery(self, mastery: Dict, card_hashes: Iterable[str]):
+        self._append([{'op': 'delete', 'coll': 'mastery', 'key': k} for k in card_hashes])
+
+    def load_excluded(self) -> Optional[Dict]:
+        return self._load('excluded')
+
+    def save_excluded(self, excluded: Dict):
+        self._append([{'op': 'replace', 'coll': 'excluded', 'value': excluded}])
+
+    def put_excluded(self, excluded: Dict, card_hashes: Iterable[str]):
+        self._append([{'op': 'put', 'coll': 'excluded', 'key': k, 'value': excluded[k]}
+                      for k in card_hashes if k in excluded])
+
+    def delete_excluded(self, excluded: Dict, card_hashes: Iterable[str]):
+        self._append([{'op': 'delete', 'coll': 'excluded', 'key': k} for k in card_hashes])
+
+    def load_history(self) -> Optional[Dict]:
+        return self._load('history')
+
+    def save_history(self, history: Dict):
+        self._append([{'op': 'replace', 'coll': 'history', 'value': history}])
+
+    def append_history(self, kind: str, timestamp: str, entry: Dict, serialize_history):
+        self._append([{'op': 'put', 'coll': 'history', 'kind': kind, 'key': timestamp, 'value': entry}])
+
+    def needs_compaction(self) -> bool:
+        if self._first_entry_time is None:
+            return False
+        try:
+            size = os.path.getsize(self.journal_path)
+        except OSError:
+            return False
+        return (size >= self.COMPACT_MAX_BYTES or
+                time.time() - self._first_entry_time >= self.COMPACT_MAX_AGE)
+
+    def compact(self):
+        """Fold the journal into the snapshot files and truncate it"""
+        with self._lock:
+            entries = self._read_journal()
+            if entries:
+                for collection in ('mastery', 'excluded', 'history'):
+                    if not any(e['coll'] == collection for e in entries):
+                        continue
+                    path = self._path(collection)
+                    snapshot = self._replay(entries, collection, self._read(path) or {})
+                    # Written (and synced) right away: the journal is removed below
+                    atomic_write_json(path, snapshot, fsync=(durable_writer.mode != 'none'))
+            # Replaying the same entries again is harmless, so a crash before this point loses nothing
+            if os.path.exists(self.journal_path):
+                os.remove(self.journal_path)
+            self._first_entry_time = None
+
+    def close(self):
+        self.compact()
+        _compactor.unregister(self)
+
+
+class JournalCompactor:
+    """Background thread that compacts journals once they pass their size or age threshold"""
+
+    CHECK_INTERVAL = 5  # seconds
+
+    def __init__(self):
+        self._journals = weakref.WeakSet()
+        self._lock = threading.Lock()
+        self._wake_event = threading.Event()
+        self._thread = None
+
+    def register(self, storage: JournalStorage):
+        with self._lock:
+            self._journals.add(storage)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='journal-compactor', daemon=True)
+                self._thread.start()
+
+    def unregister(self, storage: JournalStorage):
+        with self._lock:
+            self._journals.discard(storage)
+
+    def wake(self):
+        self._wake_event.set()
+
+    def _run(self):
+        while True:
+            self._wake_event.wait(self.CHECK_INTERVAL)
+            self._wake_event.clear()
+            self.compact_all(only_if_needed=True)
+
+    def compact_all(self, only_if_needed: bool = False):
+        with self._lock:
+            journals = list(self._journals)
+        for storage in journals:
+            try:
+                if not only_if_needed or storage.needs_compaction():
+                    storage.compact()
+            except Exception as e:
+                print(f"Error compacting journal in {storage.folder}: {e}")
+
+
+_compactor = JournalCompactor()
+atexit.register(_compactor.compact_all)
+
+
+STORAGE_ENGINES = {
+    JsonStorage.name: JsonStorage,
+    JournalStorage.name: JournalStorage,
+    SqliteStorage.name: SqliteStorage,
+}
+
+
+def create_storage(engine: str, folder: str, card_format: str = 'json'):
+    """Instantiate the storage engine registered under the given name"""
+    if engine not in STORAGE_ENGINES:
+        raise ValueError(f"Unknown storage engine: {engine}")
+    return STORAGE_ENGINES[engine](folder, card_format)
@@ -0,0 +1,87 @@
+"""Project creation jobs on projects whose cards are stored as a binary card file"""
+
+import os
+import json
+
+import pytest
+
+from job_queue import JobQueue
+from project_manager import Project
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def make_card(card_id, topic):
+    return {'id': card_id, 'question': f'Question {card_id}?', 'answer': 'Yes', 'topic': topic}
+
+
+@pytest.fixture(scope='module')
+def app_module(tmp_path_factory):
+    """The app, started in a scratch folder against the local LLM stub, creating binary-format projects"""
+    import llm_stub
+    folder = tmp_path_factory.mktemp('app')
+    server, url = llm_stub.start_stub_server('127.0.0.1', latency=0)
+    with open(os.path.join(REPO, 'settings.json')) as f:
+        settings = json.load(f)
+    settings.update(llm_backend='stub', llm_base_url=url, llm_cache_enabled=False,
+                    card_format='binary', write_durability='none')
+    with open(folder / 'settings.json', 'w') as f:
+        json.dump(settings, f)
+    cwd = os.getcwd()
+    os.chdir(folder)
+    try:
+        import app
+        yield app
+    finally:
+        os.chdir(cwd)
+        server.shutdown()
+
+
+def test_add_flashcards_after_cache_release(tmp_path):
+    project = Project('p1', 'Binary deck', str(tmp_path / 'p1'), card_format='binary')
+    project.add_flashcards([make_card('a', 'T')])
+    project.save_flashcards()
+
+    # Released by the project cache, the deck is read back as a read-only card file
+    assert project._release('flashcards')
+    project.add_flashcards([make_card('b', 'T')])
+    # Unsaved cards are not released
+    assert project._release('flashcards')
+    assert [card['id'] for card in project.flashcards] == ['a', 'b']
+
+    project.save_flashcards()
+    assert project._release('flashcards')
+    assert [card['id'] for card in project.flashcards] == ['a', 'b']
+
+
+def test_resume_job_on_binary_project(app_module, monkeypatch, tmp_path):
+    project = app_module.project_manager.create_project('Binary resume')
+    assert project.card_format == 'binary'
+    project.add_flashcards([make_card(f'done{i}', 'Done') for i in range(3)])
+    project.save_flashcards()
+    project._release('flashcards')  # As after a restart: the cards are only on disk
+
+    # A job interrupted after its first topic was checkpointed
+    jobs = JobQueue(str(tmp_path / 'jobs.db'))
+    jobs.register('create_project', app_module._generate_flashcards_background)
+    monkeypatch.setattr(app_module, 'job_queue', jobs)
+    text = app_module.text_blobs.put('Cells are the basic unit of life. ' * 50)
+    jobs.submit('resumejob', 'create_project', project.id, {
+        'project_name': project.name,
+        'text_blobs': [[text]],
+        'topics': [{'name': 'Done', 'count': 3, 'text': 0}, {'name': 'Cells', 'count': 4, 'text': 0}]
+    }, ['Done', 'Cells'])
+    jobs._queue.get_nowait()
+    jobs.set_topic('resumejob', 0, 'done', 3)
+    jobs.set_state('resumejob', 'running')
+
+    assert jobs.resume() == 1
+    jobs._run(jobs._queue.get_nowait())
+
+    job = jobs.get('resumejob')
+    assert job['state'] == 'complete', job['error']
+    assert [topic['state'] for topic in job['topics']] == ['done', 'done']
+    project._release('flashcards')
+    cards = list(project.flashcards)
+    assert [card['id'] for card in cards[:3]] == ['done0', 'done1', 'done2']
+    assert cards[3:] and all(card['topic'] == 'Cells' for card in cards[3:])
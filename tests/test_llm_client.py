@@ -0,0 +1,65 @@
+"""Retries and stream handling of LLMClient"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from llm_client import LLMClient, LLMResponseCache
+
+
+class ServerError(Exception):
+    status_code = 503
+
+
+class FakeStream:
+    def __init__(self, pieces):
+        self.pieces = pieces
+        self.closed = False
+
+    def __iter__(self):
+        for piece in self.pieces:
+            delta = SimpleNamespace(content=piece)
+            yield SimpleNamespace(usage=None, choices=[SimpleNamespace(delta=delta, finish_reason=None)])
+
+    def close(self):
+        self.closed = True
+
+
+def make_client(tmp_path, responses):
+    """An LLMClient whose API calls return (or raise) the given responses in turn"""
+    calls = []
+
+    def create(**kwargs):
+        calls.append(kwargs)
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    api = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    cache = LLMResponseCache(str(tmp_path / 'cache'), enabled=False)
+    return LLMClient(api, cache, backoff_base=0, max_retries=2), calls
+
+
+def test_abandoned_stream_is_closed(tmp_path):
+    stream = FakeStream(['one ', 'two ', 'three'])
+    client, _ = make_client(tmp_path, [stream])
+    pieces = client.stream('model', [{'role': 'user', 'content': 'Hi'}])
+    assert next(pieces) == 'one '
+    pieces.close()
+    assert stream.closed
+    assert client.limiter.stats()['model']['in_flight'] == 0
+
+
+def test_stream_and_complete_share_retries(tmp_path):
+    stream = FakeStream(['done'])
+    client, calls = make_client(tmp_path, [ServerError(), stream])
+    assert list(client.stream('model', [{'role': 'user', 'content': 'Hi'}])) == ['done']
+    assert len(calls) == 2 and stream.closed
+
+    client, calls = make_client(tmp_path, [ServerError(), ServerError(), ServerError()])
+    with pytest.raises(ServerError):
+        client.complete('model', [{'role': 'user', 'content': 'Hi'}])
+    assert len(calls) == 3
+    stats = client.limiter.stats()['model']
+    assert (stats['retries'], stats['failures'], stats['in_flight']) == (2, 1, 0)
@@ -0,0 +1,38 @@
+"""Near-duplicate detection and the dedupe_cards script"""
+
+import json
+import os
+
+from dedupe_cards import dedupe_project
+from near_duplicates import find_near_duplicates
+from project_manager import Project
+
+
+def test_negated_statement_is_not_a_duplicate():
+    cards = [
+        {'question': 'True or false: mitochondria produce ATP'},
+        {'question': 'True or false: mitochondria do not produce ATP'},
+        {'question': "True or false: mitochondria don't produce ATP"},
+        {'question': 'True or false: the mitochondria produce ATP'},
+    ]
+    # Negated statements only match each other (the contraction too), never the plain one
+    assert find_near_duplicates(cards) == {2: 1, 3: 0}
+
+
+def test_dedupe_removes_records_of_removed_cards(tmp_path):
+    project = Project('p1', 'Deck', str(tmp_path / 'p1'))
+    project.flashcards = [
+        {'id': 'kept', 'question': 'What is the function of mitochondria?', 'answer': 'Energy', 'topic': 'A'},
+        {'id': 'copy', 'question': 'What is the function of the mitochondria?', 'answer': 'Energy', 'topic': 'B'},
+    ]
+    project.save_flashcards()
+    project.update_mastery({'kept': {'mastered_date': '2026-01-01'}})
+    project.update_excluded({'copy': {'excluded_date': '2026-01-02'}})
+
+    assert dedupe_project(project, 0.5, dry_run=False) == 1
+    assert [card['id'] for card in project.load_flashcards()] == ['kept']
+    assert list(project.load_mastery()) == ['kept']
+    assert project.load_excluded() == {}
+    with open(os.path.join(project.folder, 'removed_duplicates.json'), encoding='utf-8') as f:
+        backup = json.load(f)
+    assert backup[0]['excluded'] == {'copy': {'excluded_date': '2026-01-02'}}
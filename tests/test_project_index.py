@@ -0,0 +1,56 @@
+"""Writes of the project summary index"""
+
+import json
+import os
+import time
+
+import atomic_writes
+from atomic_writes import DurableWriter, durable_writer
+from project_manager import Project, ProjectIndex, ProjectManager
+
+
+def test_index_is_queued_without_fsync_in_always_mode(tmp_path, monkeypatch):
+    # A long batch interval, so only the explicit flush below writes
+    writer = DurableWriter(mode='always', batch_ms=60000)
+    monkeypatch.setattr('project_manager.durable_writer', writer)
+    fsyncs = []
+    real_atomic_write = atomic_writes.atomic_write
+
+    def atomic_write(path, write, fsync=True):
+        fsyncs.append((path, fsync))
+        real_atomic_write(path, write, fsync)
+    monkeypatch.setattr(atomic_writes, 'atomic_write', atomic_write)
+
+    index = ProjectIndex(str(tmp_path / 'projects_index.json'))
+    project = Project('p1', 'Deck', str(tmp_path / 'p1'))
+    for _ in range(20):
+        index.update(project)
+    # Nothing is written per update; the queued updates become one write
+    assert fsyncs == []
+    writer.flush()
+    assert fsyncs == [(index.path, False)]
+    with open(index.path, encoding='utf-8') as f:
+        assert list(json.load(f)['projects']) == ['p1']
+
+
+def test_entries_older_than_their_project_are_rebuilt(tmp_path):
+    root = str(tmp_path / 'projects')
+    manager = ProjectManager(root)
+    project = manager.create_project('Deck')
+    project.flashcards = [{'id': 'a', 'question': 'Q?', 'answer': 'A', 'topic': 'T'}]
+    project.save_flashcards()
+    durable_writer.flush()
+    assert manager.index.get(project.id)['total_flashcards'] == 1
+
+    # The index write of a later change is lost (as in a crash before the queued write ran)
+    with open(manager.index.path, encoding='utf-8') as f:
+        saved = f.read()
+    project.flashcards = project.flashcards + [{'id': 'b', 'question': 'Q2?', 'answer': 'A', 'topic': 'T'}]
+    project.save_flashcards()
+    durable_writer.flush()
+    then = time.time() - 60
+    with open(manager.index.path, 'w', encoding='utf-8') as f:
+        f.write(saved)
+    os.utime(manager.index.path, (then, then))
+
+    assert ProjectManager(root).index.get(project.id)['total_flashcards'] == 2
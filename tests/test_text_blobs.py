@@ -0,0 +1,36 @@
+"""Server-side store of extracted text"""
+
+import os
+import time
+
+from text_blobs import TextBlobStore
+
+
+def age(store, handle, seconds):
+    path = store._path(handle)
+    then = time.time() - seconds
+    os.utime(path, (then, then))
+
+
+def test_put_prunes_old_blobs_once_per_interval(tmp_path):
+    store = TextBlobStore(str(tmp_path / 'blobs'), max_age_seconds=60, prune_interval_seconds=0.2)
+    old = store.put('old text')
+    age(store, old, 120)
+
+    # The first put pruned the store (before the blob was old); the next, within the interval, doesn't
+    recent = store.put('recent text')
+    assert store.exists(old)
+
+    time.sleep(0.25)
+    new = store.put('new text')
+    assert not store.exists(old)
+    assert store.get(old) is None
+    assert store.get(recent) == 'recent text'
+    assert store.get(new) == 'new text'
+
+
+def test_handles_are_content_hashes(tmp_path):
+    store = TextBlobStore(str(tmp_path / 'blobs'))
+    assert store.put('same text') == store.put('same text')
+    assert store.get('../../etc/passwd') is None
+    assert not store.exists(None)
@@ -0,0 +1,110 @@
+"""
+Server-side store of extracted document text.
+
+Once an upload is extracted, its text used to travel as a whole: in the
+extraction progress the page polls, back up in the POST that stores it in
+the session, in the session file, and in the job payload that generates the
+flashcards. Now each document's text is written once to text_blobs/ and
+everything else passes a handle - the SHA-256 of the text, so the same
+document uploaded twice is stored once - plus a short preview.
+
+Blobs that have not been stored or read for max_age_seconds are deleted
+(a pending project or job that still refers to one then asks for the
+documents to be uploaded again). Storing a blob prunes the store, at most
+once every prune_interval_seconds.
+"""
+
+import os
+import re
+import time
+import hashlib
+import threading
+from typing import Optional
+
+from atomic_writes import atomic_write
+
+PREVIEW_CHARS = 200
+PRUNE_INTERVAL_SECONDS = 3600
+HANDLE_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+
+
+def preview(text: str, chars: int = PREVIEW_CHARS) -> str:
+    """Start of a text with whitespace collapsed, for display"""
+    text = ' '.join(text[:chars * 2].split())
+    return text if len(text) <= chars else text[:chars].rstrip() + '…'
+
+
+class TextBlobStore:
+    """Texts stored once on disk and referred to by the SHA-256 of their content"""
+
+    def __init__(self, folder: str = 'text_blobs', max_age_seconds: float = 7 * 24 * 3600,
+                 prune_interval_seconds: float = PRUNE_INTERVAL_SECONDS):
+        self.folder = folder
+        self.max_age_seconds = max_age_seconds
+        self.prune_interval_seconds = prune_interval_seconds
+        self._last_prune = 0.0
+        self._lock = threading.Lock()
+
+    def _path(self, handle: str) -> str:
+        return os.path.join(self.folder, handle[:2], f'{handle}.txt')
+
+    def put(self, text: str) -> str:
+        """Store a text; returns its handle"""
+        data = text.encode('utf-8')
+        handle = hashlib.sha256(data).hexdigest()
+        path = self._path(handle)
+        self.prune()
+        if os.path.exists(path):
+            try:
+                os.utime(path)  # Keep it from being pruned
+                return handle
+            except OSError:
+                pass
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        atomic_write(path, lambda f: f.write(data), fsync=False)
+        return handle
+
+    def exists(self, handle: str) -> bool:
+        return isinstance(handle, str) and bool(HANDLE_PATTERN.match(handle)) and os.path.exists(self._path(handle))
+
+    def get(self, handle: str) -> Optional[str]:
+        """Text stored under a handle, or None if there is none"""
+        if not isinstance(handle, str) or not HANDLE_PATTERN.match(handle):
+            return None
+        path = self._path(handle)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                text = f.read()
+        except (OSError, ValueError):
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return text
+
+    def prune(self, force: bool = False) -> int:
+        """Delete blobs unused for max_age_seconds (at most once per prune_interval_seconds unless forced)"""
+        if not self.max_age_seconds:
+            return 0
+        with self._lock:
+            now = time.time()
+            if not force and now - self._last_prune < self.prune_interval_seconds:
+                return 0
+            self._last_prune = now
+        cutoff = now - self.max_age_seconds
+        removed = 0
+        if not os.path.isdir(self.folder):
+            return 0
+        for root, _, files in os.walk(self.folder):
+            for name in files:
+                if not name.endswith('.txt'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    if os.path.getmtime(path) < cutoff:
+                        os.remove(path)
+                        removed += 1
+                except OSError:
+                    pass
+        return removed
@@ -0,0 +1,147 @@
+"""
+Splitting long documents into chunks that fit a prompt.
+
+Generation used to send only the first few thousand characters of a document
+to the model, so everything after that was never turned into flashcards.
+split_into_chunks() cuts a document into pieces of at most max_tokens,
+breaking at headings and paragraphs where it can, and allocate_counts()
+spreads a requested number of cards over the chunks in proportion to their
+size. pack_texts() does the opposite for short topics, grouping them so that
+several can be generated with one request. Token counts are estimated from
+character counts (about four characters per token for English text), which
+is close enough for budgeting.
+"""
+
+import re
+from typing import List
+
+CHARS_PER_TOKEN = 4
+
+# A markdown heading, or a short line in capitals/title case on its own
+_HEADING = re.compile(r'^(#{1,6}\s+\S.*|[A-Z0-9][^.!?\n]{0,80})$')
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _blocks(text: str) -> List[str]:
+    """Paragraphs of the text, with each heading starting a new block"""
+    blocks = []
+    current = []
+    for line in text.replace('\r\n', '\n').split('\n'):
+        stripped = line.strip()
+        if not stripped:
+            if current:
+                blocks.append('\n'.join(current))
+                current = []
+        elif _HEADING.match(stripped) and current and not _HEADING.match(current[-1].strip()):
+            blocks.append('\n'.join(current))
+            current = [line]
+        else:
+            current.append(line)
+    if current:
+        blocks.append('\n'.join(current))
+    return blocks
+
+
+def _split_block(block: str, max_chars: int) -> List[str]:
+    """Break a block longer than max_chars at sentence ends, or hard-wrap as a last resort"""
+    pieces = []
+    current = ''
+    for sentence in _SENTENCE_END.split(block):
+        while len(sentence) > max_chars:
+            if current:
+                pieces.append(current)
+                current = ''
+            pieces.append(sentence[:max_chars])
+            sentence = sentence[max_chars:]
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            pieces.append(current)
+            current = sentence
+        else:
+            current = f'{current} {sentence}' if current else sentence
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def split_into_chunks(text: str, max_tokens: int) -> List[str]:
+    """
+    Split text into chunks of at most max_tokens (estimated), keeping
+    paragraphs together and starting a new chunk at a heading when the
+    current one is already at least half full.
+    """
+    max_chars = max(1, max_tokens * CHARS_PER_TOKEN)
+    text = text.strip()
+    if len(text) <= max_chars:
+        return [text] if text else []
+
+    chunks = []
+    current = []
+    size = 0
+    for block in _blocks(text):
+        pieces = [block] if len(block) <= max_chars else _split_block(block, max_chars)
+        for piece in pieces:
+            starts_section = _HEADING.match(piece.split('\n', 1)[0].strip()) is not None
+            if current and (size + 2 + len(piece) > max_chars or (starts_section and size >= max_chars // 2)):
+                chunks.append('\n\n'.join(current))
+                current = []
+                size = 0
+            size += len(piece) + (2 if current else 0)
+            current.append(piece)
+    if current:
+        chunks.append('\n\n'.join(current))
+    return chunks
+
+
+def allocate_counts(chunks: List[str], total: int) -> List[int]:
+    """
+    Number of cards to generate from each chunk, proportional to chunk size
+    and summing to total (largest remainder). When there are more chunks
+    than cards, the largest chunks get one card each.
+    """
+    if not chunks or total <= 0:
+        return [0] * len(chunks)
+    sizes = [max(1, len(chunk)) for chunk in chunks]
+    whole = sum(sizes)
+    shares = [total * size / whole for size in sizes]
+    counts = [int(share) for share in shares]
+    by_remainder = sorted(range(len(chunks)), key=lambda i: (shares[i] - counts[i], sizes[i]), reverse=True)
+    for i in by_remainder[:total - sum(counts)]:
+        counts[i] += 1
+    return counts
+
+
+def pack_texts(texts: List[str], counts: List[int], budget_tokens: int, max_cards: int) -> List[List[int]]:
+    """
+    Group texts (topics) into generation requests. A text that fits within
+    budget_tokens shares a request with others as long as the texts together
+    stay within budget_tokens and their card counts within max_cards (first
+    fit, keeping the original order inside each group); larger texts get a
+    request of their own. Returns lists of indexes into texts.
+    """
+    groups = []
+    totals = []  # [tokens, cards] of each open group
+    for i, text in enumerate(texts):
+        tokens = estimate_tokens(text)
+        if budget_tokens <= 0 or tokens > budget_tokens or counts[i] > max_cards:
+            groups.append([i])
+            totals.append(None)  # Never packed with anything else
+            continue
+        for group, total in zip(groups, totals):
+            if total and total[0] + tokens <= budget_tokens and total[1] + counts[i] <= max_cards:
+                group.append(i)
+                total[0] += tokens
+                total[1] += counts[i]
+                break
+        else:
+            groups.append([i])
+            totals.append([tokens, counts[i]])
+    return groups
+
+
+def normalize_question(question: str) -> str:
+    """Question text with case, punctuation and spacing ignored, for spotting duplicates"""
+    return ' '.join(re.sub(r'[^\w\s]', ' ', question.lower()).split())